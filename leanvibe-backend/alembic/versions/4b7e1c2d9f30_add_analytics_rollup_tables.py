@@ -0,0 +1,70 @@
+"""Add analytics rollup tables
+
+Revision ID: 4b7e1c2d9f30
+Revises: 20250813_add_indexes_logs_audit
+Create Date: 2025-08-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e1c2d9f30'
+down_revision: Union[str, None] = '20250813_add_indexes_logs_audit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create analytics_rollups table
+    op.create_table(
+        'analytics_rollups',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('tenant_id', sa.UUID(), nullable=False),
+        sa.Column('granularity', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('stage', sa.String(length=64), nullable=False),
+        sa.Column('pipelines_created', sa.Integer(), nullable=False),
+        sa.Column('pipelines_deployed', sa.Integer(), nullable=False),
+        sa.Column('pipelines_failed', sa.Integer(), nullable=False),
+        sa.Column('pipelines_active', sa.Integer(), nullable=False),
+        sa.Column('completion_hours_sum', sa.Float(), nullable=False),
+        sa.Column('completion_count', sa.Integer(), nullable=False),
+        sa.Column('cpu_hours', sa.Float(), nullable=False),
+        sa.Column('memory_gb_hours', sa.Float(), nullable=False),
+        sa.Column('storage_mb', sa.Integer(), nullable=False),
+        sa.Column('ai_tokens', sa.Integer(), nullable=False),
+        sa.Column('total_cost', sa.Float(), nullable=False),
+        sa.Column('stage_runs', sa.Integer(), nullable=False),
+        sa.Column('stage_hours_sum', sa.Float(), nullable=False),
+        sa.Column('stage_failures', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_rollup_bucket', 'analytics_rollups', ['tenant_id', 'granularity', 'stage', 'bucket_start'], unique=True)
+
+    # Create analytics_rollup_state table
+    op.create_table(
+        'analytics_rollup_state',
+        sa.Column('tenant_id', sa.UUID(), nullable=False),
+        sa.Column('projects_watermark', sa.DateTime(), nullable=True),
+        sa.Column('executions_watermark', sa.DateTime(), nullable=True),
+        sa.Column('rebuilt_at', sa.DateTime(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('tenant_id'),
+    )
+
+    # Incremental refreshes scan projects by last update
+    op.create_index('idx_mvp_tenant_updated', 'mvp_projects', ['tenant_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_mvp_tenant_updated', table_name='mvp_projects')
+    op.drop_table('analytics_rollup_state')
+    op.drop_index('idx_rollup_bucket', table_name='analytics_rollups')
+    op.drop_table('analytics_rollups')
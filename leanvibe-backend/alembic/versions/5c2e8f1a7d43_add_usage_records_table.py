@@ -0,0 +1,47 @@
+"""Add usage records table
+
+Revision ID: 5c2e8f1a7d43
+Revises: 4b7e1c2d9f30
+Create Date: 2025-08-22 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1a7d43'
+down_revision: Union[str, None] = '4b7e1c2d9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create usage_records table for rolled-up metered usage
+    op.create_table(
+        'usage_records',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('tenant_id', sa.UUID(), nullable=False),
+        sa.Column('subscription_id', sa.UUID(), nullable=False),
+        sa.Column('metric_type', sa.String(length=32), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=True),
+        sa.Column('usage_date', sa.DateTime(), nullable=False),
+        sa.Column('billing_period_start', sa.DateTime(), nullable=False),
+        sa.Column('billing_period_end', sa.DateTime(), nullable=False),
+        sa.Column('aggregation_key', sa.String(length=255), nullable=False),
+        sa.Column('stripe_usage_record_id', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_usage_aggregation_key', 'usage_records', ['aggregation_key'], unique=True)
+    op.create_index('idx_usage_tenant_period', 'usage_records', ['tenant_id', 'billing_period_start', 'metric_type'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_usage_tenant_period', table_name='usage_records')
+    op.drop_index('idx_usage_aggregation_key', table_name='usage_records')
+    op.drop_table('usage_records')
@@ -0,0 +1,34 @@
+"""Add updated_at to pipeline executions
+
+Revision ID: 6d3f9a2b8e51
+Revises: 5c2e8f1a7d43
+Create Date: 2025-08-24 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d3f9a2b8e51'
+down_revision: Union[str, None] = '5c2e8f1a7d43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Analytics rollups watermark executions on their last update
+    op.add_column('pipeline_executions', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE pipeline_executions "
+        "SET updated_at = COALESCE(completed_at, current_stage_started_at, started_at)"
+    )
+    op.alter_column('pipeline_executions', 'updated_at', nullable=False)
+    op.create_index('idx_exec_tenant_updated', 'pipeline_executions', ['tenant_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_exec_tenant_updated', table_name='pipeline_executions')
+    op.drop_column('pipeline_executions', 'updated_at')
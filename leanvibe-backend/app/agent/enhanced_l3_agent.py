@@ -4,11 +4,14 @@ Enhanced L3 Coding Agent with AST Integration
 Extends the basic L3 agent with deep code understanding through AST analysis.
 """
 
+import asyncio
 import logging
+import re
 import time
+from contextlib import aclosing
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from ..models.ast_models import (
     ProjectContext,
@@ -34,6 +37,7 @@ from ..services.file_monitor_service import file_monitor_service
 from ..services.graph_query_service import graph_query_service
 from ..services.graph_service import graph_service
 from ..services.incremental_indexer import incremental_indexer
+from ..services.index_snapshot import SnapshotOverlay
 from ..services.project_indexer import project_indexer
 from ..services.unified_mlx_service import unified_mlx_service
 from ..services.visualization_service import visualization_service
@@ -60,6 +64,18 @@ class EnhancedL3CodingAgent(L3CodingAgent):
         self.last_index_update = 0
         self.index_timeout = 300  # 5 minutes
 
+        # Progressive indexing: tools answer from the partial index while the
+        # rest of the project is indexed in the background
+        self.open_files: List[str] = []  # Files open in the client, indexed first
+        self.current_file: Optional[str] = None  # File being edited in the client
+        self.index_status: Dict[str, Any] = {
+            "complete": False,
+            "files_indexed": 0,
+            "total_files": 0,
+        }
+        self._indexing_task: Optional[asyncio.Task] = None
+        self._index_available: Optional[asyncio.Event] = None
+
         # AST Context Provider for intelligent code assistance
         self.ast_context_provider = ASTContextProvider()
 
@@ -128,7 +144,7 @@ class EnhancedL3CodingAgent(L3CodingAgent):
             # Create project context
             self.project_context = ProjectContext(
                 workspace_path=workspace_path,
-                current_file=None,
+                current_file=self.current_file,
                 recent_changes=[],
                 key_components=[],
                 technology_stack=[],
@@ -141,49 +157,144 @@ class EnhancedL3CodingAgent(L3CodingAgent):
             logger.error(f"Error initializing project context: {e}")
 
     async def _ensure_project_indexed(self, force_refresh: bool = False) -> bool:
-        """Ensure project is indexed and up-to-date"""
+        """Ensure a project index is available and up-to-date
+
+        Indexing runs in the background; this returns as soon as the first
+        partial snapshot is published rather than after the whole project.
+        """
         try:
             current_time = time.time()
+            indexing = self._indexing_task is not None and not self._indexing_task.done()
 
             # Check if we need to refresh the index
             if (
                 not force_refresh
                 and self.project_index
-                and current_time - self.last_index_update < self.index_timeout
+                and (indexing or current_time - self.last_index_update < self.index_timeout)
             ):
                 return True
 
-            logger.info("Updating project index...")
+            if not indexing:
+                logger.info("Updating project index...")
+                self._index_available = asyncio.Event()
+                self._indexing_task = asyncio.create_task(
+                    self._index_project_in_background(force_refresh)
+                )
+
+            await self._index_available.wait()
+            return self.project_index is not None
+
+        except Exception as e:
+            logger.error(f"Error indexing project: {e}")
+            return False
+
+    async def _index_project_in_background(self, force_refresh: bool = False):
+        """Index the workspace, serving partial snapshots until it completes"""
+        try:
             workspace_path = self.dependencies.workspace_path
 
             # Index the project using incremental indexer for better performance
-            self.project_index = await incremental_indexer.get_or_create_project_index(
-                workspace_path, force_full_reindex=force_refresh
+            project_index = await incremental_indexer.get_or_create_project_index(
+                workspace_path,
+                force_full_reindex=force_refresh,
+                priority_files=self._priority_files(),
+                on_snapshot=self._publish_partial_index,
             )
-            self.last_index_update = current_time
+            self.last_index_update = time.time()
 
-            # Store project in graph database
-            if graph_service.initialized and self.project_index:
-                f"project_{hash(workspace_path)}"
-                await graph_service.store_project_graph(
-                    self.project_index, workspace_path
-                )
-                logger.debug("Project stored in graph database")
+            if project_index:
+                await self._publish_project_index(project_index)
 
-            # Update project context
+        except Exception as e:
+            logger.error(f"Error indexing project: {e}")
+        finally:
+            self._index_available.set()
+
+    def _priority_files(self) -> List[str]:
+        """Files the client has open, indexed before the rest of the project"""
+        priority_files = list(self.open_files)
+        if self.project_context and self.project_context.current_file:
+            priority_files.insert(0, self.project_context.current_file)
+        return priority_files
+
+    def set_open_files(self, file_paths: List[str], current_file: Optional[str] = None):
+        """Record the files open in the client so they are indexed first"""
+        self.open_files = list(file_paths)
+        if current_file:
+            self.current_file = current_file
             if self.project_context:
-                self.project_context.project_index = self.project_index
-                await self._update_project_context()
+                self.project_context.current_file = current_file
 
-            logger.info(
-                f"Project indexed: {self.project_index.supported_files} files, "
-                f"{len(self.project_index.symbols)} symbols"
-            )
-            return True
+    def _index_reader(self) -> Optional[SnapshotOverlay]:
+        """Symbol, file and dependency lookups served from the mapped snapshot
 
-        except Exception as e:
-            logger.error(f"Error indexing project: {e}")
-            return False
+        Only used once indexing is complete, when the snapshot (with the
+        overlay of later changes) matches the published index.
+        """
+        if not self.index_status["complete"]:
+            return None
+        return incremental_indexer.get_index_reader(self.dependencies.workspace_path)
+
+    def _publish_partial_index(self, project_index: ProjectIndex):
+        """Serve a partial snapshot unless a complete index is already available"""
+        if self.project_index is None or not self.index_status["complete"]:
+            if self.project_index is not project_index:
+                self.project_index = project_index
+                graph_query_service.register_call_graph(
+                    f"project_{hash(self.dependencies.workspace_path)}",
+                    project_index.call_graph,
+                )
+                if self.project_context:
+                    self.project_context.project_index = project_index
+
+            self.index_status = {
+                "complete": False,
+                "files_indexed": len(project_index.files),
+                "total_files": project_index.total_files,
+            }
+
+        self._index_available.set()
+
+    async def _publish_project_index(self, project_index: ProjectIndex):
+        """Make a completed index the one tools answer from"""
+        workspace_path = self.dependencies.workspace_path
+        self.project_index = project_index
+        self.index_status = {
+            "complete": True,
+            "files_indexed": len(project_index.files),
+            "total_files": project_index.total_files,
+        }
+
+        # Serve call graph queries in memory when the graph database is down
+        graph_query_service.register_call_graph(
+            f"project_{hash(workspace_path)}", project_index.call_graph
+        )
+
+        # Store project in graph database
+        if graph_service.initialized:
+            await graph_service.store_project_graph(project_index, workspace_path)
+            logger.debug("Project stored in graph database")
+
+        # Update project context
+        if self.project_context:
+            self.project_context.project_index = project_index
+            await self._update_project_context()
+
+        logger.info(
+            f"Project indexed: {project_index.supported_files} files, "
+            f"{len(project_index.symbols)} symbols"
+        )
+
+    def _with_index_status(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Flag results answered from a partially indexed project"""
+        result["index_status"] = dict(self.index_status)
+        if not self.index_status["complete"] and self.index_status["total_files"]:
+            result["message"] = (
+                f"{result['message']} (partial index: "
+                f"{self.index_status['files_indexed']}/"
+                f"{self.index_status['total_files']} files indexed)"
+            )
+        return result
 
     async def _update_project_context(self):
         """Update project context with analysis insights"""
@@ -324,14 +435,29 @@ class EnhancedL3CodingAgent(L3CodingAgent):
             # Reference finding
             elif "references" in user_lower or "where is" in user_lower:
                 # Extract symbol name from query
-                for symbol in (
-                    self.project_index.symbols.values() if self.project_index else []
-                ):
-                    if symbol.name.lower() in user_lower:
-                        result = await self._find_references_tool(symbol.name)
-                        if result["status"] == "success":
-                            return result["data"]["summary"]
-                        break
+                reader = self._index_reader()
+                if reader is not None:
+                    # Exact lookups of the query's words in the mapped snapshot
+                    candidates = (
+                        symbol
+                        for word in re.findall(r"[A-Za-z_]\w*", user_input)
+                        for symbol in reader.find_symbols(word)[:1]
+                    )
+                else:
+                    candidates = (
+                        symbol
+                        for symbol in (
+                            self.project_index.symbols.values()
+                            if self.project_index
+                            else []
+                        )
+                        if symbol.name.lower() in user_lower
+                    )
+                for symbol in candidates:
+                    result = await self._find_references_tool(symbol.name)
+                    if result["status"] == "success":
+                        return result["data"]["summary"]
+                    break
 
             # Complexity analysis
             elif any(
@@ -583,13 +709,15 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                 * 0.4,
             )
 
-            return {
-                "status": "success",
-                "type": "project_analysis",
-                "data": analysis_data,
-                "message": "Project analysis completed successfully",
-                "confidence": confidence,
-            }
+            return self._with_index_status(
+                {
+                    "status": "success",
+                    "type": "project_analysis",
+                    "data": analysis_data,
+                    "message": "Project analysis completed successfully",
+                    "confidence": confidence,
+                }
+            )
 
         except Exception as e:
             logger.error(f"Error in project analysis tool: {e}")
@@ -640,7 +768,10 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                 summary_parts.append(f"\n{symbol_type}s:")
                 for symbol in symbols[:5]:  # Limit to 5 per type
                     location = f"{Path(symbol.file_path).name}:{symbol.line_start}"
-                    summary_parts.append(f"  • {symbol.name} ({location})")
+                    references = self.project_index.identifiers.count(symbol.name)
+                    summary_parts.append(
+                        f"  • {symbol.name} ({location}, {references} references)"
+                    )
 
                 if len(symbols) > 5:
                     summary_parts.append(f"  ... and {len(symbols) - 5} more")
@@ -654,19 +785,22 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                         "type": s.symbol_type,
                         "file": s.file_path,
                         "line": s.line_start,
+                        "references": self.project_index.identifiers.count(s.name),
                     }
                     for s in matching_symbols[:10]
                 ],
                 "summary": "\n".join(summary_parts),
             }
 
-            return {
-                "status": "success",
-                "type": "symbol_exploration",
-                "data": data,
-                "message": f"Found {len(matching_symbols)} symbols",
-                "confidence": 0.9,
-            }
+            return self._with_index_status(
+                {
+                    "status": "success",
+                    "type": "symbol_exploration",
+                    "data": data,
+                    "message": f"Found {len(matching_symbols)} symbols",
+                    "confidence": 0.9,
+                }
+            )
 
         except Exception as e:
             logger.error(f"Error in symbol exploration: {e}")
@@ -688,7 +822,7 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
 
             # Find references using project indexer
             references = await project_indexer.find_references(
-                self.project_index, symbol_name
+                self.project_index, symbol_name, reader=self._index_reader()
             )
 
             if not references:
@@ -702,7 +836,12 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
             definitions = [
                 ref for ref in references if ref.reference_type == "definition"
             ]
-            usages = [ref for ref in references if ref.reference_type == "usage"]
+            usages = [ref for ref in references if ref.reference_type != "definition"]
+            usages_by_kind: Dict[str, int] = {}
+            for ref in usages:
+                usages_by_kind[ref.reference_type] = (
+                    usages_by_kind.get(ref.reference_type, 0) + 1
+                )
 
             # Generate summary
             summary = f"References for '{symbol_name}':\n\n"
@@ -714,10 +853,13 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                     summary += f"  • {location} - {ref.context or 'Definition'}\n"
 
             if usages:
-                summary += f"\n🔗 Usages ({len(usages)}):\n"
+                breakdown = ", ".join(
+                    f"{count} {kind}s" for kind, count in usages_by_kind.items()
+                )
+                summary += f"\n🔗 Usages ({len(usages)}: {breakdown}):\n"
                 for ref in usages[:5]:
                     location = f"{Path(ref.file_path).name}:{ref.line_number}"
-                    summary += f"  • {location} - {ref.context or 'Usage'}\n"
+                    summary += f"  • {location} [{ref.reference_type}] - {ref.context or 'Usage'}\n"
 
                 if len(usages) > 5:
                     summary += f"  ... and {len(usages) - 5} more usages\n"
@@ -726,17 +868,21 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                 "total_references": len(references),
                 "definitions": len(definitions),
                 "usages": len(usages),
+                "calls": usages_by_kind.get("call", 0),
+                "imports": usages_by_kind.get("import", 0),
                 "files_affected": len(set(ref.file_path for ref in references)),
                 "summary": summary,
             }
 
-            return {
-                "status": "success",
-                "type": "reference_analysis",
-                "data": data,
-                "message": f"Found {len(references)} references",
-                "confidence": 0.85,
-            }
+            return self._with_index_status(
+                {
+                    "status": "success",
+                    "type": "reference_analysis",
+                    "data": data,
+                    "message": f"Found {len(references)} references",
+                    "confidence": 0.85,
+                }
+            )
 
         except Exception as e:
             logger.error(f"Error finding references: {e}")
@@ -816,13 +962,15 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                 "summary": summary,
             }
 
-            return {
-                "status": "success",
-                "type": "complexity_analysis",
-                "data": data,
-                "message": "Complexity analysis completed",
-                "confidence": 0.9,
-            }
+            return self._with_index_status(
+                {
+                    "status": "success",
+                    "type": "complexity_analysis",
+                    "data": data,
+                    "message": "Complexity analysis completed",
+                    "confidence": 0.9,
+                }
+            )
 
         except Exception as e:
             logger.error(f"Error in complexity analysis: {e}")
@@ -846,13 +994,23 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
             context_info = []
 
             if self.project_index:
+                reader = self._index_reader()
+
                 # Find related files through dependencies
                 related_files = []
-                for dep in self.project_index.dependencies:
-                    if dep.source_file == file_path and dep.target_file:
-                        related_files.append(Path(dep.target_file).name)
-                    elif dep.target_file == file_path:
-                        related_files.append(Path(dep.source_file).name)
+                dependency_edges = (
+                    reader.dependency_edges()
+                    if reader is not None
+                    else (
+                        (dep.source_file, dep.target_file)
+                        for dep in self.project_index.dependencies
+                    )
+                )
+                for source_file, target_file in dependency_edges:
+                    if source_file == file_path and target_file:
+                        related_files.append(Path(target_file).name)
+                    elif target_file == file_path:
+                        related_files.append(Path(source_file).name)
 
                 if related_files:
                     context_info.append(
@@ -860,11 +1018,14 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
                     )
 
                 # Find symbols in this file
-                file_symbols = [
-                    symbol
-                    for symbol in self.project_index.symbols.values()
-                    if symbol.file_path == file_path
-                ]
+                if reader is not None:
+                    file_symbols = reader.symbols_in_file(file_path)
+                else:
+                    file_symbols = [
+                        symbol
+                        for symbol in self.project_index.symbols.values()
+                        if symbol.file_path == file_path
+                    ]
 
                 if file_symbols:
                     symbol_summary = {}
@@ -1145,16 +1306,19 @@ Technology Stack: {', '.join(self.project_context.technology_stack[:10]) if self
     async def _find_hotspots_tool(self) -> Dict[str, Any]:
         """Find code hotspots (frequently connected code)"""
         try:
-            if not graph_service.initialized:
+            workspace_path = self.dependencies.workspace_path
+            project_id = f"project_{hash(workspace_path)}"
+
+            if (
+                not graph_service.initialized
+                and project_id not in graph_query_service.call_graphs
+            ):
                 return {
                     "status": "error",
                     "message": "Graph database not available",
                     "confidence": 0.0,
                 }
 
-            workspace_path = self.dependencies.workspace_path
-            project_id = f"project_{hash(workspace_path)}"
-
             hotspots = await graph_query_service.find_hotspots(project_id)
 
             if not hotspots:
@@ -1495,6 +1659,7 @@ Use it to understand:
             {
                 "project_indexed": self.project_index is not None,
                 "last_index_update": self.last_index_update,
+                "index_status": dict(self.index_status),
                 "project_files": (
                     self.project_index.supported_files if self.project_index else 0
                 ),
@@ -2014,22 +2179,13 @@ Start again with 'start monitoring' when needed."""
                 await incremental_indexer.clear_cache(workspace_path)
 
             # Force reindex
-            self.project_index = await incremental_indexer.get_or_create_project_index(
-                workspace_path, force_full_reindex=force_full
+            project_index = await incremental_indexer.get_or_create_project_index(
+                workspace_path,
+                force_full_reindex=force_full,
+                priority_files=self._priority_files(),
             )
             self.last_index_update = time.time()
-
-            # Update graph database
-            if graph_service.initialized and self.project_index:
-                f"project_{hash(workspace_path)}"
-                await graph_service.store_project_graph(
-                    self.project_index, workspace_path
-                )
-
-            # Update project context
-            if self.project_context:
-                self.project_context.project_index = self.project_index
-                await self._update_project_context()
+            await self._publish_project_index(project_index)
 
             refresh_time = time.time() - start_time
 
@@ -3104,6 +3260,30 @@ Generated {suggestion_count} contextual suggestions based on:
             logger.error(f"Error in MLX optimize code tool: {e}")
             return f"Error: {str(e)}"
 
+    async def stream_code_completion(
+        self, file_path: str, cursor_position: int = 0, intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a code completion token by token using MLX inference with AST context
+
+        Args:
+            file_path: File being edited
+            cursor_position: Cursor position in the file
+            intent: Type of completion requested
+
+        Yields:
+            Streaming events from the unified MLX service (start, token, complete/error)
+        """
+        context = await self.ast_context_provider.get_completion_context(
+            file_path, cursor_position, intent=intent
+        )
+
+        async with aclosing(
+            unified_mlx_service.stream_code_completion(context, intent)
+        ) as events:
+            async for event in events:
+                yield event
+
     async def _mlx_stream_completion_tool(self, request: str) -> str:
         """
         Generate streaming code completion using MLX inference
@@ -3112,7 +3292,9 @@ Generated {suggestion_count} contextual suggestions based on:
             request: JSON string with file_path, cursor_position, and intent
 
         Returns:
-            Information about starting streaming completion
+            The assembled completion plus streaming timings. Clients that want
+            tokens as they are generated should use the SSE endpoint or the
+            WebSocket ``code_completion`` message with ``stream: true``.
         """
         try:
             import json
@@ -3133,22 +3315,26 @@ Generated {suggestion_count} contextual suggestions based on:
                 f"Starting MLX streaming completion for {file_path}:{cursor_position} with intent '{intent}'"
             )
 
-            # Get rich AST context
-            await self.ast_context_provider.get_completion_context(
-                file_path, cursor_position, intent=intent
-            )
+            final_event: Dict[str, Any] = {}
+            async for event in self.stream_code_completion(
+                file_path, cursor_position, intent
+            ):
+                if event["type"] in ("complete", "error"):
+                    final_event = event
 
-            # Note: In a real implementation, this would set up a streaming endpoint
-            # For now, we simulate by starting the stream and returning info
+            if final_event.get("type") != "complete":
+                return f"Error generating streaming completion: {final_event.get('error', 'Unknown error')}"
 
             result = {
-                "status": "streaming_started",
+                "status": "streaming_completed",
                 "file_path": file_path,
                 "cursor_position": cursor_position,
                 "intent": intent,
-                "context_ready": True,
-                "estimated_chunks": 10,
-                "message": "Streaming completion started. Use WebSocket connection to receive real-time updates.",
+                "response": final_event["response"],
+                "confidence": final_event["confidence"],
+                "chunk_count": final_event.get("chunk_count", 1),
+                "time_to_first_token": final_event["time_to_first_token"],
+                "total_response_time": final_event["total_response_time"],
             }
 
             return json.dumps(result, indent=2)
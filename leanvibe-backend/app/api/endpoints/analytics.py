@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from ...models.analytics_models import (
@@ -17,7 +17,11 @@ from ...models.analytics_models import (
     TimeSeriesData, AnalyticsFilter
 )
 from ...services.auth_service import auth_service
-from ...services.mvp_service import mvp_service
+from ...services.analytics_service import analytics_service
+from ...services.analytics_export_service import (
+    EXPORT_DATASETS, EXPORT_FORMATS, analytics_export_service
+)
+from ...services.storage import RangeNotSatisfiable, ZeroCopyFileResponse, get_storage_service
 from ...services.audit_service import audit_service
 from ...middleware.tenant_middleware import get_current_tenant, require_tenant
 from ...auth.permissions import require_permission, Permission
@@ -34,7 +38,9 @@ async def get_pipeline_analytics(
     tenant = Depends(require_tenant),
     _perm = Depends(require_permission(Permission.TENANT_READ)),
     time_range: str = Query("30d", description="Time range: 7d, 30d, 90d, 1y"),
-    include_predictions: bool = Query(False, description="Include predictive analytics")
+    include_predictions: bool = Query(False, description="Include predictive analytics"),
+    cursor: Optional[str] = Query(None, description="Resume the daily time series after this date"),
+    limit: int = Query(400, ge=1, le=400, description="Maximum number of time series points")
 ) -> PipelineAnalyticsResponse:
     """
     Get comprehensive pipeline analytics for the tenant
@@ -54,6 +60,10 @@ async def get_pipeline_analytics(
     - Resource utilization patterns
     - Error frequency and types
     - Performance trends over time
+
+    Aggregates are read from pre-computed hourly and daily rollups. The daily
+    time series is paginated: pass the returned ``next_cursor`` as ``cursor``
+    to fetch the following page.
     """
     try:
         # Verify token
@@ -63,21 +73,18 @@ async def get_pipeline_analytics(
         days = _parse_time_range(time_range)
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get pipeline data for tenant
-        projects = await mvp_service.get_tenant_mvp_projects(tenant.id, limit=1000)
-        
-        # Filter by time range
-        filtered_projects = [
-            p for p in projects 
-            if p.created_at >= start_date
-        ]
+        # Aggregate pipeline rollups for the range
+        summary = await analytics_service.pipeline_summary(tenant.id, start_date)
+        time_series_data, next_cursor = await analytics_service.daily_series(
+            tenant.id, start_date, cursor=cursor, limit=limit
+        )
         
         # Calculate analytics
-        analytics = _calculate_pipeline_analytics(filtered_projects, start_date)
+        analytics = _calculate_pipeline_analytics(summary, time_series_data)
         
         # Add predictions if requested
         if include_predictions:
-            analytics["predictions"] = _generate_pipeline_predictions(filtered_projects)
+            analytics["predictions"] = _generate_pipeline_predictions(summary)
         
         response = PipelineAnalyticsResponse(
             tenant_id=tenant.id,
@@ -92,7 +99,8 @@ async def get_pipeline_analytics(
             error_breakdown=analytics["error_breakdown"],
             time_series_data=analytics["time_series_data"],
             performance_trends=analytics["performance_trends"],
-            predictions=analytics.get("predictions")
+            predictions=analytics.get("predictions"),
+            next_cursor=next_cursor
         )
         
         logger.info(f"Generated pipeline analytics for tenant {tenant.id}")
@@ -134,11 +142,11 @@ async def get_tenant_analytics(
         days = _parse_time_range(time_range)
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get tenant data
-        projects = await mvp_service.get_tenant_mvp_projects(tenant.id, limit=1000)
+        # Get all-time project totals from the rollups
+        totals = await analytics_service.tenant_totals(tenant.id)
         
         # Calculate tenant analytics
-        analytics = _calculate_tenant_analytics(tenant, projects, start_date)
+        analytics = _calculate_tenant_analytics(tenant, totals, start_date)
         
         response = TenantAnalyticsResponse(
             tenant_id=tenant.id,
@@ -396,24 +404,26 @@ async def get_user_engagement_metrics(
         )
 
 
-@router.post("/export")
+@router.post("/export", status_code=status.HTTP_202_ACCEPTED)
 async def export_analytics(
     export_request: Dict[str, Any],
     credentials: HTTPAuthorizationCredentials = Depends(security),
     tenant = Depends(require_tenant),
     _perm = Depends(require_permission(Permission.TENANT_READ))
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
     Export analytics data in various formats
     
     Exports comprehensive analytics data for external analysis,
     reporting, or integration with business intelligence tools.
+    The export runs as a background job; poll the returned status URL
+    and download each dataset once the job has completed.
     
     **Export Options:**
-    - Format: CSV, JSON, Excel, PDF
-    - Time range and filters
-    - Specific metric selections
-    - Data aggregation level
+    - Format: CSV, JSON, NDJSON
+    - Datasets: audit_logs, usage, pipelines (or "all")
+    - Time range: 7d, 30d, 90d, 1y
+    - Gzip compression (``compress: true``)
     """
     try:
         # Verify token
@@ -423,37 +433,49 @@ async def export_analytics(
         # Validate export request
         export_format = export_request.get("format", "csv")
         time_range = export_request.get("time_range", "30d")
-        metrics = export_request.get("metrics", ["all"])
+        metrics = export_request.get("datasets") or export_request.get("metrics") or ["all"]
+        compress = bool(export_request.get("compress", False))
         
-        if export_format not in ["csv", "json", "xlsx", "pdf"]:
+        if export_format not in EXPORT_FORMATS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unsupported export format"
             )
+        datasets = list(EXPORT_DATASETS) if "all" in metrics else metrics
+        if not set(datasets) <= set(EXPORT_DATASETS):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown datasets. Must be among: {list(EXPORT_DATASETS)}"
+            )
+        
+        days = _parse_time_range(time_range)
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
         
-        # Generate export file
-        export_id = f"export_{tenant.id.hex[:8]}_{int(datetime.utcnow().timestamp())}"
+        # Start the export job
+        job = analytics_export_service.submit(
+            tenant.id, export_format, datasets, start_date, end_date,
+            compress=compress, user_id=user_id
+        )
         
         # Audit export initiation
         await audit_service.log(
             tenant_id=tenant.id,
             action="analytics_export",
             resource_type="analytics",
-            resource_id=export_id,
+            resource_id=job.export_id,
             user_id=user_id,
-            details={"format": export_format, "metrics": metrics, "time_range": time_range},
+            details={"format": export_format, "metrics": datasets, "time_range": time_range},
         )
-
-        # TODO: Implement actual export generation
-        # For now, return mock export information
         
         return {
-            "export_id": export_id,
-            "status": "generating",
-            "download_url": f"/api/v1/analytics/exports/{export_id}",
-            "estimated_completion": (datetime.utcnow() + timedelta(minutes=5)).isoformat(),
+            "export_id": job.export_id,
+            "status": job.status,
+            "status_url": f"/api/v1/analytics/exports/{job.export_id}",
+            "download_url": f"/api/v1/analytics/exports/{job.export_id}/files/{job.datasets[0]}",
             "format": export_format,
-            "metrics_included": metrics
+            "compressed": compress,
+            "metrics_included": job.datasets
         }
         
     except HTTPException:
@@ -466,6 +488,75 @@ async def export_analytics(
         )
 
 
+@router.get("/exports/{export_id}")
+async def get_export_status(
+    export_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    tenant = Depends(require_tenant),
+    _perm = Depends(require_permission(Permission.TENANT_READ))
+) -> Dict[str, Any]:
+    """
+    Get the status and progress of an analytics export
+    
+    Returns the job status, rows written, progress percentage, and a
+    download URL per dataset once its file is complete.
+    """
+    await auth_service.verify_token(credentials.credentials)
+    
+    job = await analytics_export_service.get_job(tenant.id, export_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+    
+    result = job.to_dict()
+    for name, export_file in job.files.items():
+        result["files"][name]["download_url"] = (
+            f"/api/v1/analytics/exports/{export_id}/files/{name}" if export_file.completed else None
+        )
+    return result
+
+
+@router.get("/exports/{export_id}/files/{dataset}")
+async def download_export_file(
+    export_id: str,
+    dataset: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    tenant = Depends(require_tenant),
+    _perm = Depends(require_permission(Permission.TENANT_READ)),
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    if_none_match: Optional[str] = Header(default=None, alias="If-None-Match")
+) -> Response:
+    """
+    Download an exported dataset
+    
+    Supports single byte ranges so interrupted downloads can resume.
+    With S3 storage the response redirects to a presigned URL.
+    """
+    await auth_service.verify_token(credentials.credentials)
+    
+    job = await analytics_export_service.get_job(tenant.id, export_id)
+    export_file = job.files.get(dataset) if job else None
+    if not export_file:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+    if not export_file.completed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export file is not ready")
+    
+    storage = get_storage_service()
+    if hasattr(storage, "presign_download"):
+        url = storage.presign_download(tenant.id, export_file.path, range_header=range_header)
+        return Response(status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Location": url})
+    
+    try:
+        served = storage.open_range(tenant.id, export_file.path, range_header, if_none_match)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export file not found")
+    except RangeNotSatisfiable as e:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{e.size}"}
+        )
+    return ZeroCopyFileResponse(served, filename=export_file.filename, media_type=export_file.media_type)
+
+
 # Helper functions
 
 def _parse_time_range(time_range: str) -> int:
@@ -486,38 +577,44 @@ def _parse_time_range(time_range: str) -> int:
     return range_mapping[time_range]
 
 
-def _calculate_pipeline_analytics(projects: List, start_date: datetime) -> Dict[str, Any]:
-    """Calculate pipeline analytics from project data"""
-    total_pipelines = len(projects)
-    successful_pipelines = len([p for p in projects if p.status.value == "deployed"])
-    failed_pipelines = len([p for p in projects if p.status.value == "failed"])
+def _calculate_pipeline_analytics(summary: Dict[str, Any], time_series_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate pipeline analytics from aggregated rollups"""
+    project = summary["project"]
+    total_pipelines = project["pipelines_created"]
+    successful_pipelines = project["pipelines_deployed"]
+    failed_pipelines = project["pipelines_failed"]
     
     # Calculate average completion time
-    completed_projects = [p for p in projects if p.completed_at and p.created_at]
-    if completed_projects:
-        avg_completion = sum(
-            (p.completed_at - p.created_at).total_seconds() / 3600 
-            for p in completed_projects
-        ) / len(completed_projects)
+    if project["completion_count"]:
+        avg_completion = project["completion_hours_sum"] / project["completion_count"]
     else:
         avg_completion = 0.0
     
     success_rate = (successful_pipelines / total_pipelines * 100) if total_pipelines > 0 else 0.0
     
-    # Mock additional analytics
     stage_performance = {
-        "blueprint_generation": {"avg_time": 0.5, "success_rate": 98.5},
-        "backend_development": {"avg_time": 2.0, "success_rate": 95.0},
-        "frontend_development": {"avg_time": 1.8, "success_rate": 96.5},
-        "infrastructure_setup": {"avg_time": 0.8, "success_rate": 99.0},
-        "deployment": {"avg_time": 0.3, "success_rate": 97.5}
+        stage: {
+            "avg_time": metrics["stage_hours_sum"] / metrics["stage_runs"],
+            "success_rate": (1 - metrics["stage_failures"] / metrics["stage_runs"]) * 100
+        }
+        for stage, metrics in summary["stages"].items()
+        if metrics["stage_runs"]
     }
+    if not stage_performance:
+        # Mock defaults until pipeline executions are recorded
+        stage_performance = {
+            "blueprint_generation": {"avg_time": 0.5, "success_rate": 98.5},
+            "backend_development": {"avg_time": 2.0, "success_rate": 95.0},
+            "frontend_development": {"avg_time": 1.8, "success_rate": 96.5},
+            "infrastructure_setup": {"avg_time": 0.8, "success_rate": 99.0},
+            "deployment": {"avg_time": 0.3, "success_rate": 97.5}
+        }
     
     resource_utilization = {
-        "cpu_hours": sum(getattr(p, 'cpu_hours_used', 0) for p in projects),
-        "memory_gb_hours": sum(getattr(p, 'memory_gb_hours_used', 0) for p in projects),
-        "storage_mb": sum(getattr(p, 'storage_mb_used', 0) for p in projects),
-        "ai_tokens": sum(getattr(p, 'ai_tokens_used', 0) for p in projects)
+        "cpu_hours": project["cpu_hours"],
+        "memory_gb_hours": project["memory_gb_hours"],
+        "storage_mb": project["storage_mb"],
+        "ai_tokens": project["ai_tokens"]
     }
     
     error_breakdown = {
@@ -527,19 +624,6 @@ def _calculate_pipeline_analytics(projects: List, start_date: datetime) -> Dict[
         "infrastructure_errors": failed_pipelines * 0.2
     }
     
-    # Generate time series data
-    time_series_data = []
-    current_date = start_date
-    while current_date <= datetime.utcnow():
-        day_projects = [p for p in projects if p.created_at.date() == current_date.date()]
-        time_series_data.append({
-            "date": current_date.isoformat(),
-            "pipelines_created": len(day_projects),
-            "pipelines_completed": len([p for p in day_projects if p.status.value == "deployed"]),
-            "success_rate": (len([p for p in day_projects if p.status.value == "deployed"]) / len(day_projects) * 100) if day_projects else 0
-        })
-        current_date += timedelta(days=1)
-    
     performance_trends = {
         "completion_time_trend": "improving",
         "success_rate_trend": "stable",
@@ -560,7 +644,7 @@ def _calculate_pipeline_analytics(projects: List, start_date: datetime) -> Dict[
     }
 
 
-def _generate_pipeline_predictions(projects: List) -> Dict[str, Any]:
+def _generate_pipeline_predictions(summary: Dict[str, Any]) -> Dict[str, Any]:
     """Generate predictive analytics for pipeline performance"""
     return {
         "predicted_success_rate": 96.5,
@@ -577,10 +661,10 @@ def _generate_pipeline_predictions(projects: List) -> Dict[str, Any]:
     }
 
 
-def _calculate_tenant_analytics(tenant, projects: List, start_date: datetime) -> Dict[str, Any]:
+def _calculate_tenant_analytics(tenant, totals: Dict[str, float], start_date: datetime) -> Dict[str, Any]:
     """Calculate tenant-specific analytics"""
-    total_projects = len(projects)
-    active_projects = len([p for p in projects if p.status.value in ["generating", "blueprint_pending"]])
+    total_projects = totals["pipelines_created"]
+    active_projects = totals["pipelines_active"]
     
     return {
         "total_projects": total_projects,
@@ -588,15 +672,15 @@ def _calculate_tenant_analytics(tenant, projects: List, start_date: datetime) ->
         "total_users": 1,  # Mock data
         "active_users": 1,  # Mock data
         "resource_usage": {
-            "cpu_hours": sum(getattr(p, 'cpu_hours_used', 0) for p in projects),
-            "storage_gb": sum(getattr(p, 'storage_mb_used', 0) for p in projects) / 1024,
+            "cpu_hours": totals["cpu_hours"],
+            "storage_gb": totals["storage_mb"] / 1024,
             "bandwidth_gb": 10.5,  # Mock data
-            "ai_tokens": sum(getattr(p, 'ai_tokens_used', 0) for p in projects)
+            "ai_tokens": totals["ai_tokens"]
         },
         "billing_metrics": {
-            "current_month_cost": sum(getattr(p, 'total_cost', 0) for p in projects),
+            "current_month_cost": totals["total_cost"],
             "projected_month_cost": 250.0,
-            "cost_per_project": sum(getattr(p, 'total_cost', 0) for p in projects) / max(1, total_projects)
+            "cost_per_project": totals["total_cost"] / max(1, total_projects)
         },
         "feature_usage": {
             "pipeline_generation": total_projects,
@@ -12,7 +12,7 @@ from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from ...models.billing_models import (
-    Plan, BillingAccount, Subscription, UsageRecord, BillingAnalytics,
+    Plan, BillingAccount, Subscription, BillingAnalytics,
     CreateSubscriptionRequest, UpdateSubscriptionRequest, CreatePaymentMethodRequest,
     UsageMetricType, DEFAULT_PLANS
 )
@@ -310,17 +310,17 @@ async def cancel_subscription(
         )
 
 
-@router.post("/usage", response_model=UsageRecord)
+@router.post("/usage", status_code=status.HTTP_202_ACCEPTED)
 async def record_usage(
     metric_type: UsageMetricType,
     quantity: int,
     tenant=Depends(require_tenant),
     current_user=Depends(get_current_user)
-) -> UsageRecord:
+) -> Dict:
     """
     Record usage for metered billing
     
-    Track usage metrics for billing calculation.
+    Usage is aggregated and reported to billing on the next flush interval.
     """
     try:
         if quantity <= 0:
@@ -329,12 +329,16 @@ async def record_usage(
                 detail="Quantity must be positive"
             )
         
-        usage_record = await billing_service.record_usage(
+        aggregation_key = await billing_service.record_usage(
             tenant.id, metric_type, quantity
         )
         
-        logger.info(f"Recorded usage: {metric_type}={quantity} for tenant {tenant.id}")
-        return usage_record
+        return {
+            "status": "accepted",
+            "metric_type": metric_type,
+            "quantity": quantity,
+            "aggregation_key": aggregation_key
+        }
         
     except HTTPException:
         raise
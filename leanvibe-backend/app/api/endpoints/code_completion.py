@@ -8,13 +8,15 @@ Provides AI-powered code suggestions, explanations, refactoring, debugging, and
 import json
 import logging
 import time
-from typing import Union
+from contextlib import aclosing
+from typing import Optional, Union
 
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ...auth import api_key_dependency
 from ...agent.enhanced_l3_agent import AgentDependencies, EnhancedL3CodingAgent
+from ...services.tenant_usage_service import tenant_usage_service
 from ..models import (
     CodeCompletionErrorResponse,
     CodeCompletionRequest,
@@ -31,8 +33,14 @@ router = APIRouter(prefix="/api", tags=["code-completion"])
 enhanced_agent: EnhancedL3CodingAgent = None
 
 
-async def get_enhanced_agent() -> EnhancedL3CodingAgent:
-    """Get or create Enhanced L3 Agent instance"""
+async def get_enhanced_agent(
+    request: Optional[CodeCompletionRequest] = None,
+) -> EnhancedL3CodingAgent:
+    """Get or create Enhanced L3 Agent instance
+
+    When a request is given, the client's current and open files are
+    recorded on the agent so indexing reaches them first.
+    """
     global enhanced_agent
 
     if enhanced_agent is None:
@@ -47,6 +55,8 @@ async def get_enhanced_agent() -> EnhancedL3CodingAgent:
 
         # Create and initialize agent
         enhanced_agent = EnhancedL3CodingAgent(deps)
+        if request is not None:
+            enhanced_agent.set_open_files(request.open_files, current_file=request.file_path)
         success = await enhanced_agent.initialize()
 
         if not success:
@@ -58,9 +68,19 @@ async def get_enhanced_agent() -> EnhancedL3CodingAgent:
 
         logger.info("Enhanced L3 Agent initialized successfully")
 
+    elif request is not None:
+        enhanced_agent.set_open_files(request.open_files, current_file=request.file_path)
+
     return enhanced_agent
 
 
+def record_ai_request(http_request: Request) -> None:
+    """Count an AI request against the tenant resolved by TenantMiddleware"""
+    tenant_id = getattr(http_request.state, "tenant_id", None)
+    if tenant_id:
+        tenant_usage_service.record_ai_request(tenant_id)
+
+
 def parse_agent_response(response_text: str, intent: str) -> dict:
     """Parse agent response text to structured format"""
     try:
@@ -114,6 +134,7 @@ def create_context_used(
 )
 async def code_completion(
     request: CodeCompletionRequest,
+    http_request: Request,
     authenticated: bool = Depends(api_key_dependency)
 ) -> Union[CodeCompletionResponse, CodeCompletionErrorResponse]:
     """
@@ -127,6 +148,7 @@ async def code_completion(
     - optimize: Performance optimization suggestions
     """
     start_time = time.time()
+    record_ai_request(http_request)
 
     try:
         logger.info(
@@ -134,7 +156,7 @@ async def code_completion(
         )
 
         # Get Enhanced L3 Agent
-        agent = await get_enhanced_agent()
+        agent = await get_enhanced_agent(request)
 
         # Prepare agent request
         agent_request = {
@@ -269,3 +291,44 @@ async def code_completion(
                 "processing_time_ms": processing_time,
             },
         )
+
+
+@router.post(
+    "/code-completion/stream",
+    summary="Stream AI-powered code completion",
+    description="Stream code completion tokens as Server-Sent Events while the model generates them",
+)
+async def code_completion_stream(
+    request: CodeCompletionRequest,
+    http_request: Request,
+    authenticated: bool = Depends(api_key_dependency)
+) -> StreamingResponse:
+    """
+    Stream a code completion as Server-Sent Events.
+
+    Emits ``start``, one ``token`` event per generated chunk, and a final
+    ``complete`` or ``error`` event. Tokens are only generated as fast as the
+    client reads them, and disconnecting cancels generation.
+    """
+    logger.info(
+        f"Streaming {request.intent} request for {request.file_path}:{request.cursor_position}"
+    )
+    record_ai_request(http_request)
+
+    agent = await get_enhanced_agent(request)
+
+    async def event_generator():
+        async with aclosing(
+            agent.stream_code_completion(
+                request.file_path, request.cursor_position, request.intent
+            )
+        ) as events:
+            async for event in events:
+                line = f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+                yield line.encode("utf-8")
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
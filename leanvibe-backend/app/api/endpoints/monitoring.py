@@ -23,6 +23,7 @@ from ...core.performance_monitor import performance_monitor, get_performance_sta
 from ...core.error_tracker import error_tracker, get_error_summary
 from ...core.service_manager import service_manager
 from ...core.websocket_monitor import websocket_monitor, get_websocket_stats
+from ...core.db_monitor import db_monitor
 
 
 logger = get_logger(__name__)
@@ -659,6 +660,40 @@ async def get_websocket_overview(
         raise HTTPException(status_code=500, detail=f"WebSocket data fetch failed: {str(e)}")
 
 
+@router.get("/monitoring/database")
+async def get_database_overview(
+    top: int = Query(default=20, ge=1, le=200),
+    reset: bool = Query(default=False),
+    request_id: str = Depends(setup_request_context),
+    _admin = Depends(require_permission(Permission.ADMIN_ALL))
+) -> Dict[str, Any]:
+    """
+    Get database query latency, slow queries and connection pool utilisation
+    
+    Args:
+        top: Number of statement fingerprints to return, ordered by total time
+        reset: Clear collected metrics after reading them
+    """
+    try:
+        logger.info("Fetching database overview", top=top, reset=reset)
+        
+        stats = db_monitor.get_stats(top=top)
+        recommendations = db_monitor.get_recommendations()
+        if reset:
+            db_monitor.reset()
+        
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'request_id': request_id,
+            **stats,
+            'recommendations': recommendations
+        }
+        
+    except Exception as e:
+        logger.error("Failed to fetch database overview", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Database metrics fetch failed: {str(e)}")
+
+
 @router.get("/monitoring/websockets/{connection_id}")
 async def get_websocket_connection_detail(
     connection_id: str,
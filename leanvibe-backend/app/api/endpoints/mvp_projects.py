@@ -21,7 +21,9 @@ from ...models.mvp_models import (
     MVPStatus, TechnicalBlueprint
 )
 from ...services.mvp_service import mvp_service
-from ...services.storage import get_storage_service, get_storage_capabilities
+from ...services.storage import (
+    RangeNotSatisfiable, ZeroCopyFileResponse, get_storage_service, get_storage_capabilities
+)
 from ...auth.permissions import require_permission, Permission
 from ...services.auth_service import auth_service
 from ...middleware.tenant_middleware import get_current_tenant, require_tenant
@@ -932,7 +934,40 @@ async def download_project_file(
                 return Response(status_code=307, headers={"Location": url})
             except Exception:
                 pass
-        # Local or server-side proxy for preview/partial content
+        # Local storage: validators and ranges come from file metadata and the
+        # body is streamed from disk without buffering it
+        if hasattr(storage, "open_range"):
+            try:
+                served = storage.open_range(project_id, file_path, range_header, if_none_match)
+            except FileNotFoundError:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+            except RangeNotSatisfiable as e:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{e.size}"}
+                )
+            await audit_service.log(
+                tenant_id=tenant.id,
+                action="file_download",
+                resource_type="project_file",
+                resource_id=f"{project_id}/{file_path}",
+                details={"file_path": file_path}
+            )
+            filename = file_path.split("/")[-1]
+            media_type = served.content_type
+            if preview and served.size <= 1_000_000:
+                text_types = {"text/plain", "text/markdown", "application/json", "application/x-ndjson"}
+                is_text = (media_type in text_types) or filename.endswith((".md", ".txt", ".log", ".json"))
+                is_image = media_type.startswith("image/") or filename.endswith((".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"))
+                if is_text or is_image:
+                    if media_type == "application/octet-stream":
+                        media_type = "text/plain" if is_text else "image/png"
+                    hdrs = served.headers
+                    hdrs.pop("Content-Length", None)
+                    hdrs["Content-Disposition"] = "inline"
+                    return Response(content=served.read(), media_type=media_type, headers=hdrs, status_code=served.status_code)
+            return ZeroCopyFileResponse(served, filename=filename)
+        # Server-side proxy for preview/partial content
         try:
             if hasattr(storage, "get_file_with_range") and (preview or range_header):
                 buffer, media_type, extra_headers, status_code = storage.get_file_with_range(project_id, file_path, range_header or "")
@@ -1051,6 +1086,9 @@ async def download_project_archive(
                                 if hasattr(storage, 'iter_object'):
                                     for chunk in storage.iter_object(project_id, f.path, chunk_size=1024*512):
                                         dst.write(chunk)
+                                elif hasattr(storage, 'iter_file'):
+                                    for chunk in storage.iter_file(project_id, f.path, chunk_size=1024*512):
+                                        dst.write(chunk)
                                 else:
                                     data_buf, _ct = storage.get_file(project_id, f.path)
                                     dst.write(data_buf.getvalue())
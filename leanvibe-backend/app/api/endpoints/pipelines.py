@@ -10,7 +10,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi import Request
+from fastapi import Request, Response
 from fastapi.responses import StreamingResponse
 
 from ...models.pipeline_models import (
@@ -20,6 +20,8 @@ from ...models.pipeline_models import (
 )
 from ...models.mvp_models import MVPProject, MVPStatus, FounderInterview, TechnicalBlueprint
 from ...services.mvp_service import mvp_service
+from ...services.pipeline_read_model import PipelineSnapshot, pipeline_read_model
+from ...services.storage.local_storage_service import etag_matches
 from ...services.auth_service import auth_service
 from ...middleware.tenant_middleware import get_current_tenant, require_tenant
 from ...core.exceptions import InsufficientPermissionsError
@@ -184,6 +186,8 @@ async def create_pipeline(
 
 @router.get("/", response_model=List[PipelineResponse])
 async def list_pipelines(
+    request: Request,
+    response: Response,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     tenant = Depends(require_tenant),
     limit: int = Query(50, ge=1, le=100),
@@ -205,6 +209,9 @@ async def list_pipelines(
     **Supported Filters:**
     - Status: blueprint_pending, generating, deployed, failed, cancelled
     - Stage: blueprint_generation, backend_development, frontend_development, infrastructure_setup, deployment
+    
+    Supports conditional requests: send the returned ETag in If-None-Match
+    to get 304 Not Modified while no listed pipeline has changed.
     """
     try:
         # Verify token
@@ -218,21 +225,27 @@ async def list_pipelines(
             offset=offset
         )
         
-        # Convert to pipeline responses with filtering
-        pipelines = []
+        # Convert to pipeline responses (served from the read model) with filtering
+        snapshots = []
         for project in mvp_projects:
-            pipeline_response = await _mvp_project_to_pipeline_response(project)
+            snapshot = mvp_service.pipeline_snapshot_for(project)
             
             # Apply filters
-            if status_filter and pipeline_response.status != status_filter:
+            if status_filter and snapshot.pipeline.status != status_filter:
                 continue
-            if stage_filter and pipeline_response.current_stage != stage_filter:
+            if stage_filter and snapshot.pipeline.current_stage != stage_filter:
                 continue
                 
-            pipelines.append(pipeline_response)
+            snapshots.append(snapshot)
+        
+        etag = pipeline_read_model.list_etag(snapshots)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         
-        logger.info(f"Listed {len(pipelines)} pipelines for tenant {tenant.id}")
-        return pipelines
+        logger.info(f"Listed {len(snapshots)} pipelines for tenant {tenant.id}")
+        return [snapshot.pipeline for snapshot in snapshots]
         
     except Exception as e:
         logger.error(f"Failed to list pipelines: {e}")
@@ -245,6 +258,8 @@ async def list_pipelines(
 @router.get("/{pipeline_id}", response_model=PipelineResponse)
 async def get_pipeline(
     pipeline_id: UUID,
+    request: Request,
+    response: Response,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     tenant = Depends(require_tenant)
 ) -> PipelineResponse:
@@ -259,30 +274,21 @@ async def get_pipeline(
     - Progress metrics and estimates
     - Configuration and blueprint details
     - Error information (if failed)
+    
+    Served from the in-memory read model; supports If-None-Match.
     """
     try:
         # Verify token
         await auth_service.verify_token(credentials.credentials)
         
-        # Get MVP project
-        mvp_project = await mvp_service.get_mvp_project(pipeline_id)
-        if not mvp_project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Pipeline not found"
-            )
-        
-        # Verify tenant access
-        if mvp_project.tenant_id != tenant.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to pipeline"
-            )
+        snapshot = await _get_pipeline_snapshot(pipeline_id, tenant)
         
-        # Convert to pipeline response
-        pipeline_response = await _mvp_project_to_pipeline_response(mvp_project)
+        headers = snapshot.headers("pipeline")
+        if snapshot.not_modified(request.headers.get("if-none-match"), "pipeline"):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         
-        return pipeline_response
+        return snapshot.pipeline
         
     except HTTPException:
         raise
@@ -729,6 +735,9 @@ async def restart_pipeline(
 @router.get("/{pipeline_id}/status", response_model=PipelineStatusResponse)
 async def get_pipeline_status(
     pipeline_id: UUID,
+    request: Request,
+    response: Response,
+    wait: int = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for a change when If-None-Match is current"),
     credentials: HTTPAuthorizationCredentials = Depends(security),
     tenant = Depends(require_tenant)
 ) -> PipelineStatusResponse:
@@ -744,95 +753,31 @@ async def get_pipeline_status(
     - Recent execution logs
     - Error details (if applicable)
     - Stage-specific metadata
+    
+    **Polling:**
+    - Responses carry an ETag and X-Pipeline-Version header
+    - If-None-Match with the current ETag returns 304 Not Modified
+    - With `wait`, an unchanged pipeline holds the request open until the
+      next version is published or the wait expires (then 304)
     """
     try:
         # Verify token
         await auth_service.verify_token(credentials.credentials)
         
-        # Get MVP project
-        mvp_project = await mvp_service.get_mvp_project(pipeline_id)
-        if not mvp_project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Pipeline not found"
-            )
-        
-        # Verify tenant access
-        if mvp_project.tenant_id != tenant.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied to pipeline"
-            )
-        
-        # Get generation progress
-        progress_data = await mvp_service.get_generation_progress(pipeline_id)
-        
-        # Convert MVP status to pipeline status
-        status_mapping = {
-            MVPStatus.BLUEPRINT_PENDING: PipelineStatus.BLUEPRINT_PENDING,
-            MVPStatus.GENERATING: PipelineStatus.GENERATING,
-            MVPStatus.DEPLOYED: PipelineStatus.DEPLOYED,
-            MVPStatus.FAILED: PipelineStatus.FAILED,
-            MVPStatus.CANCELLED: PipelineStatus.CANCELLED
-        }
-        
-        pipeline_status = status_mapping.get(mvp_project.status, PipelineStatus.FAILED)
-        
-        # Create status response
-        if progress_data:
-            progress = PipelineProgress(
-                overall_progress=progress_data.get("overall_progress", 0.0),
-                stage_progress=progress_data.get("stage_progress", 0.0),
-                estimated_completion=progress_data.get("estimated_completion"),
-                stages_completed=progress_data.get("stages_completed", []),
-                current_stage_details=progress_data.get("current_stage_details", "")
-            )
-            
-            # Map current stage
-            stage_mapping = {
-                "backend": PipelineStage.BACKEND_DEVELOPMENT,
-                "frontend": PipelineStage.FRONTEND_DEVELOPMENT,
-                "infrastructure": PipelineStage.INFRASTRUCTURE_SETUP,
-                "observability": PipelineStage.DEPLOYMENT,
-                "completed": PipelineStage.DEPLOYMENT,
-                "failed": PipelineStage.BLUEPRINT_GENERATION
-            }
-            
-            current_stage = stage_mapping.get(
-                progress_data.get("current_stage", ""),
-                PipelineStage.BLUEPRINT_GENERATION
-            )
-        else:
-            # Default progress for non-generating pipelines
-            progress = PipelineProgress(
-                overall_progress=100.0 if pipeline_status == PipelineStatus.DEPLOYED else 0.0,
-                stage_progress=0.0,
-                estimated_completion=mvp_project.completed_at,
-                stages_completed=[],
-                current_stage_details=mvp_project.error_message or "Pipeline not active"
-            )
-            current_stage = PipelineStage.BLUEPRINT_GENERATION
+        snapshot = await _get_pipeline_snapshot(pipeline_id, tenant)
         
-        # Generate mock logs for demonstration
-        logs = []
-        if mvp_project.status == MVPStatus.GENERATING and progress_data:
-            logs.append(PipelineLogEntry(
-                timestamp=datetime.utcnow(),
-                level="INFO",
-                message=progress_data.get("current_stage_details", "Processing..."),
-                stage=current_stage
-            ))
+        if_none_match = request.headers.get("if-none-match")
+        if wait and snapshot.not_modified(if_none_match):
+            snapshot = await pipeline_read_model.wait_for_change(
+                pipeline_id, snapshot.version, timeout=wait
+            ) or await _get_pipeline_snapshot(pipeline_id, tenant)
         
-        status_response = PipelineStatusResponse(
-            status=pipeline_status,
-            current_stage=current_stage,
-            progress=progress,
-            stage_details=progress_data or {},
-            logs=logs,
-            error_message=mvp_project.error_message
-        )
+        headers = snapshot.headers("status")
+        if snapshot.not_modified(if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         
-        return status_response
+        return snapshot.status
         
     except HTTPException:
         raise
@@ -1033,82 +978,25 @@ def _validate_founder_interview(interview: FounderInterview) -> bool:
 
 async def _mvp_project_to_pipeline_response(mvp_project: MVPProject) -> PipelineResponse:
     """Convert MVP project to pipeline response"""
-    
-    # Map MVP status to pipeline status
-    status_mapping = {
-        MVPStatus.BLUEPRINT_PENDING: PipelineStatus.BLUEPRINT_PENDING,
-        MVPStatus.GENERATING: PipelineStatus.GENERATING,
-        MVPStatus.DEPLOYED: PipelineStatus.DEPLOYED,
-        MVPStatus.FAILED: PipelineStatus.FAILED,
-        MVPStatus.CANCELLED: PipelineStatus.CANCELLED
-    }
-    
-    pipeline_status = status_mapping.get(mvp_project.status, PipelineStatus.FAILED)
-    
-    # Determine current stage
-    if mvp_project.status == MVPStatus.BLUEPRINT_PENDING:
-        current_stage = PipelineStage.BLUEPRINT_GENERATION
-    elif mvp_project.status == MVPStatus.GENERATING:
-        # Get real-time stage from progress
-        progress_data = await mvp_service.get_generation_progress(mvp_project.id)
-        if progress_data:
-            stage_mapping = {
-                "backend": PipelineStage.BACKEND_DEVELOPMENT,
-                "frontend": PipelineStage.FRONTEND_DEVELOPMENT,
-                "infrastructure": PipelineStage.INFRASTRUCTURE_SETUP,
-                "observability": PipelineStage.DEPLOYMENT
-            }
-            current_stage = stage_mapping.get(
-                progress_data.get("current_stage", ""),
-                PipelineStage.BACKEND_DEVELOPMENT
-            )
-        else:
-            current_stage = PipelineStage.BACKEND_DEVELOPMENT
-    elif mvp_project.status == MVPStatus.DEPLOYED:
-        current_stage = PipelineStage.DEPLOYMENT
-    else:
-        current_stage = PipelineStage.BLUEPRINT_GENERATION
-    
-    # Get progress information
-    progress_data = await mvp_service.get_generation_progress(mvp_project.id)
-    if progress_data:
-        progress = PipelineProgress(
-            overall_progress=progress_data.get("overall_progress", 0.0),
-            stage_progress=progress_data.get("stage_progress", 0.0),
-            estimated_completion=progress_data.get("estimated_completion"),
-            stages_completed=progress_data.get("stages_completed", []),
-            current_stage_details=progress_data.get("current_stage_details", "")
+    return mvp_service.pipeline_snapshot_for(mvp_project).pipeline
+
+
+async def _get_pipeline_snapshot(pipeline_id: UUID, tenant) -> PipelineSnapshot:
+    """Get the pipeline read model, enforcing existence and tenant access"""
+    snapshot = await mvp_service.get_pipeline_snapshot(pipeline_id)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pipeline not found"
         )
-    else:
-        # Default progress
-        if mvp_project.status == MVPStatus.DEPLOYED:
-            progress = PipelineProgress(
-                overall_progress=100.0,
-                stage_progress=100.0,
-                estimated_completion=mvp_project.completed_at,
-                stages_completed=["backend", "frontend", "infrastructure", "observability"],
-                current_stage_details="Pipeline completed successfully"
-            )
-        else:
-            progress = PipelineProgress(
-                overall_progress=0.0,
-                stage_progress=0.0,
-                estimated_completion=mvp_project.created_at + timedelta(hours=6),
-                stages_completed=[],
-                current_stage_details=mvp_project.error_message or "Pipeline not active"
-            )
     
-    return PipelineResponse(
-        id=mvp_project.id,
-        project_name=mvp_project.project_name,
-        status=pipeline_status,
-        current_stage=current_stage,
-        progress=progress,
-        created_at=mvp_project.created_at,
-        estimated_completion=progress.estimated_completion,
-        tenant_id=mvp_project.tenant_id,
-        created_by=mvp_project.tenant_id  # TODO: Add proper user tracking
-    )
+    # Verify tenant access
+    if snapshot.tenant_id != tenant.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to pipeline"
+        )
+    return snapshot
 
 
 @router.get("/{pipeline_id}/logs/tail")
@@ -21,6 +21,9 @@ class CodeCompletionRequest(BaseModel):
     language: Optional[str] = Field(
         default=None, description="Programming language (auto-detected if not provided)"
     )
+    open_files: List[str] = Field(
+        default_factory=list, description="Other files open in the client, indexed first"
+    )
 
     @validator("file_path")
     def file_path_must_not_be_empty(cls, v):
@@ -62,7 +62,15 @@ class LeanVibeSettings(BaseSettings):
     
     # Database
     database_url: Optional[str] = Field(default=None)
-    
+    db_pool_size: int = Field(default=20, description="Connections held by the API engine pool")
+    db_max_overflow: int = Field(default=0, description="Extra API connections allowed beyond the pool size")
+    db_pool_timeout: float = Field(default=10.0, description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=300, description="Seconds before a pooled connection is recycled")
+    db_background_pool_size: int = Field(default=5, description="Connections held by the background job pool")
+    db_background_max_overflow: int = Field(default=5, description="Extra background connections beyond the pool size")
+    db_echo: bool = Field(default=False, description="Log every SQL statement (noisy; debugging only)")
+    db_slow_query_ms: float = Field(default=200.0, description="Statements slower than this are sampled and logged")
+
     # Neo4j Graph Database Configuration
     neo4j_uri: str = Field(
         default="bolt://localhost:7687",
@@ -1,15 +1,22 @@
+import asyncio
 import json
 import logging
+import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from enum import Enum
+from typing import Callable, Deque, Dict, Optional, Set, Union
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
 from app.models.event_models import (
     ClientPreferences,
     ConnectionState,
     EventPriority,
     NotificationChannel,
 )
+from app.core.websocket_monitor import MessageType, websocket_monitor
+from app.core.websocket_monitor import ConnectionState as MonitorConnectionState
 from app.services.event_streaming_service import event_streaming_service
 from app.services.reconnection_service import (
     client_disconnected,
@@ -19,13 +26,197 @@ from app.services.reconnection_service import (
 logger = logging.getLogger(__name__)
 
 
+class OverflowPolicy(str, Enum):
+    """What to do when a client's outbound queue is full"""
+
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest pending message
+    COALESCE = "coalesce"  # Replace a pending message with the same key, else drop oldest
+    DISCONNECT = "disconnect"  # Evict the slow consumer
+
+
+@dataclass
+class OutboundMessage:
+    """A serialized message waiting in a client's outbound queue"""
+
+    data: Union[str, bytes]
+    coalesce_key: Optional[str] = None
+    enqueued_at: float = 0.0
+    delivery: Optional[asyncio.Future] = None
+
+    def resolve(self, delivered: bool):
+        if self.delivery is not None and not self.delivery.done():
+            self.delivery.set_result(delivered)
+
+
+class ClientOutbox:
+    """Bounded outbound queue for one WebSocket, drained by its own writer task"""
+
+    def __init__(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        max_size: int,
+        policy: OverflowPolicy,
+        send_timeout: float,
+        on_failure: Callable[[str, str], None],
+    ):
+        self.client_id = client_id
+        self.websocket = websocket
+        self.max_size = max_size
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self._on_failure = on_failure
+        self._queue: Deque[OutboundMessage] = deque()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+        self.stats = {
+            "sent": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "peak_depth": 0,
+            "last_send_latency_ms": 0.0,
+        }
+        self._writer = asyncio.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(self, message: OutboundMessage) -> bool:
+        """Enqueue a message; returns False when the client should be evicted"""
+        if self._closed:
+            message.resolve(False)
+            return False
+
+        dropped = 0
+        if len(self._queue) >= self.max_size:
+            if self.policy == OverflowPolicy.DISCONNECT:
+                message.resolve(False)
+                return False
+            if self.policy == OverflowPolicy.COALESCE and self._coalesce(message):
+                websocket_monitor.record_outbound_queue(self.client_id, self.depth)
+                return True
+            self._queue.popleft().resolve(False)
+            self.stats["dropped"] += 1
+            dropped = 1
+
+        message.enqueued_at = time.perf_counter()
+        self._queue.append(message)
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], len(self._queue))
+        self._idle.clear()
+        self._wakeup.set()
+        websocket_monitor.record_outbound_queue(self.client_id, self.depth, dropped)
+        return True
+
+    def _coalesce(self, message: OutboundMessage) -> bool:
+        """Replace a pending message with the same key, keeping its queue position"""
+        if message.coalesce_key is None:
+            return False
+        for index, pending in enumerate(self._queue):
+            if pending.coalesce_key == message.coalesce_key:
+                message.enqueued_at = pending.enqueued_at
+                self._queue[index] = message
+                pending.resolve(False)
+                self.stats["coalesced"] += 1
+                return True
+        return False
+
+    async def flush(self):
+        """Wait until every queued message has been written"""
+        await self._idle.wait()
+
+    def close(self):
+        """Stop the writer and fail any messages still pending"""
+        self._closed = True
+        while self._queue:
+            self._queue.popleft().resolve(False)
+        self._idle.set()
+        # The writer closes its own outbox when a send fails; never cancel it mid-callback
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def _run(self):
+        while not self._closed:
+            if not self._queue:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message = self._queue.popleft()
+            binary = isinstance(message.data, bytes)
+            send = self.websocket.send_bytes if binary else self.websocket.send_text
+            try:
+                await asyncio.wait_for(send(message.data), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                message.resolve(False)
+                raise
+            except Exception as e:
+                message.resolve(False)
+                error = str(e) or type(e).__name__
+                logger.error(f"Error sending to client {self.client_id}: {error}")
+                self._on_failure(self.client_id, error)
+                return
+
+            latency_ms = (time.perf_counter() - message.enqueued_at) * 1000
+            self.stats["sent"] += 1
+            self.stats["last_send_latency_ms"] = latency_ms
+            message.resolve(True)
+            websocket_monitor.record_message(
+                self.client_id,
+                MessageType.BINARY if binary else MessageType.TEXT,
+                len(message.data),
+                direction="outbound",
+                processing_time_ms=latency_ms,
+            )
+            websocket_monitor.record_outbound_queue(self.client_id, self.depth)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "depth": self.depth, "policy": self.policy.value}
+
+
+class OutboxSender:
+    """WebSocket-like sender for services that push to a managed connection
+
+    Sends are queued on the client's outbox instead of writing to the socket,
+    so they keep their order relative to every other message for the client
+    and never race the outbox's writer.
+    """
+
+    def __init__(self, manager: "ConnectionManager", client_id: str):
+        self._manager = manager
+        self.client_id = client_id
+
+    async def send_text(self, data: str):
+        self._manager._enqueue(self.client_id, data)
+
+    async def send_bytes(self, data: bytes):
+        self._manager._enqueue(self.client_id, data)
+
+
 class ConnectionManager:
-    """Enhanced WebSocket connection manager with event streaming integration"""
+    """Enhanced WebSocket connection manager with event streaming integration
+
+    Every connection gets a bounded outbound queue drained by its own writer
+    task, so a stalled client never blocks sends to anyone else.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        send_timeout: float = 10.0,
+    ):
         self.active_connections: Dict[str, WebSocket] = {}
         self.client_info: Dict[str, Dict] = {}
         self._streaming_enabled = True
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        self._outboxes: Dict[str, ClientOutbox] = {}
+        self._closing: Set[asyncio.Task] = set()  # close handshakes of evicted clients
 
     async def connect(
         self,
@@ -36,7 +227,17 @@ class ConnectionManager:
     ):
         """Accept a new WebSocket connection with event streaming and reconnection handling"""
         await websocket.accept()
+        if client_id in self._outboxes:
+            self._outboxes.pop(client_id).close()
         self.active_connections[client_id] = websocket
+        self._outboxes[client_id] = ClientOutbox(
+            client_id,
+            websocket,
+            self.max_queue_size,
+            self.overflow_policy,
+            self.send_timeout,
+            self._handle_send_failure,
+        )
 
         # Store connection info
         self.client_info[client_id] = {
@@ -64,18 +265,32 @@ class ConnectionManager:
 
         # Register with event streaming service
         if self._streaming_enabled:
-            event_streaming_service.register_client(client_id, websocket, preferences)
+            event_streaming_service.register_client(
+                client_id, OutboxSender(self, client_id), preferences
+            )
 
         # Register session for reconnection tracking
         register_client_session(client_id, connection_state)
 
+        client = getattr(websocket, "client", None)
+        websocket_monitor.register_connection(
+            client_id,
+            str(getattr(client, "host", "unknown")),
+            user_agent=self.client_info[client_id]["user_agent"],
+        )
+        websocket_monitor.update_connection_state(client_id, MonitorConnectionState.CONNECTED)
+
         connection_type = "reconnected" if is_reconnection else "new"
         logger.info(
             f"Client {client_id} {connection_type} connection with streaming. Total connections: {len(self.active_connections)}"
         )
 
-    def disconnect(self, client_id: str):
+    def disconnect(self, client_id: str, reason: Optional[str] = None):
         """Remove a WebSocket connection and clean up streaming"""
+        outbox = self._outboxes.pop(client_id, None)
+        if outbox is not None:
+            outbox.close()
+        websocket_monitor.disconnect_connection(client_id, reason=reason)
         if client_id in self.active_connections:
             del self.active_connections[client_id]
         if client_id in self.client_info:
@@ -92,44 +307,80 @@ class ConnectionManager:
             f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}"
         )
 
+    def _enqueue(
+        self,
+        client_id: str,
+        data: Union[str, bytes],
+        coalesce_key: Optional[str] = None,
+        delivery: Optional[asyncio.Future] = None,
+    ) -> bool:
+        """Queue a serialized message for a client, evicting it if the queue policy says so"""
+        outbox = self._outboxes.get(client_id)
+        if outbox is None:
+            if delivery is not None:
+                delivery.set_result(False)
+            return False
+        message = OutboundMessage(data, coalesce_key=coalesce_key, delivery=delivery)
+        if not outbox.put(message):
+            logger.warning(f"Evicting slow consumer {client_id}: outbound queue full")
+            self._evict(client_id, status.WS_1013_TRY_AGAIN_LATER, "slow_consumer")
+            return False
+        return True
+
+    async def _send_and_wait(self, data: Union[str, bytes], client_id: str) -> bool:
+        """Queue a message behind the client's pending ones and wait until it is written"""
+        delivery = asyncio.get_running_loop().create_future()
+        self._enqueue(client_id, data, delivery=delivery)
+        return await delivery
+
+    def _handle_send_failure(self, client_id: str, error: str):
+        self._evict(client_id, status.WS_1011_INTERNAL_ERROR, f"send_failed: {error}")
+
+    def _evict(self, client_id: str, code: int, reason: str):
+        """Close a client's socket with ``code`` and remove it from the manager
+
+        Closing ends the peer's receive loop and tells the client why it was
+        dropped instead of leaving a socket nobody writes to.
+        """
+        websocket = self.active_connections.get(client_id)
+        if websocket is not None:
+            task = asyncio.get_running_loop().create_task(
+                self._close_websocket(client_id, websocket, code)
+            )
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self.disconnect(client_id, reason=reason)
+
+    async def _close_websocket(self, client_id: str, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception as e:
+            # The socket may already be gone, which is why it was evicted
+            logger.debug(f"Error closing websocket of {client_id}: {e}")
+
     async def send_personal_message(self, message: str, client_id: str):
         """Send a message to a specific client"""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error sending personal message to {client_id}: {e}")
-                self.disconnect(client_id)
+        await self._send_and_wait(message, client_id)
 
     async def send_json_message(self, data: Dict, client_id: str):
         """Send a JSON message to a specific client"""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(json.dumps(data, default=str))
-            except Exception as e:
-                logger.error(f"Error sending JSON message to {client_id}: {e}")
-                self.disconnect(client_id)
-
-    async def broadcast(self, message: str):
-        """Send a message to all connected clients"""
-        disconnected_clients = []
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
+        await self._send_and_wait(json.dumps(data, default=str), client_id)
 
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+    async def broadcast(self, message: str, coalesce_key: Optional[str] = None):
+        """Queue a message for all connected clients without waiting on any of them"""
+        for client_id in list(self._outboxes):
+            self._enqueue(client_id, message, coalesce_key)
 
-    async def broadcast_json(self, data: Dict):
+    async def broadcast_json(self, data: Dict, coalesce_key: Optional[str] = None):
         """Broadcast a JSON message to all connected clients"""
         message = json.dumps(data, default=str)
-        await self.broadcast(message)
+        await self.broadcast(message, coalesce_key)
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until every client's outbound queue has been written"""
+        flushes = [outbox.flush() for outbox in list(self._outboxes.values())]
+        if flushes:
+            await asyncio.wait_for(asyncio.gather(*flushes), timeout=timeout)
 
     def update_client_preferences(self, client_id: str, preferences: ClientPreferences):
         """Update client notification preferences"""
@@ -139,38 +390,27 @@ class ConnectionManager:
 
     async def send_to_client(self, client_id: str, message: dict) -> bool:
         """Send a message to a specific client, return success status"""
-        if client_id in self.active_connections:
-            try:
-                await self.send_json_message(message, client_id)
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send message to client {client_id}: {e}")
-                return False
-        return False
+        if client_id not in self.active_connections:
+            return False
+        try:
+            return await self._send_and_wait(json.dumps(message, default=str), client_id)
+        except Exception as e:
+            logger.error(f"Failed to send message to client {client_id}: {e}")
+            return False
 
     async def broadcast_to_ios_devices(self, message: dict) -> int:
-        """Broadcast message to all connected iOS devices, return count of notified devices"""
+        """Queue a message for all connected iOS devices, return count of devices queued"""
+        text = json.dumps(message, default=str)
         ios_count = 0
-        disconnected_clients = []
-        
-        for client_id, info in self.client_info.items():
+
+        for client_id, info in list(self.client_info.items()):
             # Check if client is iOS device
             client_type = info.get('client_type', '').lower()
             user_agent = info.get('user_agent', '').lower()
             
             if 'ios' in client_type or 'iphone' in user_agent or 'ipad' in user_agent:
-                if client_id in self.active_connections:
-                    try:
-                        await self.send_json_message(message, client_id)
-                        ios_count += 1
-                        logger.debug(f"Message sent to iOS device {client_id}")
-                    except Exception as e:
-                        logger.error(f"Error sending to iOS device {client_id}: {e}")
-                        disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+                if self._enqueue(client_id, text):
+                    ios_count += 1
         
         logger.info(f"Broadcasted message to {ios_count} iOS devices")
         return ios_count
@@ -269,6 +509,10 @@ class ConnectionManager:
             "connected_clients": list(self.active_connections.keys()),
             "client_details": self.client_info,
             "streaming_enabled": self._streaming_enabled,
+            "outbound_queues": {
+                client_id: outbox.get_stats()
+                for client_id, outbox in self._outboxes.items()
+            },
         }
 
         # Add streaming service info if enabled
@@ -9,14 +9,16 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngin
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.pool import StaticPool
 from ..config.settings import settings
+from .db_monitor import InstrumentedAsyncQueuePool, db_monitor
 
 logger = logging.getLogger(__name__)
 
 # Database base class
 Base = declarative_base()
 
-# Global engine instance
+# Global engine instances: request handling and background jobs get separate pools
 _engine: AsyncEngine = None
+_background_engine: AsyncEngine = None
 
 
 def get_database_url() -> str:
@@ -51,14 +53,22 @@ def get_sync_database_url() -> str:
         return async_url
 
 
-def create_database_engine() -> AsyncEngine:
+def _pool_limits(workload: str) -> tuple:
+    """Pool size and overflow for a workload"""
+    if workload == "background":
+        return settings.db_background_pool_size, settings.db_background_max_overflow
+    return settings.db_pool_size, settings.db_max_overflow
+
+
+def create_database_engine(workload: str = "api") -> AsyncEngine:
     """Create database engine with appropriate configuration"""
     database_url = get_database_url()
     
     engine_kwargs = {
-        "echo": settings.is_development,
+        "echo": settings.db_echo,
         "future": True,
     }
+    pool_size = max_overflow = None
     
     # Special configuration for SQLite
     if database_url.startswith("sqlite"):
@@ -71,14 +81,19 @@ def create_database_engine() -> AsyncEngine:
     
     # PostgreSQL configuration for production
     elif database_url.startswith("postgresql"):
+        pool_size, max_overflow = _pool_limits(workload)
         engine_kwargs.update({
-            "pool_size": 20,
-            "max_overflow": 0,
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
             "pool_pre_ping": True,
-            "pool_recycle": 300,
+            "pool_recycle": settings.db_pool_recycle,
         })
     
-    return create_async_engine(database_url, **engine_kwargs)
+    engine = create_async_engine(database_url, **engine_kwargs)
+    db_monitor.instrument(engine, workload, pool_size=pool_size, max_overflow=max_overflow)
+    return engine
 
 
 def get_database_engine() -> AsyncEngine:
@@ -92,6 +107,25 @@ def get_database_engine() -> AsyncEngine:
     return _engine
 
 
+def get_background_database_engine() -> AsyncEngine:
+    """Get the engine used by background jobs (analytics, exports, log persistence)
+
+    Background work gets its own, smaller pool so long-running jobs cannot
+    starve request handlers of connections. SQLite has a single writer and
+    a static pool, so it shares the request engine instead.
+    """
+    global _background_engine
+    
+    if get_database_url().startswith("sqlite"):
+        return get_database_engine()
+    
+    if _background_engine is None:
+        _background_engine = create_database_engine(workload="background")
+        logger.info("Created background database engine")
+    
+    return _background_engine
+
+
 # Async session factory
 AsyncSessionLocal = sessionmaker(
     bind=get_database_engine(),
@@ -100,6 +134,13 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+BackgroundSessionLocal = sessionmaker(
+    bind=get_background_database_engine(),
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
 async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session"""
     async with AsyncSessionLocal() as session:
@@ -112,6 +153,18 @@ async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_background_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get a session from the background job pool"""
+    async with BackgroundSessionLocal() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
 async def init_database():
     """Initialize database tables"""
     engine = get_database_engine()
@@ -125,7 +178,11 @@ async def init_database():
 
 async def close_database():
     """Close database connections"""
-    global _engine
+    global _engine, _background_engine
+    
+    if _background_engine:
+        await _background_engine.dispose()
+        _background_engine = None
     
     if _engine:
         await _engine.dispose()
@@ -0,0 +1,342 @@
+"""
+Database Query and Connection Pool Monitoring
+
+Hooks SQLAlchemy engine and pool events to provide:
+- Per-workload query latency histograms (API vs background jobs)
+- Per-statement-fingerprint call counts and timings (parameters never recorded)
+- Sampled slow queries above a configurable threshold
+- Connection pool checkout wait times and utilisation snapshots
+- Pool sizing recommendations derived from the observed numbers
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .logging_config import get_logger
+from ..config.settings import settings
+
+
+logger = get_logger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> Tuple[str, str]:
+    """Normalise a SQL statement so that calls differing only in values group together.
+
+    Returns ``(fingerprint_id, normalised_sql)``.
+    """
+    normalised = _STRING_LITERAL.sub("?", statement)
+    normalised = _BIND_PARAM.sub("?", normalised)
+    normalised = _NUMBER_LITERAL.sub("?", normalised)
+    normalised = _IN_LIST.sub("(?+)", normalised)
+    normalised = _WHITESPACE.sub(" ", normalised).strip()
+    return hashlib.sha1(normalised.encode()).hexdigest()[:12], normalised
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float):
+        index = 0
+        while index < len(self.BOUNDS_MS) and duration_ms > self.BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, quantile: float) -> float:
+        """Upper bound of the bucket containing the given quantile"""
+        if not self.count:
+            return 0.0
+        target = quantile * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return float(self.BOUNDS_MS[index]) if index < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                (f"le_{bound}" if index < len(self.BOUNDS_MS) else "inf"): self.buckets[index]
+                for index, bound in enumerate(self.BOUNDS_MS + (None,))
+            },
+        }
+
+
+@dataclass
+class StatementStats:
+    """Aggregated timings for one statement fingerprint"""
+    fingerprint_id: str
+    statement: str
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    workloads: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint_id": self.fingerprint_id,
+            "statement": self.statement,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "workloads": dict(self.workloads),
+        }
+
+
+@dataclass
+class WorkloadStats:
+    """Query and pool metrics for one engine workload"""
+    workload: str
+    pool: Any = None
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    queries: LatencyHistogram = field(default_factory=LatencyHistogram)
+    pool_wait: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: int = 0
+    checkouts: int = 0
+    connects: int = 0
+    invalidations: int = 0
+    peak_checked_out: int = 0
+
+    def pool_snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        snapshot: Dict[str, Any] = {
+            "class": type(pool).__name__ if pool is not None else None,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+        }
+        for name in ("checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                snapshot[name] = method()
+        return snapshot
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited for a connection"""
+
+    wait_observer: Optional[Callable[[float], None]] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_observer is not None:
+                self.wait_observer((time.perf_counter() - started) * 1000)
+
+
+class DatabaseMonitor:
+    """Collects query and connection pool metrics from instrumented engines"""
+
+    def __init__(self, slow_query_ms: float = 200.0, max_fingerprints: int = 500, max_slow_samples: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self.workloads: Dict[str, WorkloadStats] = {}
+        self.statements: "OrderedDict[str, StatementStats]" = OrderedDict()
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=max_slow_samples)
+        self.started_at = datetime.utcnow()
+        self._lock = threading.Lock()
+
+    def instrument(self, engine: AsyncEngine, workload: str,
+                   pool_size: Optional[int] = None, max_overflow: Optional[int] = None):
+        """Attach query and pool listeners to an engine"""
+        if not isinstance(engine, AsyncEngine):
+            return
+
+        stats = self.workloads.get(workload)
+        if stats is None:
+            stats = self.workloads[workload] = WorkloadStats(workload=workload)
+        stats.pool = engine.sync_engine.pool
+        stats.pool_size = pool_size
+        stats.max_overflow = max_overflow
+
+        if isinstance(stats.pool, InstrumentedAsyncQueuePool):
+            stats.pool.wait_observer = lambda waited_ms: self._record_pool_wait(stats, waited_ms)
+
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.get("query_started_at")
+            if started:
+                self._record_query(stats, statement, (time.perf_counter() - started.pop()) * 1000)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _handle_error(context):
+            started = context.connection.info.get("query_started_at") if context.connection is not None else None
+            elapsed = (time.perf_counter() - started.pop()) * 1000 if started else 0.0
+            self._record_query(stats, context.statement or "", elapsed, failed=True)
+
+        @event.listens_for(stats.pool, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            checked_out = getattr(stats.pool, "checkedout", None)
+            with self._lock:
+                stats.checkouts += 1
+                if callable(checked_out):
+                    stats.peak_checked_out = max(stats.peak_checked_out, checked_out())
+
+        @event.listens_for(stats.pool, "connect")
+        def _connect(dbapi_connection, connection_record):
+            with self._lock:
+                stats.connects += 1
+
+        @event.listens_for(stats.pool, "invalidate")
+        def _invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                stats.invalidations += 1
+
+    def _record_pool_wait(self, stats: WorkloadStats, waited_ms: float):
+        with self._lock:
+            stats.pool_wait.observe(waited_ms)
+
+    def _record_query(self, stats: WorkloadStats, statement: str, duration_ms: float, failed: bool = False):
+        fingerprint_id, normalised = fingerprint_statement(statement)
+        with self._lock:
+            if failed:
+                stats.errors += 1
+            else:
+                stats.queries.observe(duration_ms)
+
+            entry = self.statements.get(fingerprint_id)
+            if entry is None:
+                entry = self.statements[fingerprint_id] = StatementStats(fingerprint_id, normalised[:1000])
+                if len(self.statements) > self.max_fingerprints:
+                    self.statements.popitem(last=False)
+            else:
+                self.statements.move_to_end(fingerprint_id)
+            entry.calls += 1
+            entry.errors += int(failed)
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.workloads[stats.workload] = entry.workloads.get(stats.workload, 0) + 1
+
+            slow = not failed and duration_ms >= self.slow_query_ms
+            if slow:
+                self.slow_queries.append({
+                    "fingerprint_id": fingerprint_id,
+                    "statement": normalised[:1000],
+                    "duration_ms": round(duration_ms, 3),
+                    "workload": stats.workload,
+                    "timestamp": datetime.utcnow().isoformat(),
+                })
+
+        if slow:
+            logger.warning("Slow database query", fingerprint_id=fingerprint_id,
+                           duration_ms=round(duration_ms, 3), workload=stats.workload)
+
+    def get_recommendations(self) -> List[str]:
+        """Pool sizing and query recommendations based on observed metrics"""
+        recommendations = []
+        for stats in self.workloads.values():
+            if stats.pool_size is None:
+                continue
+            capacity = stats.pool_size + (stats.max_overflow or 0)
+            if stats.pool_wait.count and stats.pool_wait.percentile(0.95) >= 50:
+                recommendations.append(
+                    f"{stats.workload} pool: p95 checkout wait is {stats.pool_wait.percentile(0.95):.0f}ms; "
+                    f"raise its pool size above {stats.pool_size} or move long-running work to the background pool"
+                )
+            elif stats.checkouts >= 100 and stats.peak_checked_out < capacity / 2:
+                recommendations.append(
+                    f"{stats.workload} pool: peak usage {stats.peak_checked_out}/{capacity} connections; "
+                    f"the pool can be reduced"
+                )
+            if stats.invalidations:
+                recommendations.append(
+                    f"{stats.workload} pool: {stats.invalidations} connections invalidated; "
+                    f"check network stability and pool_recycle"
+                )
+
+        if self.slow_queries:
+            slowest = max(self.statements.values(), key=lambda entry: entry.max_ms)
+            recommendations.append(
+                f"Slowest statement {slowest.fingerprint_id} peaked at {slowest.max_ms:.0f}ms; "
+                f"review its query plan and indexes"
+            )
+        return recommendations
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """Get query, pool and slow query statistics"""
+        with self._lock:
+            top_statements = sorted(self.statements.values(), key=lambda entry: entry.total_ms, reverse=True)[:top]
+            return {
+                "since": self.started_at.isoformat(),
+                "slow_query_threshold_ms": self.slow_query_ms,
+                "workloads": {
+                    name: {
+                        "queries": stats.queries.to_dict(),
+                        "errors": stats.errors,
+                        "pool": stats.pool_snapshot(),
+                        "pool_wait": stats.pool_wait.to_dict(),
+                    }
+                    for name, stats in self.workloads.items()
+                },
+                "top_statements": [entry.to_dict() for entry in top_statements],
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def reset(self):
+        """Clear collected metrics, keeping instrumented engines"""
+        with self._lock:
+            for stats in self.workloads.values():
+                stats.queries = LatencyHistogram()
+                stats.pool_wait = LatencyHistogram()
+                stats.errors = stats.checkouts = stats.connects = stats.invalidations = 0
+                stats.peak_checked_out = 0
+            self.statements.clear()
+            self.slow_queries.clear()
+            self.started_at = datetime.utcnow()
+
+
+# Global database monitor instance
+db_monitor = DatabaseMonitor(slow_query_ms=settings.db_slow_query_ms)
+
+
+def get_database_stats() -> Dict[str, Any]:
+    """Get database query and pool statistics"""
+    return db_monitor.get_stats()
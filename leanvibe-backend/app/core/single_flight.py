@@ -0,0 +1,219 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same work share one execution: the first
+caller (the leader) runs it, everyone who arrives while it is in flight waits
+for the same result. Nothing is cached - once the call finishes the next
+identical request runs again.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlightCall:
+    """A shared awaitable call and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _InFlightStream:
+    """A shared event stream paced on its slowest subscriber
+
+    Events stay buffered until every subscriber has read them, so late
+    subscribers can replay the stream from the start. The buffer never holds
+    more than ``max_buffered`` events: once it is full the pump stops pulling
+    from the source until the slowest subscriber catches up, and events all
+    subscribers have read are dropped. After that a new subscriber can no
+    longer replay the stream and starts its own.
+    """
+
+    def __init__(self, max_buffered: int):
+        self.max_buffered = max_buffered
+        self.events: List[Any] = []
+        self.base = 0  # stream position of events[0]
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.cursors: Dict[int, int] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.events)
+
+    @property
+    def replayable(self) -> bool:
+        return self.base == 0
+
+    def subscribe(self, subscriber: int) -> None:
+        self.cursors[subscriber] = self.base
+
+    def unsubscribe(self, subscriber: int) -> None:
+        del self.cursors[subscriber]
+        self._notify()
+
+    def advance(self, subscriber: int, position: int) -> None:
+        self.cursors[subscriber] = position
+        self._notify()
+
+    def publish(self, event: Any) -> None:
+        self.events.append(event)
+        self._notify()
+
+    async def wait_for_room(self) -> None:
+        """Wait until the buffer can take another event"""
+        while len(self.events) >= self.max_buffered:
+            slowest = min(self.cursors.values(), default=self.end)
+            if slowest > self.base:
+                del self.events[: slowest - self.base]
+                self.base = slowest
+                continue
+            await self.changed.wait()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight async calls and streams.
+
+    If every caller of a shared call goes away, the underlying work is
+    cancelled; as long as one caller remains it keeps running. Shared streams
+    are pulled no faster than their slowest subscriber reads, with at most
+    ``max_buffered_events`` events buffered in between.
+    """
+
+    def __init__(self, name: str, max_buffered_events: int = 64):
+        self.name = name
+        self.max_buffered_events = max_buffered_events
+        self._calls: Dict[str, _InFlightCall] = {}
+        self._streams: Dict[str, _InFlightStream] = {}
+        self._subscriber_ids = itertools.count()
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable key from request components (model, prompt, params...)"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def do(
+        self, key: str, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Tuple[Any, bool]:
+        """Run ``func`` once per key at a time.
+
+        Returns ``(result, coalesced)`` where ``coalesced`` is True when this
+        caller joined a call that was already in flight.
+        """
+        call = self._calls.get(key)
+        coalesced = call is not None
+
+        if coalesced:
+            self._stats["coalesced"] += 1
+            logger.debug(f"SingleFlight {self.name}: coalesced request {key[:12]}")
+        else:
+            call = _InFlightCall(asyncio.ensure_future(func(*args, **kwargs)))
+            self._calls[key] = call
+            self._stats["leaders"] += 1
+            call.task.add_done_callback(lambda _: self._forget_call(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), coalesced
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    async def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """Share one async iterator between all concurrent subscribers of a key.
+
+        Subscribers that join late first replay the events already produced,
+        then follow the live stream. A stream that has already dropped events
+        cannot be replayed, so a subscriber arriving then starts a new one.
+        """
+        shared = self._streams.get(key)
+
+        if shared is None or not shared.replayable:
+            shared = _InFlightStream(self.max_buffered_events)
+            self._streams[key] = shared
+            self._stats["leaders"] += 1
+            shared.task = asyncio.create_task(self._pump(key, shared, factory()))
+        else:
+            self._stats["coalesced"] += 1
+            logger.debug(f"SingleFlight {self.name}: coalesced stream {key[:12]}")
+
+        token = next(self._subscriber_ids)
+        shared.subscribe(token)
+        position = shared.base
+        try:
+            while True:
+                if position < shared.end:
+                    event = shared.events[position - shared.base]
+                    position += 1
+                    shared.advance(token, position)
+                    yield event
+                    continue
+                if shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                await shared.changed.wait()
+        finally:
+            shared.unsubscribe(token)
+            if not shared.cursors and shared.task and not shared.task.done():
+                shared.task.cancel()
+                # Wait for the source to unwind so cancellation is complete on return
+                await asyncio.gather(shared.task, return_exceptions=True)
+
+    async def _pump(self, key: str, shared: _InFlightStream, source: AsyncIterator[Any]) -> None:
+        """Drive the source iterator and publish its events to subscribers"""
+        try:
+            async with aclosing(source) as events:
+                async for event in events:
+                    shared.publish(event)
+                    # Pull the next event only once subscribers have room for it
+                    await shared.wait_for_room()
+            shared.finish()
+        except asyncio.CancelledError:
+            shared.finish(asyncio.CancelledError())
+            raise
+        except Exception as e:
+            shared.finish(e)
+        finally:
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+
+    def _forget_call(self, key: str, call: _InFlightCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        total = self._stats["leaders"] + self._stats["coalesced"]
+        return {
+            "name": self.name,
+            "in_flight": len(self._calls) + len(self._streams),
+            "leaders": self._stats["leaders"],
+            "coalesced": self._stats["coalesced"],
+            "coalesced_ratio": round(self._stats["coalesced"] / total, 3) if total else 0.0,
+        }
@@ -73,6 +73,12 @@ class ConnectionInfo:
     peak_message_rate: float = 0.0
     connection_quality: float = 1.0  # 0.0 to 1.0
     
+    # Outbound queue metrics
+    outbound_queue_depth: int = 0
+    peak_outbound_queue_depth: int = 0
+    dropped_outbound_messages: int = 0
+    avg_send_latency_ms: float = 0.0
+    
     # Error tracking
     error_count: int = 0
     last_error: Optional[str] = None
@@ -294,6 +300,9 @@ class WebSocketMonitor:
                 if direction == "outbound":
                     conn.bytes_sent += size_bytes
                     conn.messages_sent += 1
+                    conn.avg_send_latency_ms += (
+                        processing_time_ms - conn.avg_send_latency_ms
+                    ) / conn.messages_sent
                 else:
                     conn.bytes_received += size_bytes
                     conn.messages_received += 1
@@ -375,6 +384,15 @@ class WebSocketMonitor:
         
         return message_id
     
+    def record_outbound_queue(self, connection_id: str, depth: int, dropped: int = 0):
+        """Record the outbound queue depth and any messages dropped on overflow"""
+        with self._lock:
+            if connection_id in self.active_connections:
+                conn = self.active_connections[connection_id]
+                conn.outbound_queue_depth = depth
+                conn.peak_outbound_queue_depth = max(conn.peak_outbound_queue_depth, depth)
+                conn.dropped_outbound_messages += dropped
+    
     def disconnect_connection(
         self,
         connection_id: str,
@@ -591,6 +609,10 @@ class WebSocketMonitor:
                         'error_count': conn.error_count,
                         'connection_quality': conn.connection_quality,
                         'avg_message_size': conn.avg_message_size,
+                        'outbound_queue_depth': conn.outbound_queue_depth,
+                        'peak_outbound_queue_depth': conn.peak_outbound_queue_depth,
+                        'dropped_outbound_messages': conn.dropped_outbound_messages,
+                        'avg_send_latency_ms': conn.avg_send_latency_ms,
                         'client_ip': conn.client_ip,
                         'user_id': conn.user_id
                     }
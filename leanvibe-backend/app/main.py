@@ -1,7 +1,10 @@
 import asyncio
 import json
 import logging
+import uuid
+from contextlib import aclosing
 from datetime import datetime
+from typing import Dict, Optional
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
@@ -44,7 +47,10 @@ from .services.reconnection_service import (
     client_heartbeat,
     reconnection_service,
 )
+from .services.auth_service import auth_service
+from .services.billing_service import billing_service
 from .services.task_service import task_service
+from .services.tenant_usage_service import tenant_usage_service
 from .core.error_recovery import global_error_recovery
 
 # Configure logging
@@ -251,7 +257,8 @@ async def handle_code_completion_websocket(message: dict, client_id: str) -> dic
         "cursor_position": 100,
         "intent": "suggest",
         "content": "optional file content",
-        "language": "python"
+        "language": "python",
+        "open_files": ["/path/to/other.py"]
     }
     """
     try:
@@ -262,6 +269,7 @@ async def handle_code_completion_websocket(message: dict, client_id: str) -> dic
             "intent": message.get("intent", "suggest"),
             "content": message.get("content"),
             "language": message.get("language"),
+            "open_files": message.get("open_files") or [],
         }
 
         # Validate request using Pydantic model
@@ -276,7 +284,7 @@ async def handle_code_completion_websocket(message: dict, client_id: str) -> dic
             }
 
         # Get Enhanced L3 Agent
-        agent = await get_enhanced_agent()
+        agent = await get_enhanced_agent(request)
 
         # Prepare agent request
         agent_request = {
@@ -378,6 +386,129 @@ async def handle_code_completion_websocket(message: dict, client_id: str) -> dic
         }
 
 
+# Streaming code completions in flight per client, keyed by request_id
+active_completion_streams: Dict[str, Dict[str, asyncio.Task]] = {}
+
+
+async def stream_code_completion_websocket(
+    message: dict, client_id: str, request_id: str
+) -> None:
+    """
+    Stream code completion tokens to a WebSocket client as they are generated
+
+    Expected message format is the same as ``code_completion`` plus
+    ``"stream": true`` and an optional ``"request_id"``. The client receives
+    ``code_completion_start``, ``code_completion_token`` and a final
+    ``code_completion_complete`` or ``code_completion_error`` message. Each
+    token is written through the client's outbox before the next one is
+    generated, so a slow socket throttles generation instead of buffering it.
+    """
+    try:
+        request = CodeCompletionRequest(
+            file_path=message.get("file_path", ""),
+            cursor_position=message.get("cursor_position", 0),
+            intent=message.get("intent", "suggest"),
+            content=message.get("content"),
+            language=message.get("language"),
+            open_files=message.get("open_files") or [],
+        )
+    except Exception as e:
+        await connection_manager.send_to_client(
+            client_id,
+            {
+                "status": "error",
+                "type": "code_completion_error",
+                "request_id": request_id,
+                "message": f"Invalid request format: {str(e)}",
+                "timestamp": asyncio.get_event_loop().time(),
+            },
+        )
+        return
+
+    try:
+        agent = await get_enhanced_agent(request)
+
+        async with aclosing(
+            agent.stream_code_completion(
+                request.file_path, request.cursor_position, request.intent
+            )
+        ) as events:
+            async for event in events:
+                delivered = await connection_manager.send_to_client(
+                    client_id,
+                    {
+                        **event,
+                        "type": f"code_completion_{event['type']}",
+                        "request_id": request_id,
+                        "client_id": client_id,
+                        "timestamp": asyncio.get_event_loop().time(),
+                    },
+                )
+                if not delivered and client_id not in connection_manager.active_connections:
+                    logger.info(
+                        f"Client {client_id} went away, stopping completion stream {request_id}"
+                    )
+                    return
+
+        logger.info(
+            f"Streaming code completion {request.intent} request {request_id} finished for client {client_id}"
+        )
+
+    except asyncio.CancelledError:
+        logger.info(f"Streaming code completion {request_id} cancelled for client {client_id}")
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming code completion for client {client_id}: {e}")
+        await connection_manager.send_to_client(
+            client_id,
+            {
+                "status": "error",
+                "type": "code_completion_error",
+                "request_id": request_id,
+                "message": f"Internal error: {str(e)}",
+                "timestamp": asyncio.get_event_loop().time(),
+            },
+        )
+
+
+def start_code_completion_stream(message: dict, client_id: str) -> str:
+    """Run a streaming completion alongside the receive loop so it can be cancelled"""
+    request_id = str(message.get("request_id") or uuid.uuid4().hex)
+    client_streams = active_completion_streams.setdefault(client_id, {})
+
+    # A repeated request_id supersedes the previous stream
+    previous = client_streams.pop(request_id, None)
+    if previous:
+        previous.cancel()
+
+    task = asyncio.create_task(
+        stream_code_completion_websocket(message, client_id, request_id)
+    )
+    client_streams[request_id] = task
+
+    def _forget(finished: asyncio.Task) -> None:
+        if client_streams.get(request_id) is finished:
+            del client_streams[request_id]
+        if not client_streams:
+            active_completion_streams.pop(client_id, None)
+
+    task.add_done_callback(_forget)
+    return request_id
+
+
+def cancel_code_completion_streams(client_id: str, request_id: Optional[str] = None) -> int:
+    """Cancel one (or every) in-flight streaming completion for a client"""
+    client_streams = active_completion_streams.get(client_id, {})
+    if request_id is not None:
+        tasks = [client_streams[request_id]] if request_id in client_streams else []
+    else:
+        tasks = list(client_streams.values())
+
+    for task in tasks:
+        task.cancel()
+    return len(tasks)
+
+
 # Initialize services with unified MLX and event streaming
 ai_service = unified_mlx_service  # Use the global enhanced unified MLX service instance
 connection_manager = ConnectionManager()
@@ -394,6 +525,8 @@ async def startup_event():
     await event_streaming_service.start()
     await reconnection_service.start()
     await task_service.initialize()
+    await tenant_usage_service.start()
+    await billing_service.usage_aggregator.start()
 
 
 @app.on_event("shutdown")
@@ -403,6 +536,9 @@ async def shutdown_event():
     await session_manager.stop()
     await event_streaming_service.stop()
     await reconnection_service.stop()
+    # Persist metered usage counted since the last periodic flush
+    await tenant_usage_service.stop()
+    await billing_service.usage_aggregator.stop()
 
 
 @app.get("/health")
@@ -771,6 +907,26 @@ async def get_visualization_cache_stats():
     return {"cache_stats": stats}
 
 
+async def get_websocket_tenant_id(websocket: WebSocket) -> Optional[uuid.UUID]:
+    """Tenant of the authenticated WebSocket client, from the access token in
+    the Authorization header or the ``token`` query parameter (browsers cannot
+    set headers). Unauthenticated clients are not attributed to any tenant."""
+    authorization = websocket.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = websocket.query_params.get("token")
+    if not token:
+        return None
+    try:
+        payload = await auth_service.verify_token(token)
+        if payload.get("type") != "access":
+            return None
+        return uuid.UUID(payload["tenant_id"])
+    except Exception as e:
+        logger.warning(f"Rejected WebSocket access token: {e}")
+        return None
+
+
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """WebSocket endpoint for L3 agent communication with reconnection support"""
@@ -815,14 +971,13 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         await connection_manager.connect(websocket, client_id, is_reconnection=True)
 
         # Send reconnection info to client
-        await websocket.send_text(
-            json.dumps(
-                {
-                    "type": "reconnection_sync",
-                    "data": reconnection_data,
-                    "timestamp": datetime.now().isoformat(),
-                }
-            )
+        await connection_manager.send_to_client(
+            client_id,
+            {
+                "type": "reconnection_sync",
+                "data": reconnection_data,
+                "timestamp": datetime.now().isoformat(),
+            },
         )
 
     else:
@@ -830,6 +985,11 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         await connection_manager.connect(websocket, client_id)
         logger.info(f"L3 Agent client {client_id} connected (new session)")
 
+    # Live sessions and AI requests count against the tenant's quotas
+    tenant_id = await get_websocket_tenant_id(websocket)
+    if tenant_id:
+        tenant_usage_service.session_opened(tenant_id)
+
     try:
         while True:
             data = await websocket.receive_text()
@@ -839,13 +999,12 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 # Handle heartbeat messages
                 if message.get("type") == "heartbeat":
                     client_heartbeat(client_id)
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "heartbeat_ack",
-                                "timestamp": datetime.now().isoformat(),
-                            }
-                        )
+                    await connection_manager.send_to_client(
+                        client_id,
+                        {
+                            "type": "heartbeat_ack",
+                            "timestamp": datetime.now().isoformat(),
+                        },
                     )
                     continue
 
@@ -854,11 +1013,28 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 message_type = message.get("type", "message")
                 workspace_path = message.get("workspace_path", ".")
 
+                if tenant_id and message_type != "code_completion_cancel":
+                    tenant_usage_service.record_ai_request(tenant_id)
+
                 # Route to appropriate handler
                 if message_type == "command" and content.startswith("/"):
                     # Handle slash commands through legacy AI service for compatibility
                     message["client_id"] = client_id
                     response = await ai_service.process_command(message)
+                elif message_type == "code_completion" and message.get("stream"):
+                    # Stream tokens from a background task; the loop keeps receiving
+                    # so the client can cancel mid-stream
+                    start_code_completion_stream(message, client_id)
+                    continue
+                elif message_type == "code_completion_cancel":
+                    request_id = message.get("request_id")
+                    cancelled = cancel_code_completion_streams(client_id, request_id)
+                    response = {
+                        "status": "success",
+                        "type": "code_completion_cancelled",
+                        "request_id": request_id,
+                        "cancelled_streams": cancelled,
+                    }
                 elif message_type == "code_completion":
                     # Handle code completion requests from iOS
                     response = await handle_code_completion_websocket(
@@ -874,7 +1050,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                 if "timestamp" not in response:
                     response["timestamp"] = asyncio.get_event_loop().time()
 
-                await websocket.send_text(json.dumps(response, default=str))
+                await connection_manager.send_to_client(client_id, response)
 
             except json.JSONDecodeError:
                 error_response = {
@@ -883,7 +1059,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     "confidence": 0.0,
                     "timestamp": asyncio.get_event_loop().time(),
                 }
-                await websocket.send_text(json.dumps(error_response))
+                await connection_manager.send_to_client(client_id, error_response)
             except Exception as e:
                 logger.error(f"Error processing message for {client_id}: {e}")
                 
@@ -902,11 +1078,15 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     "timestamp": asyncio.get_event_loop().time(),
                     "recovery_attempted": recovery_result["success"],
                 }
-                await websocket.send_text(json.dumps(error_response))
+                await connection_manager.send_to_client(client_id, error_response)
 
     except WebSocketDisconnect:
+        cancel_code_completion_streams(client_id)
         connection_manager.disconnect(client_id)
         logger.info(f"L3 Agent client {client_id} disconnected")
+    finally:
+        if tenant_id:
+            tenant_usage_service.session_closed(tenant_id)
 
 
 def main():
@@ -121,7 +121,11 @@ class TenantMiddleware(BaseHTTPMiddleware):
                 request.state.tenant = tenant
                 request.state.tenant_id = tenant.id
                 request.state.user_id = user_id
-                
+
+                # Meter API calls against the monthly quota
+                if request.url.path.startswith("/api/"):
+                    self.tenant_service.usage.record_api_call(tenant.id)
+
                 logger.info(f"Request processed for tenant: {tenant.slug} (user: {user_id})")
                 
             else:
@@ -58,6 +58,7 @@ class PipelineAnalyticsResponse(BaseModel):
     time_series_data: List[Dict[str, Any]] = Field(description="Time series analytics data")
     performance_trends: Dict[str, str] = Field(description="Performance trend indicators")
     predictions: Optional[Dict[str, Any]] = Field(None, description="Predictive analytics")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page of time series data")
     
     class Config:
         json_encoders = {
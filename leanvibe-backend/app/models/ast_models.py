@@ -5,8 +5,12 @@ Pydantic models for representing Abstract Syntax Trees and code analysis results
 """
 
 import time
+from array import array
+from bisect import bisect_right
+from collections import deque
 from enum import Enum
-from typing import Dict, List, Optional
+from pathlib import PurePath
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -51,6 +55,224 @@ class ASTNode(BaseModel):
     parent: Optional["ASTNode"] = None
 
 
+NODE_NAMED = 1
+NODE_ERROR = 2
+NODE_MISSING = 4
+
+
+class CompactAST:
+    """Flat, struct-of-arrays syntax tree over a shared source buffer
+
+    Nodes are stored in pre-order, so the subtree of node ``i`` occupies
+    indices ``[i, subtree_ends[i])`` and its first child (if any) is ``i + 1``.
+    Node text is sliced from ``source`` on demand instead of being copied into
+    every node, which keeps a parsed file at a few dozen bytes per node and
+    makes pickling a handful of buffer copies. Row/column points are derived
+    from byte offsets through a per-file line table rather than stored.
+    """
+
+    __slots__ = (
+        "source",
+        "type_names",
+        "types",
+        "flags",
+        "start_bytes",
+        "end_bytes",
+        "line_starts",
+        "parents",
+        "subtree_ends",
+        "_type_ids",
+    )
+
+    def __init__(self, source: bytes = b""):
+        self.source = source
+        self.type_names: List[str] = []
+        self.types = array("H")
+        self.flags = bytearray()
+        self.start_bytes = array("I")
+        self.end_bytes = array("I")
+        self.line_starts = array("I", [0])
+        line_start = source.find(b"\n")
+        while line_start != -1:
+            self.line_starts.append(line_start + 1)
+            line_start = source.find(b"\n", line_start + 1)
+        self.parents = array("i")
+        self.subtree_ends = array("I")
+        self._type_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "_type_ids"}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._type_ids = {name: i for i, name in enumerate(self.type_names)}
+
+    def add_node(
+        self,
+        node_type: str,
+        start_byte: int,
+        end_byte: int,
+        parent: int,
+        flags: int = NODE_NAMED,
+    ) -> int:
+        """Append a node in pre-order and return its index"""
+        type_id = self._type_ids.get(node_type)
+        if type_id is None:
+            type_id = self._type_ids[node_type] = len(self.type_names)
+            self.type_names.append(node_type)
+
+        index = len(self.types)
+        self.types.append(type_id)
+        self.flags.append(flags)
+        self.start_bytes.append(start_byte)
+        self.end_bytes.append(end_byte)
+        self.parents.append(parent)
+        self.subtree_ends.append(index + 1)
+        return index
+
+    def close_node(self, index: int):
+        """Mark the end of a node's subtree once all its descendants are added"""
+        self.subtree_ends[index] = len(self.types)
+
+    def node_type(self, index: int) -> str:
+        return self.type_names[self.types[index]]
+
+    def point(self, byte_offset: int) -> tuple[int, int]:
+        """(row, column) of a byte offset, matching tree-sitter's byte columns"""
+        row = bisect_right(self.line_starts, byte_offset) - 1
+        return (row, byte_offset - self.line_starts[row])
+
+    def text(self, index: int) -> str:
+        return self.source[self.start_bytes[index] : self.end_bytes[index]].decode(
+            "utf-8", errors="ignore"
+        )
+
+    def line_text(self, row: int) -> str:
+        """Source text of a 0-based row, without its line ending"""
+        if not 0 <= row < len(self.line_starts):
+            return ""
+        start = self.line_starts[row]
+        end = self.line_starts[row + 1] - 1 if row + 1 < len(self.line_starts) else len(self.source)
+        return self.source[start:end].decode("utf-8", errors="ignore").rstrip("\r")
+
+    def children(self, index: int) -> Iterator[int]:
+        child = index + 1
+        end = self.subtree_ends[index]
+        while child < end:
+            yield child
+            child = self.subtree_ends[child]
+
+    def find_by_type(self, node_types: List[str]) -> List[int]:
+        """Indices of all nodes of the given types, in document order"""
+        wanted = {self._type_ids[t] for t in node_types if t in self._type_ids}
+        return [i for i, type_id in enumerate(self.types) if type_id in wanted]
+
+    @property
+    def root(self) -> Optional["ASTNodeView"]:
+        return ASTNodeView(self, 0) if len(self.types) else None
+
+    def node(self, index: int) -> "ASTNodeView":
+        return ASTNodeView(self, index)
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by the node tables and source buffer"""
+        columns = (
+            self.types,
+            self.start_bytes,
+            self.end_bytes,
+            self.line_starts,
+            self.parents,
+            self.subtree_ends,
+        )
+        return (
+            len(self.source)
+            + len(self.flags)
+            + sum(column.itemsize * len(column) for column in columns)
+            + sum(len(name) for name in self.type_names)
+        )
+
+
+class ASTNodeView:
+    """Lazy, read-only ASTNode facade over a node in a CompactAST"""
+
+    __slots__ = ("ast", "index")
+
+    def __init__(self, ast: CompactAST, index: int):
+        self.ast = ast
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, ASTNodeView)
+            and other.ast is self.ast
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.ast), self.index))
+
+    def __repr__(self) -> str:
+        return f"ASTNodeView({self.node_type!r}, {self.start_byte}:{self.end_byte})"
+
+    @property
+    def node_type(self) -> str:
+        return self.ast.node_type(self.index)
+
+    @property
+    def start_byte(self) -> int:
+        return self.ast.start_bytes[self.index]
+
+    @property
+    def end_byte(self) -> int:
+        return self.ast.end_bytes[self.index]
+
+    @property
+    def start_point(self) -> tuple[int, int]:
+        return self.ast.point(self.ast.start_bytes[self.index])
+
+    @property
+    def end_point(self) -> tuple[int, int]:
+        return self.ast.point(self.ast.end_bytes[self.index])
+
+    @property
+    def is_named(self) -> bool:
+        return bool(self.ast.flags[self.index] & NODE_NAMED)
+
+    @property
+    def has_error(self) -> bool:
+        return bool(self.ast.flags[self.index] & NODE_ERROR)
+
+    @property
+    def text(self) -> str:
+        return self.ast.text(self.index)
+
+    @property
+    def children(self) -> List["ASTNodeView"]:
+        return [ASTNodeView(self.ast, child) for child in self.ast.children(self.index)]
+
+    @property
+    def parent(self) -> Optional["ASTNodeView"]:
+        parent = self.ast.parents[self.index]
+        return ASTNodeView(self.ast, parent) if parent >= 0 else None
+
+    def to_ast_node(self, max_text: int = 1000) -> "ASTNode":
+        """Materialize this subtree as pydantic ASTNode models"""
+        text = self.text
+        return ASTNode(
+            node_type=self.node_type,
+            start_byte=self.start_byte,
+            end_byte=self.end_byte,
+            start_point=self.start_point,
+            end_point=self.end_point,
+            text=text[:max_text],
+            children=[child.to_ast_node(max_text) for child in self.children],
+        )
+
+
 class Symbol(BaseModel):
     """Code symbol representation"""
 
@@ -97,18 +319,302 @@ class ComplexityMetrics(BaseModel):
     maintainability_index: float = 0.0
 
 
+class OccurrenceKind(str, Enum):
+    """How an identifier is used at one occurrence"""
+
+    DEFINITION = "definition"
+    CALL = "call"
+    IMPORT = "import"
+    USAGE = "usage"
+
+
+class IdentifierOccurrence(NamedTuple):
+    """One identifier occurrence within a file (1-based line, 0-based column)"""
+
+    line: int
+    column: int
+    kind: OccurrenceKind
+
+
+class IdentifierIndex(BaseModel):
+    """Project-wide identifier occurrences, maintained one file at a time"""
+
+    names: Dict[str, Dict[str, List[IdentifierOccurrence]]] = Field(default_factory=dict)
+    file_names: Dict[str, List[str]] = Field(default_factory=dict)
+
+    def set_file(
+        self, file_path: str, identifiers: Dict[str, List[IdentifierOccurrence]]
+    ) -> None:
+        """Replace the occurrences recorded for a file"""
+        self.remove_file(file_path)
+        for name, occurrences in identifiers.items():
+            self.names.setdefault(name, {})[file_path] = occurrences
+        self.file_names[file_path] = list(identifiers)
+
+    def remove_file(self, file_path: str) -> None:
+        """Drop every occurrence recorded for a file"""
+        for name in self.file_names.pop(file_path, ()):
+            files = self.names.get(name)
+            if files is None:
+                continue
+            files.pop(file_path, None)
+            if not files:
+                del self.names[name]
+
+    def find(self, name: str) -> List[Tuple[str, IdentifierOccurrence]]:
+        """All occurrences of a name as (file_path, occurrence) pairs"""
+        return [
+            (file_path, occurrence)
+            for file_path, occurrences in self.names.get(name, {}).items()
+            for occurrence in occurrences
+        ]
+
+    def count(self, name: str, kind: Optional[OccurrenceKind] = None) -> int:
+        """Number of occurrences of a name, optionally of one kind"""
+        files = self.names.get(name, {})
+        if kind is None:
+            return sum(len(occurrences) for occurrences in files.values())
+        return sum(
+            1
+            for occurrences in files.values()
+            for occurrence in occurrences
+            if occurrence.kind == kind
+        )
+
+
+class ImportBinding(NamedTuple):
+    """A local name bound by an import statement"""
+
+    local_name: str
+    module: str
+    name: Optional[str]  # imported member, None when the module itself is bound
+    line: int
+
+
+class CallSite(NamedTuple):
+    """A call expression: the called name and the receiver it is called on"""
+
+    line: int
+    column: int
+    callee: str
+    receiver: Optional[str] = None
+
+
+# Source suffixes an import may spell out in a path-style module name
+MODULE_FILE_SUFFIXES = (".py", ".js", ".ts", ".jsx", ".tsx")
+
+
+def module_key(module_name: str) -> str:
+    """Last component of a dotted or path-style module name"""
+    name = module_name.replace("\\", "/").rstrip("/")
+    if "/" in name:
+        name = name.rsplit("/", 1)[-1]
+        stem, dot, suffix = name.rpartition(".")
+        return stem if dot and stem and f".{suffix}" in MODULE_FILE_SUFFIXES else name
+    return name.rsplit(".", 1)[-1]
+
+
+def file_module_key(file_path: str) -> str:
+    """Module key under which imports can name a file"""
+    path = PurePath(file_path)
+    return path.parent.name if path.stem in ("__init__", "index") else path.stem
+
+
+class CallGraphIndex(BaseModel):
+    """Resolved call edges between symbol ids with forward and reverse indexes
+
+    Edges are recorded per calling file so a changed file replaces only its
+    own edges; importers lists, per imported file, the files whose calls were
+    resolved through it and must be re-resolved when it changes. Imports that
+    resolved to no indexed file are kept per file as module names, and indexed
+    by module key (the last component of the module name) so the importers can
+    be re-resolved when a matching file is added.
+    """
+
+    callees: Dict[str, Set[str]] = Field(default_factory=dict)
+    callers: Dict[str, Set[str]] = Field(default_factory=dict)
+    file_edges: Dict[str, List[Tuple[str, str]]] = Field(default_factory=dict)
+    file_imports: Dict[str, List[str]] = Field(default_factory=dict)
+    importers: Dict[str, Set[str]] = Field(default_factory=dict)
+    file_unresolved: Dict[str, List[str]] = Field(default_factory=dict)
+    unresolved_importers: Dict[str, Set[str]] = Field(default_factory=dict)
+
+    def set_file(
+        self,
+        file_path: str,
+        edges: List[Tuple[str, str]],
+        imported_files: Iterable[str] = (),
+        unresolved_modules: Iterable[str] = (),
+    ) -> None:
+        """Replace the call edges originating in a file"""
+        self.remove_file(file_path)
+        self.file_edges[file_path] = edges
+        for caller, callee in edges:
+            self.callees.setdefault(caller, set()).add(callee)
+            self.callers.setdefault(callee, set()).add(caller)
+        imported = sorted(set(imported_files))
+        self.file_imports[file_path] = imported
+        for target in imported:
+            self.importers.setdefault(target, set()).add(file_path)
+        unresolved = sorted(set(unresolved_modules))
+        if unresolved:
+            self.file_unresolved[file_path] = unresolved
+        for key in {module_key(module) for module in unresolved}:
+            self.unresolved_importers.setdefault(key, set()).add(file_path)
+
+    def remove_file(self, file_path: str) -> None:
+        """Drop the call edges originating in a file"""
+        for caller, callee in self.file_edges.pop(file_path, ()):
+            self._discard(self.callees, caller, callee)
+            self._discard(self.callers, callee, caller)
+        for target in self.file_imports.pop(file_path, ()):
+            self._discard(self.importers, target, file_path)
+        for module in self.file_unresolved.pop(file_path, ()):
+            self._discard(self.unresolved_importers, module_key(module), file_path)
+
+    def importers_awaiting(self, file_path: str) -> Set[str]:
+        """Files with unresolved imports whose module name could refer to this file"""
+        return set(self.unresolved_importers.get(file_module_key(file_path), ()))
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, value: str) -> None:
+        values = index.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del index[key]
+
+    def callees_of(self, symbol_id: str, depth: int = 1) -> Dict[str, int]:
+        """Symbols reachable within depth calls, with their distance"""
+        return self._reachable(self.callees, symbol_id, depth)
+
+    def callers_of(self, symbol_id: str, depth: int = 1) -> Dict[str, int]:
+        """Symbols that reach this one within depth calls, with their distance"""
+        return self._reachable(self.callers, symbol_id, depth)
+
+    @staticmethod
+    def _reachable(index: Dict[str, Set[str]], start: str, depth: int) -> Dict[str, int]:
+        distances: Dict[str, int] = {}
+        frontier = deque([(start, 0)])
+        while frontier:
+            node, distance = frontier.popleft()
+            if distance == depth:
+                continue
+            for neighbour in index.get(node, ()):
+                if neighbour not in distances and neighbour != start:
+                    distances[neighbour] = distance + 1
+                    frontier.append((neighbour, distance + 1))
+        return distances
+
+    def find_call_chains(
+        self, source_id: str, target_id: str, max_depth: int = 5, limit: int = 10
+    ) -> List[List[str]]:
+        """Shortest-first simple call paths from source to target"""
+        # Only walk symbols that can still reach the target in time
+        remaining = self.callers_of(target_id, max_depth)
+        remaining[target_id] = 0
+        if source_id not in remaining:
+            return []
+
+        chains: List[List[str]] = []
+        frontier = deque([[source_id]])
+        while frontier and len(chains) < limit:
+            path = frontier.popleft()
+            node = path[-1]
+            if node == target_id and len(path) > 1:
+                chains.append(path)
+                continue
+            budget = max_depth - len(path) + 1
+            for callee in sorted(self.callees.get(node, ())):
+                if callee in path and callee != target_id:
+                    continue
+                if remaining.get(callee, max_depth + 1) < budget:
+                    frontier.append(path + [callee])
+        return chains
+
+    def degree(self, symbol_id: str) -> int:
+        """Number of distinct callers plus callees"""
+        return len(self.callers.get(symbol_id, ())) + len(self.callees.get(symbol_id, ()))
+
+    def edges(self) -> List[Tuple[str, str]]:
+        return [
+            (caller, callee)
+            for caller, callees in self.callees.items()
+            for callee in sorted(callees)
+        ]
+
+    def cycles(self) -> List[List[str]]:
+        """Strongly connected groups of mutually recursive symbols"""
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        cycles: List[List[str]] = []
+
+        for root in list(self.callees):
+            if root in index_of:
+                continue
+            work = [(root, iter(sorted(self.callees.get(root, ()))))]
+            index_of[root] = lowlink[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, neighbours = work[-1]
+                advanced = False
+                for neighbour in neighbours:
+                    if neighbour not in index_of:
+                        index_of[neighbour] = lowlink[neighbour] = len(index_of)
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append(
+                            (neighbour, iter(sorted(self.callees.get(neighbour, ()))))
+                        )
+                        advanced = True
+                        break
+                    if neighbour in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[neighbour])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.callees.get(node, ()):
+                        cycles.append(sorted(component))
+        return cycles
+
+
 class FileAnalysis(BaseModel):
     """Complete analysis of a single file"""
 
     file_path: str
     language: LanguageType
-    ast_root: Optional[ASTNode] = None
+    ast: Optional[CompactAST] = Field(default=None, exclude=True)
     symbols: List[Symbol] = Field(default_factory=list)
     dependencies: List[Dependency] = Field(default_factory=list)
     complexity: ComplexityMetrics = Field(default_factory=ComplexityMetrics)
+    identifiers: Dict[str, List[IdentifierOccurrence]] = Field(default_factory=dict)
+    imports: List[ImportBinding] = Field(default_factory=list)
+    calls: List[CallSite] = Field(default_factory=list)
     last_analyzed: float = Field(default_factory=time.time)
     parsing_errors: List[str] = Field(default_factory=list)
 
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def ast_root(self) -> Optional[ASTNodeView]:
+        """Root of the syntax tree as a lazy ASTNode-compatible view"""
+        return self.ast.root if self.ast is not None else None
+
 
 class ProjectIndex(BaseModel):
     """Project-wide code index"""
@@ -117,10 +623,20 @@ class ProjectIndex(BaseModel):
     files: Dict[str, FileAnalysis] = Field(default_factory=dict)
     symbols: Dict[str, Symbol] = Field(default_factory=dict)
     dependencies: List[Dependency] = Field(default_factory=list)
+    identifiers: IdentifierIndex = Field(default_factory=IdentifierIndex)
+    call_graph: CallGraphIndex = Field(default_factory=CallGraphIndex)
     last_indexed: float = Field(default_factory=time.time)
     total_files: int = 0
     supported_files: int = 0
     parsing_errors: int = 0
+    complete: bool = True  # False while files are still being indexed
+
+    @property
+    def progress(self) -> float:
+        """Fraction of discovered files analyzed so far"""
+        if self.complete or not self.total_files:
+            return 1.0
+        return min(len(self.files) / self.total_files, 1.0)
 
 
 class Reference(BaseModel):
@@ -46,6 +46,7 @@ class EventType(str, Enum):
     CACHE_INVALIDATED = "cache_invalidated"
     CACHE_WARMED = "cache_warmed"
     INDEX_UPDATED = "index_updated"
+    INDEX_PROGRESS = "index_progress"
 
     # Agent events
     AGENT_STARTED = "agent_started"
@@ -271,6 +272,32 @@ def create_analysis_event(
     )
 
 
+def create_index_progress_event(
+    workspace_path: str,
+    files_indexed: int,
+    total_files: int,
+    complete: bool,
+    symbols_count: Optional[int] = None,
+) -> AnalysisEvent:
+    """Create a project indexing progress event"""
+    return AnalysisEvent(
+        event_id=f"index_{int(time.time() * 1000)}_{hash(workspace_path) % 10000}",
+        event_type=EventType.INDEX_UPDATED if complete else EventType.INDEX_PROGRESS,
+        priority=EventPriority.HIGH if complete else EventPriority.MEDIUM,
+        channel=NotificationChannel.ANALYSIS,
+        timestamp=datetime.now(),
+        source="project_indexer",
+        analysis_type="index",
+        file_path=workspace_path,
+        symbols_count=symbols_count,
+        data={
+            "files_indexed": files_indexed,
+            "total_files": total_files,
+            "complete": complete,
+        },
+    )
+
+
 def create_violation_event(
     violation_id: str,
     violation_type: str,
@@ -345,6 +345,7 @@ class MVPProjectORM(Base):
     __table_args__ = (
         Index('idx_mvp_tenant_status', 'tenant_id', 'status'),
         Index('idx_mvp_tenant_created', 'tenant_id', 'created_at'),
+        Index('idx_mvp_tenant_updated', 'tenant_id', 'updated_at'),
         Index('idx_mvp_slug_tenant', 'slug', 'tenant_id'),
         Index('idx_mvp_deployment_status', 'status', 'deployed_at'),
         CheckConstraint('created_at <= updated_at', name='chk_mvp_timestamps'),
@@ -446,9 +447,12 @@ class PipelineExecutionORM(Base):
     error_message = Column(Text, nullable=True)
     retry_count = Column(Integer, default=0, nullable=False)
     
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
     __table_args__ = (
         Index('idx_exec_project_time', 'mvp_project_id', 'started_at'),
         Index('idx_exec_tenant_status', 'tenant_id', 'status'),
+        Index('idx_exec_tenant_updated', 'tenant_id', 'updated_at'),
     )
     
     def __repr__(self):
@@ -479,6 +483,109 @@ class PipelineExecutionLogORM(Base):
     def __repr__(self):
         return f"<PipelineExecutionLogORM(exec={self.execution_id}, level={self.level})>"
 
+
+# ------------------------
+# Analytics Rollup Models
+# ------------------------
+
+
+class AnalyticsRollupORM(Base):
+    """Pre-aggregated pipeline metrics per tenant, time bucket and pipeline stage
+
+    Rows with stage '*' aggregate MVP projects by creation time; other rows
+    aggregate pipeline executions for that stage by start time. Granularity is
+    'hour', 'day', or 'total' (one all-time row per tenant and stage).
+    """
+    __tablename__ = "analytics_rollups"
+    
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey('tenants.id'), nullable=False)
+    granularity = Column(String(8), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    stage = Column(String(64), nullable=False, default="*")
+    
+    # Project metrics (stage '*')
+    pipelines_created = Column(Integer, default=0, nullable=False)
+    pipelines_deployed = Column(Integer, default=0, nullable=False)
+    pipelines_failed = Column(Integer, default=0, nullable=False)
+    pipelines_active = Column(Integer, default=0, nullable=False)
+    completion_hours_sum = Column(Float, default=0.0, nullable=False)
+    completion_count = Column(Integer, default=0, nullable=False)
+    cpu_hours = Column(Float, default=0.0, nullable=False)
+    memory_gb_hours = Column(Float, default=0.0, nullable=False)
+    storage_mb = Column(Integer, default=0, nullable=False)
+    ai_tokens = Column(Integer, default=0, nullable=False)
+    total_cost = Column(Float, default=0.0, nullable=False)
+    
+    # Stage metrics (stage != '*')
+    stage_runs = Column(Integer, default=0, nullable=False)
+    stage_hours_sum = Column(Float, default=0.0, nullable=False)
+    stage_failures = Column(Integer, default=0, nullable=False)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_rollup_bucket', 'tenant_id', 'granularity', 'stage', 'bucket_start', unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<AnalyticsRollupORM(tenant={self.tenant_id}, {self.granularity}={self.bucket_start}, stage={self.stage})>"
+
+
+class AnalyticsRollupStateORM(Base):
+    """Refresh watermarks for a tenant's analytics rollups"""
+    __tablename__ = "analytics_rollup_state"
+    
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey('tenants.id'), primary_key=True)
+    projects_watermark = Column(DateTime, nullable=True)
+    executions_watermark = Column(DateTime, nullable=True)
+    rebuilt_at = Column(DateTime, nullable=True)
+    version = Column(Integer, default=0, nullable=False)
+
+# ------------------------
+# Billing Models
+# ------------------------
+
+
+class UsageRecordORM(Base):
+    """Rolled-up metered usage for one tenant, metric and period bucket
+
+    ``aggregation_key`` is the rollup's idempotency key; it is unique so a
+    rollup retried after a crash is stored, and reported to Stripe, once.
+    """
+    __tablename__ = "usage_records"
+    
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid4)
+    tenant_id = Column(PG_UUID(as_uuid=True), ForeignKey('tenants.id'), nullable=False)
+    subscription_id = Column(PG_UUID(as_uuid=True), nullable=False)
+    
+    # Usage details
+    metric_type = Column(String(32), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=True)
+    
+    # Time period
+    usage_date = Column(DateTime, nullable=False)
+    billing_period_start = Column(DateTime, nullable=False)
+    billing_period_end = Column(DateTime, nullable=False)
+    
+    # Aggregation metadata
+    aggregation_key = Column(String(255), nullable=False)
+    
+    # Stripe integration
+    stripe_usage_record_id = Column(String(255), nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_usage_aggregation_key', 'aggregation_key', unique=True),
+        Index('idx_usage_tenant_period', 'tenant_id', 'billing_period_start', 'metric_type'),
+    )
+    
+    def __repr__(self):
+        return f"<UsageRecordORM(tenant={self.tenant_id}, {self.metric_type}={self.quantity})>"
+
+
 # Row-Level Security Policies (Applied via migrations)
 """
 These policies will be implemented in Alembic migrations:
@@ -0,0 +1,436 @@
+"""
+Streaming analytics export jobs
+
+Exports run as background jobs. Each dataset is read through a streaming
+cursor in ``chunk_size`` partitions and written incrementally to the storage
+provider as CSV, NDJSON or JSON (optionally gzip-compressed), so memory use is
+bounded by one partition no matter how many rows a tenant exports. Finished
+files can be downloaded with HTTP ranges, so interrupted downloads resume.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from ..core.database import get_background_session
+from ..models.orm_models import AuditLogORM, MVPProjectORM, UsageRecordORM
+from .storage import get_storage_service
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Datasets
+# ----------------------------
+
+def _audit_logs_query(tenant_id: UUID, start: datetime, end: datetime) -> Select:
+    audit = AuditLogORM
+    return (
+        select(
+            audit.timestamp,
+            audit.action,
+            audit.resource_type,
+            audit.resource_id,
+            audit.user_id,
+            audit.user_email,
+            audit.ip_address,
+            audit.details,
+        )
+        .where(audit.tenant_id == tenant_id, audit.timestamp >= start, audit.timestamp < end)
+        .order_by(audit.timestamp)
+    )
+
+
+def _usage_query(tenant_id: UUID, start: datetime, end: datetime) -> Select:
+    usage = UsageRecordORM
+    return (
+        select(
+            usage.usage_date,
+            usage.metric_type,
+            usage.quantity,
+            usage.unit_price,
+            usage.billing_period_start,
+            usage.billing_period_end,
+            usage.subscription_id,
+            usage.stripe_usage_record_id,
+        )
+        .where(usage.tenant_id == tenant_id, usage.usage_date >= start, usage.usage_date < end)
+        .order_by(usage.usage_date, usage.metric_type)
+    )
+
+
+def _pipelines_query(tenant_id: UUID, start: datetime, end: datetime) -> Select:
+    project = MVPProjectORM
+    return (
+        select(
+            project.id,
+            project.project_name,
+            project.status,
+            project.created_at,
+            project.completed_at,
+            project.deployed_at,
+            project.cpu_hours_used,
+            project.memory_gb_hours_used,
+            project.storage_mb_used,
+            project.ai_tokens_used,
+            project.total_cost,
+        )
+        .where(project.tenant_id == tenant_id, project.created_at >= start, project.created_at < end)
+        .order_by(project.created_at)
+    )
+
+
+EXPORT_DATASETS: Dict[str, Callable[[UUID, datetime, datetime], Select]] = {
+    "audit_logs": _audit_logs_query,
+    "usage": _usage_query,
+    "pipelines": _pipelines_query,
+}
+
+
+# ----------------------------
+# Encoders
+# ----------------------------
+
+def _plain(value: Any) -> Any:
+    """Convert a column value to a JSON-compatible value"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if hasattr(value, "value"):  # enums
+        return value.value
+    return value
+
+
+class CsvEncoder:
+    extension = "csv"
+    media_type = "text/csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+    def begin(self, columns: Sequence[str]) -> str:
+        self._writer.writerow(columns)
+        return self._drain()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        for row in rows:
+            self._writer.writerow(
+                json.dumps(value) if isinstance(value, (dict, list)) else _plain(value)
+                for value in row
+            )
+        return self._drain()
+
+    def end(self) -> str:
+        return ""
+
+
+class NdjsonEncoder:
+    extension = "ndjson"
+    media_type = "application/x-ndjson"
+
+    def begin(self, columns: Sequence[str]) -> str:
+        self._columns = list(columns)
+        return ""
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        return "".join(
+            json.dumps({column: _plain(value) for column, value in zip(self._columns, row)}) + "\n"
+            for row in rows
+        )
+
+    def end(self) -> str:
+        return ""
+
+
+class JsonEncoder(NdjsonEncoder):
+    """A JSON array written element by element"""
+
+    extension = "json"
+    media_type = "application/json"
+
+    def begin(self, columns: Sequence[str]) -> str:
+        super().begin(columns)
+        self._separator = "\n"
+        return "["
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        parts = []
+        for row in rows:
+            parts.append(self._separator)
+            parts.append(json.dumps({column: _plain(value) for column, value in zip(self._columns, row)}))
+            self._separator = ",\n"
+        return "".join(parts)
+
+    def end(self) -> str:
+        return "\n]\n"
+
+
+EXPORT_FORMATS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "json": JsonEncoder}
+
+
+# ----------------------------
+# Jobs
+# ----------------------------
+
+@dataclass
+class ExportFile:
+    dataset: str
+    path: str
+    media_type: str
+    filename: str
+    rows: int = 0
+    size: int = 0
+    completed: bool = False
+
+
+@dataclass
+class ExportJob:
+    export_id: str
+    tenant_id: UUID
+    format: str
+    datasets: List[str]
+    start: datetime
+    end: datetime
+    compress: bool = False
+    user_id: Optional[UUID] = None
+    status: str = "queued"  # queued, running, completed, failed
+    estimated_rows: int = 0
+    rows_written: int = 0
+    files: Dict[str, ExportFile] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == "completed":
+            return 100.0
+        if not self.estimated_rows:
+            return 0.0
+        return min(99.0, self.rows_written / self.estimated_rows * 100)
+
+    @property
+    def manifest_path(self) -> str:
+        return f"exports/{self.export_id}/manifest.json"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["progress"] = self.progress
+        return {key: _plain(value) for key, value in data.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportJob":
+        def timestamp(value):
+            return datetime.fromisoformat(value) if value else None
+
+        return cls(
+            export_id=data["export_id"],
+            tenant_id=UUID(data["tenant_id"]),
+            format=data["format"],
+            datasets=list(data["datasets"]),
+            start=timestamp(data["start"]),
+            end=timestamp(data["end"]),
+            compress=data.get("compress", False),
+            user_id=UUID(data["user_id"]) if data.get("user_id") else None,
+            status=data["status"],
+            estimated_rows=data.get("estimated_rows", 0),
+            rows_written=data.get("rows_written", 0),
+            files={name: ExportFile(**info) for name, info in data.get("files", {}).items()},
+            error=data.get("error"),
+            created_at=timestamp(data["created_at"]),
+            completed_at=timestamp(data.get("completed_at")),
+        )
+
+
+class AnalyticsExportService:
+    """Runs export jobs and tracks their progress
+
+    Finished jobs are kept in memory for ``job_ttl`` seconds; after that their
+    status is served from the stored manifest.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        storage=None,
+        chunk_size: int = 1000,
+        max_concurrent_jobs: int = 2,
+        job_ttl: float = 3600.0,
+    ):
+        self._session_factory = session_factory
+        self._storage = storage
+        self.chunk_size = chunk_size
+        self.job_ttl = job_ttl
+        self._jobs: Dict[str, ExportJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+
+    @property
+    def storage(self):
+        return self._storage or get_storage_service()
+
+    async def _run_with_session(self, operation, *args):
+        if self._session_factory is not None:
+            async with self._session_factory() as session:
+                return await operation(session, *args)
+        async for session in get_background_session():
+            return await operation(session, *args)
+
+    def submit(
+        self,
+        tenant_id: UUID,
+        export_format: str,
+        datasets: Sequence[str],
+        start: datetime,
+        end: datetime,
+        compress: bool = False,
+        user_id: Optional[UUID] = None,
+    ) -> ExportJob:
+        """Validate an export request and start it in the background"""
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        unknown = [name for name in datasets if name not in EXPORT_DATASETS]
+        if unknown or not datasets:
+            raise ValueError(f"Unknown export datasets: {unknown or list(datasets)}")
+
+        self._expire_jobs()
+        encoder = EXPORT_FORMATS[export_format]
+        export_id = f"export_{tenant_id.hex[:8]}_{uuid4().hex[:12]}"
+        job = ExportJob(
+            export_id=export_id,
+            tenant_id=tenant_id,
+            format=export_format,
+            datasets=list(dict.fromkeys(datasets)),
+            start=start,
+            end=end,
+            compress=compress,
+            user_id=user_id,
+        )
+        for name in job.datasets:
+            filename = f"{name}.{encoder.extension}" + (".gz" if compress else "")
+            job.files[name] = ExportFile(
+                dataset=name,
+                path=f"exports/{export_id}/{filename}",
+                media_type="application/gzip" if compress else encoder.media_type,
+                filename=filename,
+            )
+
+        self._jobs[export_id] = job
+        self._tasks[export_id] = asyncio.create_task(self._run(job))
+        logger.info(f"Queued analytics export {export_id} ({export_format}, {job.datasets})")
+        return job
+
+    async def wait(self, export_id: str) -> None:
+        task = self._tasks.get(export_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def get_job(self, tenant_id: UUID, export_id: str) -> Optional[ExportJob]:
+        """Return a tenant's export job, from memory or its stored manifest"""
+        self._expire_jobs()
+        job = self._jobs.get(export_id)
+        if job is None:
+            try:
+                buffer, _ = await asyncio.to_thread(
+                    self.storage.get_file, tenant_id, f"exports/{export_id}/manifest.json"
+                )
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.warning(f"Failed to load export manifest {export_id}: {e}")
+                return None
+            job = ExportJob.from_dict(json.loads(buffer.getvalue()))
+        return job if job.tenant_id == tenant_id else None
+
+    def _expire_jobs(self) -> None:
+        """Forget finished jobs older than the TTL"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.job_ttl)
+        expired = [
+            export_id
+            for export_id, job in self._jobs.items()
+            if job.completed_at is not None
+            and export_id not in self._tasks
+            and job.completed_at <= cutoff
+        ]
+        for export_id in expired:
+            del self._jobs[export_id]
+
+    async def _run(self, job: ExportJob) -> None:
+        async with self._semaphore:
+            job.status = "running"
+            try:
+                await self._run_with_session(self._export, job)
+                job.status = "completed"
+                logger.info(f"Analytics export {job.export_id} completed: {job.rows_written} rows")
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                logger.error(f"Analytics export {job.export_id} failed: {e}")
+            finally:
+                job.completed_at = datetime.utcnow()
+                self._tasks.pop(job.export_id, None)
+                try:
+                    await asyncio.to_thread(self._write_manifest, job)
+                except Exception as e:
+                    logger.warning(f"Failed to store export manifest {job.export_id}: {e}")
+
+    async def _export(self, db, job: ExportJob) -> None:
+        queries = {
+            name: EXPORT_DATASETS[name](job.tenant_id, job.start, job.end) for name in job.datasets
+        }
+        for query in queries.values():
+            count = select(func.count()).select_from(query.order_by(None).subquery())
+            job.estimated_rows += (await db.execute(count)).scalar_one()
+
+        for name, query in queries.items():
+            await self._export_dataset(db, job, job.files[name], query)
+
+    async def _export_dataset(self, db, job: ExportJob, export_file: ExportFile, query: Select) -> None:
+        encoder = EXPORT_FORMATS[job.format]()
+        storage = self.storage
+        writer = await asyncio.to_thread(storage.open_write, job.tenant_id, export_file.path)
+        sink = gzip.GzipFile(fileobj=writer, mode="wb") if job.compress else writer
+        try:
+            await asyncio.to_thread(sink.write, encoder.begin(list(query.selected_columns.keys())).encode())
+            result = await db.stream(query.execution_options(yield_per=self.chunk_size))
+            async for partition in result.partitions():
+                await asyncio.to_thread(sink.write, encoder.encode(partition).encode())
+                export_file.rows += len(partition)
+                job.rows_written += len(partition)
+            await asyncio.to_thread(sink.write, encoder.end().encode())
+            if sink is not writer:
+                await asyncio.to_thread(sink.close)
+            await asyncio.to_thread(writer.close)
+        except BaseException:
+            writer.abort()
+            raise
+
+        export_file.size = await asyncio.to_thread(storage.file_size, job.tenant_id, export_file.path)
+        export_file.completed = True
+
+    def _write_manifest(self, job: ExportJob) -> None:
+        with self.storage.open_write(job.tenant_id, job.manifest_path) as writer:
+            writer.write(json.dumps(job.to_dict()).encode())
+
+
+# Global analytics export service instance
+analytics_export_service = AnalyticsExportService()
@@ -0,0 +1,533 @@
+"""
+Analytics query layer backed by pre-aggregated rollup tables
+
+Pipeline and tenant analytics are answered from ``analytics_rollups``: hourly,
+daily and all-time rows per tenant and pipeline stage. Rollups are maintained
+incrementally: a refresh finds the hour buckets touched since the tenant's
+watermark and recomputes only those buckets with GROUP BY queries, adjusting the
+all-time row by the difference. Queries then sum a bounded number of rollup rows
+(hourly rows for the partial days at the edges of a range, daily rows in
+between), so dashboard cost does not grow with history size.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import get_background_session
+from ..core.single_flight import SingleFlight
+from ..models.orm_models import (
+    AnalyticsRollupORM,
+    AnalyticsRollupStateORM,
+    MVPProjectORM,
+    PipelineExecutionORM,
+)
+
+logger = logging.getLogger(__name__)
+
+PROJECT_STAGE = "*"
+TOTAL_BUCKET = datetime(1970, 1, 1)
+ACTIVE_STATUSES = ("generating", "blueprint_pending")
+
+PROJECT_METRICS = (
+    "pipelines_created",
+    "pipelines_deployed",
+    "pipelines_failed",
+    "pipelines_active",
+    "completion_hours_sum",
+    "completion_count",
+    "cpu_hours",
+    "memory_gb_hours",
+    "storage_mb",
+    "ai_tokens",
+    "total_cost",
+)
+STAGE_METRICS = ("stage_runs", "stage_hours_sum", "stage_failures")
+METRICS = PROJECT_METRICS + STAGE_METRICS
+
+# Rows updated within this window before the watermark are recomputed again,
+# covering transactions that committed out of timestamp order
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+BucketKey = Tuple[datetime, str]
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour or day containing ``moment``"""
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_expression(column, granularity: str, dialect: str):
+    """SQL expression truncating a timestamp column to an hour or day bucket"""
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    if granularity == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    return func.strftime("%Y-%m-%d 00:00:00", column)
+
+
+def hours_between(start, end, dialect: str):
+    """SQL expression for the number of hours from ``start`` to ``end``"""
+    if dialect == "postgresql":
+        return func.extract("epoch", end - start) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+
+def _as_datetime(value: Any) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _bucket_ranges(buckets: Iterable[datetime], step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """Merge bucket starts into contiguous [start, end) ranges"""
+    ranges: List[Tuple[datetime, datetime]] = []
+    for bucket in sorted(set(buckets)):
+        if ranges and ranges[-1][1] == bucket:
+            ranges[-1] = (ranges[-1][0], bucket + step)
+        else:
+            ranges.append((bucket, bucket + step))
+    return ranges
+
+
+def _in_ranges(column, ranges: List[Tuple[datetime, datetime]]):
+    return or_(*(and_(column >= start, column < end) for start, end in ranges))
+
+
+class AnalyticsService:
+    """Incrementally maintained rollups and the queries that read them"""
+
+    GRANULARITY_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+    def __init__(
+        self,
+        session_factory=None,
+        refresh_interval: float = 60.0,
+        rebuild_interval: timedelta = timedelta(days=1),
+        max_cached_responses: int = 1024,
+    ):
+        self._session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        # tenant -> (monotonic time of last refresh, rollup version)
+        self._refreshed: Dict[UUID, Tuple[float, int]] = {}
+        self.max_cached_responses = max_cached_responses
+        # Least recently used first; queries keyed by hour would otherwise
+        # add an entry every hour forever
+        self._cache: "OrderedDict[Tuple, Tuple[int, Any]]" = OrderedDict()
+        self._refresh_locks: Dict[UUID, asyncio.Lock] = {}
+        self._single_flight = SingleFlight("analytics")
+        self.stats = {"refreshes": 0, "rebuilds": 0, "buckets_recomputed": 0, "cache_hits": 0}
+
+    # ----------------------------
+    # Sessions
+    # ----------------------------
+
+    async def _run(self, operation, *args):
+        if self._session_factory is not None:
+            async with self._session_factory() as session:
+                return await operation(session, *args)
+        async for session in get_background_session():
+            return await operation(session, *args)
+
+    # ----------------------------
+    # Rollup maintenance
+    # ----------------------------
+
+    async def refresh(self, tenant_id: UUID, db: Optional[AsyncSession] = None) -> int:
+        """Bring a tenant's rollups up to date; returns the rollup version"""
+        lock = self._refresh_locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            if db is not None:
+                version = await self._refresh(db, tenant_id)
+            else:
+                version = await self._run(self._refresh, tenant_id)
+            self._refreshed[tenant_id] = (time.monotonic(), version)
+            return version
+
+    async def _refresh(self, db: AsyncSession, tenant_id: UUID) -> int:
+        dialect = db.get_bind().dialect.name
+        now = datetime.utcnow()
+        state = await db.get(AnalyticsRollupStateORM, tenant_id)
+        if state is None:
+            state = AnalyticsRollupStateORM(tenant_id=tenant_id, version=0)
+            db.add(state)
+
+        rebuild = state.rebuilt_at is None or now - state.rebuilt_at >= self.rebuild_interval
+        if rebuild:
+            # Full rebuild also drops buckets of deleted projects and executions
+            await db.execute(delete(AnalyticsRollupORM).where(AnalyticsRollupORM.tenant_id == tenant_id))
+            state.projects_watermark = None
+            state.executions_watermark = None
+
+        project_hours, projects_watermark = await self._changed_project_hours(
+            db, tenant_id, state.projects_watermark, dialect
+        )
+        execution_hours, executions_watermark = await self._changed_execution_hours(
+            db, tenant_id, state.executions_watermark, dialect
+        )
+
+        changed = False
+        for granularity, step in self.GRANULARITY_STEPS.items():
+            if project_hours:
+                buckets = {truncate(hour, granularity) for hour in project_hours}
+                ranges = _bucket_ranges(buckets, step)
+                computed = await self._aggregate_projects(db, tenant_id, granularity, ranges, dialect)
+                changed |= await self._store(db, tenant_id, granularity, ranges, computed, stages=False)
+            if execution_hours:
+                buckets = {truncate(hour, granularity) for hour in execution_hours}
+                ranges = _bucket_ranges(buckets, step)
+                computed = await self._aggregate_stages(db, tenant_id, granularity, ranges, dialect)
+                changed |= await self._store(db, tenant_id, granularity, ranges, computed, stages=True)
+
+        state.projects_watermark = projects_watermark or state.projects_watermark
+        state.executions_watermark = executions_watermark or state.executions_watermark
+        if rebuild:
+            state.rebuilt_at = now
+            self.stats["rebuilds"] += 1
+        if changed or rebuild:
+            state.version = (state.version or 0) + 1
+        await db.commit()
+
+        self.stats["refreshes"] += 1
+        return state.version
+
+    async def _changed_project_hours(
+        self, db: AsyncSession, tenant_id: UUID, watermark: Optional[datetime], dialect: str
+    ) -> Tuple[List[datetime], Optional[datetime]]:
+        """Hour buckets (by creation time) containing projects updated since the watermark"""
+        hour = bucket_expression(MVPProjectORM.created_at, "hour", dialect)
+        query = (
+            select(hour.label("bucket"), func.max(MVPProjectORM.updated_at))
+            .where(MVPProjectORM.tenant_id == tenant_id)
+            .group_by(hour)
+        )
+        if watermark is not None:
+            query = query.where(MVPProjectORM.updated_at > watermark - WATERMARK_OVERLAP)
+        rows = (await db.execute(query)).all()
+        latest = max((_as_datetime(updated) for _, updated in rows), default=None)
+        return [_as_datetime(bucket) for bucket, _ in rows], latest
+
+    async def _changed_execution_hours(
+        self, db: AsyncSession, tenant_id: UUID, watermark: Optional[datetime], dialect: str
+    ) -> Tuple[List[datetime], Optional[datetime]]:
+        """Hour buckets (by start time) containing executions updated since the watermark"""
+        execution = PipelineExecutionORM
+        hour = bucket_expression(execution.started_at, "hour", dialect)
+        query = (
+            select(hour.label("bucket"), func.max(execution.updated_at))
+            .where(execution.tenant_id == tenant_id)
+            .group_by(hour)
+        )
+        if watermark is not None:
+            query = query.where(execution.updated_at > watermark - WATERMARK_OVERLAP)
+        rows = (await db.execute(query)).all()
+        latest = max((_as_datetime(updated) for _, updated in rows), default=None)
+        return [_as_datetime(bucket) for bucket, _ in rows], latest
+
+    async def _aggregate_projects(
+        self, db: AsyncSession, tenant_id: UUID, granularity: str, ranges, dialect: str
+    ) -> Dict[BucketKey, Dict[str, float]]:
+        project = MVPProjectORM
+        bucket = bucket_expression(project.created_at, granularity, dialect)
+        completed = project.completed_at.isnot(None)
+        query = (
+            select(
+                bucket.label("bucket"),
+                func.count().label("pipelines_created"),
+                func.sum(case((project.status == "deployed", 1), else_=0)).label("pipelines_deployed"),
+                func.sum(case((project.status == "failed", 1), else_=0)).label("pipelines_failed"),
+                func.sum(case((project.status.in_(ACTIVE_STATUSES), 1), else_=0)).label("pipelines_active"),
+                func.sum(
+                    case((completed, hours_between(project.created_at, project.completed_at, dialect)), else_=0.0)
+                ).label("completion_hours_sum"),
+                func.count(project.completed_at).label("completion_count"),
+                func.sum(project.cpu_hours_used).label("cpu_hours"),
+                func.sum(project.memory_gb_hours_used).label("memory_gb_hours"),
+                func.sum(project.storage_mb_used).label("storage_mb"),
+                func.sum(project.ai_tokens_used).label("ai_tokens"),
+                func.sum(project.total_cost).label("total_cost"),
+            )
+            .where(project.tenant_id == tenant_id, _in_ranges(project.created_at, ranges))
+            .group_by(bucket)
+        )
+        computed = {}
+        for row in (await db.execute(query)).mappings():
+            computed[(_as_datetime(row["bucket"]), PROJECT_STAGE)] = {
+                metric: row[metric] or 0 for metric in PROJECT_METRICS
+            }
+        self.stats["buckets_recomputed"] += len(computed)
+        return computed
+
+    async def _aggregate_stages(
+        self, db: AsyncSession, tenant_id: UUID, granularity: str, ranges, dialect: str
+    ) -> Dict[BucketKey, Dict[str, float]]:
+        execution = PipelineExecutionORM
+        bucket = bucket_expression(execution.started_at, granularity, dialect)
+        in_scope = and_(execution.tenant_id == tenant_id, _in_ranges(execution.started_at, ranges))
+        computed: Dict[BucketKey, Dict[str, float]] = {}
+
+        def entry(key: BucketKey) -> Dict[str, float]:
+            return computed.setdefault(key, {metric: 0 for metric in STAGE_METRICS})
+
+        failures = (
+            select(bucket.label("bucket"), execution.current_stage, func.count())
+            .where(in_scope, execution.status == "failed")
+            .group_by(bucket, execution.current_stage)
+        )
+        for bucket_value, stage, count in (await db.execute(failures)).all():
+            stage_entry = entry((_as_datetime(bucket_value), stage))
+            stage_entry["stage_failures"] = count
+            stage_entry["stage_runs"] += count
+
+        # Per-stage durations live in a JSON column; only executions in the
+        # recomputed buckets are read
+        durations = select(bucket.label("bucket"), execution.stage_durations).where(in_scope)
+        for bucket_value, stage_durations in (await db.execute(durations)).all():
+            for stage, seconds in (stage_durations or {}).items():
+                stage_entry = entry((_as_datetime(bucket_value), stage))
+                stage_entry["stage_runs"] += 1
+                stage_entry["stage_hours_sum"] += float(seconds or 0) / 3600
+
+        self.stats["buckets_recomputed"] += len(computed)
+        return computed
+
+    async def _store(
+        self,
+        db: AsyncSession,
+        tenant_id: UUID,
+        granularity: str,
+        ranges,
+        computed: Dict[BucketKey, Dict[str, float]],
+        stages: bool,
+    ) -> bool:
+        """Replace rollup rows in the recomputed ranges and adjust all-time rows.
+
+        Returns whether any stored value changed.
+        """
+        rollup = AnalyticsRollupORM
+        stage_filter = rollup.stage != PROJECT_STAGE if stages else rollup.stage == PROJECT_STAGE
+        existing_rows = (
+            await db.execute(
+                select(rollup).where(
+                    rollup.tenant_id == tenant_id,
+                    rollup.granularity == granularity,
+                    stage_filter,
+                    _in_ranges(rollup.bucket_start, ranges),
+                )
+            )
+        ).scalars().all()
+        existing = {(row.bucket_start, row.stage): row for row in existing_rows}
+        metrics = STAGE_METRICS if stages else PROJECT_METRICS
+
+        deltas: Dict[str, Dict[str, float]] = {}
+        changed = False
+        for key in set(existing) | set(computed):
+            row = existing.get(key)
+            values = computed.get(key)
+            if granularity == "day":
+                stage_delta = deltas.setdefault(key[1], {metric: 0 for metric in metrics})
+                for metric in metrics:
+                    new_value = values[metric] if values else 0
+                    old_value = getattr(row, metric) if row is not None else 0
+                    stage_delta[metric] += new_value - old_value
+
+            if values is None:
+                await db.delete(row)
+                changed = True
+            elif row is None:
+                db.add(
+                    rollup(
+                        tenant_id=tenant_id,
+                        granularity=granularity,
+                        bucket_start=key[0],
+                        stage=key[1],
+                        **values,
+                    )
+                )
+                changed = True
+            elif any(getattr(row, metric) != value for metric, value in values.items()):
+                for metric, value in values.items():
+                    setattr(row, metric, value)
+                changed = True
+
+        if changed and deltas:
+            await self._apply_totals(db, tenant_id, deltas)
+        return changed
+
+    async def _apply_totals(self, db: AsyncSession, tenant_id: UUID, deltas: Dict[str, Dict[str, float]]):
+        rollup = AnalyticsRollupORM
+        totals = {
+            row.stage: row
+            for row in (
+                await db.execute(
+                    select(rollup).where(
+                        rollup.tenant_id == tenant_id,
+                        rollup.granularity == "total",
+                        rollup.stage.in_(list(deltas)),
+                    )
+                )
+            ).scalars()
+        }
+        for stage, stage_delta in deltas.items():
+            row = totals.get(stage)
+            if row is None:
+                row = rollup(
+                    tenant_id=tenant_id,
+                    granularity="total",
+                    bucket_start=TOTAL_BUCKET,
+                    stage=stage,
+                    **{metric: 0 for metric in METRICS},
+                )
+                db.add(row)
+            for metric, delta in stage_delta.items():
+                setattr(row, metric, (getattr(row, metric) or 0) + delta)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    async def _cached(self, tenant_id: UUID, key: Tuple, compute):
+        """Serve a query from cache until the tenant's rollups change"""
+        refreshed_at, version = self._refreshed.get(tenant_id, (None, None))
+        if refreshed_at is None or time.monotonic() - refreshed_at >= self.refresh_interval:
+            version, _ = await self._single_flight.do(
+                SingleFlight.make_key("refresh", tenant_id), self.refresh, tenant_id
+            )
+
+        cache_key = (tenant_id, *key)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            self.stats["cache_hits"] += 1
+            self._cache.move_to_end(cache_key)
+            return cached[1]
+
+        result, _ = await self._single_flight.do(
+            SingleFlight.make_key(*cache_key, version), self._run, compute, tenant_id, *key[1:]
+        )
+        self._cache[cache_key] = (version, result)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.max_cached_responses:
+            self._cache.popitem(last=False)
+        return result
+
+    async def pipeline_summary(self, tenant_id: UUID, start: datetime) -> Dict[str, Any]:
+        """Summed project and per-stage metrics for pipelines created since ``start``"""
+        start = truncate(start, "hour")
+        return await self._cached(tenant_id, ("summary", start), self._summary)
+
+    async def _summary(self, db: AsyncSession, tenant_id: UUID, start: datetime) -> Dict[str, Any]:
+        rollup = AnalyticsRollupORM
+        first_full_day = truncate(start, "day")
+        if first_full_day < start:
+            first_full_day += timedelta(days=1)
+        today = truncate(datetime.utcnow(), "day")
+        if first_full_day > today:
+            first_full_day = today
+
+        # Hourly rows for the partial days at both ends, daily rows in between
+        window = or_(
+            and_(rollup.granularity == "hour", rollup.bucket_start >= start, rollup.bucket_start < first_full_day),
+            and_(rollup.granularity == "day", rollup.bucket_start >= first_full_day, rollup.bucket_start < today),
+            and_(rollup.granularity == "hour", rollup.bucket_start >= max(today, start)),
+        )
+        query = (
+            select(rollup.stage, *(func.sum(getattr(rollup, metric)).label(metric) for metric in METRICS))
+            .where(rollup.tenant_id == tenant_id, window)
+            .group_by(rollup.stage)
+        )
+        summary = {"project": {metric: 0 for metric in PROJECT_METRICS}, "stages": {}}
+        for row in (await db.execute(query)).mappings():
+            if row["stage"] == PROJECT_STAGE:
+                summary["project"] = {metric: row[metric] or 0 for metric in PROJECT_METRICS}
+            else:
+                summary["stages"][row["stage"]] = {metric: row[metric] or 0 for metric in STAGE_METRICS}
+        return summary
+
+    async def tenant_totals(self, tenant_id: UUID) -> Dict[str, float]:
+        """All-time project metrics for a tenant"""
+        return await self._cached(tenant_id, ("totals",), self._totals)
+
+    async def _totals(self, db: AsyncSession, tenant_id: UUID) -> Dict[str, float]:
+        rollup = AnalyticsRollupORM
+        row = (
+            await db.execute(
+                select(rollup).where(
+                    rollup.tenant_id == tenant_id,
+                    rollup.granularity == "total",
+                    rollup.stage == PROJECT_STAGE,
+                )
+            )
+        ).scalar_one_or_none()
+        return {metric: (getattr(row, metric) if row else 0) for metric in PROJECT_METRICS}
+
+    async def daily_series(
+        self,
+        tenant_id: UUID,
+        start: datetime,
+        cursor: Optional[str] = None,
+        limit: int = 400,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Daily pipeline points from ``start`` (or after ``cursor``) up to today.
+
+        Returns the page of points and the cursor for the next page, or None
+        when the series is complete.
+        """
+        first_day = truncate(start, "day")
+        if cursor:
+            first_day = max(first_day, truncate(datetime.fromisoformat(cursor), "day") + timedelta(days=1))
+        return await self._cached(tenant_id, ("series", first_day, limit), self._series)
+
+    async def _series(
+        self, db: AsyncSession, tenant_id: UUID, first_day: datetime, limit: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        rollup = AnalyticsRollupORM
+        today = truncate(datetime.utcnow(), "day")
+        last_day = min(today, first_day + timedelta(days=limit - 1))
+        rows = (
+            await db.execute(
+                select(rollup.bucket_start, rollup.pipelines_created, rollup.pipelines_deployed)
+                .where(
+                    rollup.tenant_id == tenant_id,
+                    rollup.granularity == "day",
+                    rollup.stage == PROJECT_STAGE,
+                    rollup.bucket_start >= first_day,
+                    rollup.bucket_start <= last_day,
+                )
+                .order_by(rollup.bucket_start)
+            )
+        ).all()
+        by_day = {bucket: (created, deployed) for bucket, created, deployed in rows}
+
+        points = []
+        day = first_day
+        while day <= last_day:
+            created, deployed = by_day.get(day, (0, 0))
+            points.append({
+                "date": day.isoformat(),
+                "pipelines_created": created,
+                "pipelines_completed": deployed,
+                "success_rate": (deployed / created * 100) if created else 0,
+            })
+            day += timedelta(days=1)
+
+        next_cursor = last_day.isoformat() if last_day < today else None
+        return points, next_cursor
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_responses": len(self._cache),
+            "single_flight": self._single_flight.get_stats(),
+        }
+
+
+# Global analytics service instance
+analytics_service = AnalyticsService()
@@ -5,9 +5,11 @@ AI Agent Orchestration for Autonomous MVP Creation
 
 import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
@@ -39,6 +41,17 @@ class AgentStatus(str, Enum):
     CANCELLED = "cancelled"       # Execution cancelled
 
 
+# Assembly line dependency DAG: agent -> agents whose output it needs.
+# Every coder agent works from the architect's blueprint alone (prior agent
+# outputs are optional inputs), so all of them can run concurrently.
+AGENT_DEPENDENCIES: Dict[AgentType, Tuple[AgentType, ...]] = {
+    AgentType.BACKEND: (),
+    AgentType.FRONTEND: (),
+    AgentType.INFRASTRUCTURE: (),
+    AgentType.OBSERVABILITY: (),
+}
+
+
 class AgentResult(BaseModel):
     """Result from an AI agent execution"""
     agent_type: AgentType
@@ -75,6 +88,33 @@ class QualityGateResult(BaseModel):
     model_config = {"extra": "ignore"}
 
 
+class NodeTiming(BaseModel):
+    """Execution timing for one assembly line node"""
+    status: AgentStatus = AgentStatus.PENDING
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    queue_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    attempts: int = 0
+    from_checkpoint: bool = False
+    
+    model_config = {"extra": "ignore"}
+
+
+class GenerationCheckpoint(BaseModel):
+    """Partial results of a generation, used to resume only unfinished nodes"""
+    mvp_project_id: UUID
+    tenant_id: Optional[UUID] = None
+    blueprint: TechnicalBlueprint
+    priority: str = "normal"
+    completed: Dict[AgentType, Dict[str, Any]] = Field(default_factory=dict)
+    failed: List[AgentType] = Field(default_factory=list)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    model_config = {"extra": "ignore"}
+
+
 class GenerationProgress(BaseModel):
     """Real-time progress tracking for MVP generation"""
     mvp_project_id: UUID
@@ -89,6 +129,10 @@ class GenerationProgress(BaseModel):
     infrastructure_status: AgentStatus = AgentStatus.PENDING
     observability_status: AgentStatus = AgentStatus.PENDING
     
+    # Per-node timing (keyed by agent type value) and nodes currently executing
+    node_timings: Dict[str, NodeTiming] = Field(default_factory=dict)
+    running_stages: List[AgentType] = Field(default_factory=list)
+    
     # Timestamps
     started_at: datetime = Field(default_factory=datetime.utcnow)
     current_stage_started_at: datetime = Field(default_factory=datetime.utcnow)
@@ -183,16 +227,26 @@ class BaseAIAgent:
 class AssemblyLineOrchestrator:
     """Main orchestrator for the MVP generation assembly line"""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_agents_per_tenant: int = 3):
         self.agents: Dict[AgentType, BaseAIAgent] = {}
         self.quality_gates: Dict[AgentType, List[Callable]] = {}
         self.progress_tracking: Dict[UUID, GenerationProgress] = {}
+        self.dependencies: Dict[AgentType, Tuple[AgentType, ...]] = dict(AGENT_DEPENDENCIES)
+        self.checkpoints: Dict[UUID, GenerationCheckpoint] = {}
+        self.max_concurrent_agents_per_tenant = max_concurrent_agents_per_tenant
         # Pause/Resume control flags per project
         self._paused_projects: Dict[UUID, bool] = {}
+        # Agent execution slots shared by all generations of a tenant
+        self._tenant_slots: Dict[UUID, asyncio.Semaphore] = {}
+        # Projects with a run in progress, and reruns started by resume_generation
+        self._active_runs: set = set()
+        self._resumed_runs: Dict[UUID, asyncio.Task] = {}
         
-    def register_agent(self, agent: BaseAIAgent):
+    def register_agent(self, agent: BaseAIAgent, depends_on: Optional[Tuple[AgentType, ...]] = None):
         """Register an AI agent with the orchestrator"""
         self.agents[agent.agent_type] = agent
+        if depends_on is not None:
+            self.dependencies[agent.agent_type] = tuple(depends_on)
         logger.info(f"Registered {agent.agent_type} agent")
     
     def register_all_agents(self):
@@ -222,29 +276,57 @@ class AssemblyLineOrchestrator:
         self,
         mvp_project_id: UUID,
         blueprint: TechnicalBlueprint,
-        priority: str = "normal"
+        priority: str = "normal",
+        tenant_id: Optional[UUID] = None,
+        resume: bool = False
     ) -> bool:
-        """Start the complete MVP generation process"""
+        """Start the complete MVP generation process
+
+        With ``resume=True`` nodes completed by a previous run of the same
+        project are restored from its checkpoint and only the rest execute.
+        """
         try:
             # Validate MVP project exists and tenant has quota
             if not await self._validate_generation_request(mvp_project_id):
                 return False
             
+            checkpoint = self.checkpoints.get(mvp_project_id) if resume else None
+            if checkpoint is None:
+                checkpoint = GenerationCheckpoint(
+                    mvp_project_id=mvp_project_id,
+                    tenant_id=tenant_id,
+                    blueprint=blueprint,
+                    priority=priority
+                )
+                self.checkpoints[mvp_project_id] = checkpoint
+            checkpoint.failed = []
+            
             # Initialize progress tracking
             progress = GenerationProgress(
                 mvp_project_id=mvp_project_id,
                 current_stage=AgentType.BACKEND,
                 estimated_completion_at=self._estimate_completion_time(blueprint)
             )
+            for agent_type in checkpoint.completed:
+                progress.node_timings[agent_type.value] = NodeTiming(
+                    status=AgentStatus.COMPLETED, from_checkpoint=True
+                )
+                await self._update_agent_status(mvp_project_id, agent_type, AgentStatus.COMPLETED)
             self.progress_tracking[mvp_project_id] = progress
             # Clear pause flag on new start
             self._paused_projects[mvp_project_id] = False
             
             # Execute assembly line
-            success = await self._execute_assembly_line(mvp_project_id, blueprint, priority)
+            self._active_runs.add(mvp_project_id)
+            try:
+                success = await self._execute_assembly_line(mvp_project_id, checkpoint.blueprint, checkpoint.priority)
+            finally:
+                self._active_runs.discard(mvp_project_id)
             
             if success:
                 logger.info(f"MVP generation completed successfully for project {mvp_project_id}")
+                # Nothing is left to resume
+                self.checkpoints.pop(mvp_project_id, None)
                 await self._update_mvp_status(mvp_project_id, MVPStatus.TESTING)
             else:
                 logger.error(f"MVP generation failed for project {mvp_project_id}")
@@ -263,39 +345,120 @@ class AssemblyLineOrchestrator:
         blueprint: TechnicalBlueprint,
         priority: str
     ) -> bool:
-        """Execute the complete assembly line sequence"""
-        
-        # Define execution order
-        execution_order = [
-            AgentType.BACKEND,
-            AgentType.FRONTEND,
-            AgentType.INFRASTRUCTURE,
-            AgentType.OBSERVABILITY
-        ]
+        """Execute the assembly line DAG, running independent agents concurrently"""
         
-        # Accumulated output from all agents
-        accumulated_output = {"blueprint": blueprint.model_dump()}
+        execution_order = self._execution_order()
+        checkpoint = self.checkpoints[mvp_project_id]
+        slot_key = checkpoint.tenant_id or mvp_project_id
+        nodes: Dict[AgentType, asyncio.Task] = {}
         
-        for agent_type in execution_order:
-            # If paused, wait until resumed before starting next agent
-            while self._paused_projects.get(mvp_project_id, False):
-                logger.info(f"Assembly line paused for project {mvp_project_id}; waiting to resume...")
-                await asyncio.sleep(0.5)
-
-            success = await self._execute_agent_with_quality_gates(
-                mvp_project_id, agent_type, accumulated_output, priority
-            )
+        async def run_node(agent_type: AgentType) -> bool:
+            # Wait for upstream nodes; a failed dependency leaves this node pending
+            for dependency in self.dependencies.get(agent_type, ()):
+                if dependency in checkpoint.completed:
+                    continue
+                if dependency not in nodes or not await nodes[dependency]:
+                    return False
+            
+            await self._wait_while_paused(mvp_project_id)
             
-            if not success:
+            input_data = {"blueprint": blueprint.model_dump()}
+            for dependency in self.dependencies.get(agent_type, ()):
+                completed = checkpoint.completed.get(dependency, {})
+                input_data[f"{dependency.value}_output"] = completed.get("output", {})
+                input_data[f"{dependency.value}_artifacts"] = completed.get("artifacts", [])
+            
+            timing = self._node_timing(mvp_project_id, agent_type)
+            timing.queued_at = datetime.utcnow()
+            queued = time.perf_counter()
+            async with self._tenant_slot(slot_key):
+                timing.queue_seconds = time.perf_counter() - queued
+                timing.started_at = datetime.utcnow()
+                timing.status = AgentStatus.RUNNING
+                self._mark_running(mvp_project_id, agent_type, True)
+                started = time.perf_counter()
+                try:
+                    success = await self._execute_agent_with_quality_gates(
+                        mvp_project_id, agent_type, input_data, priority
+                    )
+                finally:
+                    timing.duration_seconds = time.perf_counter() - started
+                    timing.completed_at = datetime.utcnow()
+                    self._mark_running(mvp_project_id, agent_type, False)
+            
+            timing.status = AgentStatus.COMPLETED if success else AgentStatus.FAILED
+            if success:
+                checkpoint.completed[agent_type] = {
+                    "output": input_data.get(f"{agent_type.value}_output", {}),
+                    "artifacts": input_data.get(f"{agent_type.value}_artifacts", []),
+                }
+            else:
+                checkpoint.failed.append(agent_type)
                 logger.error(f"Assembly line failed at {agent_type} stage")
-                return False
+            checkpoint.updated_at = datetime.utcnow()
             
             # Update progress
             progress = self.progress_tracking[mvp_project_id]
-            progress.current_stage = agent_type
-            progress.overall_progress = self._calculate_overall_progress(execution_order, agent_type)
+            progress.overall_progress = self._calculate_overall_progress(
+                execution_order, list(checkpoint.completed)
+            )
+            return success
         
-        return True
+        for agent_type in execution_order:
+            if agent_type in checkpoint.completed:
+                continue
+            nodes[agent_type] = asyncio.create_task(run_node(agent_type))
+        
+        outcomes = await asyncio.gather(*nodes.values())
+        return all(outcomes)
+    
+    def _execution_order(self) -> List[AgentType]:
+        """Topological order of the registered dependency DAG"""
+        order: List[AgentType] = []
+        visiting: set = set()
+        
+        def visit(agent_type: AgentType):
+            if agent_type in order:
+                return
+            if agent_type in visiting:
+                raise ValueError(f"Assembly line dependency cycle at {agent_type}")
+            visiting.add(agent_type)
+            for dependency in self.dependencies.get(agent_type, ()):
+                visit(dependency)
+            visiting.discard(agent_type)
+            order.append(agent_type)
+        
+        for agent_type in self.dependencies:
+            visit(agent_type)
+        return order
+    
+    @asynccontextmanager
+    async def _tenant_slot(self, slot_key: UUID):
+        """Bound concurrent agent executions per tenant"""
+        semaphore = self._tenant_slots.get(slot_key)
+        if semaphore is None:
+            semaphore = self._tenant_slots[slot_key] = asyncio.Semaphore(self.max_concurrent_agents_per_tenant)
+        async with semaphore:
+            yield
+    
+    async def _wait_while_paused(self, mvp_project_id: UUID):
+        """If paused, wait until resumed before starting the next agent"""
+        while self._paused_projects.get(mvp_project_id, False):
+            logger.info(f"Assembly line paused for project {mvp_project_id}; waiting to resume...")
+            await asyncio.sleep(0.5)
+    
+    def _node_timing(self, mvp_project_id: UUID, agent_type: AgentType) -> NodeTiming:
+        progress = self.progress_tracking[mvp_project_id]
+        return progress.node_timings.setdefault(agent_type.value, NodeTiming())
+    
+    def _mark_running(self, mvp_project_id: UUID, agent_type: AgentType, running: bool):
+        progress = self.progress_tracking[mvp_project_id]
+        if running:
+            progress.running_stages.append(agent_type)
+            progress.current_stage = agent_type
+            progress.current_stage_started_at = datetime.utcnow()
+        elif agent_type in progress.running_stages:
+            progress.running_stages.remove(agent_type)
     
     async def _execute_agent_with_quality_gates(
         self,
@@ -315,6 +478,8 @@ class AssemblyLineOrchestrator:
         retry_count = 0
         
         while retry_count < max_retries:
+            if mvp_project_id in self.progress_tracking:
+                self._node_timing(mvp_project_id, agent_type).attempts += 1
             try:
                 # Execute agent
                 result = await agent.execute(
@@ -447,10 +612,27 @@ class AssemblyLineOrchestrator:
         return True
 
     async def resume_generation(self, mvp_project_id: UUID) -> bool:
-        """Resume a previously paused generation."""
+        """Resume a previously paused generation, or rerun only the failed nodes of a finished one."""
         if mvp_project_id not in self.progress_tracking:
             return False
         self._paused_projects[mvp_project_id] = False
+        
+        checkpoint = self.checkpoints.get(mvp_project_id)
+        if checkpoint and checkpoint.failed and mvp_project_id not in self._active_runs:
+            logger.info(
+                f"Resuming project {mvp_project_id} from checkpoint; "
+                f"rerunning {[agent.value for agent in checkpoint.failed]}"
+            )
+            await self._update_mvp_status(mvp_project_id, MVPStatus.GENERATING)
+            rerun = asyncio.create_task(self.start_mvp_generation(
+                mvp_project_id,
+                checkpoint.blueprint,
+                checkpoint.priority,
+                tenant_id=checkpoint.tenant_id,
+                resume=True
+            ))
+            self._resumed_runs[mvp_project_id] = rerun
+            rerun.add_done_callback(lambda _: self._resumed_runs.pop(mvp_project_id, None))
         logger.info(f"Resume requested for project {mvp_project_id}")
         return True
     
@@ -472,13 +654,13 @@ class AssemblyLineOrchestrator:
         return datetime.utcnow().replace(microsecond=0).replace(second=0) + \
                timedelta(minutes=estimated_minutes)
     
-    def _calculate_overall_progress(self, execution_order: List[AgentType], current_agent: AgentType) -> float:
+    def _calculate_overall_progress(self, execution_order: List[AgentType], completed: List[AgentType]) -> float:
         """Calculate overall progress percentage"""
-        if current_agent not in execution_order:
+        if not execution_order:
             return 0.0
         
-        current_index = execution_order.index(current_agent)
-        return (current_index / len(execution_order)) * 100
+        done = sum(1 for agent_type in execution_order if agent_type in completed)
+        return (done / len(execution_order)) * 100
     
     async def _update_progress(self, mvp_project_id: UUID, agent_type: AgentType, status: AgentStatus, progress: float):
         """Update progress tracking"""
@@ -10,21 +10,112 @@ import hashlib
 import logging
 import re
 import time
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from ..models.ast_models import (
+    CallSite,
     ComplexityMetrics,
     Dependency,
     FileAnalysis,
+    IdentifierOccurrence,
+    ImportBinding,
     LanguageType,
+    OccurrenceKind,
     Symbol,
     SymbolType,
 )
-from .tree_sitter_parsers import tree_sitter_manager
+from .file_reader import FileContent, file_reader
+from .shared_analysis_store import shared_analysis_store
+from .tree_sitter_parsers import QueryCaptures, SourceEdit, tree_sitter_manager
 
 logger = logging.getLogger(__name__)
 
+# Order in which a full extraction emits symbols of each type
+SYMBOL_EXTRACTION_ORDER = {
+    SymbolType.FUNCTION: 0,
+    SymbolType.METHOD: 0,
+    SymbolType.CLASS: 1,
+}
+
+# Function node types counted by the file complexity metrics
+COMPLEXITY_FUNCTION_TYPES = {
+    "function_definition",
+    "function_declaration",
+    "method_definition",
+}
+
+# Fields, per parent node type, whose identifier child defines a name
+DEFINITION_FIELDS = {
+    "function_definition": ("name",),
+    "class_definition": ("name",),
+    "default_parameter": ("name",),
+    "typed_default_parameter": ("name",),
+    "assignment": ("left",),
+    "augmented_assignment": ("left",),
+    "for_statement": ("left",),
+    "for_in_clause": ("left",),
+    "function_declaration": ("name",),
+    "generator_function_declaration": ("name",),
+    "function_expression": ("name",),
+    "class_declaration": ("name",),
+    "class": ("name",),
+    "method_definition": ("name",),
+    "variable_declarator": ("name",),
+    "assignment_expression": ("left",),
+    "arrow_function": ("parameter",),
+    "required_parameter": ("pattern",),
+    "optional_parameter": ("pattern",),
+    "catch_clause": ("parameter",),
+    "for_in_statement": ("left",),
+    "public_field_definition": ("name",),
+    "field_definition": ("property",),
+    "interface_declaration": ("name",),
+    "type_alias_declaration": ("name",),
+    "enum_declaration": ("name",),
+}
+
+# Parent node types whose identifier children are all definitions
+DEFINITION_PARENT_TYPES = {
+    "parameters",
+    "lambda_parameters",
+    "typed_parameter",
+    "list_splat_pattern",
+    "dictionary_splat_pattern",
+    "pattern_list",
+    "tuple_pattern",
+    "as_pattern_target",
+    "formal_parameters",
+    "array_pattern",
+    "rest_pattern",
+}
+
+# Callee fields of call nodes, and member nodes whose last name is the callee
+CALL_FIELDS = {"call": "function", "call_expression": "function", "new_expression": "constructor"}
+MEMBER_FIELDS = {"attribute": "attribute", "member_expression": "property"}
+
+# Statements whose identifiers are imported names
+IMPORT_STATEMENT_TYPES = {"import_statement", "import_from_statement"}
+
+# Node types naming the called function of a call site
+CALLEE_NAME_TYPES = {"identifier", "property_identifier"}
+
+
+class TreeExtraction(NamedTuple):
+    """Everything extracted from one syntax tree"""
+
+    symbols: List[Symbol]
+    dependencies: List[Dependency]
+    complexity: ComplexityMetrics
+    identifiers: Dict[str, List[IdentifierOccurrence]]
+    imports: List[ImportBinding]
+    calls: List[CallSite]
+
+
+def _binding_order(binding: ImportBinding) -> Tuple[int, str, str]:
+    return (binding.line, binding.local_name, binding.module)
+
 
 from concurrent.futures import ThreadPoolExecutor
 
@@ -53,8 +144,21 @@ class ASTAnalysisService:
             logger.error(f"Failed to initialize AST service: {e}")
             self.initialized = False
 
-    async def parse_file(self, file_path: str) -> FileAnalysis:
-        """Parse a single file and extract comprehensive analysis"""
+    async def parse_file(
+        self,
+        file_path: str,
+        content: Optional[FileContent] = None,
+        reuse_shared: bool = False,
+    ) -> FileAnalysis:
+        """Parse a single file and extract comprehensive analysis
+
+        ``content`` is the file as already read by the indexing pipeline;
+        otherwise the file is read off the event loop. With ``reuse_shared``
+        a file whose content was already analyzed, in any workspace, is not
+        parsed again and new analyses are shared; hot files being edited
+        leave it unset so they keep their incremental parse trees and do not
+        churn the shared store.
+        """
         try:
             # Skip files we shouldn't parse (pragmatic filter)
             if self._should_skip_file(file_path):
@@ -64,19 +168,24 @@ class ASTAnalysisService:
                     parsing_errors=[f"Skipped: {file_path}"],
                 )
 
-            # Check cache first
-            cache_key = self._get_cache_key(file_path)
-            if cache_key in self.file_cache:
-                cached = self.file_cache[cache_key]
-                if time.time() - cached.last_analyzed < self.cache_timeout:
-                    return cached
-
             # Read file content
             path = Path(file_path)
-            if not path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
+            if content is None:
+                try:
+                    content = await file_reader.read(file_path)
+                except FileNotFoundError:
+                    raise FileNotFoundError(f"File not found: {file_path}")
+            source_bytes = content.source
+
+            # Check cache first; an edited file is never served stale
+            cache_key = self._get_cache_key(file_path)
+            previous = self.file_cache.get(cache_key)
+            if previous is not None and (
+                time.time() - previous.last_analyzed < self.cache_timeout
+                and (previous.ast is None or previous.ast.source == source_bytes)
+            ):
+                return previous
 
-            content = path.read_text(encoding="utf-8", errors="ignore")
             language = tree_sitter_manager.detect_language(file_path)
 
             # Initialize analysis result
@@ -90,45 +199,75 @@ class ASTAnalysisService:
                 analysis.parsing_errors.append(f"Unsupported file type: {file_path}")
                 return analysis
 
-            # Parse with tree-sitter
-            tree, parsing_errors = await tree_sitter_manager.async_parse_file(
-                file_path, content
+            # Identical content analyzed in another workspace or checkout
+            content_key = None
+            if reuse_shared:
+                content_key = shared_analysis_store.content_key(
+                    language, content.content_hash
+                )
+                shared = shared_analysis_store.get_analysis(
+                    content_key, analysis.file_path, file_path
+                )
+                if shared is not None:
+                    self.file_cache[cache_key] = shared
+                    return shared
+
+            # Parse with tree-sitter, reusing the previous tree of a hot file
+            (
+                tree,
+                parsing_errors,
+                edit,
+            ) = await tree_sitter_manager.async_parse_file_incremental(
+                file_path, content.text
             )
             analysis.parsing_errors.extend(parsing_errors)
 
             if tree is None:
                 return analysis
 
-            # Convert to our AST model
-            source_bytes = content.encode("utf-8")
-            analysis.ast_root = tree_sitter_manager.tree_to_ast_node(
-                tree.root_node, source_bytes
-            )
+            if (
+                edit is not None
+                and previous is not None
+                and previous.language == language
+                and previous.ast is not None
+                and previous.ast.source == edit.old_source
+            ):
+                # Only re-extract the top-level nodes touched by the edit
+                def extract():
+                    return self._update_extraction_sync(
+                        tree, edit, previous, source_bytes, language, file_path
+                    )
 
-            # Extract symbols
-            analysis.symbols = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda: self._extract_symbols_sync(
-                    tree, source_bytes, language, file_path
-                ),
-            )
+            else:
+                # Extract everything in one query pass
+                def extract():
+                    return self._analyze_tree_sync(
+                        tree, source_bytes, language, file_path
+                    )
 
-            # Extract dependencies
-            analysis.dependencies = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda: self._extract_dependencies_sync(
-                    tree, source_bytes, language, file_path
-                ),
-            )
+            # Flatten into a compact AST over the shared source buffer and
+            # extract, both on the executor
+            def flatten_and_extract():
+                compact_ast = tree_sitter_manager.tree_to_compact_ast(
+                    tree.root_node, source_bytes
+                )
+                return compact_ast, extract()
 
-            # Calculate complexity metrics
-            analysis.complexity = await asyncio.get_event_loop().run_in_executor(
-                self.executor,
-                lambda: self._calculate_complexity_sync(tree, source_bytes, language),
+            analysis.ast, extraction = await asyncio.get_event_loop().run_in_executor(
+                self.executor, flatten_and_extract
             )
-
-            # Cache the result
+            analysis.symbols = extraction.symbols
+            analysis.dependencies = extraction.dependencies
+            analysis.complexity = extraction.complexity
+            analysis.identifiers = extraction.identifiers
+            analysis.imports = extraction.imports
+            analysis.calls = extraction.calls
+
+            # Cache the result, and share bulk-indexed files with identical
+            # files elsewhere
             self.file_cache[cache_key] = analysis
+            if content_key is not None:
+                shared_analysis_store.add_analysis(content_key, analysis)
 
             return analysis
 
@@ -169,22 +308,63 @@ class ASTAnalysisService:
                 
         return False
 
+    def _analyze_tree_sync(
+        self, tree, source_bytes: bytes, language: LanguageType, file_path: str
+    ) -> TreeExtraction:
+        """Extract symbols, dependencies, complexity, identifier occurrences,
+        import bindings and call sites from a single query pass"""
+        captures = tree_sitter_manager.capture_nodes(tree.root_node, language)
+        return TreeExtraction(
+            self._extract_node_symbols(
+                tree.root_node, source_bytes, language, file_path, captures
+            ),
+            self._extract_node_dependencies(
+                tree.root_node, source_bytes, language, file_path, captures
+            ),
+            self._calculate_complexity_sync(tree, source_bytes, language, captures),
+            self._extract_node_identifiers(
+                tree.root_node, source_bytes, language, captures
+            ),
+            sorted(
+                self._extract_node_import_bindings(
+                    tree.root_node, source_bytes, language, captures
+                ),
+                key=_binding_order,
+            ),
+            sorted(
+                self._extract_node_calls(tree.root_node, source_bytes, language, captures)
+            ),
+        )
+
     def _extract_symbols_sync(
         self, tree, source_bytes: bytes, language: LanguageType, file_path: str
     ) -> List[Symbol]:
         """Extract symbols (functions, classes, variables) from the AST"""
+        return self._extract_node_symbols(
+            tree.root_node, source_bytes, language, file_path
+        )
+
+    def _extract_node_symbols(
+        self,
+        root,
+        source_bytes: bytes,
+        language: LanguageType,
+        file_path: str,
+        captures: Optional[QueryCaptures] = None,
+    ) -> List[Symbol]:
+        """Extract symbols from a subtree"""
         symbols = []
 
         try:
+            if captures is None:
+                captures = tree_sitter_manager.capture_nodes(root, language)
             if language == LanguageType.PYTHON:
                 symbols.extend(
-                    self._extract_python_symbols(
-                        tree.root_node, source_bytes, file_path
-                    )
+                    self._extract_python_symbols(captures, source_bytes, file_path)
                 )
             elif language in [LanguageType.JAVASCRIPT, LanguageType.TYPESCRIPT]:
                 symbols.extend(
-                    self._extract_js_symbols(tree.root_node, source_bytes, file_path)
+                    self._extract_js_symbols(captures, source_bytes, file_path)
                 )
 
         except Exception as e:
@@ -193,30 +373,27 @@ class ASTAnalysisService:
         return symbols
 
     def _extract_python_symbols(
-        self, root, source_bytes: bytes, file_path: str
+        self, captures: QueryCaptures, source_bytes: bytes, file_path: str
     ) -> List[Symbol]:
         """Extract Python symbols"""
         symbols = []
 
         # Function definitions
-        function_nodes = tree_sitter_manager.find_nodes_by_type(
-            root, ["function_definition"]
-        )
-        for node in function_nodes:
-            symbol = self._create_python_function_symbol(node, source_bytes, file_path)
+        for node in captures["definition.function"]:
+            symbol = self._create_python_function_symbol(
+                node, source_bytes, file_path, captures
+            )
             if symbol:
                 symbols.append(symbol)
 
         # Class definitions
-        class_nodes = tree_sitter_manager.find_nodes_by_type(root, ["class_definition"])
-        for node in class_nodes:
+        for node in captures["definition.class"]:
             symbol = self._create_python_class_symbol(node, source_bytes, file_path)
             if symbol:
                 symbols.append(symbol)
 
         # Variable assignments (top-level only)
-        assignment_nodes = tree_sitter_manager.find_nodes_by_type(root, ["assignment"])
-        for node in assignment_nodes:
+        for node in captures["definition.variable"]:
             # Only extract top-level assignments
             if self._is_top_level_node(node):
                 symbol = self._create_python_variable_symbol(
@@ -228,7 +405,7 @@ class ASTAnalysisService:
         return symbols
 
     def _create_python_function_symbol(
-        self, node, source_bytes: bytes, file_path: str
+        self, node, source_bytes: bytes, file_path: str, captures: QueryCaptures
     ) -> Optional[Symbol]:
         """Create symbol for Python function"""
         try:
@@ -246,8 +423,7 @@ class ASTAnalysisService:
 
             # Extract parameters
             parameters = []
-            param_nodes = tree_sitter_manager.find_nodes_by_type(node, ["parameter"])
-            for param_node in param_nodes:
+            for param_node in captures.within("parameter", node):
                 param_name = tree_sitter_manager.get_node_text(param_node, source_bytes)
                 if param_name and param_name != "self":
                     parameters.append(param_name)
@@ -259,7 +435,7 @@ class ASTAnalysisService:
             is_async = any(child.type == "async" for child in node.children)
 
             # Calculate complexity
-            complexity = self._calculate_cyclomatic_complexity(node)
+            complexity = self._calculate_cyclomatic_complexity(node, captures)
 
             return Symbol(
                 id=f"{file_path}:{name}:{node.start_point[0]}",
@@ -358,34 +534,27 @@ class ASTAnalysisService:
             return None
 
     def _extract_js_symbols(
-        self, root, source_bytes: bytes, file_path: str
+        self, captures: QueryCaptures, source_bytes: bytes, file_path: str
     ) -> List[Symbol]:
         """Extract JavaScript/TypeScript symbols"""
         symbols = []
 
         # Function declarations
-        function_nodes = tree_sitter_manager.find_nodes_by_type(
-            root, ["function_declaration", "arrow_function", "method_definition"]
-        )
-        for node in function_nodes:
-            symbol = self._create_js_function_symbol(node, source_bytes, file_path)
+        for node in captures["definition.function"]:
+            symbol = self._create_js_function_symbol(
+                node, source_bytes, file_path, captures
+            )
             if symbol:
                 symbols.append(symbol)
 
         # Class declarations
-        class_nodes = tree_sitter_manager.find_nodes_by_type(
-            root, ["class_declaration"]
-        )
-        for node in class_nodes:
+        for node in captures["definition.class"]:
             symbol = self._create_js_class_symbol(node, source_bytes, file_path)
             if symbol:
                 symbols.append(symbol)
 
         # Variable declarations
-        var_nodes = tree_sitter_manager.find_nodes_by_type(
-            root, ["variable_declarator", "lexical_declaration"]
-        )
-        for node in var_nodes:
+        for node in captures["definition.variable"]:
             if self._is_top_level_node(node):
                 symbol = self._create_js_variable_symbol(node, source_bytes, file_path)
                 if symbol:
@@ -394,7 +563,7 @@ class ASTAnalysisService:
         return symbols
 
     def _create_js_function_symbol(
-        self, node, source_bytes: bytes, file_path: str
+        self, node, source_bytes: bytes, file_path: str, captures: QueryCaptures
     ) -> Optional[Symbol]:
         """Create symbol for JavaScript function"""
         try:
@@ -407,12 +576,11 @@ class ASTAnalysisService:
 
             # Extract parameters
             parameters = []
-            param_nodes = tree_sitter_manager.find_nodes_by_type(
-                node, ["formal_parameter", "identifier"]
-            )
-            for param_node in param_nodes:
+            seen_parameters = set()
+            for param_node in captures.within("parameter", node):
                 param_name = tree_sitter_manager.get_node_text(param_node, source_bytes)
-                if param_name and param_name not in parameters:
+                if param_name and param_name not in seen_parameters:
+                    seen_parameters.add(param_name)
                     parameters.append(param_name)
 
             # Check if async
@@ -503,12 +671,25 @@ class ASTAnalysisService:
         self, tree, source_bytes: bytes, language: LanguageType, file_path: str
     ) -> List[Dependency]:
         """Extract file dependencies (imports, requires, etc.)"""
+        return self._extract_node_dependencies(
+            tree.root_node, source_bytes, language, file_path
+        )
+
+    def _extract_node_dependencies(
+        self,
+        root,
+        source_bytes: bytes,
+        language: LanguageType,
+        file_path: str,
+        captures: Optional[QueryCaptures] = None,
+    ) -> List[Dependency]:
+        """Extract dependencies declared within a subtree"""
         dependencies = []
 
         try:
             # Extract imports using tree-sitter manager (synchronous version)
-            imports = tree_sitter_manager.extract_imports(
-                tree, source_bytes, language
+            imports = tree_sitter_manager.extract_node_imports(
+                root, source_bytes, language, captures
             )
 
             for import_info in imports:
@@ -526,8 +707,403 @@ class ASTAnalysisService:
 
         return dependencies
 
+    def _extract_node_identifiers(
+        self,
+        root,
+        source_bytes: bytes,
+        language: LanguageType,
+        captures: Optional[QueryCaptures] = None,
+    ) -> Dict[str, List[IdentifierOccurrence]]:
+        """Index identifier occurrences within a subtree by name"""
+        identifiers: Dict[str, List[IdentifierOccurrence]] = {}
+
+        try:
+            if captures is None:
+                captures = tree_sitter_manager.capture_nodes(root, language)
+
+            imports = [
+                (node.start_byte, node.end_byte)
+                for node in captures["import"]
+                if node.type in IMPORT_STATEMENT_TYPES
+            ]
+            import_starts = [start for start, _ in imports]
+
+            for node in captures["identifier"]:
+                index = bisect_right(import_starts, node.start_byte) - 1
+                if index >= 0 and node.end_byte <= imports[index][1]:
+                    kind = OccurrenceKind.IMPORT
+                else:
+                    kind = self._classify_identifier(node, source_bytes)
+
+                name = tree_sitter_manager.get_node_text(node, source_bytes)
+                identifiers.setdefault(name, []).append(
+                    IdentifierOccurrence(
+                        node.start_point[0] + 1, node.start_point[1], kind
+                    )
+                )
+
+        except Exception as e:
+            logger.error(f"Error extracting identifiers: {e}")
+
+        return identifiers
+
+    def _classify_identifier(self, node, source_bytes: bytes) -> OccurrenceKind:
+        """Tell definitions and calls apart from plain usages by the parent node"""
+        if node.type == "shorthand_property_identifier_pattern":
+            return OccurrenceKind.DEFINITION
+
+        parent = node.parent
+        if parent is None:
+            return OccurrenceKind.USAGE
+
+        if parent.type in DEFINITION_PARENT_TYPES:
+            return OccurrenceKind.DEFINITION
+        for field in DEFINITION_FIELDS.get(parent.type, ()):
+            if parent.child_by_field_name(field) == node:
+                value = parent.child_by_field_name("value")
+                if (
+                    parent.type == "variable_declarator"
+                    and value is not None
+                    and value.type == "call_expression"
+                    and tree_sitter_manager.get_node_text(
+                        value.child_by_field_name("function"), source_bytes
+                    )
+                    == "require"
+                ):
+                    return OccurrenceKind.IMPORT
+                return OccurrenceKind.DEFINITION
+
+        callee = node
+        member_field = MEMBER_FIELDS.get(parent.type)
+        if member_field is not None:
+            if parent.child_by_field_name(member_field) != node:
+                return OccurrenceKind.USAGE
+            callee, parent = parent, parent.parent
+            if parent is None:
+                return OccurrenceKind.USAGE
+        call_field = CALL_FIELDS.get(parent.type)
+        if call_field is not None and parent.child_by_field_name(call_field) == callee:
+            return OccurrenceKind.CALL
+
+        return OccurrenceKind.USAGE
+
+    def _extract_node_calls(
+        self,
+        root,
+        source_bytes: bytes,
+        language: LanguageType,
+        captures: Optional[QueryCaptures] = None,
+    ) -> List[CallSite]:
+        """Extract call sites within a subtree as callee name and receiver"""
+        calls = []
+
+        try:
+            if captures is None:
+                captures = tree_sitter_manager.capture_nodes(root, language)
+
+            for node in captures["call"]:
+                function = node.child_by_field_name("function")
+                if function is None:
+                    continue
+
+                receiver = None
+                name_node = function
+                member_field = MEMBER_FIELDS.get(function.type)
+                if member_field is not None:
+                    name_node = function.child_by_field_name(member_field)
+                    receiver_node = function.child_by_field_name("object")
+                    if receiver_node is not None:
+                        receiver = tree_sitter_manager.get_node_text(
+                            receiver_node, source_bytes
+                        )
+
+                if name_node is None or name_node.type not in CALLEE_NAME_TYPES:
+                    continue
+                calls.append(
+                    CallSite(
+                        name_node.start_point[0] + 1,
+                        name_node.start_point[1],
+                        tree_sitter_manager.get_node_text(name_node, source_bytes),
+                        receiver,
+                    )
+                )
+
+        except Exception as e:
+            logger.error(f"Error extracting calls: {e}")
+
+        return calls
+
+    def _extract_node_import_bindings(
+        self,
+        root,
+        source_bytes: bytes,
+        language: LanguageType,
+        captures: Optional[QueryCaptures] = None,
+    ) -> List[ImportBinding]:
+        """Extract the names bound by imports within a subtree"""
+        bindings = []
+
+        try:
+            if captures is None:
+                captures = tree_sitter_manager.capture_nodes(root, language)
+
+            def text(node) -> str:
+                return tree_sitter_manager.get_node_text(node, source_bytes)
+
+            if language == LanguageType.PYTHON:
+                for node in captures["import"]:
+                    line = node.start_point[0] + 1
+                    module = None
+                    if node.type == "import_from_statement":
+                        module = text(node.child_by_field_name("module_name"))
+                    for name in node.children_by_field_name("name"):
+                        alias = None
+                        if name.type == "aliased_import":
+                            alias = text(name.child_by_field_name("alias"))
+                            name = name.child_by_field_name("name")
+                        if module is None:
+                            # import package.module [as alias]
+                            bindings.append(
+                                ImportBinding(alias or text(name), text(name), None, line)
+                            )
+                        else:
+                            # from module import member [as alias]
+                            bindings.append(
+                                ImportBinding(alias or text(name), module, text(name), line)
+                            )
+
+            elif language in [LanguageType.JAVASCRIPT, LanguageType.TYPESCRIPT]:
+                for node in captures["import"]:
+                    if node.type != "import_statement":
+                        continue
+                    line = node.start_point[0] + 1
+                    source = node.child_by_field_name("source")
+                    if source is None:
+                        continue
+                    module = text(source).strip("'\"`")
+                    for clause in node.named_children:
+                        if clause.type != "import_clause":
+                            continue
+                        for child in clause.named_children:
+                            if child.type == "identifier":
+                                bindings.append(
+                                    ImportBinding(text(child), module, "default", line)
+                                )
+                            elif child.type == "namespace_import":
+                                for name in child.named_children:
+                                    bindings.append(
+                                        ImportBinding(text(name), module, None, line)
+                                    )
+                            elif child.type == "named_imports":
+                                for specifier in child.named_children:
+                                    name = specifier.child_by_field_name("name")
+                                    if name is None:
+                                        continue
+                                    alias = specifier.child_by_field_name("alias")
+                                    bindings.append(
+                                        ImportBinding(
+                                            text(alias if alias is not None else name),
+                                            module,
+                                            text(name),
+                                            line,
+                                        )
+                                    )
+
+                # const name = require("module"), const { a, b } = require("module")
+                for node in captures["definition.variable"]:
+                    if node.type != "variable_declarator":
+                        continue
+                    value = node.child_by_field_name("value")
+                    if (
+                        value is None
+                        or value.type != "call_expression"
+                        or text(value.child_by_field_name("function")) != "require"
+                    ):
+                        continue
+                    arguments = value.child_by_field_name("arguments")
+                    target = node.child_by_field_name("name")
+                    if arguments is None or target is None:
+                        continue
+                    strings = [
+                        child for child in arguments.named_children if child.type == "string"
+                    ]
+                    if not strings:
+                        continue
+                    module = text(strings[0]).strip("'\"`")
+                    line = node.start_point[0] + 1
+                    if target.type == "identifier":
+                        bindings.append(ImportBinding(text(target), module, None, line))
+                    elif target.type == "object_pattern":
+                        for child in target.named_children:
+                            if child.type == "shorthand_property_identifier_pattern":
+                                bindings.append(
+                                    ImportBinding(text(child), module, text(child), line)
+                                )
+
+        except Exception as e:
+            logger.error(f"Error extracting import bindings: {e}")
+
+        return bindings
+
+    def _update_extraction_sync(
+        self,
+        tree,
+        edit: SourceEdit,
+        previous: FileAnalysis,
+        source_bytes: bytes,
+        language: LanguageType,
+        file_path: str,
+    ) -> TreeExtraction:
+        """Patch the previous extraction results for a single edit
+
+        Results outside the dirty rows are kept (shifted by the edit's row
+        delta when they follow it); top-level nodes overlapping the dirty rows
+        are re-extracted. The output matches a full extraction. Complexity is
+        recomputed over the whole tree.
+        """
+        first_row, last_row = self._dirty_rows(tree, edit)
+        old_end_row = edit.old_end_point[0]
+        delta = edit.row_delta
+
+        def row_shift(start_row: int, end_row: int) -> Optional[int]:
+            if end_row < first_row:
+                return 0
+            if start_row >= old_end_row and start_row + delta > last_row:
+                return delta
+            return None  # overlaps the dirty rows
+
+        symbols = []
+        for symbol in previous.symbols:
+            shift = row_shift(symbol.line_start - 1, symbol.line_end - 1)
+            if shift is None:
+                continue
+            if shift:
+                symbol = symbol.model_copy(
+                    update={
+                        "id": f"{file_path}:{symbol.name}:{symbol.line_start - 1 + shift}",
+                        "line_start": symbol.line_start + shift,
+                        "line_end": symbol.line_end + shift,
+                    }
+                )
+            symbols.append(symbol)
+
+        dependencies = []
+        for dependency in previous.dependencies:
+            shift = row_shift(dependency.line_number - 1, dependency.line_number - 1)
+            if shift is None:
+                continue
+            if shift:
+                dependency = dependency.model_copy(
+                    update={"line_number": dependency.line_number + shift}
+                )
+            dependencies.append(dependency)
+
+        identifiers: Dict[str, List[IdentifierOccurrence]] = {}
+        for name, occurrences in previous.identifiers.items():
+            kept = []
+            for occurrence in occurrences:
+                shift = row_shift(occurrence.line - 1, occurrence.line - 1)
+                if shift is None:
+                    continue
+                if shift:
+                    occurrence = occurrence._replace(line=occurrence.line + shift)
+                kept.append(occurrence)
+            if kept:
+                identifiers[name] = kept
+
+        imports = []
+        for binding in previous.imports:
+            shift = row_shift(binding.line - 1, binding.line - 1)
+            if shift is not None:
+                imports.append(binding._replace(line=binding.line + shift))
+
+        calls = []
+        for call in previous.calls:
+            shift = row_shift(call.line - 1, call.line - 1)
+            if shift is not None:
+                calls.append(call._replace(line=call.line + shift))
+
+        for node in tree.root_node.children:
+            if node.start_point[0] <= last_row and node.end_point[0] >= first_row:
+                captures = tree_sitter_manager.capture_nodes(node, language)
+                symbols.extend(
+                    self._extract_node_symbols(
+                        node, source_bytes, language, file_path, captures
+                    )
+                )
+                dependencies.extend(
+                    self._extract_node_dependencies(
+                        node, source_bytes, language, file_path, captures
+                    )
+                )
+                for name, occurrences in self._extract_node_identifiers(
+                    node, source_bytes, language, captures
+                ).items():
+                    identifiers.setdefault(name, []).extend(occurrences)
+                imports.extend(
+                    self._extract_node_import_bindings(
+                        node, source_bytes, language, captures
+                    )
+                )
+                calls.extend(
+                    self._extract_node_calls(node, source_bytes, language, captures)
+                )
+
+        # Restore full-extraction order: functions, classes, then variables
+        symbols.sort(
+            key=lambda s: (
+                SYMBOL_EXTRACTION_ORDER.get(s.symbol_type, 2),
+                s.line_start,
+                s.column_start,
+            )
+        )
+        dependencies.sort(key=lambda d: d.line_number)
+        for occurrences in identifiers.values():
+            occurrences.sort()
+        imports.sort(key=_binding_order)
+        calls.sort()
+        return TreeExtraction(
+            symbols,
+            dependencies,
+            self._calculate_complexity_sync(tree, source_bytes, language),
+            identifiers,
+            imports,
+            calls,
+        )
+
+    def _dirty_rows(self, tree, edit: SourceEdit) -> Tuple[int, int]:
+        """Rows touched by an edit, widened to whole top-level nodes of both trees"""
+        first_row = edit.start_point[0]
+        last_row = edit.new_end_point[0]
+        for start_row, end_row in edit.changed_rows:
+            first_row = min(first_row, start_row)
+            last_row = max(last_row, end_row)
+
+        top_level = [(n.start_point[0], n.end_point[0]) for n in tree.root_node.children]
+        if edit.old_tree is not None:
+            top_level.extend(
+                (n.start_point[0], n.end_point[0])
+                for n in edit.old_tree.root_node.children
+            )
+
+        widened = True
+        while widened:
+            widened = False
+            for start_row, end_row in top_level:
+                if start_row <= last_row and end_row >= first_row:
+                    if start_row < first_row or end_row > last_row:
+                        first_row = min(first_row, start_row)
+                        last_row = max(last_row, end_row)
+                        widened = True
+
+        return first_row, last_row
+
     def _calculate_complexity_sync(
-        self, tree, source_bytes: bytes, language: LanguageType
+        self,
+        tree,
+        source_bytes: bytes,
+        language: LanguageType,
+        captures: Optional[QueryCaptures] = None,
     ) -> ComplexityMetrics:
         """Calculate various complexity metrics for the file"""
         try:
@@ -538,13 +1114,14 @@ class ASTAnalysisService:
             metrics.lines_of_code = len([line for line in lines if line.strip()])
 
             # Count functions and classes
-            functions = tree_sitter_manager.find_nodes_by_type(
-                tree.root_node,
-                ["function_definition", "function_declaration", "method_definition"],
-            )
-            classes = tree_sitter_manager.find_nodes_by_type(
-                tree.root_node, ["class_definition", "class_declaration"]
-            )
+            if captures is None:
+                captures = tree_sitter_manager.capture_nodes(tree.root_node, language)
+            functions = [
+                node
+                for node in captures["definition.function"]
+                if node.type in COMPLEXITY_FUNCTION_TYPES
+            ]
+            classes = captures["definition.class"]
 
             metrics.number_of_functions = len(functions)
             metrics.number_of_classes = len(classes)
@@ -552,7 +1129,7 @@ class ASTAnalysisService:
             # Calculate cyclomatic complexity (sum of all functions)
             total_complexity = 0
             for func_node in functions:
-                complexity = self._calculate_cyclomatic_complexity(func_node)
+                complexity = self._calculate_cyclomatic_complexity(func_node, captures)
                 total_complexity += complexity
 
             metrics.cyclomatic_complexity = total_complexity
@@ -577,33 +1154,10 @@ class ASTAnalysisService:
             logger.error(f"Error calculating complexity: {e}")
             return ComplexityMetrics()
 
-    def _calculate_cyclomatic_complexity(self, node) -> int:
+    def _calculate_cyclomatic_complexity(self, node, captures: QueryCaptures) -> int:
         """Calculate cyclomatic complexity for a function node"""
-        complexity = 1  # Base complexity
-
-        # Count decision points
-        decision_nodes = [
-            "if_statement",
-            "while_statement",
-            "for_statement",
-            "try_statement",
-            "except_clause",
-            "case_clause",
-            "conditional_expression",
-            "and",
-            "or",
-        ]
-
-        def count_decisions(n):
-            count = 0
-            if n.type in decision_nodes:
-                count += 1
-            for child in n.children:
-                count += count_decisions(child)
-            return count
-
-        complexity += count_decisions(node)
-        return complexity
+        # Base complexity plus captured decision points within the function
+        return 1 + len(captures.within("decision", node))
 
     def _extract_python_docstring(self, node, source_bytes: bytes) -> Optional[str]:
         """Extract docstring from Python function or class"""
@@ -672,12 +1226,16 @@ class ASTAnalysisService:
     async def clear_cache(self):
         """Clear the file analysis cache"""
         self.file_cache.clear()
+        shared_analysis_store.clear_analyses()
+        tree_sitter_manager.forget_tree()
 
     def get_cache_stats(self) -> Dict[str, int]:
         """Get cache statistics"""
         return {
             "cached_files": len(self.file_cache),
+            "cached_trees": len(tree_sitter_manager.tree_cache),
             "cache_timeout": self.cache_timeout,
+            **tree_sitter_manager.parse_stats,
         }
 
 
@@ -10,7 +10,7 @@ from uuid import UUID
 
 from sqlalchemy import select
 
-from ..core.database import get_database_session
+from ..core.database import get_background_session
 from ..models.orm_models import AuditLogORM
 
 logger = logging.getLogger(__name__)
@@ -31,7 +31,7 @@ class AuditService:
         user_agent: Optional[str] = None,
     ) -> None:
         try:
-            async for session in get_database_session():
+            async for session in get_background_session():
                 entry = AuditLogORM(
                     tenant_id=tenant_id,
                     action=action,
@@ -14,11 +14,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, and_, func
 
 from ..models.billing_models import (
-    Plan, BillingAccount, Subscription, UsageRecord, Invoice, Payment, BillingEvent,
+    Plan, BillingAccount, Subscription, Invoice, Payment, BillingEvent,
     CreateSubscriptionRequest, UpdateSubscriptionRequest, BillingAnalytics,
     BillingStatus, SubscriptionStatus, PaymentStatus, InvoiceStatus, UsageMetricType,
     DEFAULT_PLANS
 )
+from ..models.orm_models import UsageRecordORM
 from ..models.tenant_models import Tenant, TenantStatus
 from ..core.database import get_database_session
 from ..core.exceptions import (
@@ -26,6 +27,7 @@ from ..core.exceptions import (
     PaymentFailedError, SubscriptionExpiredError
 )
 from ..config.settings import settings
+from .usage_metering import UsageAggregator, UsageRollup
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,7 @@ class StripeIntegration:
     def __init__(self, api_key: str = None):
         self.api_key = api_key or settings.stripe_secret_key
         self.webhook_secret = settings.stripe_webhook_secret
+        self._idempotent_responses: Dict[str, Dict] = {}
     
     async def create_customer(self, billing_account: BillingAccount) -> str:
         """Create Stripe customer"""
@@ -90,16 +93,30 @@ class StripeIntegration:
         logger.info(f"Mock Stripe subscription cancelled: {subscription_id}, at_period_end: {at_period_end}")
         return {"id": subscription_id, "status": status, "cancel_at_period_end": at_period_end}
     
-    async def create_usage_record(self, subscription_item_id: str, quantity: int, timestamp: int = None) -> Dict:
+    async def create_usage_record(
+        self,
+        subscription_item_id: str,
+        quantity: int,
+        timestamp: int = None,
+        idempotency_key: str = None
+    ) -> Dict:
         """Create usage record in Stripe"""
+        # Stripe returns the original response when a request is retried with
+        # the same idempotency key; the mock keeps the same contract
+        if idempotency_key and idempotency_key in self._idempotent_responses:
+            return self._idempotent_responses[idempotency_key]
+        
         # Mock implementation
         usage_record = {
             "id": f"mbur_mock_{secrets.token_hex(8)}",
             "quantity": quantity,
             "timestamp": timestamp or int(datetime.utcnow().timestamp()),
-            "subscription_item": subscription_item_id
+            "subscription_item": subscription_item_id,
+            "action": "increment"
         }
         
+        if idempotency_key:
+            self._idempotent_responses[idempotency_key] = usage_record
         logger.info(f"Mock Stripe usage record created: {usage_record['id']}")
         return usage_record
     
@@ -114,9 +131,12 @@ class StripeIntegration:
 class BillingService:
     """Enterprise billing service"""
     
-    def __init__(self, db: AsyncSession = None):
+    def __init__(self, db: AsyncSession = None, usage_journal_dir: str = "./.leanvibe_cache/usage_journal"):
         self.db = db
         self.stripe = StripeIntegration()
+        self.usage_aggregator = UsageAggregator(
+            self._deliver_usage_rollup, journal_dir=usage_journal_dir
+        )
     
     async def _get_db(self) -> AsyncSession:
         """Get database session"""
@@ -340,48 +360,70 @@ class BillingService:
         metric_type: UsageMetricType, 
         quantity: int,
         usage_date: datetime = None
-    ) -> UsageRecord:
-        """Record usage for metered billing"""
+    ) -> str:
+        """Record usage for metered billing
+        
+        Usage is aggregated in memory and journaled locally; rolled-up records
+        are written to the database and reported to Stripe on the aggregator's
+        flush interval. Returns the aggregation key the usage was added to.
+        """
+        if quantity <= 0:
+            raise ValueError("Usage quantity must be positive")
+        return self.usage_aggregator.record(tenant_id, metric_type, quantity, usage_date)
+    
+    async def flush_usage(self) -> int:
+        """Deliver aggregated usage now; returns the number of rollups delivered"""
+        return await self.usage_aggregator.flush()
+    
+    async def _deliver_usage_rollup(self, rollup: UsageRollup):
+        """Persist one rolled-up usage record and report it to Stripe.
+        
+        Retries after a crash reuse the rollup's idempotency key, which is
+        stored as the record's aggregation key and sent to Stripe.
+        """
         db = await self._get_db()
         
         try:
-            subscription = await self.get_subscription(tenant_id)
+            existing = await db.execute(
+                select(UsageRecordORM.id).where(
+                    UsageRecordORM.aggregation_key == rollup.idempotency_key
+                )
+            )
+            if existing.scalar_one_or_none():
+                return
+            
+            subscription = await self.get_subscription(rollup.tenant_id)
             if not subscription:
                 raise ResourceNotFoundError("Active subscription not found")
             
-            usage_date = usage_date or datetime.utcnow()
-            
-            # Determine billing period
-            billing_period_start = subscription.current_period_start
-            billing_period_end = subscription.current_period_end
-            
-            # Create usage record
-            usage_record = UsageRecord(
-                tenant_id=tenant_id,
+            usage_record = UsageRecordORM(
+                tenant_id=rollup.tenant_id,
                 subscription_id=subscription.id,
-                metric_type=metric_type,
-                quantity=quantity,
-                usage_date=usage_date,
-                billing_period_start=billing_period_start,
-                billing_period_end=billing_period_end
+                metric_type=rollup.metric_type.value,
+                quantity=rollup.quantity,
+                usage_date=rollup.period_start,
+                billing_period_start=subscription.current_period_start,
+                billing_period_end=subscription.current_period_end,
+                aggregation_key=rollup.idempotency_key
             )
             
             # Report to Stripe (for metered billing)
             if subscription.stripe_subscription_id:
                 stripe_usage = await self.stripe.create_usage_record(
-                    subscription_item_id=f"si_mock_{metric_type}",
-                    quantity=quantity,
-                    timestamp=int(usage_date.timestamp())
+                    subscription_item_id=f"si_mock_{rollup.metric_type}",
+                    quantity=rollup.quantity,
+                    timestamp=int(rollup.period_start.timestamp()),
+                    idempotency_key=rollup.idempotency_key
                 )
                 usage_record.stripe_usage_record_id = stripe_usage["id"]
             
-            # Save to database
             db.add(usage_record)
             await db.commit()
-            await db.refresh(usage_record)
             
-            logger.info(f"Recorded usage: {metric_type}={quantity} for tenant {tenant_id}")
-            return usage_record
+            logger.info(
+                f"Recorded usage: {rollup.metric_type}={rollup.quantity} "
+                f"for tenant {rollup.tenant_id}"
+            )
             
         except Exception as e:
             await db.rollback()
@@ -433,16 +475,16 @@ class BillingService:
         # Get usage metrics for current period
         usage_result = await db.execute(
             select(
-                UsageRecord.metric_type,
-                func.sum(UsageRecord.quantity).label("total_quantity")
+                UsageRecordORM.metric_type,
+                func.sum(UsageRecordORM.quantity).label("total_quantity")
             )
             .where(
                 and_(
-                    UsageRecord.tenant_id == tenant_id,
-                    UsageRecord.billing_period_start == subscription.current_period_start
+                    UsageRecordORM.tenant_id == tenant_id,
+                    UsageRecordORM.billing_period_start == subscription.current_period_start
                 )
             )
-            .group_by(UsageRecord.metric_type)
+            .group_by(UsageRecordORM.metric_type)
         )
         
         usage_metrics = {row.metric_type: row.total_quantity for row in usage_result}
@@ -6,6 +6,7 @@ ensuring cache coherency when files and their dependencies change.
 """
 
 import logging
+import os
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass
@@ -18,6 +19,7 @@ from ..models.ast_models import (
     ProjectIndex,
 )
 from ..models.monitoring_models import ChangeType, FileChange
+from .file_reader import file_reader
 
 logger = logging.getLogger(__name__)
 
@@ -124,9 +126,13 @@ class CacheInvalidationService:
             self.symbol_to_files.clear()
             self.import_to_files.clear()
 
-            # Build nodes from project files
-            for file_path, analysis in project_index.files.items():
-                await self._create_dependency_node(file_path, analysis)
+            # Build nodes from project files, stat'ing them in one batch
+            file_paths = list(project_index.files)
+            file_stats = await file_reader.stat_files(file_paths)
+            for file_path, file_stat in zip(file_paths, file_stats):
+                await self._create_dependency_node(
+                    file_path, project_index.files[file_path], file_stat
+                )
 
             # Build dependency relationships
             for file_path, analysis in project_index.files.items():
@@ -145,10 +151,18 @@ class CacheInvalidationService:
         except Exception as e:
             logger.error(f"Error building dependency graph: {e}")
 
-    async def _create_dependency_node(self, file_path: str, analysis: FileAnalysis):
+    async def _create_dependency_node(
+        self,
+        file_path: str,
+        analysis: FileAnalysis,
+        file_stat: Optional[os.stat_result] = None,
+    ):
         """Create a dependency node for a file"""
         try:
-            file_stat = Path(file_path).stat()
+            if file_stat is None:
+                [file_stat] = await file_reader.stat_files([file_path])
+            if file_stat is None:
+                raise FileNotFoundError(f"File not found: {file_path}")
 
             # Extract symbols
             symbols = set()
@@ -527,10 +541,13 @@ class CacheInvalidationService:
             removed_count = 0
 
             # Remove nodes for files that no longer exist
-            stale_files = []
-            for file_path in self.dependency_graph:
-                if not Path(file_path).exists():
-                    stale_files.append(file_path)
+            file_paths = list(self.dependency_graph)
+            file_stats = await file_reader.stat_files(file_paths)
+            stale_files = [
+                file_path
+                for file_path, file_stat in zip(file_paths, file_stats)
+                if file_stat is None
+            ]
 
             for file_path in stale_files:
                 await self._remove_node(file_path)
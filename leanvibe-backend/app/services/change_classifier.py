@@ -6,16 +6,20 @@ breaking using pattern analysis, AST comparison, and semantic analysis.
 """
 
 import asyncio
-import difflib
 import hashlib
 import logging
 import re
-from collections import defaultdict
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from tree_sitter import Parser
 
 from ..models.ast_models import (
     LanguageType,
@@ -23,9 +27,49 @@ from ..models.ast_models import (
     SymbolType,
 )
 from ..models.monitoring_models import ChangeType, FileChange
+from .tree_sitter_parsers import tree_sitter_manager
 
 logger = logging.getLogger(__name__)
 
+# Definition node types whose signatures make up a file's public surface
+DEFINITION_NODE_TYPES = {
+    LanguageType.PYTHON: {"function_definition", "class_definition"},
+    LanguageType.JAVASCRIPT: {
+        "function_declaration",
+        "generator_function_declaration",
+        "class_declaration",
+        "method_definition",
+    },
+    LanguageType.TYPESCRIPT: {
+        "function_declaration",
+        "generator_function_declaration",
+        "class_declaration",
+        "abstract_class_declaration",
+        "interface_declaration",
+        "method_definition",
+        "method_signature",
+    },
+}
+
+# Nodes that can hold public definitions; function bodies are never entered
+CONTAINER_NODE_TYPES = {
+    "module",
+    "program",
+    "decorated_definition",
+    "export_statement",
+    "block",
+    "class_body",
+    "interface_body",
+    "object_type",
+}
+
+CLASS_NODE_TYPES = {
+    "class_definition",
+    "class_declaration",
+    "abstract_class_declaration",
+    "interface_declaration",
+}
+
 
 class BreakingChangeType(str, Enum):
     """Types of breaking changes"""
@@ -159,6 +203,119 @@ class ChangeMetrics:
     recall: float = 0.0
 
 
+@dataclass
+class DefinedSymbol:
+    """A definition extracted from parsed content for symbol-level diffing"""
+
+    name: str
+    signature: str
+    is_class: bool = False
+    is_public: bool = True
+    start_line: int = 0  # 0-based line span of the whole definition
+    end_line: int = 0
+
+
+@dataclass
+class ContentDelta:
+    """Line and symbol level difference between two versions of a file"""
+
+    unchanged: bool = False
+    old_line_count: int = 0
+    removed_lines: List[str] = field(default_factory=list)
+    added_line_count: int = 0
+    old_symbols: Optional[Dict[str, DefinedSymbol]] = None
+    new_symbols: Optional[Dict[str, DefinedSymbol]] = None
+
+    @property
+    def changed_line_count(self) -> int:
+        return len(self.removed_lines) + self.added_line_count
+
+    @property
+    def has_symbols(self) -> bool:
+        return self.old_symbols is not None and self.new_symbols is not None
+
+
+def _content_digest(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _touched_symbols(symbols: Dict[str, DefinedSymbol], lines: Set[int]) -> Set[str]:
+    """Names of the definitions whose line span contains any of the lines"""
+    if not lines:
+        return set()
+    ordered = sorted(lines)
+    touched = set()
+    for name, symbol in symbols.items():
+        position = bisect_left(ordered, symbol.start_line)
+        if position < len(ordered) and ordered[position] <= symbol.end_line:
+            touched.add(name)
+    return touched
+
+
+def _myers_diff(
+    old: List[int], new: List[int], max_edits: int
+) -> Optional[Tuple[List[int], List[int]]]:
+    """Shortest edit script between two sequences of line hashes (Myers O(ND)).
+
+    Returns (removed old indices, added new indices), or None when the
+    sequences differ by more than max_edits lines.
+    """
+    n, m = len(old), len(new)
+    max_d = min(n + m, max_edits)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace: List[List[int]] = []
+
+    for d in range(max_d + 1):
+        # Only diagonals -d-1..d+1 are read when backtracking from step d
+        trace.append(v[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and old[x] == new[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack_edits(trace, n, m)
+    return None
+
+
+def _backtrack_edits(
+    trace: List[List[int]], n: int, m: int
+) -> Tuple[List[int], List[int]]:
+    removed: List[int] = []
+    added: List[int] = []
+    x, y = n, m
+
+    for d in range(len(trace) - 1, 0, -1):
+        v = trace[d]
+        k = x - y
+        base = d + 1  # v[base + k] holds diagonal k
+        if k == -d or (k != d and v[base + k - 1] < v[base + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[base + prev_k]
+        prev_y = prev_x - prev_k
+
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+        if x == prev_x:
+            added.append(prev_y)
+        else:
+            removed.append(prev_x)
+        x, y = prev_x, prev_y
+
+    removed.reverse()
+    added.reverse()
+    return removed, added
+
+
 class ChangeClassifier:
     """
     Intelligent Change Classification Service
@@ -185,6 +342,25 @@ class ChangeClassifier:
         self.confidence_threshold = 0.7
         self.breaking_change_threshold = 0.8
         self.max_cache_size = 1000
+        self.max_concurrency = 10
+        self.max_diff_edits = 2000
+        self.max_symbol_cache_size = 256
+
+        # Diffing and parsing run off the event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="change-classifier"
+        )
+        self._symbol_cache: "OrderedDict[str, Dict[str, DefinedSymbol]]" = (
+            OrderedDict()
+        )
+        self._symbol_cache_lock = threading.Lock()
+        self._thread_state = threading.local()
+        self._diff_stats = {
+            "unchanged_skips": 0,
+            "symbol_diffs": 0,
+            "line_fallbacks": 0,
+            "symbol_cache_hits": 0,
+        }
 
         # Initialize patterns and rules
         self._initialize_built_in_patterns()
@@ -195,6 +371,10 @@ class ChangeClassifier:
         try:
             logger.info("Initializing Change Classifier...")
 
+            # Parsers back the symbol-level diff; without them we fall back to lines
+            if not tree_sitter_manager.initialized:
+                await tree_sitter_manager.initialize()
+
             # Load custom patterns and rules if they exist
             await self._load_custom_patterns()
             await self._load_classification_history()
@@ -291,33 +471,43 @@ class ChangeClassifier:
     ) -> List[ChangeClassification]:
         """Classify multiple changes in batch"""
         try:
-            classifications = []
-
-            # Process changes in parallel for better performance
-            semaphore = asyncio.Semaphore(10)  # Limit concurrent classifications
+            results: List[Any] = [None] * len(changes)
+            queue: asyncio.Queue = asyncio.Queue()
+            for index, change in enumerate(changes):
+                queue.put_nowait((index, change))
 
             async def classify_single(change):
-                async with semaphore:
-                    old_content = None
-                    new_content = None
+                old_content = None
+                new_content = None
 
-                    if content_provider:
-                        old_content = await content_provider.get_old_content(
-                            change.file_path
-                        )
-                        new_content = await content_provider.get_new_content(
-                            change.file_path
-                        )
+                if content_provider:
+                    old_content = await content_provider.get_old_content(
+                        change.file_path
+                    )
+                    new_content = await content_provider.get_new_content(
+                        change.file_path
+                    )
 
-                    return await self.classify_change(change, old_content, new_content)
+                return await self.classify_change(change, old_content, new_content)
 
-            # Create tasks for all changes
-            tasks = [classify_single(change) for change in changes]
-            classifications = await asyncio.gather(*tasks, return_exceptions=True)
+            # Fixed pool of workers pulling from the queue bounds concurrency
+            async def worker():
+                while True:
+                    try:
+                        index, change = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        results[index] = await classify_single(change)
+                    except Exception as e:
+                        results[index] = e
 
-            # Filter out exceptions and log errors
+            worker_count = min(self.max_concurrency, len(changes))
+            await asyncio.gather(*[worker() for _ in range(worker_count)])
+
+            # Replace failures with error classifications and log errors
             valid_classifications = []
-            for i, result in enumerate(classifications):
+            for i, result in enumerate(results):
                 if isinstance(result, Exception):
                     logger.error(
                         f"Error classifying change {changes[i].file_path}: {result}"
@@ -761,7 +951,7 @@ class ChangeClassifier:
         if old_content and new_content:
             # Analyze content changes
             await self._analyze_content_changes(
-                classification, old_content, new_content
+                classification, old_content, new_content, file_change.file_path
             )
 
         # Check file type specific patterns
@@ -783,52 +973,39 @@ class ChangeClassifier:
             )
 
     async def _analyze_content_changes(
-        self, classification: ChangeClassification, old_content: str, new_content: str
+        self,
+        classification: ChangeClassification,
+        old_content: str,
+        new_content: str,
+        file_path: str = "",
     ):
         """Analyze changes in file content"""
         try:
-            # Calculate diff
-            diff_lines = list(
-                difflib.unified_diff(
-                    old_content.splitlines(keepends=True),
-                    new_content.splitlines(keepends=True),
-                    lineterm="",
-                )
+            loop = asyncio.get_event_loop()
+            delta = await loop.run_in_executor(
+                self.executor,
+                self._compute_content_delta,
+                file_path,
+                old_content,
+                new_content,
             )
 
-            removed_lines = [
-                line[1:]
-                for line in diff_lines
-                if line.startswith("-") and not line.startswith("---")
-            ]
-            added_lines = [
-                line[1:]
-                for line in diff_lines
-                if line.startswith("+") and not line.startswith("+++")
-            ]
+            if delta.unchanged:
+                self._diff_stats["unchanged_skips"] += 1
+                return
 
-            # Analyze removed content for breaking changes
-            for line in removed_lines:
-                if self._is_public_api_line(line):
-                    classification.risk_level = ChangeRisk.HIGH_RISK
-                    classification.breaking_changes.append(
-                        BreakingChangeType.API_CONTRACT_CHANGE
-                    )
-                    classification.reasons.append("Public API removal detected")
-
-                if self._is_function_signature_line(line):
-                    classification.risk_level = ChangeRisk.HIGH_RISK
-                    classification.breaking_changes.append(
-                        BreakingChangeType.SIGNATURE_CHANGE
-                    )
-                    classification.reasons.append("Function signature removal")
+            if delta.has_symbols:
+                self._diff_stats["symbol_diffs"] += 1
+                self._classify_symbol_changes(
+                    classification, delta.old_symbols, delta.new_symbols
+                )
+            else:
+                self._diff_stats["line_fallbacks"] += 1
+                self._classify_removed_lines(classification, delta.removed_lines)
 
             # Calculate change magnitude
-            total_lines = len(old_content.splitlines())
-            changed_lines = len(removed_lines) + len(added_lines)
-
-            if total_lines > 0:
-                change_ratio = changed_lines / total_lines
+            if delta.old_line_count > 0:
+                change_ratio = delta.changed_line_count / delta.old_line_count
                 if change_ratio > 0.5:
                     classification.reasons.append("Large-scale changes detected")
                     if classification.risk_level == ChangeRisk.MEDIUM_RISK:
@@ -837,6 +1014,221 @@ class ChangeClassifier:
         except Exception as e:
             logger.error(f"Error analyzing content changes: {e}")
 
+    def _compute_content_delta(
+        self, file_path: str, old_content: str, new_content: str
+    ) -> ContentDelta:
+        """Diff two versions of a file (runs in the worker pool)"""
+        old_digest = _content_digest(old_content)
+        new_digest = _content_digest(new_content)
+        if len(old_content) == len(new_content) and old_digest == new_digest:
+            return ContentDelta(unchanged=True)
+
+        old_lines = old_content.splitlines()
+        new_lines = new_content.splitlines()
+        delta = ContentDelta(old_line_count=len(old_lines))
+
+        # Hash each distinct line to a small integer so comparisons are cheap
+        line_ids: Dict[str, int] = {}
+        old_ids = [line_ids.setdefault(line, len(line_ids)) for line in old_lines]
+        new_ids = [line_ids.setdefault(line, len(line_ids)) for line in new_lines]
+
+        # Common prefix and suffix never take part in the edit script
+        start = 0
+        limit = min(len(old_ids), len(new_ids))
+        while start < limit and old_ids[start] == new_ids[start]:
+            start += 1
+        end_old, end_new = len(old_ids), len(new_ids)
+        while (
+            end_old > start
+            and end_new > start
+            and old_ids[end_old - 1] == new_ids[end_new - 1]
+        ):
+            end_old -= 1
+            end_new -= 1
+
+        edits = _myers_diff(
+            old_ids[start:end_old], new_ids[start:end_new], self.max_diff_edits
+        )
+        if edits is None:
+            # Too different for a line-level alignment to matter: treat as rewritten
+            removed = range(end_old - start)
+            added = range(end_new - start)
+        else:
+            removed, added = edits
+
+        delta.removed_lines = [old_lines[start + i] for i in removed]
+        delta.added_line_count = len(added)
+
+        language = tree_sitter_manager.detect_language(file_path) if file_path else None
+        if language in DEFINITION_NODE_TYPES:
+            old_symbols = self._get_symbols(file_path, language, old_content, old_digest)
+            new_symbols = (
+                self._get_symbols(file_path, language, new_content, new_digest)
+                if old_symbols is not None
+                else None
+            )
+            if new_symbols is not None:
+                # Only definitions overlapping a hunk can have changed; an
+                # added line inside a multi-line signature touches only the
+                # new version, so both sides are checked
+                touched = _touched_symbols(
+                    old_symbols, {start + i for i in removed}
+                ) | _touched_symbols(new_symbols, {start + i for i in added})
+                delta.old_symbols = {
+                    name: symbol for name, symbol in old_symbols.items() if name in touched
+                }
+                delta.new_symbols = {
+                    name: symbol for name, symbol in new_symbols.items() if name in touched
+                }
+
+        return delta
+
+    def _get_symbols(
+        self, file_path: str, language: LanguageType, content: str, digest: str
+    ) -> Optional[Dict[str, DefinedSymbol]]:
+        """Symbol table for content, cached by content hash"""
+        cache_key = f"{language}:{digest}"
+        with self._symbol_cache_lock:
+            symbols = self._symbol_cache.get(cache_key)
+            if symbols is not None:
+                self._symbol_cache.move_to_end(cache_key)
+                self._diff_stats["symbol_cache_hits"] += 1
+                return symbols
+
+        symbols = self._extract_symbols(file_path, language, content)
+        if symbols is None:
+            return None
+
+        with self._symbol_cache_lock:
+            self._symbol_cache[cache_key] = symbols
+            while len(self._symbol_cache) > self.max_symbol_cache_size:
+                self._symbol_cache.popitem(last=False)
+        return symbols
+
+    def _get_parser(self, file_path: str, language: LanguageType) -> Optional[Parser]:
+        """Per-thread parser, since tree-sitter parsers are not thread-safe"""
+        key = "tsx" if file_path.lower().endswith(".tsx") else language
+        grammar = tree_sitter_manager.languages.get(key)
+        if grammar is None:
+            return None
+
+        parsers = getattr(self._thread_state, "parsers", None)
+        if parsers is None:
+            parsers = self._thread_state.parsers = {}
+        if key not in parsers:
+            parsers[key] = Parser(grammar)
+        return parsers[key]
+
+    def _extract_symbols(
+        self, file_path: str, language: LanguageType, content: str
+    ) -> Optional[Dict[str, DefinedSymbol]]:
+        """Extract definitions and their signatures, or None if content can't be parsed"""
+        parser = self._get_parser(file_path, language)
+        if parser is None:
+            return None
+
+        source = content.encode("utf-8")
+        tree = parser.parse(source)
+        if tree.root_node.has_error:
+            return None
+
+        definition_types = DEFINITION_NODE_TYPES[language]
+        symbols: Dict[str, DefinedSymbol] = {}
+
+        def visit(node, scope: str):
+            for child in node.children:
+                if child.type in definition_types:
+                    name_node = child.child_by_field_name("name")
+                    if name_node is None:
+                        continue
+
+                    name = source[name_node.start_byte : name_node.end_byte].decode(
+                        "utf-8", errors="ignore"
+                    )
+                    qualified = f"{scope}.{name}" if scope else name
+                    body = child.child_by_field_name("body")
+                    header_end = body.start_byte if body is not None else child.end_byte
+                    signature = " ".join(
+                        source[child.start_byte : header_end]
+                        .decode("utf-8", errors="ignore")
+                        .split()
+                    )
+                    symbols[qualified] = DefinedSymbol(
+                        name=qualified,
+                        signature=signature,
+                        is_class=child.type in CLASS_NODE_TYPES,
+                        is_public=self._is_public_name(name, language),
+                        start_line=child.start_point[0],
+                        end_line=child.end_point[0],
+                    )
+                    if child.type in CLASS_NODE_TYPES and body is not None:
+                        visit(body, qualified)
+                elif child.type in CONTAINER_NODE_TYPES:
+                    visit(child, scope)
+
+        visit(tree.root_node, "")
+        return symbols
+
+    def _is_public_name(self, name: str, language: LanguageType) -> bool:
+        """Check if a symbol name is part of the public surface"""
+        if language == LanguageType.PYTHON:
+            return not name.startswith("_") or (
+                name.startswith("__") and name.endswith("__")
+            )
+        return not name.startswith("#")
+
+    def _classify_symbol_changes(
+        self,
+        classification: ChangeClassification,
+        old_symbols: Dict[str, DefinedSymbol],
+        new_symbols: Dict[str, DefinedSymbol],
+    ):
+        """Classify a modification from the difference between symbol tables"""
+        for name, old_symbol in old_symbols.items():
+            if not old_symbol.is_public:
+                continue
+
+            new_symbol = new_symbols.get(name)
+            if new_symbol is None:
+                classification.risk_level = ChangeRisk.HIGH_RISK
+                classification.breaking_changes.append(
+                    BreakingChangeType.API_CONTRACT_CHANGE
+                )
+                classification.reasons.append(f"Public API removal detected: {name}")
+                classification.affected_symbols.append(name)
+            elif new_symbol.signature != old_symbol.signature:
+                classification.risk_level = ChangeRisk.HIGH_RISK
+                if old_symbol.is_class:
+                    classification.breaking_changes.append(
+                        BreakingChangeType.INHERITANCE_CHANGE
+                    )
+                    classification.reasons.append(f"Class definition changed: {name}")
+                else:
+                    classification.breaking_changes.append(
+                        BreakingChangeType.SIGNATURE_CHANGE
+                    )
+                    classification.reasons.append(f"Function signature changed: {name}")
+                classification.affected_symbols.append(name)
+
+    def _classify_removed_lines(
+        self, classification: ChangeClassification, removed_lines: List[str]
+    ):
+        """Line-based fallback for content that could not be parsed"""
+        for line in removed_lines:
+            if self._is_public_api_line(line):
+                classification.risk_level = ChangeRisk.HIGH_RISK
+                classification.breaking_changes.append(
+                    BreakingChangeType.API_CONTRACT_CHANGE
+                )
+                classification.reasons.append("Public API removal detected")
+
+            if self._is_function_signature_line(line):
+                classification.risk_level = ChangeRisk.HIGH_RISK
+                classification.breaking_changes.append(
+                    BreakingChangeType.SIGNATURE_CHANGE
+                )
+                classification.reasons.append("Function signature removal")
+
     async def _apply_pattern_analysis(
         self, classification: ChangeClassification, file_change: FileChange
     ):
@@ -1041,6 +1433,10 @@ class ChangeClassifier:
             "rules_loaded": len(self.rules),
             "cache_size": len(self.classification_cache),
             "confidence_threshold": self.confidence_threshold,
+            "diff_engine": {
+                **self._diff_stats,
+                "symbol_cache_size": len(self._symbol_cache),
+            },
         }
 
 
@@ -0,0 +1,536 @@
+"""
+Change Detection Service
+
+Stat-first detection of added, modified and removed code files. The workspace
+is walked with os.scandir in parallel, pruning excluded and .gitignore'd
+directories, and each file's (size, mtime_ns, inode) signature is compared
+against the previous index. Contents are hashed only when a signature no longer
+matches, and tracked files that git already knows to be clean reuse the blob id
+recorded in the git index instead of being read at all.
+"""
+
+import fnmatch
+import hashlib
+import logging
+import os
+import re
+import struct
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Pattern, Tuple
+
+# Prefer a non-cryptographic hash when one is installed
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+# Directories that are never part of the working tree
+ALWAYS_PRUNED = {".git"}
+
+# Fixed-size part of a git index entry: ctime, mtime, dev, ino, mode, uid, gid, size
+GIT_INDEX_ENTRY = struct.Struct(">10I")
+
+# Offset of the path name within a git index entry
+GIT_INDEX_NAME_OFFSET = 62
+
+
+class FileSignature(NamedTuple):
+    """Cheap identity of a file's state taken from a single stat call"""
+
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, stat_result: os.stat_result) -> "FileSignature":
+        return cls(stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+
+
+class FileFingerprint(NamedTuple):
+    """Stat signature together with the content hash it was taken with"""
+
+    signature: FileSignature
+    content_hash: str
+
+
+class GitIndexEntry(NamedTuple):
+    """Stat data and blob id git recorded for a tracked file"""
+
+    signature: FileSignature
+    blob_id: str
+    racy: bool = False  # Modified in the same instant the index was written
+
+    def matches(self, signature: FileSignature) -> bool:
+        """Whether a current stat signature agrees with the one git recorded.
+
+        The index stores 32-bit sizes and inodes, and builds without
+        nanosecond support record whole seconds only.
+        """
+        if self.signature.size != signature.size & 0xFFFFFFFF:
+            return False
+        if self.signature.inode and self.signature.inode != signature.inode & 0xFFFFFFFF:
+            return False
+        if self.signature.mtime_ns % 1_000_000_000 == 0:
+            return self.signature.mtime_ns // 1_000_000_000 == signature.mtime_ns // 1_000_000_000
+        return self.signature.mtime_ns == signature.mtime_ns
+
+
+class IgnoreRule(NamedTuple):
+    """A single .gitignore pattern, relative to the directory that declared it"""
+
+    base: str
+    pattern: str
+    negated: bool
+    directory_only: bool
+    anchored: bool
+
+
+@dataclass
+class ChangeSet:
+    """Result of comparing the workspace against a previous index"""
+
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    files_hashed: int = 0
+    fingerprints: Dict[str, FileFingerprint] = field(default_factory=dict)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+def hash_content(content: bytes) -> str:
+    """Hash file content with the fastest available algorithm"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(content)
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Hash the content of a file, returning "error" if it cannot be read"""
+    try:
+        with open(file_path, "rb") as f:
+            return hash_content(f.read())
+    except OSError as e:
+        logger.warning(f"Error calculating hash for {file_path}: {e}")
+        return "error"
+
+
+def hash_git_blob(file_path: str) -> str:
+    """Blob id git would record for a file, returning "error" if it cannot be read"""
+    try:
+        with open(file_path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        logger.warning(f"Error calculating blob id for {file_path}: {e}")
+        return "error"
+    digest = hashlib.sha1(b"blob %d\0" % len(content))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def parse_gitignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """Parse .gitignore content declared in the directory ``base``.
+
+    Covers the common subset of gitignore syntax: comments, negation,
+    directory-only and anchored patterns, and leading ``**/``.
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        while line.startswith("**/"):
+            line = line[3:]
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        if line:
+            rules.append(IgnoreRule(base, line, negated, directory_only, anchored))
+    return rules
+
+
+def is_ignored(rules: Iterable[IgnoreRule], relative_path: str, is_dir: bool) -> bool:
+    """Apply .gitignore rules to a workspace-relative path; the last match wins"""
+    ignored = False
+    name = relative_path.rsplit("/", 1)[-1]
+    for rule in rules:
+        if rule.directory_only and not is_dir:
+            continue
+        if rule.anchored:
+            target = relative_path[len(rule.base) + 1 :] if rule.base else relative_path
+        else:
+            target = name
+        if fnmatch.fnmatchcase(target, rule.pattern):
+            ignored = not rule.negated
+    return ignored
+
+
+def read_git_index(index_path: str) -> Dict[str, GitIndexEntry]:
+    """Read the stat data and blob ids of stage-0 entries in a git index.
+
+    Supports index versions 2, 3 and 4 and returns entries keyed by the
+    path relative to the repository root.
+    """
+    with open(index_path, "rb") as f:
+        data = f.read()
+
+    if data[:4] != b"DIRC":
+        raise ValueError(f"Not a git index: {index_path}")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in (2, 3, 4):
+        raise ValueError(f"Unsupported git index version {version}")
+
+    entries = {}
+    offset = 12
+    previous_name = b""
+    for _ in range(count):
+        fields = GIT_INDEX_ENTRY.unpack_from(data, offset)
+        mtime_s, mtime_nsec, inode, size = fields[2], fields[3], fields[5], fields[9]
+        blob_id = data[offset + 40 : offset + 60].hex()
+        (flags,) = struct.unpack_from(">H", data, offset + 60)
+
+        name_start = offset + GIT_INDEX_NAME_OFFSET
+        if version >= 3 and flags & 0x4000:
+            name_start += 2
+
+        if version == 4:
+            # Names are prefix-compressed against the previous entry
+            strip, name_start = _read_git_varint(data, name_start)
+            name_end = data.index(b"\0", name_start)
+            name = previous_name[: len(previous_name) - strip] + data[name_start:name_end]
+            offset = name_end + 1
+        else:
+            name_end = data.index(b"\0", name_start)
+            name = data[name_start:name_end]
+            offset += (name_start - offset + len(name) + 8) & ~7
+        previous_name = name
+
+        # Skip unmerged entries
+        if flags & 0x3000:
+            continue
+
+        signature = FileSignature(size, mtime_s * 1_000_000_000 + mtime_nsec, inode)
+        entries[name.decode("utf-8", "surrogateescape")] = GitIndexEntry(signature, blob_id)
+
+    return entries
+
+
+def _read_git_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode git's offset varint, returning the value and the next offset"""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def _find_git_dir(path: str) -> Tuple[Optional[str], Optional[str]]:
+    """Locate the repository root and git directory containing ``path``"""
+    current = path
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules point at their git directory
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    content = f.read().strip()
+            except OSError:
+                return None, None
+            if content.startswith("gitdir:"):
+                git_dir = content[len("gitdir:") :].strip()
+                return current, os.path.normpath(os.path.join(current, git_dir))
+            return None, None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None, None
+        current = parent
+
+
+def _compile_patterns(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Combine fnmatch patterns into one regular expression"""
+    translated = [fnmatch.translate(pattern) for pattern in patterns]
+    if not translated:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in translated))
+
+
+class ChangeDetector:
+    """Detects workspace changes from stat signatures before touching contents"""
+
+    def __init__(self, max_workers: int = 8, use_git_index: bool = True):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.use_git_index = use_git_index
+        self.respect_gitignore = True
+
+        # Parsed git indexes keyed by path, with the signature they were read at
+        self._git_indexes: Dict[str, Tuple[FileSignature, Dict[str, GitIndexEntry]]] = {}
+
+    def scan(
+        self,
+        workspace_path: str,
+        extensions: Iterable[str],
+        exclude_patterns: Optional[Iterable[str]] = None,
+    ) -> Dict[str, FileSignature]:
+        """Walk the workspace and stat every code file.
+
+        Directories are scanned concurrently and pruned as soon as they match
+        an exclude pattern or a .gitignore rule. Must not be called from this
+        detector's own executor.
+        """
+        root = os.path.abspath(workspace_path)
+        if not os.path.isdir(root):
+            logger.error(f"Workspace path does not exist: {workspace_path}")
+            return {}
+
+        extensions = {extension.lower() for extension in extensions}
+        excludes = _compile_patterns(exclude_patterns or [])
+
+        files: Dict[str, FileSignature] = {}
+        pending = {
+            self.executor.submit(self._scan_directory, root, "", (), extensions, excludes)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory_files, subdirectories = future.result()
+                files.update(directory_files)
+                for path, relative_path, rules in subdirectories:
+                    pending.add(
+                        self.executor.submit(
+                            self._scan_directory,
+                            path,
+                            relative_path,
+                            rules,
+                            extensions,
+                            excludes,
+                        )
+                    )
+        return files
+
+    def _scan_directory(
+        self,
+        path: str,
+        relative_path: str,
+        rules: Tuple[IgnoreRule, ...],
+        extensions: set,
+        excludes: Optional[Pattern],
+    ) -> Tuple[Dict[str, FileSignature], List[Tuple[str, str, Tuple[IgnoreRule, ...]]]]:
+        """Scan a single directory, returning its files and subdirectories to visit"""
+        try:
+            with os.scandir(path) as iterator:
+                entries = list(iterator)
+        except OSError as e:
+            logger.debug(f"Cannot scan {path}: {e}")
+            return {}, []
+
+        if self.respect_gitignore and any(e.name == ".gitignore" for e in entries):
+            try:
+                with open(os.path.join(path, ".gitignore"), "r", encoding="utf-8") as f:
+                    rules = rules + tuple(parse_gitignore(f.read(), relative_path))
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(f"Cannot read .gitignore in {path}: {e}")
+
+        files = {}
+        subdirectories = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir:
+                    if name in ALWAYS_PRUNED:
+                        continue
+                elif os.path.splitext(name)[1].lower() not in extensions:
+                    continue
+
+                entry_path = f"{relative_path}/{name}" if relative_path else name
+                if excludes is not None and (
+                    excludes.match(name) or excludes.match(entry_path)
+                ):
+                    continue
+                if rules and is_ignored(rules, entry_path, is_dir):
+                    continue
+
+                if is_dir:
+                    subdirectories.append((entry.path, entry_path, rules))
+                elif entry.is_file():
+                    files[entry.path] = FileSignature.from_stat(entry.stat())
+            except OSError:
+                continue
+
+        return files, subdirectories
+
+    def git_index(self, workspace_path: str) -> Dict[str, GitIndexEntry]:
+        """Tracked files of the enclosing git repository.
+
+        Entries are keyed by absolute path. Racily clean entries, modified
+        in the same instant the index was written, are marked so their blob
+        ids are never trusted.
+        """
+        if not self.use_git_index:
+            return {}
+
+        repo_root, git_dir = _find_git_dir(os.path.abspath(workspace_path))
+        if git_dir is None:
+            return {}
+
+        index_path = os.path.join(git_dir, "index")
+        try:
+            index_signature = FileSignature.from_stat(os.stat(index_path))
+        except OSError:
+            return {}
+
+        cached = self._git_indexes.get(index_path)
+        if cached and cached[0] == index_signature:
+            return cached[1]
+
+        try:
+            raw_entries = read_git_index(index_path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Could not read git index {index_path}: {e}")
+            return {}
+
+        entries = {
+            os.path.join(repo_root, name): entry._replace(
+                racy=entry.signature.mtime_ns >= index_signature.mtime_ns
+            )
+            for name, entry in raw_entries.items()
+        }
+        self._git_indexes[index_path] = (index_signature, entries)
+        return entries
+
+    def fingerprint(
+        self,
+        file_path: str,
+        tracked: Optional[Mapping[str, GitIndexEntry]] = None,
+    ) -> Optional[FileFingerprint]:
+        """Stat and hash a single file, or None if it no longer exists"""
+        try:
+            signature = FileSignature.from_stat(os.stat(file_path))
+        except OSError:
+            return None
+        return FileFingerprint(signature, self._content_hash(file_path, signature, tracked))
+
+    def fingerprint_files(
+        self, workspace_path: str, file_paths: Iterable[str]
+    ) -> Dict[str, FileFingerprint]:
+        """Fingerprint several files concurrently, skipping any that vanished"""
+        tracked = self.git_index(workspace_path)
+        file_paths = list(file_paths)
+        results = self.executor.map(lambda p: self.fingerprint(p, tracked), file_paths)
+        return {
+            path: fingerprint
+            for path, fingerprint in zip(file_paths, results)
+            if fingerprint is not None
+        }
+
+    def detect(
+        self,
+        workspace_path: str,
+        previous: Mapping[str, FileFingerprint],
+        extensions: Iterable[str],
+        exclude_patterns: Optional[Iterable[str]] = None,
+    ) -> ChangeSet:
+        """Compare the workspace against the fingerprints of a previous index"""
+        current = self.scan(workspace_path, extensions, exclude_patterns)
+        changes = ChangeSet()
+
+        to_hash = []
+        for file_path, signature in current.items():
+            old = previous.get(file_path)
+            if old is None:
+                changes.added.append(file_path)
+                to_hash.append(file_path)
+            elif old.signature == signature:
+                changes.unchanged += 1
+                changes.fingerprints[file_path] = old
+            else:
+                to_hash.append(file_path)
+
+        if to_hash:
+            tracked = self.git_index(workspace_path)
+            hashes = self.executor.map(
+                lambda p: self._content_hash(p, current[p], tracked), to_hash
+            )
+            for file_path, content_hash in zip(to_hash, hashes):
+                changes.fingerprints[file_path] = FileFingerprint(
+                    current[file_path], content_hash
+                )
+                old = previous.get(file_path)
+                if old is None:
+                    continue
+                if old.content_hash == content_hash:
+                    # Touched but not edited
+                    changes.unchanged += 1
+                else:
+                    changes.modified.append(file_path)
+
+        changes.removed = [path for path in previous if path not in current]
+        changes.files_hashed = sum(
+            1
+            for path in to_hash
+            if self._index_entry(path, current[path], tracked) is None
+        )
+
+        changes.added.sort()
+        changes.modified.sort()
+        changes.removed.sort()
+        return changes
+
+    def _content_hash(
+        self,
+        file_path: str,
+        signature: FileSignature,
+        tracked: Optional[Mapping[str, GitIndexEntry]],
+    ) -> str:
+        """Content hash of a file, taken from the git index when it is clean
+
+        Tracked files that have to be read are hashed the way git hashes
+        blobs, so a clean file that was only touched compares equal to its
+        index entry. Untracked files are hashed with xxhash.
+        """
+        entry = self._index_entry(file_path, signature, tracked)
+        if entry is not None:
+            return f"git:{entry.blob_id}"
+        if tracked and file_path in tracked:
+            blob_id = hash_git_blob(file_path)
+            return blob_id if blob_id == "error" else f"git:{blob_id}"
+        return hash_file(file_path)
+
+    @staticmethod
+    def _index_entry(
+        file_path: str,
+        signature: FileSignature,
+        tracked: Optional[Mapping[str, GitIndexEntry]],
+    ) -> Optional[GitIndexEntry]:
+        """Git index entry of a file whose stat data shows it is clean"""
+        entry = tracked.get(file_path) if tracked else None
+        if entry is not None and not entry.racy and entry.matches(signature):
+            return entry
+        return None
+
+
+# Global change detector instance
+change_detector = ChangeDetector()
@@ -16,13 +16,96 @@ This service enhances the natural language processing capabilities for:
 import re
 import difflib
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Set, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import time
 
 logger = logging.getLogger(__name__)
 
+# Words dropped during normalization and speech-to-text phrase substitutions
+FILLER_WORDS = frozenset({
+    'please', 'could', 'you', 'can', 'would', 'like', 'to',
+    'the', 'a', 'an', 'and', 'or', 'but', 'so'
+})
+
+PHRASE_SUBSTITUTIONS = (
+    ('show me', 'show'),
+    ('give me', 'show'),
+    ('tell me', 'show'),
+    ('let me see', 'show'),
+    ('what is', 'show'),
+    ('what are', 'list'),
+    ('how many', 'count'),
+    ('go to', 'navigate'),
+    ('move to', 'navigate'),
+    ('switch to', 'change'),
+    ('open up', 'open'),
+    ('look at', 'analyze'),
+    ('check out', 'analyze'),
+)
+
+# Common command phrases offered as suggestions, in display priority order
+COMMON_COMMANDS = {
+    'system': [
+        "show system status",
+        "check health",
+        "what's the system status",
+        "is everything running"
+    ],
+    'files': [
+        "list files",
+        "show current directory",
+        "open file",
+        "create new file",
+        "read file"
+    ],
+    'navigation': [
+        "go to directory",
+        "navigate to project",
+        "change directory",
+        "show current location"
+    ],
+    'code': [
+        "analyze code",
+        "review this file",
+        "explain function",
+        "find issues",
+        "check code quality"
+    ],
+    'tasks': [
+        "create task",
+        "list tasks",
+        "mark task complete",
+        "add new task",
+        "show my tasks"
+    ],
+    'voice': [
+        "activate voice control",
+        "change volume",
+        "mute voice",
+        "voice commands available"
+    ],
+    'help': [
+        "help me",
+        "what can you do",
+        "show available commands",
+        "how to use"
+    ]
+}
+
+DEFAULT_SUGGESTIONS = [
+    "show status",
+    "list files",
+    "help me",
+    "analyze code",
+    "create task"
+]
+
+_REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+_REGEX_QUANTIFIERS = set('*?{')
+
 
 class CommandIntent(Enum):
     """Available command intents for voice command processing"""
@@ -59,6 +142,279 @@ class NLPCommand:
     context_used: bool = False
 
 
+class _LRUCache(OrderedDict):
+    """Bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class _KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword that occurs in a text in one pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        outputs: List[Set[str]] = [set()]
+
+        for keyword in keywords:
+            if not keyword:
+                continue
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                    self._goto[node][char] = next_node
+                node = next_node
+            outputs[node].add(keyword)
+
+        # Breadth-first so every failure target is complete before it is inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_node] = self._goto[fallback].get(char, 0)
+                outputs[next_node] |= outputs[self._fail[next_node]]
+
+        self._outputs: List[FrozenSet[str]] = [frozenset(o) for o in outputs]
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords occurring anywhere in text"""
+        found: Set[str] = set()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found |= outputs[node]
+        return found
+
+
+def _regex_anchor(pattern: Pattern) -> str:
+    """Literal prefix every match of pattern must contain, or '' if there is none"""
+    if pattern.flags & re.IGNORECASE:
+        return ""
+
+    source = pattern.pattern
+    depth = 0
+    for char in source:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return ""  # Top-level alternation has no common prefix
+
+    anchor = []
+    for char in source:
+        if char in _REGEX_METACHARACTERS:
+            if char in _REGEX_QUANTIFIERS and anchor:
+                anchor.pop()  # The quantified character is optional
+            break
+        anchor.append(char)
+    return "".join(anchor)
+
+
+class _CompiledIntentMatcher:
+    """
+    Intent patterns compiled into a single keyword automaton
+
+    Literal patterns, fuzzy keywords and the literal prefixes of regex patterns
+    are all matched in one scan; a regex only runs when its prefix occurred.
+    """
+
+    def __init__(
+        self,
+        intent_patterns: Dict[CommandIntent, List],
+        fuzzy_keywords: Dict[CommandIntent, str],
+    ):
+        self._literals: Dict[str, List[Tuple[CommandIntent, int]]] = {}
+        self._regexes: List[Tuple[CommandIntent, Pattern]] = []
+        self._anchored: Dict[str, List[int]] = {}
+        self._unanchored: List[int] = []
+
+        for intent, patterns in intent_patterns.items():
+            for pattern in patterns:
+                if isinstance(pattern, str):
+                    self._literals.setdefault(pattern, []).append(
+                        (intent, len(pattern.split()))
+                    )
+                elif hasattr(pattern, 'search'):
+                    index = len(self._regexes)
+                    self._regexes.append((intent, pattern))
+                    anchor = _regex_anchor(pattern)
+                    if anchor:
+                        self._anchored.setdefault(anchor, []).append(index)
+                    else:
+                        self._unanchored.append(index)
+
+        # Per-intent matchers keep difflib's index of the keyword string between calls
+        self._fuzzy = [
+            (intent, keywords.split(), difflib.SequenceMatcher(None, "", keywords))
+            for intent, keywords in fuzzy_keywords.items()
+        ]
+        fuzzy_tokens = {token for _, tokens, _ in self._fuzzy for token in tokens}
+
+        self._automaton = _KeywordAutomaton(
+            set(self._literals) | set(self._anchored) | fuzzy_tokens
+        )
+
+    def score_intents(self, text: str) -> Dict[CommandIntent, Tuple[float, int, int]]:
+        """Score every intent as (confidence, pattern_matches, specific_matches)"""
+        found = self._automaton.find(text)
+        scores: Dict[CommandIntent, List] = {}
+
+        for keyword in found:
+            for intent, word_count in self._literals.get(keyword, ()):
+                score = scores.setdefault(intent, [0.0, 0, 0])
+                # Multi-word patterns are more specific than single keywords
+                if word_count >= 2:
+                    score[0] = max(score[0], 0.85 + (word_count * 0.05))
+                    score[2] += 1
+                else:
+                    score[0] = max(score[0], 0.6)
+                score[1] += 1
+
+        candidates = set(self._unanchored)
+        for keyword in found:
+            candidates.update(self._anchored.get(keyword, ()))
+        for index in candidates:
+            intent, pattern = self._regexes[index]
+            if pattern.search(text):
+                score = scores.setdefault(intent, [0.0, 0, 0])
+                score[0] = max(score[0], 0.8)
+                score[1] += 1
+                score[2] += 1
+
+        # Boost confidence for multiple specific pattern matches
+        result = {}
+        for intent, (confidence, matches, specific) in scores.items():
+            if specific > 1:
+                confidence = min(1.0, confidence + (specific - 1) * 0.1)
+            result[intent] = (confidence, matches, specific)
+        return result
+
+    def fuzzy_match(self, text: str) -> Tuple[CommandIntent, float]:
+        """Best intent by keyword overlap and string similarity"""
+        found = self._automaton.find(text)
+        best_intent = CommandIntent.UNKNOWN
+        best_ratio = 0.0
+
+        for intent, tokens, matcher in self._fuzzy:
+            keyword_ratio = sum(1 for token in tokens if token in found) / len(tokens)
+            keyword_score = keyword_ratio * 0.6
+
+            # Cheap upper bounds first; the full ratio only runs for contenders
+            matcher.set_seq1(text)
+            if (matcher.real_quick_ratio() * 0.4) + keyword_score <= best_ratio:
+                continue
+            if (matcher.quick_ratio() * 0.4) + keyword_score <= best_ratio:
+                continue
+
+            combined_ratio = (matcher.ratio() * 0.4) + keyword_score
+            if combined_ratio > best_ratio:
+                best_intent = intent
+                best_ratio = combined_ratio
+
+        return best_intent, best_ratio
+
+
+class _SuggestionIndex:
+    """Trie over every suffix of the suggestion vocabulary for substring lookups"""
+
+    def __init__(self, commands: List[str]):
+        self.commands = commands
+        self._lowered = [command.lower() for command in commands]
+        self._children: List[Dict[str, int]] = [{}]
+        self._members: List[Set[int]] = [set(range(len(commands)))]
+        self._matchers = [
+            difflib.SequenceMatcher(None, "", lowered) for lowered in self._lowered
+        ]
+
+        for index, lowered in enumerate(self._lowered):
+            for start in range(len(lowered)):
+                node = 0
+                for char in lowered[start:]:
+                    next_node = self._children[node].get(char)
+                    if next_node is None:
+                        next_node = len(self._children)
+                        self._children.append({})
+                        self._members.append(set())
+                        self._children[node][char] = next_node
+                    node = next_node
+                    self._members[node].add(index)
+
+    def containing(self, fragment: str) -> Set[int]:
+        """Indices of commands that contain fragment"""
+        node = 0
+        for char in fragment:
+            node = self._children[node].get(char)
+            if node is None:
+                return set()
+        return self._members[node]
+
+    def suggest(self, partial_lower: str, limit: int) -> List[str]:
+        """Rank commands for partial input, best first"""
+        exact = self.containing(partial_lower)
+        word_hits: Set[int] = set()
+        for word in partial_lower.split():
+            word_hits |= self.containing(word)
+
+        # Exact substring match scores highest, then any word match
+        scores: Dict[int, float] = {}
+        for index in range(len(self.commands)):
+            if index in exact:
+                scores[index] = 1.0
+            elif index in word_hits:
+                scores[index] = 0.7
+
+        # Fuzzy candidates can only matter if they could beat the current top `limit`
+        cutoff = 0.0
+        if 0 < limit <= len(scores):
+            cutoff = sorted(scores.values(), reverse=True)[limit - 1]
+
+        for index, matcher in enumerate(self._matchers):
+            if index in scores:
+                continue
+            matcher.set_seq1(partial_lower)
+            if matcher.real_quick_ratio() <= 0.3 or matcher.real_quick_ratio() < cutoff:
+                continue
+            if matcher.quick_ratio() <= 0.3 or matcher.quick_ratio() < cutoff:
+                continue
+            scores[index] = matcher.ratio()
+
+        scored = [
+            (self.commands[index], scores[index])
+            for index in sorted(scores)
+            if scores[index] > 0.3  # Minimum relevance threshold
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return [command for command, _ in scored[:limit]]
+
+
 class EnhancedNLPService:
     """
     Enhanced Natural Language Processing service for intelligent voice command processing
@@ -71,12 +427,19 @@ class EnhancedNLPService:
     - Performance optimization with caching
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 100):
         self.intent_patterns = self._build_intent_patterns()
         self.action_mappings = self._build_action_mappings()
         self.parameter_extractors = self._build_parameter_extractors()
+        self.intent_matcher = _CompiledIntentMatcher(
+            self.intent_patterns, self._build_fuzzy_keywords()
+        )
+        self.suggestion_index = _SuggestionIndex(
+            [command for commands in COMMON_COMMANDS.values() for command in commands]
+        )
         self.context_history: List[NLPCommand] = []
-        self.command_cache: Dict[str, NLPCommand] = {}
+        self.command_cache: _LRUCache = _LRUCache(maxsize=cache_size)
+        self.suggestion_cache: _LRUCache = _LRUCache(maxsize=cache_size)
         self.is_initialized = True
         self._performance_stats = {
             "total_processed": 0,
@@ -101,7 +464,7 @@ class EnhancedNLPService:
         try:
             # Check cache first for performance optimization
             cache_key = self._generate_cache_key(text, context)
-            cached_result = self._get_cached_result(cache_key)
+            cached_result = self.command_cache.get(cache_key)
             if cached_result:
                 self._performance_stats["cache_hits"] += 1
                 cached_result.processing_time = time.time() - start_time
@@ -144,7 +507,8 @@ class EnhancedNLPService:
             
             # Update context history and cache results
             self._update_context_history(command)
-            self._cache_result(cache_key, command)
+            if command.confidence > 0.7:  # Only cache high-confidence results
+                self.command_cache.put(cache_key, command)
             
             # Update performance statistics
             self._update_performance_stats(processing_time)
@@ -180,32 +544,11 @@ class EnhancedNLPService:
         text = text.lower().strip()
         
         # Remove common filler words that don't add meaning
-        filler_words = {
-            'please', 'could', 'you', 'can', 'would', 'like', 'to', 
-            'the', 'a', 'an', 'and', 'or', 'but', 'so'
-        }
-        words = text.split()
-        words = [w for w in words if w not in filler_words]
-        
+        words = [w for w in text.split() if w not in FILLER_WORDS]
+
         # Handle common speech-to-text substitutions
-        substitutions = {
-            'show me': 'show',
-            'give me': 'show',
-            'tell me': 'show',
-            'let me see': 'show',
-            'what is': 'show',
-            'what are': 'list',
-            'how many': 'count',
-            'go to': 'navigate',
-            'move to': 'navigate',
-            'switch to': 'change',
-            'open up': 'open',
-            'look at': 'analyze',
-            'check out': 'analyze',
-        }
-        
         text = ' '.join(words)
-        for old, new in substitutions.items():
+        for old, new in PHRASE_SUBSTITUTIONS:
             text = text.replace(old, new)
             
         return text.strip()
@@ -214,7 +557,6 @@ class EnhancedNLPService:
         """Recognize intent from normalized text with context awareness"""
         best_intent = CommandIntent.UNKNOWN
         best_confidence = 0.0
-        intent_scores = {}
         
         # Define intent priority order (more specific intents first)
         intent_priority = [
@@ -227,40 +569,8 @@ class EnhancedNLPService:
             CommandIntent.HELP,
         ]
         
-        # Check each intent pattern and accumulate scores
-        for intent in intent_priority:
-            patterns = self.intent_patterns[intent]
-            intent_confidence = 0.0
-            pattern_matches = 0
-            specific_matches = 0
-            
-            for pattern in patterns:
-                if isinstance(pattern, str):
-                    # Exact substring match - prefer specific keywords
-                    if pattern in text:
-                        # Multi-word patterns are more specific
-                        word_count = len(pattern.split())
-                        if word_count >= 2:
-                            # Multi-word patterns get high confidence
-                            intent_confidence = max(intent_confidence, 0.85 + (word_count * 0.05))
-                            specific_matches += 1
-                        else:
-                            # Single word patterns get lower confidence
-                            intent_confidence = max(intent_confidence, 0.6)
-                        pattern_matches += 1
-                elif hasattr(pattern, 'search'):
-                    # Regex pattern match
-                    match = pattern.search(text)
-                    if match:
-                        intent_confidence = max(intent_confidence, 0.8)
-                        specific_matches += 1
-                        pattern_matches += 1
-            
-            # Boost confidence for multiple specific pattern matches
-            if specific_matches > 1:
-                intent_confidence = min(1.0, intent_confidence + (specific_matches - 1) * 0.1)
-            
-            intent_scores[intent] = (intent_confidence, pattern_matches, specific_matches)
+        # Score all intents in a single pass over the compiled patterns
+        intent_scores = self.intent_matcher.score_intents(text)
         
         # Find best intent prioritizing specific matches and higher confidence
         for intent in intent_priority:  # Check in priority order
@@ -868,9 +1178,9 @@ class EnhancedNLPService:
         
         return parameters
 
-    def _fuzzy_intent_match(self, text: str) -> Tuple[CommandIntent, float]:
-        """Fallback fuzzy matching for intent recognition"""
-        intent_keywords = {
+    def _build_fuzzy_keywords(self) -> Dict[CommandIntent, str]:
+        """Build keyword vocabulary for fuzzy intent matching"""
+        return {
             CommandIntent.SYSTEM_STATUS: 'system status health running working operational alive',
             CommandIntent.FILE_OPERATIONS: 'file files directory folder document list show open create',
             CommandIntent.PROJECT_NAVIGATION: 'project navigate directory current location path switch',
@@ -879,24 +1189,10 @@ class EnhancedNLPService:
             CommandIntent.VOICE_CONTROL: 'voice speech listen hear speak volume mute command activate',
             CommandIntent.HELP: 'help commands what can how to usage guide manual instructions',
         }
-        
-        best_intent = CommandIntent.UNKNOWN
-        best_ratio = 0.0
-        
-        for intent, keywords in intent_keywords.items():
-            # Calculate similarity ratio
-            ratio = difflib.SequenceMatcher(None, text, keywords).ratio()
-            
-            # Also check individual keyword matches
-            keyword_matches = sum(1 for keyword in keywords.split() if keyword in text)
-            keyword_ratio = keyword_matches / len(keywords.split()) if keywords.split() else 0
-            
-            # Combined score with weighted importance
-            combined_ratio = (ratio * 0.4) + (keyword_ratio * 0.6)
-            
-            if combined_ratio > best_ratio:
-                best_intent = intent
-                best_ratio = combined_ratio
+
+    def _fuzzy_intent_match(self, text: str) -> Tuple[CommandIntent, float]:
+        """Fallback fuzzy matching for intent recognition"""
+        best_intent, best_ratio = self.intent_matcher.fuzzy_match(text)
         
         # Only return if confidence is reasonable
         confidence = best_ratio if best_ratio > 0.3 else 0.0
@@ -967,25 +1263,6 @@ class EnhancedNLPService:
         key_string = "|".join(key_components)
         return hashlib.md5(key_string.encode()).hexdigest()
 
-    def _get_cached_result(self, cache_key: str) -> Optional[NLPCommand]:
-        """Get cached result if available and fresh"""
-        if cache_key in self.command_cache:
-            cached_command = self.command_cache[cache_key]
-            # Simple cache without expiration for now
-            return cached_command
-        return None
-
-    def _cache_result(self, cache_key: str, command: NLPCommand):
-        """Cache successful command processing results"""
-        if command.confidence > 0.7:  # Only cache high-confidence results
-            # Limit cache size
-            if len(self.command_cache) >= 100:
-                # Remove oldest entries (simple FIFO)
-                oldest_key = next(iter(self.command_cache))
-                del self.command_cache[oldest_key]
-            
-            self.command_cache[cache_key] = command
-
     def _update_performance_stats(self, processing_time: float):
         """Update performance statistics"""
         self._performance_stats["total_processed"] += 1
@@ -999,92 +1276,20 @@ class EnhancedNLPService:
 
     def get_command_suggestions(self, partial_text: str, limit: int = 5) -> List[str]:
         """Get command suggestions for partial input with enhanced matching"""
-        suggestions = []
-        
-        # Common command patterns categorized by intent
-        common_commands = {
-            'system': [
-                "show system status",
-                "check health", 
-                "what's the system status",
-                "is everything running"
-            ],
-            'files': [
-                "list files",
-                "show current directory",
-                "open file",
-                "create new file",
-                "read file"
-            ],
-            'navigation': [
-                "go to directory",
-                "navigate to project", 
-                "change directory",
-                "show current location"
-            ],
-            'code': [
-                "analyze code",
-                "review this file",
-                "explain function",
-                "find issues",
-                "check code quality"
-            ],
-            'tasks': [
-                "create task",
-                "list tasks",
-                "mark task complete",
-                "add new task",
-                "show my tasks"
-            ],
-            'voice': [
-                "activate voice control",
-                "change volume",
-                "mute voice",
-                "voice commands available"
-            ],
-            'help': [
-                "help me",
-                "what can you do",
-                "show available commands",
-                "how to use"
-            ]
-        }
-        
         partial_lower = partial_text.lower()
-        scored_suggestions = []
-        
-        # Score suggestions based on relevance
-        for category, commands in common_commands.items():
-            for command in commands:
-                # Calculate relevance score
-                if partial_lower in command.lower():
-                    # Exact substring match gets highest score
-                    score = 1.0
-                elif any(word in command.lower() for word in partial_lower.split()):
-                    # Word match gets medium score
-                    score = 0.7
-                else:
-                    # Use fuzzy matching for partial matches
-                    score = difflib.SequenceMatcher(None, partial_lower, command.lower()).ratio()
-                
-                if score > 0.3:  # Minimum relevance threshold
-                    scored_suggestions.append((command, score))
-        
-        # Sort by score and return top suggestions
-        scored_suggestions.sort(key=lambda x: x[1], reverse=True)
-        suggestions = [cmd for cmd, score in scored_suggestions[:limit]]
+        cache_key = (partial_lower, limit)
+        cached = self.suggestion_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        suggestions = self.suggestion_index.suggest(partial_lower, limit)
         
         # If no good suggestions, provide category-based suggestions
         if not suggestions:
-            suggestions = [
-                "show status",
-                "list files",
-                "help me",
-                "analyze code",
-                "create task"
-            ][:limit]
+            suggestions = DEFAULT_SUGGESTIONS[:limit]
         
-        return suggestions
+        self.suggestion_cache.put(cache_key, suggestions)
+        return list(suggestions)
 
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get performance metrics for monitoring"""
@@ -1101,6 +1306,7 @@ class EnhancedNLPService:
             "cache_hit_ratio": round(cache_hit_ratio, 1),
             "avg_processing_time": round(self._performance_stats["avg_processing_time"], 3),
             "cache_size": len(self.command_cache),
+            "suggestion_cache_size": len(self.suggestion_cache),
             "history_size": len(self.context_history),
             "supported_intents": len(self.intent_patterns),
             "supported_actions": sum(len(actions) for actions in self.action_mappings.values()),
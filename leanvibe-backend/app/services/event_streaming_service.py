@@ -37,6 +37,19 @@ class EventFilter:
 
     def should_deliver(self, event: EventData, preferences: ClientPreferences) -> bool:
         """Determine if an event should be delivered to a client"""
+        if not self.matches(event, preferences):
+            return False
+
+        # Check rate limiting
+        if not self._check_rate_limit(
+            preferences.client_id, preferences.max_events_per_second
+        ):
+            return False
+
+        return True
+
+    def matches(self, event: EventData, preferences: ClientPreferences) -> bool:
+        """Check channel, priority and custom filters, without rate limiting"""
 
         # Check channel subscription
         if (
@@ -57,12 +70,6 @@ class EventFilter:
         if priority_levels[event.priority] < priority_levels[preferences.min_priority]:
             return False
 
-        # Check rate limiting
-        if not self._check_rate_limit(
-            preferences.client_id, preferences.max_events_per_second
-        ):
-            return False
-
         # Apply custom filters
         if not self._apply_custom_filters(event, preferences.custom_filters):
             return False
@@ -285,6 +292,7 @@ class EventStreamingService:
         """Deliver an event to all eligible clients"""
         delivery_tasks = []
         disconnected_clients = []
+        sequence = self._record_for_replay(event)
 
         for client_id, client_state in self.clients.items():
             # Check if client is currently connected
@@ -302,30 +310,32 @@ class EventStreamingService:
                 self._deliver_to_client(client_id, event, client_state)
             )
 
-        # Track missed events for disconnected clients that should receive this event
-        if disconnected_clients:
-            self._track_missed_events(event, disconnected_clients)
+        # Disconnected clients replay from the shared log when they come back
+        if disconnected_clients and sequence is not None:
+            self._track_missed_events(sequence, disconnected_clients)
 
         if delivery_tasks:
             await asyncio.gather(*delivery_tasks, return_exceptions=True)
 
-    def _track_missed_events(self, event: EventData, disconnected_clients: List[str]):
-        """Track missed events for disconnected clients"""
+    def _record_for_replay(self, event: EventData) -> Optional[int]:
+        """Record an event once in the reconnection replay log"""
+        try:
+            # Import here to avoid circular imports
+            from .reconnection_service import record_event_for_replay
+
+            return record_event_for_replay(event)
+        except Exception as e:
+            logger.error(f"Error recording event for replay: {e}")
+            return None
+
+    def _track_missed_events(self, sequence: int, disconnected_clients: List[str]):
+        """Pin the replay cursor of clients that stopped receiving events"""
         try:
             # Import here to avoid circular imports
-            from .reconnection_service import track_missed_event_for_client
+            from .reconnection_service import hold_event_cursor
 
             for client_id in disconnected_clients:
-                # Only track if the client has preferences that would want this event
-                if client_id in self.clients:
-                    client_state = self.clients[client_id]
-                    if self.event_filter.should_deliver(
-                        event, client_state.preferences
-                    ):
-                        track_missed_event_for_client(client_id, event)
-                        logger.debug(
-                            f"Tracked missed event {event.event_type.value} for disconnected client {client_id}"
-                        )
+                hold_event_cursor(client_id, sequence)
         except Exception as e:
             logger.error(f"Error tracking missed events: {e}")
 
@@ -502,6 +512,22 @@ async def emit_analysis_completed(
     await event_streaming_service.emit_event(event)
 
 
+async def emit_index_progress(
+    workspace_path: str,
+    files_indexed: int,
+    total_files: int,
+    complete: bool,
+    symbols_count: Optional[int] = None,
+):
+    """Emit a project indexing progress event"""
+    from ..models.event_models import create_index_progress_event
+
+    event = create_index_progress_event(
+        workspace_path, files_indexed, total_files, complete, symbols_count
+    )
+    await event_streaming_service.emit_event(event)
+
+
 async def emit_violation_detected(
     violation_id: str,
     violation_type: str,
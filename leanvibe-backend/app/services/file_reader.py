@@ -0,0 +1,249 @@
+"""
+Prefetching File Reader
+
+I/O stage of the indexing pipeline. Files are read and decoded on a
+dedicated thread pool, so the event loop never blocks on disk, and handed
+to parser workers through a queue. A byte budget bounds how much content
+can be read ahead of the parsers, so a slow parser stage applies
+backpressure instead of buffering the whole project in memory.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from .change_detector import hash_content
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FileContent(NamedTuple):
+    """Decoded text of a file, its UTF-8 encoding and the encoding's hash"""
+
+    text: str
+    source: bytes
+    content_hash: str
+
+
+def read_file_content(file_path: str) -> FileContent:
+    """Read and decode a file the way ``Path.read_text`` does
+
+    Undecodable bytes are dropped and line endings are normalized to ``\\n``.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    source = text.encode("utf-8")
+    return FileContent(text, source, hash_content(source))
+
+
+def _stat_files(file_paths: List[str]) -> List[Optional[os.stat_result]]:
+    stats = []
+    for file_path in file_paths:
+        try:
+            stats.append(os.stat(file_path))
+        except OSError:
+            stats.append(None)
+    return stats
+
+
+class _ByteBudget:
+    """Async counting budget of bytes read but not yet consumed
+
+    A request larger than the whole budget is admitted once nothing else is
+    in flight, so oversized files cannot deadlock the pipeline.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, size: int) -> float:
+        """Reserve bytes, returning the seconds spent waiting"""
+        async with self._condition:
+            if self._fits(size):
+                self.in_flight += size
+                return 0.0
+            start = time.perf_counter()
+            await self._condition.wait_for(lambda: self._fits(size))
+            self.in_flight += size
+            return time.perf_counter() - start
+
+    async def release(self, size: int):
+        async with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+    def _fits(self, size: int) -> bool:
+        return self.in_flight == 0 or self.in_flight + size <= self.limit
+
+
+class PrefetchingFileReader:
+    """Bounded-concurrency reader feeding parser workers through a queue"""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_inflight_bytes: int = 32 * 1024 * 1024,
+        parser_concurrency: int = 4,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="file-reader"
+        )
+        self.max_inflight_bytes = max_inflight_bytes
+        self.parser_concurrency = parser_concurrency
+
+        # Throughput and stall tracking
+        self.metrics = {
+            "files_read": 0,
+            "bytes_read": 0,
+            "read_errors": 0,
+            "read_time": 0.0,
+            "budget_stall_time": 0.0,  # reader waiting on slow parsers
+            "parser_stall_time": 0.0,  # parsers waiting on disk
+            "peak_inflight_bytes": 0,
+            "pipeline_bytes": 0,
+            "pipeline_time": 0.0,
+        }
+
+    async def read(self, file_path: str) -> FileContent:
+        """Read one file off the event loop"""
+        loop = asyncio.get_event_loop()
+        start = time.perf_counter()
+        try:
+            content = await loop.run_in_executor(
+                self.executor, read_file_content, file_path
+            )
+        except OSError:
+            self.metrics["read_errors"] += 1
+            raise
+        self._record_read(len(content.source), time.perf_counter() - start)
+        return content
+
+    async def stat_files(
+        self, file_paths: List[str]
+    ) -> List[Optional[os.stat_result]]:
+        """Stat files in one batch off the event loop; None for missing files"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, _stat_files, file_paths)
+
+    async def process(
+        self,
+        file_paths: Iterable[str],
+        handler: Callable[[str, Union[FileContent, Exception]], Awaitable[T]],
+        sizes: Optional[Dict[str, int]] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, T]:
+        """Read files ahead of ``handler`` and collect its results
+
+        Reads are issued in order while the byte budget allows and parser
+        workers take files as soon as their content is ready. The handler
+        receives the content, or the exception that reading raised. Results
+        are returned in the order of ``file_paths``.
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        if not file_paths:
+            return {}
+
+        if sizes is None or any(path not in sizes for path in file_paths):
+            stats = await self.stat_files(file_paths)
+            sizes = {
+                path: stat.st_size if stat else 0
+                for path, stat in zip(file_paths, stats)
+            }
+
+        start_time = time.perf_counter()
+        budget = _ByteBudget(self.max_inflight_bytes)
+        ready: asyncio.Queue = asyncio.Queue()
+        results: Dict[str, T] = {}
+        reads: List[asyncio.Task] = []
+
+        async def read_ahead(file_path: str, size: int):
+            try:
+                content: Union[FileContent, Exception] = await self.read(file_path)
+            except Exception as e:
+                content = e
+            await ready.put((file_path, size, content))
+
+        async def produce():
+            for file_path in file_paths:
+                size = sizes[file_path]
+                self.metrics["budget_stall_time"] += await budget.acquire(size)
+                self.metrics["peak_inflight_bytes"] = max(
+                    self.metrics["peak_inflight_bytes"], budget.in_flight
+                )
+                reads.append(asyncio.create_task(read_ahead(file_path, size)))
+
+        async def consume():
+            while True:
+                start = time.perf_counter()
+                item = await ready.get()
+                self.metrics["parser_stall_time"] += time.perf_counter() - start
+                if item is None:
+                    return
+                file_path, size, content = item
+                try:
+                    results[file_path] = await handler(file_path, content)
+                finally:
+                    await budget.release(size)
+
+        workers = [
+            asyncio.create_task(consume())
+            for _ in range(min(concurrency or self.parser_concurrency, len(file_paths)))
+        ]
+        try:
+            await produce()
+            await asyncio.gather(*reads)
+            for _ in workers:
+                await ready.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in reads + workers:
+                task.cancel()
+
+        self.metrics["pipeline_bytes"] += sum(sizes[path] for path in file_paths)
+        self.metrics["pipeline_time"] += time.perf_counter() - start_time
+
+        return {
+            file_path: results[file_path]
+            for file_path in file_paths
+            if file_path in results
+        }
+
+    def _record_read(self, size: int, duration: float):
+        self.metrics["files_read"] += 1
+        self.metrics["bytes_read"] += size
+        self.metrics["read_time"] += duration
+
+    def get_metrics(self) -> Dict[str, Union[int, float]]:
+        """Get reader throughput and stall metrics"""
+        metrics = self.metrics.copy()
+        pipeline_time = metrics["pipeline_time"]
+        metrics["throughput_mb_per_s"] = (
+            metrics["pipeline_bytes"] / pipeline_time / (1024 * 1024)
+            if pipeline_time
+            else 0.0
+        )
+        return metrics
+
+
+# Global instance
+file_reader = PrefetchingFileReader()
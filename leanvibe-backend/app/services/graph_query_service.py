@@ -2,7 +2,9 @@
 Graph Query Service
 
 Advanced query interface for code relationship analysis, impact assessment,
-and architecture pattern detection using the Neo4j graph database.
+and architecture pattern detection using the Neo4j graph database. Call chain
+and hotspot queries fall back to the in-memory call graph of indexed projects
+when the database is unavailable.
 """
 
 import logging
@@ -10,7 +12,7 @@ from collections import defaultdict
 from pathlib import Path
 from typing import Any, Dict, List
 
-
+from ..models.ast_models import CallGraphIndex
 from .graph_service import graph_service
 
 logger = logging.getLogger(__name__)
@@ -28,6 +30,17 @@ class GraphQueryService:
         self.graph_service = graph_service
         self.query_cache = {}
         self.cache_timeout = 300  # 5 minutes
+        self.call_graphs: Dict[str, CallGraphIndex] = {}
+
+    def register_call_graph(self, project_id: str, call_graph: CallGraphIndex):
+        """Serve call graph queries for a project from its in-memory index"""
+        self.call_graphs[project_id] = call_graph
+
+    @staticmethod
+    def _symbol_name(symbol_id: str) -> str:
+        """Symbol name from a "file:name:row" symbol id"""
+        parts = symbol_id.rsplit(":", 2)
+        return parts[1] if len(parts) == 3 else symbol_id
 
     async def find_call_chains(
         self, source_symbol: str, target_symbol: str, max_depth: int = 5
@@ -35,6 +48,15 @@ class GraphQueryService:
         """Find all call chains between two symbols"""
         try:
             if not self.graph_service.initialized:
+                for call_graph in self.call_graphs.values():
+                    chains = call_graph.find_call_chains(
+                        source_symbol, target_symbol, max_depth
+                    )
+                    if chains:
+                        return [
+                            [self._symbol_name(symbol_id) for symbol_id in chain]
+                            for chain in chains
+                        ]
                 return []
 
             query = """
@@ -471,7 +493,8 @@ class GraphQueryService:
         """Find code hotspots (frequently changed or highly connected code)"""
         try:
             if not self.graph_service.initialized:
-                return []
+                call_graph = self.call_graphs.get(project_id)
+                return self._call_graph_hotspots(call_graph) if call_graph else []
 
             # Find highly connected nodes (high degree centrality)
             query = """
@@ -514,6 +537,30 @@ class GraphQueryService:
             logger.error(f"Error finding hotspots: {e}")
             return []
 
+    def _call_graph_hotspots(self, call_graph: CallGraphIndex) -> List[Dict[str, Any]]:
+        """Most connected symbols of an in-memory call graph"""
+        symbols = set(call_graph.callers) | set(call_graph.callees)
+        ranked = sorted(
+            ((call_graph.degree(symbol_id), symbol_id) for symbol_id in symbols),
+            key=lambda item: (-item[0], item[1]),
+        )
+
+        hotspots = []
+        for connection_count, symbol_id in ranked[:20]:
+            if connection_count <= 3:  # Only include well-connected nodes
+                break
+            hotspots.append(
+                {
+                    "symbol_name": self._symbol_name(symbol_id),
+                    "file_path": symbol_id.rsplit(":", 2)[0],
+                    "symbol_types": ["Function"],
+                    "connection_count": connection_count,
+                    "hotspot_type": "highly_connected",
+                    "risk_level": self._calculate_hotspot_risk(connection_count),
+                }
+            )
+        return hotspots
+
     def _calculate_hotspot_risk(self, connection_count: int) -> str:
         """Calculate risk level for hotspots"""
         if connection_count < 5:
@@ -5,26 +5,44 @@ Extends the basic project indexer with incremental updates, intelligent caching,
 and performance optimization for real-time code analysis.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
+import os
 import pickle
 import time
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+from contextlib import aclosing
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import aiofiles
 
 from ..models.ast_models import (
     FileAnalysis,
+    IdentifierIndex,
     ProjectIndex,
 )
 from ..models.monitoring_models import ChangeType, FileChange
 from .cache_invalidation_service import cache_invalidation_service
 from .cache_warming_service import cache_warming_service
+from .change_detector import (
+    ChangeSet,
+    FileFingerprint,
+    FileSignature,
+    change_detector,
+)
+from .event_streaming_service import emit_index_progress
+from .index_snapshot import (
+    IndexSnapshot,
+    SnapshotError,
+    SnapshotOverlay,
+    write_snapshot,
+)
 from .project_indexer import project_indexer
+from .shared_analysis_store import shared_analysis_store
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +60,15 @@ class FileIndexEntry:
     dependencies_count: int
     language: Optional[str] = None
     parsing_errors: int = 0
+    mtime_ns: int = 0
+    inode: int = 0
+
+    @property
+    def fingerprint(self) -> FileFingerprint:
+        """Stat signature and content hash recorded for this file"""
+        return FileFingerprint(
+            FileSignature(self.file_size, self.mtime_ns, self.inode), self.content_hash
+        )
 
 
 @dataclass
@@ -57,6 +84,8 @@ class IncrementalIndexCache:
     symbol_registry_hash: str
     created_at: float
     updated_at: float
+    identifier_index: IdentifierIndex = field(default_factory=IdentifierIndex)
+    snapshot_id: str = ""  # memory-mapped snapshot holding the full index
 
 
 class IncrementalProjectIndexer:
@@ -71,12 +100,19 @@ class IncrementalProjectIndexer:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.executor = ThreadPoolExecutor(max_workers=6)
+        self.change_detector = change_detector
 
         # Cache configuration
-        self.cache_version = "1.0.0"
+        self.cache_version = "1.3.0"
         self.full_index_interval = 3600  # 1 hour - force full reindex
         self.max_cache_age = 86400  # 24 hours
         self.batch_size = 15
+        self.progress_interval = 0.5  # seconds between progress events
+
+        # Memory-mapped snapshots opened by this process, keyed by file
+        self._snapshots: Dict[str, Tuple[Tuple[int, int, int], IndexSnapshot]] = {}
+        # Overlays of files changed since each workspace's snapshot was written
+        self._readers: Dict[str, SnapshotOverlay] = {}
 
         # Performance tracking
         self.metrics = {
@@ -84,7 +120,9 @@ class IncrementalProjectIndexer:
             "cache_hits": 0,
             "cache_misses": 0,
             "files_reanalyzed": 0,
+            "files_hashed": 0,
             "symbols_updated": 0,
+            "snapshot_loads": 0,
             "total_indexing_time": 0.0,
         }
 
@@ -104,8 +142,15 @@ class IncrementalProjectIndexer:
         force_full_reindex: bool = False,
         include_patterns: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None,
+        priority_files: Optional[List[str]] = None,
+        on_snapshot: Optional[Callable[[ProjectIndex], None]] = None,
     ) -> ProjectIndex:
-        """Get existing project index or create/update incrementally"""
+        """Get existing project index or create/update incrementally
+
+        During a full reindex ``priority_files`` are analyzed first and
+        ``on_snapshot`` receives the partial index after every batch, while
+        progress events are streamed to clients.
+        """
         try:
             start_time = time.time()
             workspace_path = str(Path(workspace_path).absolute())
@@ -115,26 +160,45 @@ class IncrementalProjectIndexer:
             # Load existing cache
             cache = await self._load_cache(workspace_path)
 
+            # Detect changes since the cached index from stat signatures
+            changes = None
+            if cache is not None and not force_full_reindex:
+                changes = await self._detect_changes(
+                    workspace_path, cache, exclude_patterns
+                )
+
             # Determine if full reindex is needed
             needs_full_reindex = (
-                force_full_reindex or cache is None or self._needs_full_reindex(cache)
+                force_full_reindex
+                or cache is None
+                or self._needs_full_reindex(cache, changes)
             )
 
             if needs_full_reindex:
                 logger.info("Performing full project reindex")
                 project_index = await self._full_reindex(
-                    workspace_path, include_patterns, exclude_patterns
+                    workspace_path,
+                    include_patterns,
+                    exclude_patterns,
+                    priority_files,
+                    on_snapshot,
+                )
+                await self._save_cache(
+                    workspace_path,
+                    project_index,
+                    changes.fingerprints if changes else None,
                 )
-                await self._save_cache(workspace_path, project_index)
 
                 # Build dependency graph for cache invalidation service
                 await cache_invalidation_service.build_dependency_graph(project_index)
             else:
                 logger.info("Performing incremental project update")
                 project_index = await self._incremental_update(
-                    workspace_path, cache, include_patterns, exclude_patterns
+                    workspace_path, cache, include_patterns, exclude_patterns, changes
+                )
+                await self._save_cache(
+                    workspace_path, project_index, changes.fingerprints
                 )
-                await self._save_cache(workspace_path, project_index)
 
                 # Update dependency graph for cache invalidation service
                 await cache_invalidation_service.build_dependency_graph(project_index)
@@ -143,6 +207,10 @@ class IncrementalProjectIndexer:
             indexing_time = time.time() - start_time
             self.metrics["total_indexing_time"] += indexing_time
 
+            # Cache hits leave clients' view of the index unchanged
+            if needs_full_reindex or changes.has_changes:
+                await self._emit_progress(workspace_path, project_index)
+
             logger.info(
                 f"Project indexing completed in {indexing_time:.2f}s "
                 f"({project_index.supported_files} files, "
@@ -205,15 +273,22 @@ class IncrementalProjectIndexer:
                         updated_files.add(change.file_path)
 
             # Update cache with changes
-            updated_cache = await self._apply_file_changes(
+            updated_cache, analyses = await self._apply_file_changes(
                 cache, updated_files, removed_files
             )
 
-            # Convert cache to project index
-            project_index = await self._cache_to_project_index(updated_cache)
+            # Overlay the changed files on the cached snapshot
+            project_index = await self._cache_to_project_index(updated_cache, analyses)
 
-            # Save updated cache
-            await self._save_cache(workspace_path, project_index)
+            # Save updated cache, reusing the fingerprints just recorded
+            await self._save_cache(
+                workspace_path,
+                project_index,
+                {
+                    file_path: entry.fingerprint
+                    for file_path, entry in updated_cache.file_entries.items()
+                },
+            )
 
             # Trigger cache invalidation for changed files
             if updated_files or removed_files:
@@ -276,27 +351,43 @@ class IncrementalProjectIndexer:
             self.metrics["cache_misses"] += 1
             return None
 
-    async def _save_cache(self, workspace_path: str, project_index: ProjectIndex):
-        """Save project index to incremental cache"""
+    async def _save_cache(
+        self,
+        workspace_path: str,
+        project_index: ProjectIndex,
+        fingerprints: Optional[Dict[str, FileFingerprint]] = None,
+    ):
+        """Save project index to incremental cache
+
+        Files without a fingerprint from change detection are stat'ed and
+        hashed here.
+        """
         try:
             cache_file = self._get_cache_file_path(workspace_path)
 
+            fingerprints = dict(fingerprints or {})
+            missing = [path for path in project_index.files if path not in fingerprints]
+            if missing:
+                fingerprints.update(
+                    await self._fingerprint_files(workspace_path, missing)
+                )
+
+            # Write the read-optimized snapshot before the cache that names it
+            loop = asyncio.get_event_loop()
+            snapshot_id = await loop.run_in_executor(
+                self.executor,
+                write_snapshot,
+                project_index,
+                str(self._get_snapshot_file_path(workspace_path)),
+            )
+
             # Create file entries from project index
             file_entries = {}
             for file_path, analysis in project_index.files.items():
-                file_entries[file_path] = FileIndexEntry(
-                    file_path=file_path,
-                    content_hash=await self._calculate_file_hash(file_path),
-                    last_modified=Path(file_path).stat().st_mtime,
-                    file_size=Path(file_path).stat().st_size,
-                    analysis_timestamp=time.time(),
-                    symbols_count=len(analysis.symbols),
-                    dependencies_count=len(analysis.dependencies),
-                    language=analysis.language.value if analysis.language else None,
-                    parsing_errors=(
-                        len(analysis.parsing_errors) if analysis.parsing_errors else 0
-                    ),
-                )
+                if file_path in fingerprints:
+                    file_entries[file_path] = self._create_file_entry(
+                        file_path, analysis, fingerprints[file_path]
+                    )
 
             # Create cache object
             cache = IncrementalIndexCache(
@@ -316,6 +407,8 @@ class IncrementalProjectIndexer:
                 symbol_registry_hash=self._calculate_object_hash(project_index.symbols),
                 created_at=time.time(),
                 updated_at=time.time(),
+                identifier_index=project_index.identifiers,
+                snapshot_id=snapshot_id,
             )
 
             # Save cache
@@ -333,7 +426,62 @@ class IncrementalProjectIndexer:
         workspace_hash = hashlib.sha256(workspace_path.encode()).hexdigest()[:16]
         return self.cache_dir / f"project_index_{workspace_hash}.cache"
 
-    def _needs_full_reindex(self, cache: IncrementalIndexCache) -> bool:
+    def _get_snapshot_file_path(self, workspace_path: str) -> Path:
+        """Get memory-mapped snapshot path for workspace"""
+        return self._get_cache_file_path(workspace_path).with_suffix(".snap")
+
+    def open_snapshot(self, workspace_path: str) -> Optional[IndexSnapshot]:
+        """Map the workspace's index snapshot, reusing this process's mapping
+
+        Processes that open the same snapshot share its pages through the OS
+        page cache. A mapping is reopened once the file has been replaced.
+        """
+        workspace_path = str(Path(workspace_path).absolute())
+        snapshot_file = str(self._get_snapshot_file_path(workspace_path))
+        try:
+            stat = os.stat(snapshot_file)
+        except OSError:
+            self._snapshots.pop(snapshot_file, None)
+            return None
+
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._snapshots.get(snapshot_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        try:
+            snapshot = IndexSnapshot(snapshot_file)
+        except SnapshotError as e:
+            logger.warning(f"Ignoring unreadable index snapshot: {e}")
+            self._snapshots.pop(snapshot_file, None)
+            return None
+
+        # Earlier mappings are released once no caller holds them
+        self._snapshots[snapshot_file] = (key, snapshot)
+        self.metrics["snapshot_loads"] += 1
+        return snapshot
+
+    def get_index_reader(self, workspace_path: str) -> Optional[SnapshotOverlay]:
+        """Lookups served from the workspace's mapped snapshot
+
+        Symbol, file and dependency lookups read the mapping directly; files
+        changed since the snapshot was written are answered from the overlay.
+        Returns None when the workspace has no readable snapshot.
+        """
+        workspace_path = str(Path(workspace_path).absolute())
+        snapshot = self.open_snapshot(workspace_path)
+        if snapshot is None:
+            self._readers.pop(workspace_path, None)
+            return None
+
+        reader = self._readers.get(workspace_path)
+        if reader is None or reader.base is not snapshot:
+            reader = self._readers[workspace_path] = snapshot.overlay()
+        return reader
+
+    def _needs_full_reindex(
+        self, cache: IncrementalIndexCache, changes: Optional[ChangeSet] = None
+    ) -> bool:
         """Determine if full reindex is needed"""
         # Check cache age
         cache_age = time.time() - cache.last_full_index
@@ -343,28 +491,20 @@ class IncrementalProjectIndexer:
 
         # Check if project structure has changed significantly
         try:
-            current_files = set()
-            workspace = Path(cache.project_path)
-
-            for path in workspace.rglob("*"):
-                if path.is_file() and path.suffix.lower() in {
-                    ".py",
-                    ".js",
-                    ".ts",
-                    ".jsx",
-                    ".tsx",
-                    ".swift",
-                }:
-                    current_files.add(str(path.absolute()))
-
-            cached_files = set(cache.file_entries.keys())
+            if changes is None:
+                changes = self.change_detector.detect(
+                    cache.project_path,
+                    self._cached_fingerprints(cache),
+                    project_indexer.supported_extensions,
+                    project_indexer.default_excludes,
+                )
 
             # Calculate file change ratio
-            total_files = len(current_files | cached_files)
+            total_files = len(changes.fingerprints) + len(changes.removed)
             if total_files == 0:
                 return True
 
-            changed_files = len(current_files.symmetric_difference(cached_files))
+            changed_files = len(changes.added) + len(changes.removed)
             change_ratio = changed_files / total_files
 
             if change_ratio > 0.3:  # More than 30% files changed
@@ -384,10 +524,39 @@ class IncrementalProjectIndexer:
         workspace_path: str,
         include_patterns: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None,
+        priority_files: Optional[List[str]] = None,
+        on_snapshot: Optional[Callable[[ProjectIndex], None]] = None,
     ) -> ProjectIndex:
-        """Perform full project reindex"""
-        return await project_indexer.index_project(
-            workspace_path, include_patterns, exclude_patterns
+        """Perform full project reindex, publishing partial snapshots"""
+        project_index = None
+        last_progress = 0.0
+        async with aclosing(
+            project_indexer.index_project_progressively(
+                workspace_path, include_patterns, exclude_patterns, priority_files
+            )
+        ) as snapshots:
+            async for project_index in snapshots:
+                if project_index.complete:
+                    continue
+
+                if on_snapshot:
+                    on_snapshot(project_index)
+
+                # Throttle progress events to stay under client rate limits
+                if time.time() - last_progress >= self.progress_interval:
+                    last_progress = time.time()
+                    await self._emit_progress(workspace_path, project_index)
+
+        return project_index
+
+    async def _emit_progress(self, workspace_path: str, project_index: ProjectIndex):
+        """Stream indexing progress to connected clients"""
+        await emit_index_progress(
+            workspace_path,
+            len(project_index.files),
+            project_index.total_files,
+            project_index.complete,
+            len(project_index.symbols),
         )
 
     async def _incremental_update(
@@ -396,35 +565,18 @@ class IncrementalProjectIndexer:
         cache: IncrementalIndexCache,
         include_patterns: Optional[List[str]] = None,
         exclude_patterns: Optional[List[str]] = None,
+        changes: Optional[ChangeSet] = None,
     ) -> ProjectIndex:
         """Perform incremental project update"""
         try:
-            # Discover current files
-            current_files = await self._discover_current_files(
-                workspace_path, include_patterns, exclude_patterns
-            )
-
-            # Determine files that need reanalysis
-            files_to_analyze = []
-            removed_files = set()
-
-            # Check for new and modified files
-            for file_path in current_files:
-                if file_path not in cache.file_entries:
-                    # New file
-                    files_to_analyze.append(file_path)
-                else:
-                    # Check if file was modified
-                    cache_entry = cache.file_entries[file_path]
-                    current_hash = await self._calculate_file_hash(file_path)
-
-                    if current_hash != cache_entry.content_hash:
-                        files_to_analyze.append(file_path)
+            # Detect new, modified and removed files
+            if changes is None:
+                changes = await self._detect_changes(
+                    workspace_path, cache, exclude_patterns
+                )
 
-            # Check for removed files
-            for file_path in cache.file_entries:
-                if file_path not in current_files:
-                    removed_files.add(file_path)
+            files_to_analyze = changes.added + changes.modified
+            removed_files = set(changes.removed)
 
             logger.info(
                 f"Incremental update: {len(files_to_analyze)} files to analyze, "
@@ -446,6 +598,9 @@ class IncrementalProjectIndexer:
                         if symbol.id in project_index.symbols:
                             del project_index.symbols[symbol.id]
 
+                    # Remove identifier occurrences
+                    project_index.identifiers.remove_file(file_path)
+
                     # Update counters
                     project_index.supported_files = max(
                         0, project_index.supported_files - 1
@@ -482,6 +637,14 @@ class IncrementalProjectIndexer:
                     # Update dependencies
                     project_index.dependencies.extend(analysis.dependencies)
 
+                    # Replace identifier occurrences
+                    project_index.identifiers.set_file(file_path, analysis.identifiers)
+
+            # Re-resolve call edges of changed files and their importers
+            project_indexer.update_call_graph(
+                project_index, set(removed_files) | set(files_to_analyze)
+            )
+
             # Update timestamp
             project_index.last_indexed = time.time()
 
@@ -499,49 +662,58 @@ class IncrementalProjectIndexer:
         cache: IncrementalIndexCache,
         updated_files: Set[str],
         removed_files: Set[str],
-    ) -> IncrementalIndexCache:
-        """Apply file changes to cache"""
+    ) -> Tuple[IncrementalIndexCache, Dict[str, FileAnalysis]]:
+        """Apply file changes to cache, returning the fresh analyses"""
+        analyses: Dict[str, FileAnalysis] = {}
         try:
             # Remove deleted files from cache
             for file_path in removed_files:
                 if file_path in cache.file_entries:
                     del cache.file_entries[file_path]
+                cache.identifier_index.remove_file(file_path)
 
             # Analyze updated files
             if updated_files:
                 analyses = await self._analyze_files_batch(list(updated_files))
+                fingerprints = await self._fingerprint_files(
+                    cache.project_path, list(analyses)
+                )
 
                 for file_path, analysis in analyses.items():
+                    if file_path not in fingerprints:
+                        continue
+
                     # Update cache entry
-                    cache.file_entries[file_path] = FileIndexEntry(
-                        file_path=file_path,
-                        content_hash=await self._calculate_file_hash(file_path),
-                        last_modified=Path(file_path).stat().st_mtime,
-                        file_size=Path(file_path).stat().st_size,
-                        analysis_timestamp=time.time(),
-                        symbols_count=len(analysis.symbols),
-                        dependencies_count=len(analysis.dependencies),
-                        language=analysis.language.value if analysis.language else None,
-                        parsing_errors=(
-                            len(analysis.parsing_errors)
-                            if analysis.parsing_errors
-                            else 0
-                        ),
+                    cache.file_entries[file_path] = self._create_file_entry(
+                        file_path, analysis, fingerprints[file_path]
                     )
+                    cache.identifier_index.set_file(file_path, analysis.identifiers)
 
             # Update cache metadata
             cache.updated_at = time.time()
 
-            return cache
+            return cache, analyses
 
         except Exception as e:
             logger.error(f"Error applying file changes to cache: {e}")
-            return cache
+            return cache, analyses
 
     async def _cache_to_project_index(
-        self, cache: IncrementalIndexCache
+        self,
+        cache: IncrementalIndexCache,
+        analyses: Optional[Dict[str, FileAnalysis]] = None,
     ) -> ProjectIndex:
-        """Convert cache to project index"""
+        """Convert cache to project index
+
+        Unchanged files are decoded from the cached snapshot; ``analyses``
+        holds fresh analyses of changed files, and only cached files missing
+        from both are reanalyzed.
+        """
+        analyses = dict(analyses or {})
+        snapshot = self.open_snapshot(cache.project_path)
+        if snapshot is not None and snapshot.snapshot_id == cache.snapshot_id:
+            return await self._overlay_snapshot(cache, snapshot, analyses)
+
         try:
             project_index = ProjectIndex(
                 workspace_path=cache.project_path, last_indexed=cache.updated_at
@@ -556,15 +728,23 @@ class IncrementalProjectIndexer:
                 "parsing_errors", 0
             )
 
+            # Restore the persisted identifier index
+            project_index.identifiers = cache.identifier_index
+
             # Reconstruct file analyses and symbols
             files_to_analyze = []
             for file_path, entry in cache.file_entries.items():
+                if file_path in analyses:
+                    continue
                 if Path(file_path).exists():
                     files_to_analyze.append(file_path)
+                else:
+                    project_index.identifiers.remove_file(file_path)
 
             if files_to_analyze:
-                analyses = await self._analyze_files_batch(files_to_analyze)
+                analyses.update(await self._analyze_files_batch(files_to_analyze))
 
+            if analyses:
                 for file_path, analysis in analyses.items():
                     project_index.files[file_path] = analysis
 
@@ -573,6 +753,10 @@ class IncrementalProjectIndexer:
 
                     project_index.dependencies.extend(analysis.dependencies)
 
+                    project_index.identifiers.set_file(file_path, analysis.identifiers)
+
+                project_indexer.update_call_graph(project_index, list(analyses))
+
             return project_index
 
         except Exception as e:
@@ -581,22 +765,119 @@ class IncrementalProjectIndexer:
                 workspace_path=cache.project_path, last_indexed=time.time()
             )
 
-    async def _discover_current_files(
+    async def _overlay_snapshot(
+        self,
+        cache: IncrementalIndexCache,
+        snapshot: IndexSnapshot,
+        analyses: Dict[str, FileAnalysis],
+    ) -> ProjectIndex:
+        """Materialize the cached snapshot with changed files overlaid"""
+        overlay = snapshot.overlay()
+        for file_path in snapshot.file_paths():
+            if file_path not in cache.file_entries or not Path(file_path).exists():
+                overlay.remove_file(file_path)
+
+        missing = [
+            file_path
+            for file_path in cache.file_entries
+            if file_path not in analyses
+            and not snapshot.has_file(file_path)
+            and Path(file_path).exists()
+        ]
+        if missing:
+            analyses.update(await self._analyze_files_batch(missing))
+
+        for analysis in analyses.values():
+            overlay.update_file(analysis)
+
+        # Until the next snapshot is written, lookups see the changes too
+        self._readers[cache.project_path] = overlay
+
+        project_index = overlay.to_project_index()
+        if overlay.changed_files:
+            project_indexer.update_call_graph(project_index, overlay.changed_files)
+        project_index.last_indexed = cache.updated_at
+
+        logger.debug(
+            f"Loaded {snapshot.file_count} files from index snapshot "
+            f"({len(overlay.changed_files)} overlaid)"
+        )
+        return project_index
+
+    async def _detect_changes(
         self,
         workspace_path: str,
-        include_patterns: Optional[List[str]] = None,
+        cache: IncrementalIndexCache,
         exclude_patterns: Optional[List[str]] = None,
-    ) -> Set[str]:
-        """Discover current code files in workspace"""
-        try:
-            # Use the existing discovery logic from project_indexer
-            code_files = await project_indexer._discover_code_files(
-                workspace_path, include_patterns, exclude_patterns
-            )
-            return set(code_files)
-        except Exception as e:
-            logger.error(f"Error discovering current files: {e}")
-            return set()
+    ) -> ChangeSet:
+        """Compare the workspace against the cached file fingerprints"""
+        all_excludes = project_indexer.default_excludes.copy()
+        if exclude_patterns:
+            all_excludes.extend(exclude_patterns)
+
+        start_time = time.perf_counter()
+        loop = asyncio.get_event_loop()
+        changes = await loop.run_in_executor(
+            self.executor,
+            self.change_detector.detect,
+            workspace_path,
+            self._cached_fingerprints(cache),
+            project_indexer.supported_extensions,
+            all_excludes,
+        )
+        self.metrics["files_hashed"] += changes.files_hashed
+
+        logger.info(
+            f"Change detection: {len(changes.added)} added, "
+            f"{len(changes.modified)} modified, {len(changes.removed)} removed, "
+            f"{changes.files_hashed} hashed in "
+            f"{(time.perf_counter() - start_time) * 1000:.1f}ms"
+        )
+        return changes
+
+    def _cached_fingerprints(
+        self, cache: IncrementalIndexCache
+    ) -> Dict[str, FileFingerprint]:
+        """Fingerprints recorded for each cached file"""
+        return {
+            file_path: entry.fingerprint
+            for file_path, entry in cache.file_entries.items()
+        }
+
+    async def _fingerprint_files(
+        self, workspace_path: str, file_paths: List[str]
+    ) -> Dict[str, FileFingerprint]:
+        """Stat and hash files that change detection has not fingerprinted"""
+        loop = asyncio.get_event_loop()
+        fingerprints = await loop.run_in_executor(
+            self.executor,
+            self.change_detector.fingerprint_files,
+            workspace_path,
+            file_paths,
+        )
+        self.metrics["files_hashed"] += len(fingerprints)
+        return fingerprints
+
+    def _create_file_entry(
+        self, file_path: str, analysis: FileAnalysis, fingerprint: FileFingerprint
+    ) -> FileIndexEntry:
+        """Build the cache entry for an analyzed file"""
+        signature = fingerprint.signature
+        return FileIndexEntry(
+            file_path=file_path,
+            content_hash=fingerprint.content_hash,
+            last_modified=signature.mtime_ns / 1e9,
+            file_size=signature.size,
+            analysis_timestamp=time.time(),
+            symbols_count=len(analysis.symbols),
+            dependencies_count=len(analysis.dependencies),
+            language=analysis.language.value if analysis.language else None,
+            parsing_errors=(
+                len(analysis.parsing_errors) if analysis.parsing_errors else 0
+            ),
+            mtime_ns=signature.mtime_ns,
+            inode=signature.inode,
+        )
 
     async def _analyze_files_batch(
         self, file_paths: List[str]
@@ -609,16 +890,6 @@ class IncrementalProjectIndexer:
             logger.error(f"Error analyzing files batch: {e}")
             return {}
 
-    async def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate hash of file content"""
-        try:
-            async with aiofiles.open(file_path, "rb") as f:
-                content = await f.read()
-                return hashlib.sha256(content).hexdigest()
-        except Exception as e:
-            logger.warning(f"Error calculating hash for {file_path}: {e}")
-            return "error"
-
     def _calculate_object_hash(self, obj: Any) -> str:
         """Calculate hash of object for comparison"""
         try:
@@ -630,13 +901,18 @@ class IncrementalProjectIndexer:
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get indexer performance metrics"""
-        return self.metrics.copy()
+        metrics = self.metrics.copy()
+        metrics["shared_analysis"] = shared_analysis_store.get_metrics()
+        return metrics
 
     async def clear_cache(self, workspace_path: Optional[str] = None):
         """Clear cache for specific workspace or all caches"""
         try:
             if workspace_path:
                 cache_file = self._get_cache_file_path(workspace_path)
+                snapshot_file = self._get_snapshot_file_path(workspace_path)
+                if snapshot_file.exists():
+                    snapshot_file.unlink()
                 if cache_file.exists():
                     cache_file.unlink()
                     logger.info(f"Cleared cache for {workspace_path}")
@@ -644,6 +920,8 @@ class IncrementalProjectIndexer:
                 # Clear all caches
                 for cache_file in self.cache_dir.glob("project_index_*.cache"):
                     cache_file.unlink()
+                for snapshot_file in self.cache_dir.glob("project_index_*.snap"):
+                    snapshot_file.unlink()
                 logger.info("Cleared all project index caches")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
@@ -0,0 +1,750 @@
+"""
+Project Index Snapshots
+
+Read-optimized, memory-mapped snapshot format for a finished ProjectIndex.
+Every table is a typed column (struct-of-arrays) in a single file: a string
+table, per-file metrics, the symbol table, dependency edges, import bindings,
+call sites, identifier occurrences and resolved call edges. Per-file rows are
+addressed through CSR-style offset columns, and sorted permutations serve
+name and id lookups by binary search.
+
+Snapshots are opened read-only with mmap and accessed through memoryview
+casts, so opening costs a header parse and worker processes mapping the same
+file share its pages instead of each materializing the index. Incremental
+updates go to a SnapshotOverlay, a copy-on-write layer that shadows changed
+and removed files without touching the mapping.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..models.ast_models import (
+    CallSite,
+    ComplexityMetrics,
+    Dependency,
+    FileAnalysis,
+    IdentifierOccurrence,
+    ImportBinding,
+    LanguageType,
+    OccurrenceKind,
+    ProjectIndex,
+    Symbol,
+    SymbolType,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"LVINDEX\0"
+SNAPSHOT_VERSION = 2
+
+# magic, version, little-endian flag, section count, last indexed,
+# total/supported/error file counts, snapshot id
+HEADER = struct.Struct("<8sHHIdIII32s")
+
+# section name, byte offset, element count, array typecode
+SECTION = struct.Struct("<16sQQc7x")
+
+# String table index standing in for None
+NO_STRING = 0xFFFFFFFF
+
+# Column order of the per-file complexity metrics
+METRIC_FIELDS = (
+    "cyclomatic_complexity",
+    "cognitive_complexity",
+    "lines_of_code",
+    "number_of_functions",
+    "number_of_classes",
+    "depth_of_inheritance",
+    "coupling_between_objects",
+)
+
+SYMBOL_ASYNC = 1
+SYMBOL_STATIC = 2
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or incompatible"""
+
+
+class _SnapshotBuilder:
+    """Accumulates columns and an interned string table for one snapshot"""
+
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {}
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def column(self, name: str, typecode: str) -> array:
+        return self.columns.setdefault(name, array(typecode))
+
+    def encode_strings(self):
+        offsets = self.column("str.off", "I")
+        data = bytearray()
+        offsets.append(0)
+        for value in self.strings:
+            data += value.encode("utf-8", "surrogatepass")
+            offsets.append(len(data))
+        self.columns["str.data"] = array("B", bytes(data))
+
+
+def write_snapshot(
+    project_index: ProjectIndex, path: str, snapshot_id: Optional[str] = None
+) -> str:
+    """Write a finished index as a snapshot and return the snapshot id
+
+    The file is written next to its destination and renamed into place, so
+    processes that still map the previous snapshot keep a consistent view.
+    """
+    snapshot_id = snapshot_id or uuid.uuid4().hex
+    builder = _SnapshotBuilder()
+    builder.string(project_index.workspace_path)
+
+    kinds = list(OccurrenceKind)
+    kind_codes = {kind: code for code, kind in enumerate(kinds)}
+    kind_names = builder.column("kind.name", "I")
+    for kind in kinds:
+        kind_names.append(builder.string(kind.value))
+
+    file_paths = sorted(project_index.files)
+    file_offsets = {
+        name: builder.column(f"file.{name}", "I")
+        for name in ("sym", "dep", "imp", "call", "occ", "edge", "link", "miss", "err")
+    }
+    for offsets in file_offsets.values():
+        offsets.append(0)
+
+    call_graph = project_index.call_graph
+    symbol_ids: List[str] = []
+    symbol_names: List[str] = []
+
+    for file_path in file_paths:
+        analysis = project_index.files[file_path]
+        builder.column("file.path", "I").append(builder.string(file_path))
+        builder.column("file.lang", "I").append(
+            builder.string(LanguageType(analysis.language).value)
+        )
+        builder.column("file.time", "d").append(analysis.last_analyzed)
+        metrics = builder.column("file.cx", "i")
+        for field_name in METRIC_FIELDS:
+            metrics.append(int(getattr(analysis.complexity, field_name)))
+        builder.column("file.mi", "d").append(analysis.complexity.maintainability_index)
+
+        for message in analysis.parsing_errors:
+            builder.column("err.msg", "I").append(builder.string(message))
+
+        for symbol in analysis.symbols:
+            symbol_ids.append(symbol.id)
+            symbol_names.append(symbol.name)
+            builder.column("sym.id", "I").append(builder.string(symbol.id))
+            builder.column("sym.name", "I").append(builder.string(symbol.name))
+            builder.column("sym.type", "I").append(
+                builder.string(SymbolType(symbol.symbol_type).value)
+            )
+            builder.column("sym.pos", "i").extend(
+                (symbol.line_start, symbol.line_end, symbol.column_start, symbol.column_end)
+            )
+            builder.column("sym.sig", "I").append(builder.string(symbol.signature))
+            builder.column("sym.doc", "I").append(builder.string(symbol.docstring))
+            builder.column("sym.vis", "I").append(builder.string(symbol.visibility))
+            builder.column("sym.ret", "I").append(builder.string(symbol.return_type))
+            builder.column("sym.flags", "B").append(
+                (SYMBOL_ASYNC if symbol.is_async else 0)
+                | (SYMBOL_STATIC if symbol.is_static else 0)
+            )
+            builder.column("sym.cx", "i").append(
+                -1 if symbol.complexity is None else symbol.complexity
+            )
+            parameters = builder.column("par.name", "I")
+            parameters.extend(builder.string(name) for name in symbol.parameters)
+            parameter_offsets = builder.column("sym.par", "I")
+            if not parameter_offsets:
+                parameter_offsets.append(0)
+            parameter_offsets.append(len(parameters))
+
+        for dependency in analysis.dependencies:
+            builder.column("dep.target", "I").append(builder.string(dependency.target_file))
+            builder.column("dep.tsym", "I").append(builder.string(dependency.target_symbol))
+            builder.column("dep.type", "I").append(builder.string(dependency.dependency_type))
+            builder.column("dep.module", "I").append(builder.string(dependency.module_name))
+            builder.column("dep.line", "i").append(dependency.line_number)
+            builder.column("dep.ext", "B").append(1 if dependency.is_external else 0)
+
+        for binding in analysis.imports:
+            builder.column("imp.local", "I").append(builder.string(binding.local_name))
+            builder.column("imp.module", "I").append(builder.string(binding.module))
+            builder.column("imp.name", "I").append(builder.string(binding.name))
+            builder.column("imp.line", "i").append(binding.line)
+
+        for call in analysis.calls:
+            builder.column("call.pos", "i").extend((call.line, call.column))
+            builder.column("call.callee", "I").append(builder.string(call.callee))
+            builder.column("call.recv", "I").append(builder.string(call.receiver))
+
+        for name, occurrences in analysis.identifiers.items():
+            name_index = builder.string(name)
+            for occurrence in occurrences:
+                builder.column("occ.name", "I").append(name_index)
+                builder.column("occ.pos", "i").extend((occurrence.line, occurrence.column))
+                builder.column("occ.kind", "B").append(kind_codes[occurrence.kind])
+
+        for caller, callee in call_graph.file_edges.get(file_path, ()):
+            builder.column("edge.caller", "I").append(builder.string(caller))
+            builder.column("edge.callee", "I").append(builder.string(callee))
+
+        for target in call_graph.file_imports.get(file_path, ()):
+            builder.column("link.file", "I").append(builder.string(target))
+
+        for module in call_graph.file_unresolved.get(file_path, ()):
+            builder.column("miss.module", "I").append(builder.string(module))
+
+        for name, column in (
+            ("sym", "sym.id"),
+            ("dep", "dep.line"),
+            ("imp", "imp.line"),
+            ("call", "call.callee"),
+            ("occ", "occ.name"),
+            ("edge", "edge.caller"),
+            ("link", "link.file"),
+            ("miss", "miss.module"),
+            ("err", "err.msg"),
+        ):
+            file_offsets[name].append(len(builder.columns.get(column, ())))
+
+    # Sorted permutations for lookups by symbol name and id
+    order = range(len(symbol_ids))
+    builder.column("sym.byname", "I").extend(
+        sorted(order, key=lambda i: (symbol_names[i], i))
+    )
+    builder.column("sym.byid", "I").extend(sorted(order, key=lambda i: symbol_ids[i]))
+
+    builder.encode_strings()
+    _write_columns(project_index, path, snapshot_id, builder.columns)
+    return snapshot_id
+
+
+def _write_columns(
+    project_index: ProjectIndex, path: str, snapshot_id: str, columns: Dict[str, array]
+):
+    """Lay out the header, section directory and 8-byte aligned columns"""
+    names = sorted(columns)
+    offset = HEADER.size + SECTION.size * len(names)
+    directory = []
+    for name in names:
+        offset = (offset + 7) & ~7
+        column = columns[name]
+        directory.append((name, offset, len(column), column.typecode))
+        offset += column.itemsize * len(column)
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    SNAPSHOT_MAGIC,
+                    SNAPSHOT_VERSION,
+                    1 if sys.byteorder == "little" else 0,
+                    len(names),
+                    project_index.last_indexed,
+                    project_index.total_files,
+                    project_index.supported_files,
+                    project_index.parsing_errors,
+                    snapshot_id.encode("ascii")[:32],
+                )
+            )
+            for name, section_offset, count, typecode in directory:
+                f.write(
+                    SECTION.pack(
+                        name.encode("ascii"), section_offset, count, typecode.encode("ascii")
+                    )
+                )
+            for name, section_offset, _, _ in directory:
+                f.write(b"\0" * (section_offset - f.tell()))
+                columns[name].tofile(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class IndexSnapshot:
+    """Read-only view over a memory-mapped index snapshot
+
+    Rows are decoded into models only when asked for; decoded strings are
+    memoized per snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+
+        try:
+            self._view = memoryview(self._mmap)
+            (
+                magic,
+                version,
+                little_endian,
+                section_count,
+                self.last_indexed,
+                self.total_files,
+                self.supported_files,
+                self.parsing_errors,
+                snapshot_id,
+            ) = HEADER.unpack_from(self._mmap, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Unsupported snapshot format in {path}")
+            if bool(little_endian) != (sys.byteorder == "little"):
+                raise SnapshotError(f"Snapshot {path} was written with another byte order")
+            self.snapshot_id = snapshot_id.rstrip(b"\0").decode("ascii")
+
+            self._columns: Dict[str, memoryview] = {}
+            for i in range(section_count):
+                name, offset, count, typecode = SECTION.unpack_from(
+                    self._mmap, HEADER.size + i * SECTION.size
+                )
+                typecode = typecode.decode("ascii")
+                size = array(typecode).itemsize * count
+                if offset + size > len(self._mmap):
+                    raise SnapshotError(f"Snapshot {path} is truncated")
+                self._columns[name.rstrip(b"\0").decode("ascii")] = self._view[
+                    offset : offset + size
+                ].cast(typecode)
+        except (struct.error, SnapshotError):
+            self.close()
+            raise
+
+        self._strings: Dict[int, str] = {}
+        self._kinds = [OccurrenceKind(self.string(i)) for i in self._col("kind.name")]
+
+    def _col(self, name: str) -> memoryview:
+        column = self._columns.get(name)
+        return column if column is not None else memoryview(b"").cast("I")
+
+    def close(self):
+        """Release the mapping; models already decoded stay valid"""
+        for column in getattr(self, "_columns", {}).values():
+            column.release()
+        self._columns = {}
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "IndexSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Strings
+
+    def string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        value = self._strings.get(index)
+        if value is None:
+            offsets = self._columns["str.off"]
+            value = bytes(
+                self._columns["str.data"][offsets[index] : offsets[index + 1]]
+            ).decode("utf-8", "surrogatepass")
+            self._strings[index] = value
+        return value
+
+    @property
+    def workspace_path(self) -> str:
+        return self.string(0)
+
+    # Files
+
+    @property
+    def file_count(self) -> int:
+        return len(self._col("file.path"))
+
+    @property
+    def symbol_count(self) -> int:
+        return len(self._col("sym.id"))
+
+    def file_paths(self) -> List[str]:
+        return [self.string(i) for i in self._col("file.path")]
+
+    def _file_row(self, file_path: str) -> int:
+        """Row of a file by binary search over the sorted path column, or -1"""
+        paths = self._col("file.path")
+        low, high = 0, len(paths)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(paths[middle]) < file_path:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(paths) and self.string(paths[low]) == file_path:
+            return low
+        return -1
+
+    def has_file(self, file_path: str) -> bool:
+        return self._file_row(file_path) >= 0
+
+    def _range(self, table: str, row: int) -> range:
+        offsets = self._col(f"file.{table}")
+        return range(offsets[row], offsets[row + 1])
+
+    def file_metrics(self, file_path: str) -> Optional[ComplexityMetrics]:
+        row = self._file_row(file_path)
+        return None if row < 0 else self._metrics(row)
+
+    def _metrics(self, row: int) -> ComplexityMetrics:
+        metrics = self._col("file.cx")
+        base = row * len(METRIC_FIELDS)
+        values = {
+            field_name: metrics[base + i] for i, field_name in enumerate(METRIC_FIELDS)
+        }
+        return ComplexityMetrics.model_construct(
+            maintainability_index=self._col("file.mi")[row], **values
+        )
+
+    def file_analysis(self, file_path: str) -> Optional[FileAnalysis]:
+        row = self._file_row(file_path)
+        return None if row < 0 else self._file_analysis(row)
+
+    def _file_analysis(self, row: int) -> FileAnalysis:
+        file_path = self.string(self._col("file.path")[row])
+        return FileAnalysis.model_construct(
+            file_path=file_path,
+            language=LanguageType(self.string(self._col("file.lang")[row])),
+            ast=None,
+            symbols=[self._symbol(i, file_path) for i in self._range("sym", row)],
+            dependencies=[self._dependency(i, file_path) for i in self._range("dep", row)],
+            complexity=self._metrics(row),
+            identifiers=self._identifiers(row),
+            imports=[self._import(i) for i in self._range("imp", row)],
+            calls=[self._call(i) for i in self._range("call", row)],
+            last_analyzed=self._col("file.time")[row],
+            parsing_errors=[
+                self.string(self._col("err.msg")[i]) for i in self._range("err", row)
+            ],
+        )
+
+    # Rows
+
+    def _symbol(self, i: int, file_path: Optional[str] = None) -> Symbol:
+        if file_path is None:
+            file_row = self._owner_row("sym", i)
+            file_path = self.string(self._col("file.path")[file_row])
+        position = self._col("sym.pos")
+        parameter_offsets = self._col("sym.par")
+        parameters = self._col("par.name")
+        flags = self._col("sym.flags")[i]
+        complexity = self._col("sym.cx")[i]
+        return Symbol.model_construct(
+            id=self.string(self._col("sym.id")[i]),
+            name=self.string(self._col("sym.name")[i]),
+            symbol_type=SymbolType(self.string(self._col("sym.type")[i])),
+            file_path=file_path,
+            line_start=position[i * 4],
+            line_end=position[i * 4 + 1],
+            column_start=position[i * 4 + 2],
+            column_end=position[i * 4 + 3],
+            signature=self.string(self._col("sym.sig")[i]),
+            docstring=self.string(self._col("sym.doc")[i]),
+            visibility=self.string(self._col("sym.vis")[i]),
+            is_async=bool(flags & SYMBOL_ASYNC),
+            is_static=bool(flags & SYMBOL_STATIC),
+            parameters=[
+                self.string(parameters[p])
+                for p in range(parameter_offsets[i], parameter_offsets[i + 1])
+            ],
+            return_type=self.string(self._col("sym.ret")[i]),
+            complexity=None if complexity < 0 else complexity,
+        )
+
+    def _owner_row(self, table: str, i: int) -> int:
+        """File row whose CSR range contains row i of a table"""
+        offsets = self._col(f"file.{table}")
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if offsets[middle + 1] <= i:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _dependency(self, i: int, source_file: str) -> Dependency:
+        return Dependency.model_construct(
+            source_file=source_file,
+            target_file=self.string(self._col("dep.target")[i]),
+            target_symbol=self.string(self._col("dep.tsym")[i]),
+            dependency_type=self.string(self._col("dep.type")[i]),
+            line_number=self._col("dep.line")[i],
+            is_external=bool(self._col("dep.ext")[i]),
+            module_name=self.string(self._col("dep.module")[i]),
+        )
+
+    def _import(self, i: int) -> ImportBinding:
+        return ImportBinding(
+            self.string(self._col("imp.local")[i]),
+            self.string(self._col("imp.module")[i]),
+            self.string(self._col("imp.name")[i]),
+            self._col("imp.line")[i],
+        )
+
+    def _call(self, i: int) -> CallSite:
+        position = self._col("call.pos")
+        return CallSite(
+            position[i * 2],
+            position[i * 2 + 1],
+            self.string(self._col("call.callee")[i]),
+            self.string(self._col("call.recv")[i]),
+        )
+
+    def _identifiers(self, row: int) -> Dict[str, List[IdentifierOccurrence]]:
+        names = self._col("occ.name")
+        position = self._col("occ.pos")
+        kinds = self._col("occ.kind")
+        identifiers: Dict[str, List[IdentifierOccurrence]] = {}
+        for i in self._range("occ", row):
+            identifiers.setdefault(self.string(names[i]), []).append(
+                IdentifierOccurrence(
+                    position[i * 2], position[i * 2 + 1], self._kinds[kinds[i]]
+                )
+            )
+        return identifiers
+
+    def _call_edges(self, row: int) -> List[Tuple[str, str]]:
+        callers = self._col("edge.caller")
+        callees = self._col("edge.callee")
+        return [
+            (self.string(callers[i]), self.string(callees[i]))
+            for i in self._range("edge", row)
+        ]
+
+    # Lookups
+
+    def symbols_in_file(self, file_path: str) -> List[Symbol]:
+        row = self._file_row(file_path)
+        if row < 0:
+            return []
+        return [self._symbol(i, file_path) for i in self._range("sym", row)]
+
+    def find_symbols(self, name: str) -> List[Symbol]:
+        """Symbols with an exact name, by binary search over the name order"""
+        order = self._col("sym.byname")
+        names = self._col("sym.name")
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(names[order[middle]]) < name:
+                low = middle + 1
+            else:
+                high = middle
+        symbols = []
+        while low < len(order) and self.string(names[order[low]]) == name:
+            symbols.append(self._symbol(order[low]))
+            low += 1
+        return symbols
+
+    def get_symbol(self, symbol_id: str) -> Optional[Symbol]:
+        order = self._col("sym.byid")
+        ids = self._col("sym.id")
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(ids[order[middle]]) < symbol_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self.string(ids[order[low]]) == symbol_id:
+            return self._symbol(order[low])
+        return None
+
+    def dependencies(self, file_path: str) -> List[Dependency]:
+        row = self._file_row(file_path)
+        if row < 0:
+            return []
+        return [self._dependency(i, file_path) for i in self._range("dep", row)]
+
+    def dependency_edges(self) -> Iterator[Tuple[str, str]]:
+        """(source_file, target_file) pairs of resolved internal dependencies"""
+        targets = self._col("dep.target")
+        for row, file_path in enumerate(self.file_paths()):
+            for i in self._range("dep", row):
+                if targets[i] != NO_STRING:
+                    yield file_path, self.string(targets[i])
+
+    def call_edges(self) -> Iterator[Tuple[str, str]]:
+        callers = self._col("edge.caller")
+        callees = self._col("edge.callee")
+        for i in range(len(callers)):
+            yield self.string(callers[i]), self.string(callees[i])
+
+    # Materialization
+
+    def to_project_index(self, exclude: Iterable[str] = ()) -> ProjectIndex:
+        """Decode the snapshot into a ProjectIndex, skipping excluded files"""
+        exclude = set(exclude)
+        project_index = ProjectIndex(
+            workspace_path=self.workspace_path,
+            last_indexed=self.last_indexed,
+            total_files=self.total_files,
+            supported_files=self.supported_files,
+            parsing_errors=self.parsing_errors,
+        )
+        links = self._col("link.file")
+        missing = self._col("miss.module")
+        for row, path_index in enumerate(self._col("file.path")):
+            file_path = self.string(path_index)
+            if file_path in exclude:
+                continue
+            analysis = self._file_analysis(row)
+            _add_file(project_index, analysis)
+            project_index.call_graph.set_file(
+                file_path,
+                self._call_edges(row),
+                [self.string(links[i]) for i in self._range("link", row)],
+                [self.string(missing[i]) for i in self._range("miss", row)],
+            )
+        return project_index
+
+    def overlay(self) -> "SnapshotOverlay":
+        return SnapshotOverlay(self)
+
+
+def _add_file(project_index: ProjectIndex, analysis: FileAnalysis):
+    """Add a file's analysis to every table of a project index"""
+    project_index.files[analysis.file_path] = analysis
+    for symbol in analysis.symbols:
+        project_index.symbols[symbol.id] = symbol
+    project_index.dependencies.extend(analysis.dependencies)
+    project_index.identifiers.set_file(analysis.file_path, analysis.identifiers)
+
+
+class SnapshotOverlay:
+    """Copy-on-write layer of file changes over a read-only snapshot
+
+    Updated files shadow their snapshot rows and removed files hide them;
+    the mapping itself is never written.
+    """
+
+    def __init__(self, base: IndexSnapshot):
+        self.base = base
+        self.files: Dict[str, FileAnalysis] = {}
+        self.removed: Set[str] = set()
+
+    @property
+    def changed_files(self) -> Set[str]:
+        """Files whose snapshot rows are shadowed by the overlay"""
+        return set(self.files) | self.removed
+
+    def update_file(self, analysis: FileAnalysis):
+        self.files[analysis.file_path] = analysis
+        self.removed.discard(analysis.file_path)
+
+    def remove_file(self, file_path: str):
+        self.files.pop(file_path, None)
+        if self.base.has_file(file_path):
+            self.removed.add(file_path)
+
+    def has_file(self, file_path: str) -> bool:
+        if file_path in self.files:
+            return True
+        return file_path not in self.removed and self.base.has_file(file_path)
+
+    def file_paths(self) -> List[str]:
+        changed = self.changed_files
+        paths = [path for path in self.base.file_paths() if path not in changed]
+        return sorted(paths + list(self.files))
+
+    def file_analysis(self, file_path: str) -> Optional[FileAnalysis]:
+        if file_path in self.files:
+            return self.files[file_path]
+        if file_path in self.removed:
+            return None
+        return self.base.file_analysis(file_path)
+
+    def file_metrics(self, file_path: str) -> Optional[ComplexityMetrics]:
+        if file_path in self.files:
+            return self.files[file_path].complexity
+        if file_path in self.removed:
+            return None
+        return self.base.file_metrics(file_path)
+
+    def symbols_in_file(self, file_path: str) -> List[Symbol]:
+        if file_path in self.files:
+            return list(self.files[file_path].symbols)
+        if file_path in self.removed:
+            return []
+        return self.base.symbols_in_file(file_path)
+
+    def dependencies(self, file_path: str) -> List[Dependency]:
+        if file_path in self.files:
+            return list(self.files[file_path].dependencies)
+        if file_path in self.removed:
+            return []
+        return self.base.dependencies(file_path)
+
+    def dependency_edges(self) -> Iterator[Tuple[str, str]]:
+        changed = self.changed_files
+        for source_file, target_file in self.base.dependency_edges():
+            if source_file not in changed:
+                yield source_file, target_file
+        for analysis in self.files.values():
+            for dependency in analysis.dependencies:
+                if dependency.target_file:
+                    yield dependency.source_file, dependency.target_file
+
+    def find_symbols(self, name: str) -> List[Symbol]:
+        changed = self.changed_files
+        symbols = [s for s in self.base.find_symbols(name) if s.file_path not in changed]
+        for analysis in self.files.values():
+            symbols.extend(s for s in analysis.symbols if s.name == name)
+        return symbols
+
+    def get_symbol(self, symbol_id: str) -> Optional[Symbol]:
+        # Symbol ids are "<file path>:<name>:<line>"
+        file_path = symbol_id.rsplit(":", 2)[0]
+        if file_path in self.files:
+            return next(
+                (s for s in self.files[file_path].symbols if s.id == symbol_id), None
+            )
+        if file_path in self.removed:
+            return None
+        return self.base.get_symbol(symbol_id)
+
+    def to_project_index(self) -> ProjectIndex:
+        """Merge the overlay onto the snapshot
+
+        Call edges of changed files, and of the files importing them, are
+        left for the caller to re-resolve.
+        """
+        changed = self.changed_files
+        project_index = self.base.to_project_index(exclude=changed)
+        if not changed:
+            return project_index
+
+        for analysis in self.files.values():
+            _add_file(project_index, analysis)
+
+        project_index.total_files = len(project_index.files)
+        project_index.parsing_errors = sum(
+            1 for analysis in project_index.files.values() if analysis.parsing_errors
+        )
+        project_index.supported_files = (
+            project_index.total_files - project_index.parsing_errors
+        )
+        return project_index
@@ -18,6 +18,7 @@ from ..models.orm_models import MVPProjectORM  # ORM model for persistence
 from ..models.tenant_models import TenantType, TenantPlan
 from ..services.assembly_line_system import AssemblyLineOrchestrator, AgentType, AgentStatus
 from ..core.database import get_database_session
+from .pipeline_read_model import PipelineSnapshot, pipeline_read_model
 # from ..services.tenant_service import tenant_service  # Will be imported when proper integration is added
 
 logger = logging.getLogger(__name__)
@@ -117,11 +118,14 @@ class MVPService:
                 "stages_completed": [],
                 "current_stage_details": "Initializing assembly line system..."
             }
+            self._publish_snapshot(mvp_project)
             self._generation_logs[mvp_project_id] = []
             self._add_log(mvp_project_id, level="INFO", message="Pipeline start requested", stage="blueprint_generation")
             
             # Start assembly line in background
-            asyncio.create_task(self._run_assembly_line(mvp_project_id, technical_blueprint))
+            asyncio.create_task(self._run_assembly_line(
+                mvp_project_id, technical_blueprint, tenant_id=mvp_project.tenant_id
+            ))
             
             logger.info(f"Started MVP generation for project {mvp_project_id}")
             return True
@@ -202,6 +206,12 @@ class MVPService:
         mvp_project = await self._get_mvp_project(mvp_project_id)
         if not mvp_project:
             return None
+        return self._progress_for(mvp_project)
+    
+    def _progress_for(self, mvp_project: MVPProject) -> Optional[Dict[str, Any]]:
+        """Progress for a loaded project: live tracking data, else derived from its status"""
+        if mvp_project.id in self._generation_progress:
+            return self._generation_progress[mvp_project.id].copy()
             
         if mvp_project.status == MVPStatus.DEPLOYED:
             return {
@@ -224,6 +234,18 @@ class MVPService:
         
         return None
     
+    async def get_pipeline_snapshot(self, mvp_project_id: UUID) -> Optional[PipelineSnapshot]:
+        """Get the prepared pipeline/status read model, loading the project only on a miss"""
+        snapshot = pipeline_read_model.get(mvp_project_id)
+        if snapshot is not None:
+            return snapshot
+        mvp_project = await self._get_mvp_project(mvp_project_id)
+        return self._publish_snapshot(mvp_project) if mvp_project else None
+    
+    def pipeline_snapshot_for(self, mvp_project: MVPProject) -> PipelineSnapshot:
+        """Get the read model for an already loaded project (e.g. a listing page)"""
+        return pipeline_read_model.get(mvp_project.id) or self._publish_snapshot(mvp_project)
+    
     async def cancel_mvp_generation(self, mvp_project_id: UUID) -> bool:
         """Cancel ongoing MVP generation"""
         try:
@@ -240,8 +262,7 @@ class MVPService:
             await self._update_mvp_project(mvp_project)
             
             # Clean up progress tracking
-            if mvp_project_id in self._generation_progress:
-                del self._generation_progress[mvp_project_id]
+            self._clear_generation_progress(mvp_project_id)
             
             logger.info(f"Cancelled MVP generation for project {mvp_project_id}")
             return True
@@ -267,10 +288,22 @@ class MVPService:
             return False
 
     async def resume_mvp_generation(self, mvp_project_id: UUID) -> bool:
-        """Resume generation after pause."""
+        """Resume generation after pause, or rerun only the failed agents of a failed generation."""
         try:
             mvp_project = await self._get_mvp_project(mvp_project_id)
-            if not mvp_project or mvp_project.status != MVPStatus.PAUSED:
+            if not mvp_project:
+                return False
+            checkpoint = self.orchestrator.checkpoints.get(mvp_project_id)
+            if mvp_project.status == MVPStatus.FAILED and checkpoint and checkpoint.failed:
+                mvp_project.status = MVPStatus.GENERATING
+                mvp_project.error_message = None
+                await self._update_mvp_project(mvp_project)
+                asyncio.create_task(self._run_assembly_line(
+                    mvp_project_id, checkpoint.blueprint, tenant_id=mvp_project.tenant_id, resume=True
+                ))
+                self._add_log(mvp_project_id, level="INFO", message="Pipeline resumed from checkpoint", stage="backend_development")
+                return True
+            if mvp_project.status != MVPStatus.PAUSED:
                 return False
             resumed = await self.orchestrator.resume_generation(mvp_project_id)
             if resumed:
@@ -287,7 +320,9 @@ class MVPService:
     async def _run_assembly_line(
         self,
         mvp_project_id: UUID,
-        technical_blueprint: TechnicalBlueprint
+        technical_blueprint: TechnicalBlueprint,
+        tenant_id: Optional[UUID] = None,
+        resume: bool = False
     ):
         """Run the assembly line system for MVP generation"""
         try:
@@ -301,7 +336,9 @@ class MVPService:
             success = await self.orchestrator.start_mvp_generation(
                 mvp_project_id,
                 technical_blueprint,
-                priority="normal"
+                priority="normal",
+                tenant_id=tenant_id,
+                resume=resume
             )
             
             # Update final status
@@ -326,8 +363,7 @@ class MVPService:
                 await self._update_mvp_project(mvp_project)
             
             # Clean up progress tracking
-            if mvp_project_id in self._generation_progress:
-                del self._generation_progress[mvp_project_id]
+            self._clear_generation_progress(mvp_project_id)
             
             logger.info(f"Assembly line completed for project {mvp_project_id} with success: {success}")
             
@@ -388,6 +424,7 @@ class MVPService:
         elif status == AgentStatus.FAILED:
             progress_data["current_stage_details"] = f"Failed at {agent_type.value} agent"
             self._add_log(mvp_project_id, level="ERROR", message=progress_data["current_stage_details"], stage=agent_type.value)
+        pipeline_read_model.publish_progress(mvp_project_id, progress_data)
 
         # Persist progress to database (best-effort)
         try:
@@ -462,6 +499,7 @@ class MVPService:
                 session.add(orm)
                 await session.flush()
                 break
+            self._publish_snapshot(mvp_project)
             logger.info(f"Saved MVP project {mvp_project.id} to database")
         except Exception:
             # Fallback to in-memory
@@ -470,8 +508,20 @@ class MVPService:
                 self._projects_by_tenant[mvp_project.tenant_id] = []
             if mvp_project.id not in self._projects_by_tenant[mvp_project.tenant_id]:
                 self._projects_by_tenant[mvp_project.tenant_id].append(mvp_project.id)
+            self._publish_snapshot(mvp_project)
             logger.info(f"Saved MVP project {mvp_project.id} to in-memory storage (DB unavailable)")
 
+    def _publish_snapshot(self, mvp_project: MVPProject) -> PipelineSnapshot:
+        """Refresh the pipeline read model after a project or progress change"""
+        return pipeline_read_model.publish(mvp_project, self._progress_for(mvp_project))
+    
+    def _clear_generation_progress(self, mvp_project_id: UUID):
+        """Stop live progress tracking; status is derived from the project again"""
+        self._generation_progress.pop(mvp_project_id, None)
+        snapshot = pipeline_read_model.peek(mvp_project_id)
+        if snapshot is not None:
+            self._publish_snapshot(snapshot.project)
+
     # In-memory logs API with DB persistence (best-effort)
     def _add_log(self, mvp_project_id: UUID, *, level: str, message: str, stage: str):
         """Append a log entry in-memory and persist to DB best-effort.
@@ -570,6 +620,7 @@ class MVPService:
         # Fast path for tests/in-memory to avoid DB churn
         if mvp_project.id in self._projects_storage:
             self._projects_storage[mvp_project.id] = mvp_project
+            self._publish_snapshot(mvp_project)
             logger.info(f"Updated MVP project {mvp_project.id} in memory")
             return
         try:
@@ -598,6 +649,7 @@ class MVPService:
             # Fallback to in-memory
             self._projects_storage[mvp_project.id] = mvp_project
             logger.info(f"Updated MVP project {mvp_project.id} in memory")
+        self._publish_snapshot(mvp_project)
     
     async def _get_mvp_project(self, mvp_project_id: UUID) -> Optional[MVPProject]:
         """Get MVP project from database (best-effort), fallback to in-memory."""
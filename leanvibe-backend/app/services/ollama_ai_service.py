@@ -9,9 +9,12 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, Any, Optional, List
+from contextlib import aclosing
+from typing import Dict, Any, AsyncIterator, Optional, List
 import httpx
 
+from ..core.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,9 @@ class OllamaAIService:
         self.total_response_time = 0
         self.last_response_time = 0
         
+        # Identical concurrent prompts share one generation
+        self._inflight = SingleFlight("ollama")
+        
     async def initialize(self) -> bool:
         """Initialize Ollama connection and check available models"""
         try:
@@ -83,6 +89,20 @@ class OllamaAIService:
                       max_tokens: int = 1000,
                       temperature: float = 0.1,
                       stream: bool = False) -> Optional[str]:
+        """Generate response using Ollama, coalescing identical in-flight prompts"""
+        model = model or self.default_model
+        key = SingleFlight.make_key(model, prompt, max_tokens, temperature)
+        result, _ = await self._inflight.do(
+            key, self._generate, prompt, model, max_tokens, temperature, stream
+        )
+        return result
+    
+    async def _generate(self,
+                        prompt: str,
+                        model: Optional[str] = None,
+                        max_tokens: int = 1000,
+                        temperature: float = 0.1,
+                        stream: bool = False) -> Optional[str]:
         """Generate response using Ollama"""
         if not self.initialized:
             logger.error("Ollama service not initialized")
@@ -105,6 +125,15 @@ class OllamaAIService:
             
             logger.debug(f"🤖 Generating response with {model}")
             
+            if stream:
+                # Collect the incremental stream into a single response
+                chunks = [
+                    token async for token in self._generate_stream(
+                        prompt, model=model, max_tokens=max_tokens, temperature=temperature
+                    )
+                ]
+                return "".join(chunks)
+            
             response = await self.client.post(
                 f"{self.base_url}/api/generate",
                 json=payload
@@ -131,6 +160,88 @@ class OllamaAIService:
             logger.error(f"❌ Generation error: {e}")
             return None
     
+    async def generate_stream(self,
+                              prompt: str,
+                              model: Optional[str] = None,
+                              max_tokens: int = 1000,
+                              temperature: float = 0.1) -> AsyncIterator[str]:
+        """Stream a response, fanning one generation out to identical concurrent prompts"""
+        model = model or self.default_model
+        key = SingleFlight.make_key("stream", model, prompt, max_tokens, temperature)
+        async with aclosing(
+            self._inflight.stream(
+                key,
+                lambda: self._generate_stream(prompt, model, max_tokens, temperature),
+            )
+        ) as tokens:
+            async for token in tokens:
+                yield token
+    
+    async def _generate_stream(self,
+                               prompt: str,
+                               model: Optional[str] = None,
+                               max_tokens: int = 1000,
+                               temperature: float = 0.1) -> AsyncIterator[str]:
+        """Generate a response incrementally, yielding tokens as Ollama emits them.
+        
+        Tokens are read from the HTTP response as they arrive, so a slow consumer
+        naturally throttles the upstream connection. Closing the iterator closes
+        the HTTP stream, which cancels generation on the Ollama side.
+        """
+        if not self.initialized:
+            raise RuntimeError("Ollama service not initialized")
+        
+        model = model or self.default_model
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        
+        start_time = time.time()
+        first_token_time = None
+        generated_chars = 0
+        
+        async with self.client.stream(
+            "POST", f"{self.base_url}/api/generate", json=payload
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise RuntimeError(
+                    f"Generation failed: {response.status_code} - {body.decode(errors='replace')}"
+                )
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                
+                token = chunk.get("response", "")
+                if token:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    generated_chars += len(token)
+                    yield token
+                
+                if chunk.get("done"):
+                    break
+        
+        response_time = time.time() - start_time
+        self.last_response_time = response_time
+        self.request_count += 1
+        self.total_response_time += response_time
+        
+        logger.info(
+            f"✅ Streamed response in {response_time:.2f}s "
+            f"(first token {first_token_time or 0:.2f}s, {generated_chars} chars)"
+        )
+    
     async def analyze_code(self, 
                           code: str, 
                           language: str = "python",
@@ -292,13 +403,16 @@ Focus on:
         """Get performance statistics"""
         avg_response_time = (self.total_response_time / self.request_count 
                            if self.request_count > 0 else 0)
+        coalescing = self._inflight.get_stats()
         
         return {
             "total_requests": self.request_count,
             "average_response_time": avg_response_time,
             "last_response_time": self.last_response_time,
             "current_model": self.default_model,
-            "available_models": len(self.available_models)
+            "available_models": len(self.available_models),
+            "coalesced_requests": coalescing["coalesced"],
+            "request_coalescing": coalescing
         }
 
 
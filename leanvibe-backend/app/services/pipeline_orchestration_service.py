@@ -25,9 +25,10 @@ from ..services.human_gate_service import human_gate_service
 from ..services.email_service import email_service
 from ..services.blueprint_refinement_service import blueprint_refinement_service
 from ..services.mvp_service import mvp_service
+from ..services.pipeline_read_model import pipeline_read_model
 from ..services.monitoring_service import monitoring_service
 from ..models.orm_models import PipelineExecutionORM, PipelineExecutionLogORM
-from ..core.database import get_database_session
+from ..core.database import get_background_session
 
 logger = logging.getLogger(__name__)
 
@@ -209,7 +210,7 @@ class PipelineOrchestrationService:
             await self._update_execution(execution)
             # Persist execution start
             try:
-                async for session in get_database_session():
+                async for session in get_background_session():
                     orm = PipelineExecutionORM(
                         id=execution.id,
                         mvp_project_id=execution.mvp_project_id,
@@ -269,7 +270,7 @@ class PipelineOrchestrationService:
             await self._update_execution(execution)
             # Persist failure
             try:
-                async for session in get_database_session():
+                async for session in get_background_session():
                     from sqlalchemy import select
                     result = await session.execute(select(PipelineExecutionORM).where(PipelineExecutionORM.id == execution.id))
                     row = result.scalar_one_or_none()
@@ -570,7 +571,7 @@ class PipelineOrchestrationService:
         await self._update_execution(execution)
         # Persist transition
         try:
-            async for session in get_database_session():
+            async for session in get_background_session():
                 from sqlalchemy import select
                 result = await session.execute(select(PipelineExecutionORM).where(PipelineExecutionORM.id == execution.id))
                 row = result.scalar_one_or_none()
@@ -597,7 +598,7 @@ class PipelineOrchestrationService:
         await self._update_execution(execution)
         # Persist progress
         try:
-            async for session in get_database_session():
+            async for session in get_background_session():
                 from sqlalchemy import select
                 result = await session.execute(select(PipelineExecutionORM).where(PipelineExecutionORM.id == execution.id))
                 row = result.scalar_one_or_none()
@@ -622,6 +623,14 @@ class PipelineOrchestrationService:
     async def _update_execution(self, execution: PipelineExecution):
         """Update pipeline execution"""
         self._executions[execution.id] = execution
+        pipeline_read_model.publish_execution(execution.mvp_project_id, {
+            "execution_id": str(execution.id),
+            "stage": execution.current_stage.value,
+            "status": execution.status.value,
+            "stage_progress": execution.current_stage_progress,
+            "stages_completed": [stage.value for stage in execution.stages_completed],
+            "error_message": execution.error_message,
+        })
     
     async def _get_execution(self, execution_id: UUID) -> Optional[PipelineExecution]:
         """Get pipeline execution by ID"""
@@ -0,0 +1,315 @@
+"""
+Pipeline Read Model - in-memory, versioned status snapshots for polling clients
+Serves pipeline and status responses without touching the database and lets
+clients revalidate with ETags or long-poll for the next version
+"""
+
+import asyncio
+import copy
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from ..models.mvp_models import MVPProject, MVPStatus
+from ..models.pipeline_models import (
+    PipelineLogEntry, PipelineProgress, PipelineResponse, PipelineStage,
+    PipelineStatus, PipelineStatusResponse,
+)
+from .storage.local_storage_service import etag_matches
+
+logger = logging.getLogger(__name__)
+
+STATUS_MAPPING = {
+    MVPStatus.BLUEPRINT_PENDING: PipelineStatus.BLUEPRINT_PENDING,
+    MVPStatus.GENERATING: PipelineStatus.GENERATING,
+    MVPStatus.DEPLOYED: PipelineStatus.DEPLOYED,
+    MVPStatus.FAILED: PipelineStatus.FAILED,
+    MVPStatus.CANCELLED: PipelineStatus.CANCELLED
+}
+
+STAGE_MAPPING = {
+    "backend": PipelineStage.BACKEND_DEVELOPMENT,
+    "frontend": PipelineStage.FRONTEND_DEVELOPMENT,
+    "infrastructure": PipelineStage.INFRASTRUCTURE_SETUP,
+    "observability": PipelineStage.DEPLOYMENT
+}
+
+ALL_STAGES_COMPLETED = ["backend", "frontend", "infrastructure", "observability"]
+
+
+def _progress_model(progress_data: Dict[str, Any]) -> PipelineProgress:
+    return PipelineProgress(
+        overall_progress=progress_data.get("overall_progress", 0.0),
+        stage_progress=progress_data.get("stage_progress", 0.0),
+        estimated_completion=progress_data.get("estimated_completion"),
+        stages_completed=progress_data.get("stages_completed", []),
+        current_stage_details=progress_data.get("current_stage_details", "")
+    )
+
+
+def build_pipeline_response(mvp_project: MVPProject, progress_data: Optional[Dict[str, Any]]) -> PipelineResponse:
+    """Convert MVP project and generation progress to pipeline response"""
+    pipeline_status = STATUS_MAPPING.get(mvp_project.status, PipelineStatus.FAILED)
+
+    # Determine current stage
+    if mvp_project.status == MVPStatus.BLUEPRINT_PENDING:
+        current_stage = PipelineStage.BLUEPRINT_GENERATION
+    elif mvp_project.status == MVPStatus.GENERATING:
+        current_stage = STAGE_MAPPING.get(
+            (progress_data or {}).get("current_stage", ""),
+            PipelineStage.BACKEND_DEVELOPMENT
+        )
+    elif mvp_project.status == MVPStatus.DEPLOYED:
+        current_stage = PipelineStage.DEPLOYMENT
+    else:
+        current_stage = PipelineStage.BLUEPRINT_GENERATION
+
+    if progress_data:
+        progress = _progress_model(progress_data)
+    elif mvp_project.status == MVPStatus.DEPLOYED:
+        progress = PipelineProgress(
+            overall_progress=100.0,
+            stage_progress=100.0,
+            estimated_completion=mvp_project.completed_at,
+            stages_completed=list(ALL_STAGES_COMPLETED),
+            current_stage_details="Pipeline completed successfully"
+        )
+    else:
+        progress = PipelineProgress(
+            overall_progress=0.0,
+            stage_progress=0.0,
+            estimated_completion=mvp_project.created_at + timedelta(hours=6),
+            stages_completed=[],
+            current_stage_details=mvp_project.error_message or "Pipeline not active"
+        )
+
+    return PipelineResponse(
+        id=mvp_project.id,
+        project_name=mvp_project.project_name,
+        status=pipeline_status,
+        current_stage=current_stage,
+        progress=progress,
+        created_at=mvp_project.created_at,
+        estimated_completion=progress.estimated_completion,
+        tenant_id=mvp_project.tenant_id,
+        created_by=mvp_project.tenant_id  # TODO: Add proper user tracking
+    )
+
+
+def build_status_response(
+    mvp_project: MVPProject,
+    progress_data: Optional[Dict[str, Any]],
+    execution: Optional[Dict[str, Any]] = None
+) -> PipelineStatusResponse:
+    """Convert MVP project and generation progress to a real-time status response"""
+    pipeline_status = STATUS_MAPPING.get(mvp_project.status, PipelineStatus.FAILED)
+
+    if progress_data:
+        progress = _progress_model(progress_data)
+        current_stage = {
+            **STAGE_MAPPING,
+            "completed": PipelineStage.DEPLOYMENT,
+            "failed": PipelineStage.BLUEPRINT_GENERATION
+        }.get(progress_data.get("current_stage", ""), PipelineStage.BLUEPRINT_GENERATION)
+    else:
+        # Default progress for non-generating pipelines
+        progress = PipelineProgress(
+            overall_progress=100.0 if pipeline_status == PipelineStatus.DEPLOYED else 0.0,
+            stage_progress=0.0,
+            estimated_completion=mvp_project.completed_at,
+            stages_completed=[],
+            current_stage_details=mvp_project.error_message or "Pipeline not active"
+        )
+        current_stage = PipelineStage.BLUEPRINT_GENERATION
+
+    logs = []
+    if mvp_project.status == MVPStatus.GENERATING and progress_data:
+        logs.append(PipelineLogEntry(
+            timestamp=mvp_project.updated_at,
+            level="INFO",
+            message=progress_data.get("current_stage_details", "Processing..."),
+            stage=current_stage
+        ))
+
+    stage_details = dict(progress_data or {})
+    if execution:
+        stage_details["orchestration"] = dict(execution)
+
+    return PipelineStatusResponse(
+        status=pipeline_status,
+        current_stage=current_stage,
+        progress=progress,
+        stage_details=stage_details,
+        logs=logs,
+        error_message=mvp_project.error_message
+    )
+
+
+@dataclass
+class PipelineSnapshot:
+    """Prepared responses for one pipeline at a given version"""
+    project: MVPProject
+    progress: Optional[Dict[str, Any]]
+    pipeline: PipelineResponse
+    status: PipelineStatusResponse
+    version: int
+    epoch: str
+    refreshed_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def pipeline_id(self) -> UUID:
+        return self.project.id
+
+    @property
+    def tenant_id(self) -> UUID:
+        return self.project.tenant_id
+
+    def etag(self, representation: str = "status") -> str:
+        return f'"{representation}-{self.epoch}-{self.pipeline_id.hex}-{self.version}"'
+
+    def not_modified(self, if_none_match: Optional[str], representation: str = "status") -> bool:
+        return etag_matches(if_none_match, self.etag(representation))
+
+    def headers(self, representation: str = "status") -> Dict[str, str]:
+        return {
+            "ETag": self.etag(representation),
+            "X-Pipeline-Version": str(self.version),
+            "Cache-Control": "private, no-cache",
+        }
+
+
+class PipelineReadModel:
+    """Versioned in-memory snapshots of pipeline status, updated on every write
+
+    Writers (MVPService, PipelineOrchestrationService) publish the current
+    project, progress and orchestration state; the version only moves when
+    the rendered responses change. Snapshots not refreshed within ``ttl``
+    seconds are treated as missing so changes made by other processes are
+    picked up from the database.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.epoch = uuid.uuid4().hex[:8]  # distinguishes versions across restarts
+        self._snapshots: "OrderedDict[UUID, PipelineSnapshot]" = OrderedDict()
+        self._executions: "OrderedDict[UUID, Dict[str, Any]]" = OrderedDict()
+        self._changed: Dict[UUID, Set[asyncio.Event]] = {}  # long-poll waiters
+        self._stats = {"hits": 0, "misses": 0, "publishes": 0, "versions": 0}
+
+    def get(self, pipeline_id: UUID) -> Optional[PipelineSnapshot]:
+        """Get a fresh snapshot, or None if it must be loaded from the database"""
+        snapshot = self._snapshots.get(pipeline_id)
+        if snapshot is None or time.monotonic() - snapshot.refreshed_at > self.ttl:
+            self._stats["misses"] += 1
+            return None
+        self._snapshots.move_to_end(pipeline_id)
+        self._stats["hits"] += 1
+        return snapshot
+
+    def peek(self, pipeline_id: UUID) -> Optional[PipelineSnapshot]:
+        """Get the last snapshot regardless of age"""
+        return self._snapshots.get(pipeline_id)
+
+    def publish(self, mvp_project: MVPProject, progress_data: Optional[Dict[str, Any]]) -> PipelineSnapshot:
+        """Render and store a snapshot, bumping the version if anything changed"""
+        progress_data = copy.deepcopy(progress_data) if progress_data else None
+        pipeline = build_pipeline_response(mvp_project, progress_data)
+        status = build_status_response(mvp_project, progress_data, self._executions.get(mvp_project.id))
+
+        self._stats["publishes"] += 1
+        previous = self._snapshots.get(mvp_project.id)
+        if previous and previous.pipeline == pipeline and previous.status == status:
+            previous.project = mvp_project
+            previous.progress = progress_data
+            previous.refreshed_at = time.monotonic()
+            self._snapshots.move_to_end(mvp_project.id)
+            return previous
+
+        snapshot = PipelineSnapshot(
+            project=mvp_project,
+            progress=progress_data,
+            pipeline=pipeline,
+            status=status,
+            version=previous.version + 1 if previous else 1,
+            epoch=self.epoch,
+        )
+        self._snapshots[mvp_project.id] = snapshot
+        self._snapshots.move_to_end(mvp_project.id)
+        while len(self._snapshots) > self.max_entries:
+            evicted, _ = self._snapshots.popitem(last=False)
+            self._executions.pop(evicted, None)
+        self._stats["versions"] += 1
+        self._notify(mvp_project.id)
+        return snapshot
+
+    def publish_progress(self, pipeline_id: UUID, progress_data: Optional[Dict[str, Any]]) -> Optional[PipelineSnapshot]:
+        """Apply a progress update to the last known project"""
+        snapshot = self._snapshots.get(pipeline_id)
+        if snapshot is None:
+            return None
+        return self.publish(snapshot.project, progress_data)
+
+    def publish_execution(self, pipeline_id: UUID, execution: Dict[str, Any]) -> Optional[PipelineSnapshot]:
+        """Record orchestration stage state shown in the status stage details"""
+        self._executions[pipeline_id] = execution
+        self._executions.move_to_end(pipeline_id)
+        while len(self._executions) > self.max_entries:
+            self._executions.popitem(last=False)
+        snapshot = self._snapshots.get(pipeline_id)
+        if snapshot is None:
+            return None
+        return self.publish(snapshot.project, snapshot.progress)
+
+    def invalidate(self, pipeline_id: UUID):
+        """Drop a snapshot so the next read reloads it"""
+        self._snapshots.pop(pipeline_id, None)
+        self._executions.pop(pipeline_id, None)
+        self._notify(pipeline_id)
+
+    async def wait_for_change(self, pipeline_id: UUID, version: int, timeout: float) -> Optional[PipelineSnapshot]:
+        """Long-poll until the snapshot moves past ``version`` or the timeout expires"""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._snapshots.get(pipeline_id)
+            if snapshot is None or snapshot.version != version:
+                return snapshot
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return snapshot
+            event = asyncio.Event()
+            waiters = self._changed.setdefault(pipeline_id, set())
+            waiters.add(event)
+            try:
+                await asyncio.wait_for(event.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return self._snapshots.get(pipeline_id)
+            finally:
+                # Timed-out and cancelled waiters must not stay registered
+                waiters.discard(event)
+                if not waiters and self._changed.get(pipeline_id) is waiters:
+                    del self._changed[pipeline_id]
+
+    def list_etag(self, snapshots: Iterable[PipelineSnapshot]) -> str:
+        """ETag for a page of pipelines, derived from member versions"""
+        digest = hashlib.sha1(self.epoch.encode())
+        for snapshot in snapshots:
+            digest.update(f"{snapshot.pipeline_id.hex}:{snapshot.version};".encode())
+        return f'"list-{digest.hexdigest()[:16]}"'
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "entries": len(self._snapshots), "waiters": len(self._changed)}
+
+    def _notify(self, pipeline_id: UUID):
+        for event in self._changed.pop(pipeline_id, ()):
+            event.set()
+
+
+# Global pipeline read model instance
+pipeline_read_model = PipelineReadModel()
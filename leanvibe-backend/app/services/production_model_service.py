@@ -7,9 +7,10 @@ to support the ProductionMLXStrategy in the unified_mlx_service.
 
 import asyncio
 import logging
+import threading
 import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
 
 import mlx.core as mx
 
@@ -22,8 +23,67 @@ except ImportError:
     load = None
     generate = None
 
+try:
+    from mlx_lm import stream_generate
+except ImportError:
+    stream_generate = None
+
 logger = logging.getLogger(__name__)
 
+# Sentinel marking the end of a threaded token stream
+_STREAM_END = object()
+
+
+async def _iterate_in_thread(
+    make_iterable: Callable[[], Iterable[Any]], buffer_size: int = 32
+) -> AsyncIterator[Any]:
+    """Drive a blocking iterator in a worker thread and yield its items.
+
+    At most ``buffer_size`` items are buffered: the worker blocks until the
+    consumer catches up (backpressure), and stops as soon as the consumer
+    goes away (cancellation).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.BoundedSemaphore(buffer_size)
+    cancelled = threading.Event()
+
+    def _publish(item: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # Event loop already closed - nobody is listening anymore
+            cancelled.set()
+
+    def _produce() -> None:
+        try:
+            for item in make_iterable():
+                while not slots.acquire(timeout=0.1):
+                    if cancelled.is_set():
+                        return
+                if cancelled.is_set():
+                    return
+                _publish(item)
+        except Exception as e:
+            _publish(e)
+        finally:
+            _publish(_STREAM_END)
+
+    producer = loop.run_in_executor(None, _produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            slots.release()
+            yield item
+    finally:
+        cancelled.set()
+        if producer.done():
+            producer.result()
+
 
 class ModelConfig:
     """Minimal model configuration for compatibility"""
@@ -33,6 +93,7 @@ class ModelConfig:
         self.temperature = 0.7
         self.max_tokens = 512
         self.server_url = "http://localhost:8080"
+        self.stream_buffer_size = 32  # Tokens buffered ahead of a slow consumer
 
 
 class ProductionModelService:
@@ -214,6 +275,87 @@ The service is operating in mock mode for development and testing.
 *Max tokens: {max_tokens}*
 """
 
+    async def generate_text_stream(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Generate text incrementally, yielding tokens as the model produces them"""
+        if not self.is_initialized:
+            raise RuntimeError("Model service not initialized")
+
+        if max_tokens is None:
+            max_tokens = self.config.max_tokens
+        if temperature is None:
+            temperature = self.config.temperature
+
+        start_time = time.time()
+
+        if self.deployment_mode == "direct" and stream_generate is not None:
+            tokens = self._stream_direct(prompt, max_tokens, temperature)
+        elif self.deployment_mode == "direct":
+            # mlx-lm without stream_generate: fall back to a single chunk
+            tokens = self._stream_single(prompt, max_tokens, temperature)
+        else:  # mock mode
+            tokens = self._stream_mock(prompt, max_tokens, temperature)
+
+        async for token in tokens:
+            yield token
+
+        self.health_status["last_inference_time"] = time.time() - start_time
+        self.health_status["total_inferences"] += 1
+
+    async def _stream_direct(
+        self, prompt: str, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream tokens from MLX-LM, running generation in a worker thread"""
+        formatted_prompt = self._format_chat_prompt(prompt)
+
+        def _tokens():
+            for chunk in stream_generate(
+                self.model,
+                self.tokenizer,
+                prompt=formatted_prompt,
+                max_tokens=max_tokens,
+            ):
+                # Newer mlx-lm yields GenerationResponse objects, older ones plain text
+                yield getattr(chunk, "text", chunk)
+
+        async for token in _iterate_in_thread(_tokens, self.config.stream_buffer_size):
+            if token:
+                yield token
+
+    async def _stream_single(
+        self, prompt: str, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Emit a non-streaming generation as one chunk"""
+        yield await self._generate_direct(prompt, max_tokens, temperature)
+
+    async def _stream_mock(
+        self, prompt: str, max_tokens: int, temperature: float
+    ) -> AsyncIterator[str]:
+        """Stream the mock response word by word for development"""
+        response = await self._generate_mock(prompt, max_tokens, temperature)
+        for word in response.split(" "):
+            yield word + " "
+            await asyncio.sleep(0)
+
+    def _format_chat_prompt(self, prompt: str) -> str:
+        """Apply the tokenizer chat template when available"""
+        messages = [
+            {"role": "system", "content": "You are a helpful coding assistant."},
+            {"role": "user", "content": prompt},
+        ]
+        if hasattr(self.tokenizer, "apply_chat_template"):
+            try:
+                return self.tokenizer.apply_chat_template(
+                    messages, tokenize=False, add_generation_prompt=True
+                )
+            except Exception as e:
+                logger.debug(f"Chat template unavailable, using raw prompt: {e}")
+        return prompt
+
     def get_health_status(self) -> Dict[str, Any]:
         """Get current health status"""
         return {
@@ -5,27 +5,130 @@ Handles project-wide code indexing, symbol cross-referencing, and dependency ana
 """
 
 import asyncio
-import fnmatch
 import logging
+import os
 import time
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from ..models.ast_models import (
     CallGraph,
+    CallSite,
+    Dependency,
     DependencyGraph,
     FileAnalysis,
     LanguageType,
+    OccurrenceKind,
     ProjectIndex,
     Reference,
     Symbol,
+    SymbolType,
 )
 from .ast_service import ASTAnalysisService
+from .change_detector import FileSignature, change_detector
+from .file_reader import FileContent, file_reader
+from .index_snapshot import SnapshotOverlay
 from .tree_sitter_parsers import TreeSitterManager
 
 logger = logging.getLogger(__name__)
 
+# Receivers that refer to the enclosing class instance
+SELF_RECEIVERS = {"self", "cls", "this"}
+
+# Method names a constructor call resolves to
+CONSTRUCTOR_NAMES = ("__init__", "constructor")
+
+# Suffixes tried when resolving a relative JavaScript/TypeScript import
+JS_MODULE_SUFFIXES = (".js", ".ts", ".jsx", ".tsx")
+
+# Local import name -> (imported file, imported member or None for the module)
+ImportMap = Dict[str, Tuple[str, Optional[str]]]
+
+
+class _FileScopes:
+    """Functions, classes and methods of one file, with their nesting"""
+
+    def __init__(self, symbols: List[Symbol]):
+        self.definitions = sorted(
+            (
+                symbol
+                for symbol in symbols
+                if symbol.symbol_type
+                in (SymbolType.FUNCTION, SymbolType.METHOD, SymbolType.CLASS)
+            ),
+            key=lambda symbol: (symbol.line_start, -symbol.line_end),
+        )
+        self.functions: Dict[str, Symbol] = {}
+        self.classes: Dict[str, Symbol] = {}
+        self.methods: Dict[Tuple[str, str], Symbol] = {}
+
+        stack: List[Symbol] = []
+        for symbol in self.definitions:
+            while stack and stack[-1].line_end < symbol.line_start:
+                stack.pop()
+            parent = stack[-1] if stack else None
+            if symbol.symbol_type == SymbolType.CLASS:
+                self.classes.setdefault(symbol.name, symbol)
+            elif parent is not None and parent.symbol_type == SymbolType.CLASS:
+                self.methods.setdefault((parent.id, symbol.name), symbol)
+            else:
+                self.functions.setdefault(symbol.name, symbol)
+            stack.append(symbol)
+
+    def callable(self, name: str) -> Optional[Symbol]:
+        """Function called by name, or the constructor of a class called by name"""
+        function = self.functions.get(name)
+        if function is not None:
+            return function
+        cls = self.classes.get(name)
+        if cls is None:
+            return None
+        for constructor in CONSTRUCTOR_NAMES:
+            method = self.methods.get((cls.id, constructor))
+            if method is not None:
+                return method
+        return None
+
+    def enclosing(
+        self, calls: List[CallSite]
+    ) -> Iterator[Tuple[CallSite, Optional[Symbol], Optional[Symbol]]]:
+        """Pair each call, in line order, with its innermost function and class"""
+        stack: List[Symbol] = []
+        index = 0
+        for call in calls:
+            while (
+                index < len(self.definitions)
+                and self.definitions[index].line_start <= call.line
+            ):
+                symbol = self.definitions[index]
+                while stack and stack[-1].line_end < symbol.line_start:
+                    stack.pop()
+                stack.append(symbol)
+                index += 1
+            while stack and stack[-1].line_end < call.line:
+                stack.pop()
+
+            function = cls = None
+            for symbol in reversed(stack):
+                if symbol.symbol_type == SymbolType.CLASS:
+                    cls = cls or symbol
+                elif function is None and cls is None:
+                    function = symbol
+            yield call, function, cls
+
 
 class ProjectIndexer:
     """Indexes and analyzes entire projects for code understanding"""
@@ -68,48 +171,126 @@ class ProjectIndexer:
         exclude_patterns: Optional[List[str]] = None,
     ) -> ProjectIndex:
         """Index an entire project"""
+        project_index = ProjectIndex(workspace_path=workspace_path, last_indexed=time.time())
+        async with aclosing(
+            self.index_project_progressively(
+                workspace_path, include_patterns, exclude_patterns
+            )
+        ) as snapshots:
+            async for project_index in snapshots:
+                pass
+        return project_index
+
+    async def index_project_progressively(
+        self,
+        workspace_path: str,
+        include_patterns: Optional[List[str]] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        priority_files: Optional[Iterable[str]] = None,
+        batch_size: int = 10,
+    ) -> AsyncIterator[ProjectIndex]:
+        """Index a project, yielding the partial index as each batch completes
+
+        Files open in the client are analyzed first, then the rest from most
+        to least recently modified. All files go through a single read-ahead
+        pipeline, and a snapshot is published every ``batch_size`` files. Every snapshot is the same live index,
+        with ``complete`` unset until cross-references and metrics are built.
+        """
         try:
             start_time = time.time()
             logger.info(f"Starting project indexing: {workspace_path}")
 
             # Initialize project index
             project_index = ProjectIndex(
-                workspace_path=workspace_path, last_indexed=time.time()
+                workspace_path=workspace_path, last_indexed=time.time(), complete=False
             )
 
-            # Discover code files
-            code_files = await self._discover_code_files(
-                workspace_path, include_patterns, exclude_patterns
-            )
+            # Discover code files, most relevant first
+            signatures = await self._scan_code_files(workspace_path, exclude_patterns)
+            code_files = self._prioritize_files(signatures, priority_files)
             project_index.total_files = len(code_files)
 
             logger.info(f"Found {len(code_files)} code files to analyze")
 
-            # Analyze files in batches for performance
-            batch_size = 10
-            for i in range(0, len(code_files), batch_size):
-                batch = code_files[i : i + batch_size]
-                batch_results = await self._analyze_file_batch(batch)
-
-                for file_path, analysis in batch_results.items():
-                    if analysis.parsing_errors:
-                        project_index.parsing_errors += 1
-                    else:
-                        project_index.supported_files += 1
-
-                    # Store file analysis
-                    project_index.files[file_path] = analysis
-
-                    # Index symbols
-                    for symbol in analysis.symbols:
-                        project_index.symbols[symbol.id] = symbol
-
-                    # Store dependencies
-                    project_index.dependencies.extend(analysis.dependencies)
-
-                # Progress logging
-                analyzed = min(i + batch_size, len(code_files))
-                logger.info(f"Analyzed {analyzed}/{len(code_files)} files")
+            # Analyze files through one read-ahead pipeline, merging results
+            # in priority order and publishing a snapshot every batch_size files
+            analyses: Dict[str, FileAnalysis] = {}
+            unlinked: List[str] = []
+            merged = 0
+            merge_lock = asyncio.Lock()
+            published: asyncio.Queue = asyncio.Queue()
+
+            async def analyze_and_merge(
+                file_path: str, content: Union[FileContent, Exception]
+            ) -> None:
+                nonlocal merged
+                analyses[file_path] = await self._analyze_file_content(file_path, content)
+
+                async with merge_lock:
+                    while merged < len(code_files) and code_files[merged] in analyses:
+                        next_path = code_files[merged]
+                        analysis = analyses.pop(next_path)
+                        merged += 1
+
+                        if analysis.parsing_errors:
+                            project_index.parsing_errors += 1
+                        else:
+                            project_index.supported_files += 1
+
+                        # Store file analysis
+                        project_index.files[next_path] = analysis
+
+                        # Index symbols
+                        for symbol in analysis.symbols:
+                            project_index.symbols[symbol.id] = symbol
+
+                        # Store dependencies
+                        project_index.dependencies.extend(analysis.dependencies)
+
+                        # Index identifier occurrences
+                        project_index.identifiers.set_file(next_path, analysis.identifiers)
+
+                        unlinked.append(next_path)
+                        if len(unlinked) < batch_size and merged < len(code_files):
+                            continue
+
+                        # Link the batch so partial snapshots can answer graph queries
+                        self._resolve_dependency_targets(
+                            project_index,
+                            [
+                                dependency
+                                for path in unlinked
+                                for dependency in project_index.files[path].dependencies
+                            ],
+                        )
+                        self.update_call_graph(project_index, list(unlinked))
+                        unlinked.clear()
+
+                        # Progress logging
+                        logger.info(f"Analyzed {merged}/{len(code_files)} files")
+
+                        # Hold further merges until the snapshot has been consumed;
+                        # reads carry on ahead of the parsers meanwhile
+                        resumed = asyncio.Event()
+                        await published.put(resumed)
+                        await resumed.wait()
+
+            analyzing = asyncio.create_task(
+                file_reader.process(
+                    code_files,
+                    analyze_and_merge,
+                    {path: signatures[path].size for path in code_files},
+                )
+            )
+            analyzing.add_done_callback(lambda _: published.put_nowait(None))
+            try:
+                while (resumed := await published.get()) is not None:
+                    project_index.last_indexed = time.time()
+                    yield project_index
+                    resumed.set()
+                await analyzing
+            finally:
+                analyzing.cancel()
 
             # Build cross-references
             await self._build_cross_references(project_index)
@@ -117,14 +298,36 @@ class ProjectIndexer:
             # Calculate project metrics
             await self._calculate_project_metrics(project_index)
 
+            project_index.complete = True
+            project_index.last_indexed = time.time()
+
             duration = time.time() - start_time
             logger.info(f"Project indexing completed in {duration:.2f}s")
 
-            return project_index
+            yield project_index
 
         except Exception as e:
             logger.error(f"Error indexing project {workspace_path}: {e}")
-            return ProjectIndex(workspace_path=workspace_path, last_indexed=time.time())
+            yield ProjectIndex(workspace_path=workspace_path, last_indexed=time.time())
+
+    def _prioritize_files(
+        self,
+        signatures: Dict[str, FileSignature],
+        priority_files: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """Order files for indexing: open files, then most recently modified"""
+        prioritized = []
+        for file_path in priority_files or []:
+            file_path = os.path.abspath(file_path)
+            if file_path in signatures and file_path not in prioritized:
+                prioritized.append(file_path)
+
+        seen = set(prioritized)
+        remaining = sorted(
+            (path for path in signatures if path not in seen),
+            key=lambda path: (-signatures[path].mtime_ns, path),
+        )
+        return prioritized + remaining
 
     async def _discover_code_files(
         self,
@@ -133,78 +336,71 @@ class ProjectIndexer:
         exclude_patterns: Optional[List[str]] = None,
     ) -> List[str]:
         """Discover all code files in the project"""
+        return sorted(await self._scan_code_files(workspace_path, exclude_patterns))
+
+    async def _scan_code_files(
+        self, workspace_path: str, exclude_patterns: Optional[List[str]] = None
+    ) -> Dict[str, FileSignature]:
+        """Discover code files with their stat signatures"""
         try:
             workspace = Path(workspace_path)
             if not workspace.exists():
                 logger.error(f"Workspace path does not exist: {workspace_path}")
-                return []
+                return {}
 
             # Combine default and custom exclude patterns
             all_excludes = self.default_excludes.copy()
             if exclude_patterns:
                 all_excludes.extend(exclude_patterns)
 
-            code_files = []
-
-            def should_exclude(path: Path) -> bool:
-                """Check if path should be excluded"""
-                str(path)
-                relative_path = str(path.relative_to(workspace))
-
-                for pattern in all_excludes:
-                    if fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(
-                        relative_path, pattern
-                    ):
-                        return True
-                return False
-
-            def should_include(path: Path) -> bool:
-                """Check if file should be included based on extension"""
-                return path.suffix.lower() in self.supported_extensions
-
-            # Walk directory tree
-            for path in workspace.rglob("*"):
-                if path.is_file() and should_include(path) and not should_exclude(path):
-                    code_files.append(str(path.absolute()))
-
-            return sorted(code_files)
+            # Walk directory tree, pruning excluded and .gitignore'd directories
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                change_detector.scan,
+                str(workspace.absolute()),
+                self.supported_extensions,
+                all_excludes,
+            )
 
         except Exception as e:
             logger.error(f"Error discovering code files: {e}")
-            return []
+            return {}
 
     async def _analyze_file_batch(
-        self, file_paths: List[str]
+        self, file_paths: List[str], sizes: Optional[Dict[str, int]] = None
     ) -> Dict[str, FileAnalysis]:
-        """Analyze a batch of files concurrently"""
-        try:
-            # Create analysis tasks
-            tasks = []
-            for file_path in file_paths:
-                task = asyncio.create_task(ast_service.parse_file(file_path))
-                tasks.append((file_path, task))
-
-            # Wait for all analyses to complete
-            results = {}
-            for file_path, task in tasks:
-                try:
-                    analysis = await task
-                    results[file_path] = analysis
-                except Exception as e:
-                    logger.error(f"Error analyzing {file_path}: {e}")
-                    # Create minimal analysis for failed files
-                    results[file_path] = FileAnalysis(
-                        file_path=file_path,
-                        language=LanguageType.UNKNOWN,
-                        parsing_errors=[f"Analysis failed: {str(e)}"],
-                    )
-
-            return results
+        """Analyze a batch of files, reading ahead of the parsers
 
+        ``sizes`` are the file sizes already known from discovery, used to
+        bound the bytes read ahead without stat'ing files again.
+        """
+        try:
+            return await file_reader.process(file_paths, self._analyze_file_content, sizes)
         except Exception as e:
             logger.error(f"Error in batch analysis: {e}")
             return {}
 
+    async def _analyze_file_content(
+        self, file_path: str, content: Union[FileContent, Exception]
+    ) -> FileAnalysis:
+        """Parse a file from content the reader has already loaded"""
+        try:
+            if isinstance(content, Exception):
+                # Let the parser report the read error in its usual form
+                return await ast_service.parse_file(file_path)
+            return await ast_service.parse_file(
+                file_path, content, reuse_shared=True
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {e}")
+            # Create minimal analysis for failed files
+            return FileAnalysis(
+                file_path=file_path,
+                language=LanguageType.UNKNOWN,
+                parsing_errors=[f"Analysis failed: {str(e)}"],
+            )
+
     async def _build_cross_references(self, project_index: ProjectIndex):
         """Build cross-references between symbols and dependencies"""
         try:
@@ -218,22 +414,156 @@ class ProjectIndexer:
                 symbol_by_name[symbol.name].append(symbol)
 
             # Resolve dependency targets
-            for dependency in project_index.dependencies:
-                if dependency.module_name and not dependency.is_external:
-                    # Try to resolve internal module dependencies
-                    target_file = self._resolve_module_path(
-                        dependency.module_name,
-                        dependency.source_file,
-                        project_index.workspace_path,
-                    )
-                    if target_file:
-                        dependency.target_file = target_file
+            self._resolve_dependency_targets(project_index, project_index.dependencies)
+
+            # Resolve call sites into the call graph
+            self.update_call_graph(project_index, list(project_index.files))
 
-            logger.info("Cross-references built successfully")
+            logger.info(
+                f"Cross-references built successfully "
+                f"({len(project_index.call_graph.edges())} call edges)"
+            )
 
         except Exception as e:
             logger.error(f"Error building cross-references: {e}")
 
+    def _resolve_dependency_targets(
+        self, project_index: ProjectIndex, dependencies: Iterable[Dependency]
+    ) -> None:
+        """Resolve the target files of internal module dependencies"""
+        for dependency in dependencies:
+            if dependency.module_name and not dependency.is_external:
+                target_file = self._resolve_module_path(
+                    dependency.module_name,
+                    dependency.source_file,
+                    project_index.workspace_path,
+                )
+                if target_file:
+                    dependency.target_file = target_file
+
+    def update_call_graph(
+        self, project_index: ProjectIndex, file_paths: Iterable[str]
+    ) -> None:
+        """Re-resolve the call edges of changed files and of the files importing them"""
+        call_graph = project_index.call_graph
+        affected = set(file_paths)
+        for file_path in list(affected):
+            affected.update(call_graph.importers.get(file_path, ()))
+            # Imports that named no indexed file may resolve to this one now
+            affected.update(call_graph.importers_awaiting(file_path))
+
+        scopes: Dict[str, _FileScopes] = {}
+        modules: Dict[Tuple[str, str], Optional[str]] = {}
+
+        def scopes_for(file_path: str) -> _FileScopes:
+            if file_path not in scopes:
+                scopes[file_path] = _FileScopes(project_index.files[file_path].symbols)
+            return scopes[file_path]
+
+        for file_path in sorted(affected):
+            analysis = project_index.files.get(file_path)
+            if analysis is None:
+                call_graph.remove_file(file_path)
+                continue
+            import_map, unresolved = self._resolve_imports(
+                project_index, file_path, analysis, modules
+            )
+            edges = self._resolve_calls(file_path, analysis, import_map, scopes_for)
+            call_graph.set_file(
+                file_path,
+                edges,
+                (target for target, _ in import_map.values()),
+                unresolved,
+            )
+
+    def _resolve_imports(
+        self,
+        project_index: ProjectIndex,
+        file_path: str,
+        analysis: FileAnalysis,
+        modules: Dict[Tuple[str, str], Optional[str]],
+    ) -> Tuple[ImportMap, Set[str]]:
+        """Map each imported local name to the indexed file it comes from
+
+        Also returns the module names of imports that resolved to no indexed
+        file.
+        """
+        import_map: ImportMap = {}
+        unresolved: Set[str] = set()
+
+        def resolve(module_name: str) -> Optional[str]:
+            key = (module_name, str(Path(file_path).parent))
+            if key not in modules:
+                modules[key] = self._resolve_module_path(
+                    module_name, file_path, project_index.workspace_path
+                )
+            return modules[key]
+
+        for binding in analysis.imports:
+            target, name, submodule = None, binding.name, None
+            if analysis.language == LanguageType.PYTHON and binding.name is not None:
+                # from package import submodule
+                separator = "" if binding.module.endswith(".") else "."
+                submodule = f"{binding.module}{separator}{binding.name}"
+                target = resolve(submodule)
+                if target in project_index.files:
+                    name = None
+            if target not in project_index.files:
+                target, name = resolve(binding.module), binding.name
+            if target in project_index.files:
+                import_map[binding.local_name] = (target, name)
+            else:
+                unresolved.add(binding.module)
+                if submodule is not None:
+                    unresolved.add(submodule)
+
+        return import_map, unresolved
+
+    def _resolve_calls(
+        self,
+        file_path: str,
+        analysis: FileAnalysis,
+        import_map: ImportMap,
+        scopes_for: Callable[[str], _FileScopes],
+    ) -> List[Tuple[str, str]]:
+        """Resolve the call sites of a file into (caller_id, callee_id) edges"""
+        scopes = scopes_for(file_path)
+        edges: Dict[Tuple[str, str], None] = {}
+
+        for call, function, cls in scopes.enclosing(analysis.calls):
+            if function is None:
+                continue  # module-level and class-body calls have no caller
+
+            callee = None
+            receiver = call.receiver
+            if receiver is None:
+                callee = scopes.callable(call.callee)
+                if callee is None and call.callee in import_map:
+                    target_file, name = import_map[call.callee]
+                    if name is not None:
+                        callee = scopes_for(target_file).callable(
+                            call.callee if name == "default" else name
+                        )
+            elif receiver in SELF_RECEIVERS:
+                if cls is not None:
+                    callee = scopes.methods.get((cls.id, call.callee))
+            elif receiver in scopes.classes:
+                callee = scopes.methods.get((scopes.classes[receiver].id, call.callee))
+            elif receiver in import_map:
+                target_file, name = import_map[receiver]
+                target_scopes = scopes_for(target_file)
+                if name is None:
+                    callee = target_scopes.callable(call.callee)
+                elif name in target_scopes.classes:
+                    callee = target_scopes.methods.get(
+                        (target_scopes.classes[name].id, call.callee)
+                    )
+
+            if callee is not None:
+                edges[(function.id, callee.id)] = None
+
+        return list(edges)
+
     def _resolve_module_path(
         self, module_name: str, source_file: str, workspace_path: str
     ) -> Optional[str]:
@@ -242,6 +572,22 @@ class ProjectIndexer:
             source_dir = Path(source_file).parent
             workspace = Path(workspace_path)
 
+            # Handle relative JavaScript/TypeScript module paths
+            if module_name.startswith(("./", "../")):
+                base = Path(os.path.normpath(source_dir.absolute() / module_name))
+                candidates = [base]
+                for suffix in JS_MODULE_SUFFIXES:
+                    candidates.append(base.with_name(base.name + suffix))
+                for suffix in JS_MODULE_SUFFIXES:
+                    candidates.append(base / f"index{suffix}")
+
+                for candidate in candidates:
+                    if candidate.is_file() and candidate.is_relative_to(
+                        workspace.absolute()
+                    ):
+                        return str(candidate)
+                return None
+
             # Handle relative imports
             if module_name.startswith("."):
                 # Relative import
@@ -362,6 +708,12 @@ class ProjectIndexer:
             # Add new dependencies
             project_index.dependencies.extend(new_analysis.dependencies)
 
+            # Replace the file's identifier occurrences
+            project_index.identifiers.set_file(file_path, new_analysis.identifiers)
+
+            # Re-resolve the file's calls and those of its importers
+            self.update_call_graph(project_index, [file_path])
+
             # Update timestamp
             project_index.last_indexed = time.time()
 
@@ -373,57 +725,59 @@ class ProjectIndexer:
             return False
 
     async def find_references(
-        self, project_index: ProjectIndex, symbol_name: str
+        self,
+        project_index: ProjectIndex,
+        symbol_name: str,
+        reader: Optional[SnapshotOverlay] = None,
     ) -> List[Reference]:
-        """Find all references to a symbol across the project"""
+        """Find all references to a symbol across the project
+
+        Served from the identifier occurrence index, so the cost is linear in
+        the number of occurrences and no file is read. Each reference is a
+        definition, call, import or usage of the name. Definitions are looked
+        up in ``reader``, the mapped index snapshot, when one is given.
+        """
         try:
             references = []
+            get_symbol = (
+                reader.get_symbol if reader is not None else project_index.symbols.get
+            )
 
-            # Find symbol definitions
-            matching_symbols = [
-                symbol
-                for symbol in project_index.symbols.values()
-                if symbol.name == symbol_name
-            ]
+            for file_path, occurrence in project_index.identifiers.find(symbol_name):
+                analysis = project_index.files.get(file_path)
+                symbol = (
+                    get_symbol(f"{file_path}:{symbol_name}:{occurrence.line - 1}")
+                    if occurrence.kind == OccurrenceKind.DEFINITION
+                    else None
+                )
+
+                if symbol is not None:
+                    references.append(
+                        Reference(
+                            symbol_id=symbol.id,
+                            file_path=symbol.file_path,
+                            line_number=symbol.line_start,
+                            column_number=symbol.column_start,
+                            reference_type="definition",
+                            context=f"Definition of {symbol.symbol_type} {symbol.name}",
+                        )
+                    )
+                    continue
 
-            for symbol in matching_symbols:
-                # Add definition reference
+                context = None
+                if analysis is not None and analysis.ast is not None:
+                    context = analysis.ast.line_text(occurrence.line - 1).strip()
                 references.append(
                     Reference(
-                        symbol_id=symbol.id,
-                        file_path=symbol.file_path,
-                        line_number=symbol.line_start,
-                        column_number=symbol.column_start,
-                        reference_type="definition",
-                        context=f"Definition of {symbol.symbol_type} {symbol.name}",
+                        symbol_id=f"{occurrence.kind.value}_{file_path}_{occurrence.line}",
+                        file_path=file_path,
+                        line_number=occurrence.line,
+                        column_number=occurrence.column,
+                        reference_type=occurrence.kind.value,
+                        context=context,
                     )
                 )
 
-            # Search for usages in all files (simplified - would need better AST analysis)
-            for file_path, analysis in project_index.files.items():
-                if analysis.ast_root:
-                    # This is a simplified search - in practice, we'd need more sophisticated analysis
-                    try:
-                        content = Path(file_path).read_text(
-                            encoding="utf-8", errors="ignore"
-                        )
-                        lines = content.split("\n")
-
-                        for line_num, line in enumerate(lines, 1):
-                            if symbol_name in line and not line.strip().startswith("#"):
-                                references.append(
-                                    Reference(
-                                        symbol_id=f"usage_{file_path}_{line_num}",
-                                        file_path=file_path,
-                                        line_number=line_num,
-                                        column_number=line.find(symbol_name),
-                                        reference_type="usage",
-                                        context=line.strip(),
-                                    )
-                                )
-                    except Exception:
-                        continue
-
             return references
 
         except Exception as e:
@@ -437,14 +791,18 @@ class ProjectIndexer:
 
             # Add all function symbols as nodes
             for symbol in project_index.symbols.values():
-                if symbol.symbol_type in [symbol.FUNCTION, symbol.METHOD]:
+                if symbol.symbol_type in [SymbolType.FUNCTION, SymbolType.METHOD]:
                     call_graph.nodes[symbol.id] = symbol
 
-            # Analyze function calls (simplified implementation)
-            # In practice, this would require more sophisticated AST analysis
-            for file_path, analysis in project_index.files.items():
-                # This is a placeholder - would need proper call analysis
-                pass
+            # Edges come from the call sites resolved during indexing
+            index = project_index.call_graph
+            call_graph.edges = index.edges()
+            call_graph.entry_points = [
+                symbol_id
+                for symbol_id in call_graph.nodes
+                if symbol_id in index.callees and symbol_id not in index.callers
+            ]
+            call_graph.cycles = index.cycles()
 
             return call_graph
 
@@ -10,9 +10,10 @@ import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from ..models.event_models import ConnectionState, EventData
+from ..models.event_models import ClientPreferences, ConnectionState, EventData
+from .event_streaming_service import EventFilter
 
 logger = logging.getLogger(__name__)
 
@@ -36,19 +37,75 @@ class ReconnectionConfig:
     max_delay_ms: int = 30000
     backoff_multiplier: float = 2.0
     missed_event_retention_hours: int = 24
+    max_logged_events: int = 10000
     state_sync_timeout_ms: int = 5000
     enable_heartbeat: bool = True
     heartbeat_interval_ms: int = 30000
 
 
 @dataclass
-class MissedEvent:
-    """Represents an event that was missed during disconnection"""
+class LoggedEvent:
+    """An event recorded in the shared replay log"""
 
+    sequence: int
     event: EventData
-    missed_at: datetime
-    retry_count: int = 0
-    delivered: bool = False
+    logged_at: datetime
+
+
+class EventLog:
+    """Bounded append-only ring of events with global sequence numbers
+
+    Disconnected sessions keep only a cursor into the log, so memory is
+    O(events) no matter how many clients are offline, and replay is a range
+    scan from the cursor.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        self.max_events = max_events
+        self._ring: List[Optional[LoggedEvent]] = [None] * max_events
+        self._first_sequence = 0
+        self._next_sequence = 0
+
+    @property
+    def first_sequence(self) -> int:
+        """Sequence of the oldest event still in the log"""
+        return self._first_sequence
+
+    @property
+    def next_sequence(self) -> int:
+        """Sequence the next appended event will get"""
+        return self._next_sequence
+
+    def __len__(self) -> int:
+        return self._next_sequence - self._first_sequence
+
+    def append(self, event: EventData) -> int:
+        """Append an event, overwriting the oldest one when full"""
+        sequence = self._next_sequence
+        self._ring[sequence % self.max_events] = LoggedEvent(
+            sequence=sequence, event=event, logged_at=datetime.now()
+        )
+        self._next_sequence += 1
+        if self._next_sequence - self._first_sequence > self.max_events:
+            self._first_sequence = self._next_sequence - self.max_events
+        return sequence
+
+    def read_from(self, cursor: int) -> Iterator[LoggedEvent]:
+        """Yield every retained event with a sequence number >= cursor"""
+        for sequence in range(max(cursor, self._first_sequence), self._next_sequence):
+            yield self._ring[sequence % self.max_events]
+
+    def trim_before(self, cutoff: datetime) -> int:
+        """Drop events logged before the cutoff, return how many were dropped"""
+        dropped = 0
+        while self._first_sequence < self._next_sequence:
+            slot = self._first_sequence % self.max_events
+            if self._ring[slot].logged_at >= cutoff:
+                break
+            self._ring[slot] = None
+            self._first_sequence += 1
+            dropped += 1
+        return dropped
 
 
 @dataclass
@@ -58,7 +115,8 @@ class ClientSession:
     client_id: str
     last_seen: datetime
     sequence_number: int
-    missed_events: List[MissedEvent] = field(default_factory=list)
+    # First log sequence the client has not received; None while connected
+    event_cursor: Optional[int] = None
     connection_attempts: int = 0
     last_heartbeat: Optional[datetime] = None
     session_state: Dict[str, Any] = field(default_factory=dict)
@@ -74,6 +132,8 @@ class ReconnectionService:
         self.active_reconnections: Set[str] = set()
         self.heartbeat_task: Optional[asyncio.Task] = None
         self.cleanup_task: Optional[asyncio.Task] = None
+        self.event_log = EventLog(self.config.max_logged_events)
+        self.event_filter = EventFilter()
 
         logger.info("Reconnection service initialized")
 
@@ -129,6 +189,7 @@ class ReconnectionService:
         if client_id in self.client_sessions:
             session = self.client_sessions[client_id]
             session.last_seen = datetime.now()
+            self.hold_event_cursor(client_id, self.event_log.next_sequence)
             logger.info(f"Client {client_id} disconnected, session preserved")
 
     async def client_reconnected(
@@ -140,30 +201,37 @@ class ReconnectionService:
             return {"status": "new_session", "missed_events": []}
 
         session = self.client_sessions[client_id]
+        truncated = 0
+        missed_events_data = []
+
+        # Replay the retained log range from the cursor through the client's filters
+        if session.event_cursor is not None:
+            truncated = max(0, self.event_log.first_sequence - session.event_cursor)
+            for missed_event in self.iter_missed_events(
+                session.event_cursor, connection_state.preferences
+            ):
+                session.sequence_number += 1
+                missed_events_data.append(
+                    {
+                        "event": missed_event.event.__dict__,
+                        "missed_at": missed_event.logged_at.isoformat(),
+                        "sequence_number": session.sequence_number,
+                        "log_sequence": missed_event.sequence,
+                    }
+                )
+            session.event_cursor = None
+
         reconnection_info = {
             "status": "reconnected",
             "session_restored": True,
-            "missed_events_count": len(session.missed_events),
-            "last_sequence_number": session.sequence_number,
+            "missed_events_count": len(missed_events_data),
+            "events_truncated": truncated,
+            "last_sequence_number": session.sequence_number - len(missed_events_data),
             "disconnection_duration_ms": int(
                 (datetime.now() - session.last_seen).total_seconds() * 1000
             ),
         }
 
-        # Prepare missed events for replay
-        missed_events_data = []
-        for missed_event in session.missed_events:
-            if not missed_event.delivered:
-                missed_events_data.append(
-                    {
-                        "event": missed_event.event.__dict__,
-                        "missed_at": missed_event.missed_at.isoformat(),
-                        "sequence_number": session.sequence_number + 1,
-                    }
-                )
-                session.sequence_number += 1
-                missed_event.delivered = True
-
         reconnection_info["missed_events"] = missed_events_data
 
         # Update session state
@@ -179,24 +247,32 @@ class ReconnectionService:
         )
         return reconnection_info
 
-    def add_missed_event(self, client_id: str, event: EventData):
-        """Add a missed event for a disconnected client"""
-        if client_id not in self.client_sessions:
-            return
-
-        session = self.client_sessions[client_id]
-        missed_event = MissedEvent(event=event, missed_at=datetime.now())
-
-        session.missed_events.append(missed_event)
-
-        # Limit missed events to prevent memory bloat
-        max_missed_events = 1000  # Configurable limit
-        if len(session.missed_events) > max_missed_events:
-            # Remove oldest events, keep newest
-            session.missed_events = session.missed_events[-max_missed_events:]
-            logger.warning(
-                f"Trimmed missed events for client {client_id} to {max_missed_events}"
-            )
+    def iter_missed_events(
+        self, cursor: int, preferences: ClientPreferences
+    ) -> Iterator[LoggedEvent]:
+        """Stream logged events from a cursor that match a client's preferences"""
+        for logged_event in self.event_log.read_from(cursor):
+            if self.event_filter.matches(logged_event.event, preferences):
+                yield logged_event
+
+    def record_event(self, event: EventData) -> int:
+        """Record an event once in the shared log, return its sequence number"""
+        return self.event_log.append(event)
+
+    def hold_event_cursor(self, client_id: str, sequence: int):
+        """Start tracking missed events for a client from the given sequence"""
+        session = self.client_sessions.get(client_id)
+        if session is not None and session.event_cursor is None:
+            session.event_cursor = sequence
+
+    def pending_event_count(self, client_id: str) -> int:
+        """Number of logged events after the client's cursor, before filtering"""
+        session = self.client_sessions.get(client_id)
+        if session is None or session.event_cursor is None:
+            return 0
+        return self.event_log.next_sequence - max(
+            session.event_cursor, self.event_log.first_sequence
+        )
 
     def get_reconnection_delay(self, client_id: str) -> int:
         """Calculate reconnection delay based on strategy and attempt count"""
@@ -248,7 +324,8 @@ class ReconnectionService:
             "client_id": session.client_id,
             "last_seen": session.last_seen.isoformat(),
             "sequence_number": session.sequence_number,
-            "missed_events_count": len(session.missed_events),
+            "missed_events_count": self.pending_event_count(client_id),
+            "event_cursor": session.event_cursor,
             "connection_attempts": session.connection_attempts,
             "last_heartbeat": (
                 session.last_heartbeat.isoformat() if session.last_heartbeat else None
@@ -262,6 +339,12 @@ class ReconnectionService:
         return {
             "total_sessions": len(self.client_sessions),
             "active_reconnections": len(self.active_reconnections),
+            "event_log": {
+                "size": len(self.event_log),
+                "capacity": self.event_log.max_events,
+                "first_sequence": self.event_log.first_sequence,
+                "next_sequence": self.event_log.next_sequence,
+            },
             "config": {
                 "strategy": self.config.strategy.value,
                 "max_retry_attempts": self.config.max_retry_attempts,
@@ -320,19 +403,10 @@ class ReconnectionService:
                     del self.client_sessions[client_id]
                     logger.info(f"Cleaned up expired session for client {client_id}")
 
-                # Clean up old missed events
-                for session in self.client_sessions.values():
-                    original_count = len(session.missed_events)
-                    session.missed_events = [
-                        event
-                        for event in session.missed_events
-                        if current_time - event.missed_at < retention_period
-                    ]
-
-                    if len(session.missed_events) < original_count:
-                        logger.info(
-                            f"Cleaned up {original_count - len(session.missed_events)} old missed events for {session.client_id}"
-                        )
+                # Clean up old logged events
+                dropped = self.event_log.trim_before(current_time - retention_period)
+                if dropped:
+                    logger.info(f"Cleaned up {dropped} old logged events")
 
             except asyncio.CancelledError:
                 break
@@ -354,9 +428,14 @@ async def handle_client_reconnection(
     return await reconnection_service.client_reconnected(client_id, connection_state)
 
 
-def track_missed_event_for_client(client_id: str, event: EventData):
-    """Track missed event for a disconnected client"""
-    reconnection_service.add_missed_event(client_id, event)
+def record_event_for_replay(event: EventData) -> int:
+    """Record an event in the shared replay log"""
+    return reconnection_service.record_event(event)
+
+
+def hold_event_cursor(client_id: str, sequence: int):
+    """Track missed events for a client that stopped receiving from a sequence"""
+    reconnection_service.hold_event_cursor(client_id, sequence)
 
 
 def register_client_session(client_id: str, connection_state: ConnectionState):
@@ -0,0 +1,146 @@
+"""
+Shared Analysis Store
+
+Content-addressed layer under the per-workspace indexes. Worktrees and
+clones of the same repository contain mostly identical files; analyses and
+embeddings are stored once per unique content and shared by every workspace
+holding that content.
+
+Only path-dependent data is copied per file: symbol ids and paths, and the
+dependencies whose targets each workspace resolves against its own tree.
+Syntax trees, identifier occurrences, import bindings, call sites and
+complexity metrics are shared by reference and must be treated as
+immutable, which the indexers already do.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..models.ast_models import FileAnalysis, LanguageType
+from .change_detector import hash_content
+
+logger = logging.getLogger(__name__)
+
+# (language, content hash) of a file's source
+ContentKey = Tuple[str, str]
+
+
+class SharedAnalysisStore:
+    """LRU store of file analyses and embeddings keyed by content"""
+
+    def __init__(self, max_analyses: int = 50000, max_embeddings: int = 100000):
+        self.max_analyses = max_analyses
+        self.max_embeddings = max_embeddings
+        self._analyses: "OrderedDict[ContentKey, FileAnalysis]" = OrderedDict()
+        self._embeddings: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
+        # Sharing statistics
+        self.metrics = {
+            "analysis_hits": 0,
+            "analysis_misses": 0,
+            "embedding_hits": 0,
+            "embedding_misses": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def content_key(language: LanguageType, content_hash: str) -> ContentKey:
+        """Key of a file's content; the language is part of it since the same
+        bytes parse differently as, say, JavaScript and TypeScript"""
+        return (LanguageType(language).value, content_hash)
+
+    def get_analysis(
+        self, key: ContentKey, file_path: str, symbol_path: Optional[str] = None
+    ) -> Optional[FileAnalysis]:
+        """Analysis of identical content rebased onto ``file_path``
+
+        ``symbol_path`` is the path symbol ids are built from, when it differs
+        from the analysis' absolute path.
+        """
+        analysis = self._analyses.get(key)
+        if analysis is None:
+            self.metrics["analysis_misses"] += 1
+            return None
+
+        self._analyses.move_to_end(key)
+        self.metrics["analysis_hits"] += 1
+        return self._rebase(analysis, file_path, symbol_path or file_path)
+
+    def add_analysis(self, key: ContentKey, analysis: FileAnalysis):
+        """Share an analysis with workspaces holding the same content"""
+        self._analyses[key] = analysis
+        self._analyses.move_to_end(key)
+        while len(self._analyses) > self.max_analyses:
+            self._analyses.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def _rebase(
+        self, analysis: FileAnalysis, file_path: str, symbol_path: str
+    ) -> FileAnalysis:
+        """Copy the path-dependent parts of an analysis for another file"""
+        symbols = [
+            symbol.model_copy(
+                update={
+                    "id": f"{symbol_path}:{symbol.name}:{symbol.line_start - 1}",
+                    "file_path": symbol_path,
+                }
+            )
+            for symbol in analysis.symbols
+        ]
+        dependencies = [
+            dependency.model_copy(
+                update={"source_file": symbol_path, "target_file": None}
+            )
+            for dependency in analysis.dependencies
+        ]
+        return analysis.model_copy(
+            update={
+                "file_path": file_path,
+                "symbols": symbols,
+                "dependencies": dependencies,
+                "parsing_errors": list(analysis.parsing_errors),
+                "last_analyzed": time.time(),
+            }
+        )
+
+    def get_embedding(self, model: str, content: str) -> Optional[List[float]]:
+        """Embedding previously computed by ``model`` for identical content"""
+        key = (model, hash_content(content.encode("utf-8")))
+        embedding = self._embeddings.get(key)
+        if embedding is None:
+            self.metrics["embedding_misses"] += 1
+            return None
+
+        self._embeddings.move_to_end(key)
+        self.metrics["embedding_hits"] += 1
+        return embedding
+
+    def add_embedding(self, model: str, content: str, embedding: List[float]):
+        key = (model, hash_content(content.encode("utf-8")))
+        self._embeddings[key] = embedding
+        self._embeddings.move_to_end(key)
+        while len(self._embeddings) > self.max_embeddings:
+            self._embeddings.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def clear_analyses(self):
+        """Drop shared analyses, forcing identical files to be reparsed"""
+        self._analyses.clear()
+
+    def clear(self):
+        """Drop all shared analyses and embeddings"""
+        self._analyses.clear()
+        self._embeddings.clear()
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Get sharing statistics"""
+        metrics = self.metrics.copy()
+        metrics["unique_analyses"] = len(self._analyses)
+        metrics["unique_embeddings"] = len(self._embeddings)
+        return metrics
+
+
+# Global instance
+shared_analysis_store = SharedAnalysisStore()
@@ -5,7 +5,10 @@ Storage services package with provider selection.
 import os
 from typing import Protocol
 from uuid import UUID
-from .local_storage_service import local_storage_service, StoredFile, LocalStorageService  # noqa: F401
+from .local_storage_service import (  # noqa: F401
+    local_storage_service, StoredFile, LocalStorageService, ServedFile, RangeNotSatisfiable, parse_range
+)
+from .file_response import ZeroCopyFileResponse  # noqa: F401
 
 
 class StorageService(Protocol):
@@ -14,6 +17,10 @@ class StorageService(Protocol):
     def get_file(self, project_id: UUID, rel_path: str): ...
     # Cleanup API: delete all artifacts under a project prefix
     def delete_project_artifacts(self, project_id: UUID) -> None: ...
+    # Streaming writes: returns a binary writer with write/close/abort; the
+    # artifact becomes visible only after close
+    def open_write(self, project_id: UUID, rel_path: str): ...
+    def file_size(self, project_id: UUID, rel_path: str) -> int: ...
 
 
 def get_storage_service() -> StorageService:
@@ -34,7 +41,7 @@ def get_storage_capabilities() -> dict:
     caps = {
         "provider": provider,
         "presign_download": provider == "s3",
-        "range_supported": provider == "s3",
+        "range_supported": True,
         "server_zip_archive": True,  # local native; s3 supported via server streaming
         "archive_formats": {"zip": True, "tar": False},
         "max_preview_size_bytes": 1_000_000,
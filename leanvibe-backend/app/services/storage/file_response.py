@@ -0,0 +1,73 @@
+"""
+ASGI response that streams a local file range without buffering it.
+
+Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) when the
+server advertises it; otherwise reads the range in fixed-size chunks with
+``os.pread`` in a worker thread, so memory per download stays at one chunk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Dict, Optional
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .local_storage_service import ServedFile
+
+
+class ZeroCopyFileResponse(Response):
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        served: ServedFile,
+        filename: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        content_disposition_type: str = "attachment",
+    ) -> None:
+        self.served = served
+        self.status_code = served.status_code
+        self.media_type = media_type or served.content_type
+        self.background = None
+        merged = dict(served.headers)
+        if filename:
+            merged["Content-Disposition"] = f"{content_disposition_type}; filename={filename}"
+        merged.update(headers or {})
+        self.init_headers(merged)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        served = self.served
+        if scope.get("method") == "HEAD" or self.status_code == 304 or not served.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = os.open(served.path, os.O_RDONLY)
+        try:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": served.start,
+                    "count": served.length,
+                    "more_body": False,
+                })
+                return
+
+            offset, remaining = served.start, served.length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(os.pread, fd, min(self.chunk_size, remaining), offset)
+                if not chunk:
+                    break  # file truncated underneath us
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
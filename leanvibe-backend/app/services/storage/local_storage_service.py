@@ -7,10 +7,13 @@ from __future__ import annotations
 
 import mimetypes
 import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime
+from email.utils import formatdate
+from functools import lru_cache
 from io import BytesIO
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
 
@@ -22,10 +25,249 @@ class StoredFile:
     modified_at: datetime
 
 
+class RangeNotSatisfiable(ValueError):
+    """Requested byte range lies outside the file"""
+
+    def __init__(self, range_header: str, size: int):
+        super().__init__(f"Unsatisfiable range {range_header!r} for {size} bytes")
+        self.size = size
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end).
+
+    Returns None when the header should be ignored (absent, malformed or
+    multi-range) and raises RangeNotSatisfiable when no byte of the range
+    exists in the file.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(range_header, size)
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except RangeNotSatisfiable:
+        raise
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(range_header, size)
+    return start, end
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+@lru_cache(maxsize=512)
+def _content_type(extension: str) -> str:
+    content_type, _ = mimetypes.guess_type(f"file{extension}")
+    return content_type or "application/octet-stream"
+
+
+def content_type_for(path: str) -> str:
+    return _content_type(os.path.splitext(path)[1].lower())
+
+
+@dataclass
+class ServedFile:
+    """A resolved, validated read of a local artifact (whole file or one range)"""
+    path: str
+    size: int
+    start: int
+    end: int
+    content_type: str
+    etag: str
+    modified_at: datetime
+    status_code: int  # 200, 206 or 304
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1 if self.size else 0
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "ETag": self.etag,
+            "Accept-Ranges": "bytes",
+            "Last-Modified": formatdate(self.modified_at.timestamp(), usegmt=True),
+        }
+        if self.status_code != 304:
+            headers["Content-Length"] = str(self.length)
+        if self.status_code == 206:
+            headers["Content-Range"] = f"bytes {self.start}-{self.end}/{self.size}"
+        return headers
+
+    def read(self) -> bytes:
+        """Read the selected bytes (for small files and previews)"""
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            return os.pread(fd, self.length, self.start)
+        finally:
+            os.close(fd)
+
+
+class AtomicFileWriter:
+    """Binary writer that publishes the file under its final name only on close.
+
+    Data goes to a ``.part`` file next to the target; ``abort`` discards it, so
+    readers never observe a partially written artifact.
+    """
+
+    def __init__(self, path: str, on_close: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self._on_close = on_close
+        self._part_path = f"{path}.part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self._part_path, "wb")
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._file.close()
+        os.replace(self._part_path, self.path)
+        self.closed = True
+        if self._on_close is not None:
+            self._on_close(self.path)
+
+    def abort(self) -> None:
+        if self.closed:
+            return
+        self._file.close()
+        try:
+            os.remove(self._part_path)
+        except FileNotFoundError:
+            pass
+        self.closed = True
+
+    def __enter__(self) -> "AtomicFileWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ListingManifest:
+    """Cached listing of a project directory tree.
+
+    Built with one scan, then kept current incrementally: writes through the
+    service update their entry directly, and ``refresh`` stats each known
+    directory and rescans only those whose mtime changed (entries were added,
+    removed or renamed). Rewriting a file in place leaves its directory's
+    mtime alone, so the files of directories that were not rescanned are
+    stat'ed individually; unchanged trees cost one stat per entry and no
+    directory reads.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Dict[str, StoredFile] = {}
+        self.dirs: Dict[str, int] = {}  # directory -> mtime_ns when scanned
+        self.scan_dir(root)
+
+    def _rel(self, full: str) -> str:
+        return os.path.relpath(full, self.root).replace("\\", "/")
+
+    def _stored_file(self, full: str, stat: os.stat_result) -> StoredFile:
+        return StoredFile(
+            path=self._rel(full),
+            size=stat.st_size,
+            content_type=content_type_for(full),
+            modified_at=datetime.fromtimestamp(stat.st_mtime),
+        )
+
+    def scan_dir(self, directory: str) -> None:
+        try:
+            self.dirs[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            self.drop_dir(directory)
+            return
+        prefix = "" if directory == self.root else self._rel(directory) + "/"
+        seen = set()
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.path not in self.dirs:
+                    self.scan_dir(entry.path)
+            elif entry.is_file() and not entry.name.endswith(".part"):  # skip in-progress writes
+                stored = self._stored_file(entry.path, entry.stat())
+                self.files[stored.path] = stored
+                seen.add(stored.path)
+        stale = [
+            path for path in self.files
+            if path.startswith(prefix) and "/" not in path[len(prefix):] and path not in seen
+        ]
+        for path in stale:
+            del self.files[path]
+
+    def drop_dir(self, directory: str) -> None:
+        prefix = self._rel(directory) + "/"
+        for known in [d for d in self.dirs if d == directory or d.startswith(directory + os.sep)]:
+            del self.dirs[known]
+        for path in [p for p in self.files if p.startswith(prefix)]:
+            del self.files[path]
+
+    def refresh(self) -> None:
+        rescanned = set()
+        for directory, mtime_ns in list(self.dirs.items()):
+            if directory not in self.dirs:
+                continue  # dropped with a parent during this pass
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                self.drop_dir(directory)
+                continue
+            if current != mtime_ns:
+                self.scan_dir(directory)
+                rescanned.add(directory)
+        for path, stored in list(self.files.items()):
+            full = os.path.join(self.root, *path.split("/"))
+            if os.path.dirname(full) in rescanned:
+                continue
+            try:
+                stat = os.stat(full)
+            except FileNotFoundError:
+                del self.files[path]
+                continue
+            if stat.st_size != stored.size or datetime.fromtimestamp(stat.st_mtime) != stored.modified_at:
+                self.files[path] = self._stored_file(full, stat)
+
+    def record_file(self, full: str) -> None:
+        stored = self._stored_file(full, os.stat(full))
+        self.files[stored.path] = stored
+        parent = os.path.dirname(full)
+        if parent not in self.dirs:
+            self.scan_dir(parent)
+
+
 class LocalStorageService:
     def __init__(self, base_dir: Optional[str] = None):
         self.base_dir = base_dir or os.path.abspath(os.path.join(os.getcwd(), "generated_artifacts"))
         os.makedirs(self.base_dir, exist_ok=True)
+        # Per-project listing manifests, revalidated by stat so only
+        # directories whose entries changed are rescanned
+        self._manifests: Dict[UUID, ListingManifest] = {}
+        self._manifest_lock = threading.Lock()
 
     def _project_root(self, project_id: UUID) -> str:
         root = os.path.join(self.base_dir, project_id.hex)
@@ -33,36 +275,128 @@ class LocalStorageService:
         return root
 
     def list_files(self, project_id: UUID, *, path_filter: Optional[str] = None) -> List[StoredFile]:
-        root = self._project_root(project_id)
-        results: List[StoredFile] = []
-        for dirpath, _, filenames in os.walk(root):
-            for name in filenames:
-                rel_path = os.path.relpath(os.path.join(dirpath, name), root)
-                if path_filter and path_filter not in rel_path:
-                    continue
-                full = os.path.join(dirpath, name)
-                stat = os.stat(full)
-                content_type, _ = mimetypes.guess_type(name)
-                results.append(
-                    StoredFile(
-                        path=rel_path.replace("\\", "/"),
-                        size=stat.st_size,
-                        content_type=content_type or "application/octet-stream",
-                        modified_at=datetime.fromtimestamp(stat.st_mtime),
-                    )
-                )
-        return results
+        with self._manifest_lock:
+            manifest = self._manifests.get(project_id)
+            if manifest is None:
+                manifest = self._manifests[project_id] = ListingManifest(self._project_root(project_id))
+            else:
+                manifest.refresh()
+            files = sorted(manifest.files.items())
+        return [stored for rel_path, stored in files if not path_filter or path_filter in rel_path]
 
-    def get_file(self, project_id: UUID, rel_path: str) -> Tuple[BytesIO, str]:
+    def _record_write(self, project_id: UUID, full: str) -> None:
+        with self._manifest_lock:
+            manifest = self._manifests.get(project_id)
+            if manifest is not None:
+                manifest.record_file(full)
+
+    def invalidate_manifest(self, project_id: Optional[UUID] = None) -> None:
+        """Drop cached listings so the next listing rescans the directory"""
+        with self._manifest_lock:
+            if project_id is None:
+                self._manifests.clear()
+            else:
+                self._manifests.pop(project_id, None)
+
+    def _resolve(self, project_id: UUID, rel_path: str) -> str:
         root = self._project_root(project_id)
         safe_rel = rel_path.lstrip("/\\").replace("..", "_")
-        full = os.path.join(root, safe_rel)
+        return os.path.join(root, safe_rel)
+
+    def get_file(self, project_id: UUID, rel_path: str) -> Tuple[BytesIO, str]:
+        full = self._resolve(project_id, rel_path)
         if not os.path.isfile(full):
             raise FileNotFoundError(rel_path)
         with open(full, "rb") as f:
             data = f.read()
-        content_type, _ = mimetypes.guess_type(full)
-        return BytesIO(data), (content_type or "application/octet-stream")
+        return BytesIO(data), content_type_for(full)
+
+    def open_write(self, project_id: UUID, rel_path: str) -> AtomicFileWriter:
+        """Open a streaming binary writer for an artifact"""
+        return AtomicFileWriter(
+            self._resolve(project_id, rel_path),
+            on_close=lambda full: self._record_write(project_id, full),
+        )
+
+    def open_range(
+        self,
+        project_id: UUID,
+        rel_path: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> ServedFile:
+        """Resolve a download without reading it: validators, status and byte range.
+
+        Raises FileNotFoundError for missing files and RangeNotSatisfiable for
+        ranges outside the file.
+        """
+        full = self._resolve(project_id, rel_path)
+        try:
+            stat = os.stat(full)
+        except OSError:
+            raise FileNotFoundError(rel_path)
+        if not os.path.isfile(full):
+            raise FileNotFoundError(rel_path)
+
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+        served = ServedFile(
+            path=full,
+            size=size,
+            start=0,
+            end=max(0, size - 1),
+            content_type=content_type_for(full),
+            etag=etag,
+            modified_at=datetime.fromtimestamp(stat.st_mtime),
+            status_code=200,
+        )
+        if etag_matches(if_none_match, etag):
+            served.status_code = 304
+            return served
+        byte_range = parse_range(range_header, size)
+        if byte_range:
+            served.start, served.end = byte_range
+            served.status_code = 206
+        return served
+
+    def get_file_with_range(self, project_id: UUID, rel_path: str, range_header: str):
+        """Return file (partial if Range provided) plus headers.
+
+        Same contract as S3StorageService.get_file_with_range:
+        returns (buffer, content_type, headers, status_code). Only the
+        requested bytes are read.
+        """
+        served = self.open_range(project_id, rel_path, range_header)
+        return BytesIO(served.read()), served.content_type, served.headers, served.status_code
+
+    def file_size(self, project_id: UUID, rel_path: str) -> int:
+        full = self._resolve(project_id, rel_path)
+        if not os.path.isfile(full):
+            raise FileNotFoundError(rel_path)
+        return os.path.getsize(full)
+
+    def iter_file(
+        self,
+        project_id: UUID,
+        rel_path: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive) of a file in chunks (bounded memory)"""
+        full = self._resolve(project_id, rel_path)
+        if not os.path.isfile(full):
+            raise FileNotFoundError(rel_path)
+        with open(full, "rb") as f:
+            f.seek(start)
+            remaining = (end - start + 1) if end is not None else None
+            while remaining is None or remaining > 0:
+                data = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not data:
+                    break
+                if remaining is not None:
+                    remaining -= len(data)
+                yield data
 
     def delete_project_artifacts(self, project_id: UUID) -> None:
         root = self._project_root(project_id)
@@ -86,6 +420,8 @@ class LocalStorageService:
         except Exception:
             # Best effort cleanup
             pass
+        finally:
+            self.invalidate_manifest(project_id)
 
 
 # Singleton
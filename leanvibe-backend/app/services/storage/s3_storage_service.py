@@ -28,6 +28,82 @@ class _S3Config:
     expiry_seconds: int
 
 
+class S3MultipartWriter:
+    """Binary writer streaming an object to S3 with multipart upload.
+
+    Buffers at most one part in memory; small objects fall back to a single
+    put. ``abort`` cancels the upload so no partial object becomes visible.
+    """
+
+    def __init__(self, s3, bucket: str, key: str, part_size: int = 8 * 1024 * 1024):
+        self._s3 = s3
+        self._bucket = bucket
+        self._key = key
+        self._part_size = part_size  # S3 minimum is 5 MiB except for the last part
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[dict] = []
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        if len(self._buffer) >= self._part_size:
+            self._upload_part()
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def _upload_part(self) -> None:
+        if self._upload_id is None:
+            upload = self._s3.create_multipart_upload(Bucket=self._bucket, Key=self._key)
+            self._upload_id = upload["UploadId"]
+        part_number = len(self._parts) + 1
+        response = self._s3.upload_part(
+            Bucket=self._bucket,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=bytes(self._buffer),
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._upload_id is None:
+            self._s3.put_object(Bucket=self._bucket, Key=self._key, Body=bytes(self._buffer))
+        else:
+            if self._buffer:
+                self._upload_part()
+            self._s3.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=self._key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer.clear()
+        self.closed = True
+
+    def abort(self) -> None:
+        if self.closed:
+            return
+        if self._upload_id is not None:
+            self._s3.abort_multipart_upload(Bucket=self._bucket, Key=self._key, UploadId=self._upload_id)
+        self._buffer.clear()
+        self.closed = True
+
+    def __enter__(self) -> "S3MultipartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
 class S3StorageService:
     def __init__(self):
         if not boto3:
@@ -111,6 +187,19 @@ class S3StorageService:
         status_code = 206 if range_header else 200
         return BytesIO(body), content_type, headers, status_code
 
+    def open_write(self, project_id: UUID, rel_path: str) -> S3MultipartWriter:
+        """Open a streaming binary writer for an object"""
+        key = f"{self._key_prefix(project_id)}{rel_path.lstrip('/')}"
+        return S3MultipartWriter(self._s3, self.config.bucket, key)
+
+    def file_size(self, project_id: UUID, rel_path: str) -> int:
+        key = f"{self._key_prefix(project_id)}{rel_path.lstrip('/')}"
+        try:
+            head = self._s3.head_object(Bucket=self.config.bucket, Key=key)
+        except Exception:
+            raise FileNotFoundError(rel_path)
+        return int(head.get("ContentLength", 0))
+
     def iter_object(self, project_id: UUID, rel_path: str, chunk_size: int = 1024 * 1024):
         """Yield object bytes in chunks (bounded memory)"""
         key = f"{self._key_prefix(project_id)}{rel_path.lstrip('/')}"
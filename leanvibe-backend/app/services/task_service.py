@@ -11,16 +11,21 @@ from ..models.task_models import (
     TaskFilters, TaskSearchRequest, TaskStats, KanbanBoard, KanbanColumn,
     TaskStatus, TaskPriority
 )
+from .task_store import SQLiteTaskStore, TaskIndex
 
 logger = logging.getLogger(__name__)
 
 class TaskService:
     """Service for managing tasks and Kanban board operations"""
     
+    TEXT_INDEX_MIN_TASKS = 500
+    
     def __init__(self, data_dir: str = ".leanvibe_cache"):
         self.data_dir = Path(data_dir)
         self.tasks_file = self.data_dir / "tasks.json"
+        self.store = SQLiteTaskStore(self.data_dir / "tasks.db")
         self._tasks: Dict[str, Task] = {}
+        self._index = TaskIndex()
         self._lock = asyncio.Lock()
         
         # Ensure data directory exists
@@ -34,67 +39,101 @@ class TaskService:
         except Exception as e:
             logger.error(f"Failed to initialize TaskService: {e}")
             # Initialize with empty tasks if loading fails
-            self._tasks = {}
+            self._set_tasks({})
     
     async def _load_tasks(self):
-        """Load tasks from persistent storage"""
+        """Load tasks from persistent storage, importing a legacy tasks.json once"""
+        await asyncio.to_thread(self.store.open)
+        rows = await asyncio.to_thread(self.store.load_all)
+        
+        tasks = {}
+        for task_id, task_data in rows:
+            task = self._parse_task(task_id, task_data)
+            if task:
+                tasks[task_id] = task
+        
+        if not await asyncio.to_thread(self.store.get_meta, "json_imported"):
+            legacy_tasks = await self._load_legacy_json()
+            new_tasks = [task for task_id, task in legacy_tasks.items() if task_id not in tasks]
+            if new_tasks:
+                await asyncio.to_thread(self.store.upsert, new_tasks)
+                tasks.update((task.id, task) for task in new_tasks)
+                logger.info(f"Imported {len(new_tasks)} tasks from {self.tasks_file}")
+            await asyncio.to_thread(self.store.set_meta, "json_imported", datetime.utcnow().isoformat())
+        
+        self._set_tasks(tasks)
+    
+    async def _load_legacy_json(self) -> Dict[str, Task]:
+        """Load tasks from the legacy whole-file JSON storage"""
         if not self.tasks_file.exists():
-            self._tasks = {}
-            return
+            return {}
         
+        tasks = {}
         try:
             async with aiofiles.open(self.tasks_file, 'r') as f:
                 content = await f.read()
                 if content.strip():
                     data = json.loads(content)
-                    self._tasks = {}
                     for task_id, task_data in data.items():
-                        try:
-                            # Handle legacy tasks by adding required fields
-                            if 'project_id' not in task_data:
-                                task_data['project_id'] = 'legacy-project'
-                            if 'client_id' not in task_data:
-                                task_data['client_id'] = 'legacy-client'
-                            if 'confidence' not in task_data and 'confidence_score' in task_data:
-                                task_data['confidence'] = task_data['confidence_score']
-                            elif 'confidence' not in task_data:
-                                task_data['confidence'] = 1.0
-                            
-                            # Map legacy status values
-                            if task_data.get('status') == 'backlog':
-                                task_data['status'] = 'todo'
-                            if task_data.get('priority') == 'critical':
-                                task_data['priority'] = 'urgent'
-                            
-                            # Ensure all required fields exist
-                            task_data.setdefault('dependencies', [])
-                            task_data.setdefault('attachments', [])
-                            task_data.setdefault('tags', [])
-                            
-                            task = Task.parse_obj(task_data)
-                            self._tasks[task_id] = task
-                        except Exception as e:
-                            logger.warning(f"Could not load task {task_id}: {e}")
-                            continue
-                else:
-                    self._tasks = {}
+                        task = self._parse_task(task_id, task_data)
+                        if task:
+                            tasks[task_id] = task
         except (json.JSONDecodeError, FileNotFoundError) as e:
             logger.warning(f"Could not load tasks from {self.tasks_file}: {e}")
-            self._tasks = {}
+        return tasks
     
-    async def _save_tasks(self):
-        """Save tasks to persistent storage"""
+    def _parse_task(self, task_id: str, task_data: Dict) -> Optional[Task]:
+        """Build a task from stored data, upgrading legacy records"""
         try:
-            # Convert tasks to serializable format
-            data = {
-                task_id: task.dict()
-                for task_id, task in self._tasks.items()
-            }
+            # Handle legacy tasks by adding required fields
+            if 'project_id' not in task_data:
+                task_data['project_id'] = 'legacy-project'
+            if 'client_id' not in task_data:
+                task_data['client_id'] = 'legacy-client'
+            if 'confidence' not in task_data and 'confidence_score' in task_data:
+                task_data['confidence'] = task_data['confidence_score']
+            elif 'confidence' not in task_data:
+                task_data['confidence'] = 1.0
             
-            async with aiofiles.open(self.tasks_file, 'w') as f:
-                await f.write(json.dumps(data, indent=2, default=str))
+            # Map legacy status values
+            if task_data.get('status') == 'backlog':
+                task_data['status'] = 'todo'
+            if task_data.get('priority') == 'critical':
+                task_data['priority'] = 'urgent'
+            
+            # Ensure all required fields exist
+            task_data.setdefault('dependencies', [])
+            task_data.setdefault('attachments', [])
+            task_data.setdefault('tags', [])
+            
+            return Task.model_validate(task_data)
+        except Exception as e:
+            logger.warning(f"Could not load task {task_id}: {e}")
+            return None
+    
+    def _set_tasks(self, tasks: Dict[str, Task]):
+        """Replace the in-memory task set and rebuild its indexes"""
+        self._tasks = tasks
+        self._index = TaskIndex()
+        for task in tasks.values():
+            self._index.add(task)
+    
+    async def _save_task(self, task: Task):
+        """Index a changed task and persist just its row"""
+        self._index.add(task)
+        try:
+            await asyncio.to_thread(self.store.upsert, [task])
+        except Exception as e:
+            logger.error(f"Failed to save task {task.id} to {self.store.db_path}: {e}")
+    
+    async def _delete_tasks(self, task_ids: List[str]):
+        """Unindex deleted tasks and remove their rows"""
+        for task_id in task_ids:
+            self._index.remove(task_id, forget_order=True)
+        try:
+            await asyncio.to_thread(self.store.delete, task_ids)
         except Exception as e:
-            logger.error(f"Failed to save tasks to {self.tasks_file}: {e}")
+            logger.error(f"Failed to delete tasks from {self.store.db_path}: {e}")
     
     async def create_task(self, task_data: TaskCreate) -> Task:
         """Create a new task"""
@@ -116,7 +155,7 @@ class TaskService:
             )
             
             self._tasks[task.id] = task
-            await self._save_tasks()
+            await self._save_task(task)
             
             logger.info(f"Created task: {task.id} - {task.title}")
             return task
@@ -127,27 +166,22 @@ class TaskService:
     
     async def list_tasks(self, filters: Optional[TaskFilters] = None) -> List[Task]:
         """List all tasks with optional filtering"""
-        tasks = list(self._tasks.values())
+        if not filters:
+            return list(self._tasks.values())
         
+        # Narrow with the secondary indexes, then apply the unindexed date filters
+        return self._filter_by_date(self._resolve(self._index.select(filters)), filters)
+    
+    def _resolve(self, task_ids: Optional[List[str]]) -> List[Task]:
+        """Tasks for an id list, or every task when no index narrowed the query"""
+        if task_ids is None:
+            return list(self._tasks.values())
+        return [self._tasks[task_id] for task_id in task_ids]
+    
+    def _filter_by_date(self, tasks: List[Task], filters: Optional[TaskFilters]) -> List[Task]:
         if not filters:
             return tasks
         
-        # Apply filters
-        if filters.project_id:
-            tasks = [t for t in tasks if getattr(t, 'project_id', None) == filters.project_id]
-            
-        if filters.status:
-            tasks = [t for t in tasks if t.status == filters.status]
-        
-        if filters.priority:
-            tasks = [t for t in tasks if t.priority == filters.priority]
-        
-        if filters.assigned_to:
-            tasks = [t for t in tasks if t.assigned_to == filters.assigned_to]
-        
-        if filters.tags:
-            tasks = [t for t in tasks if any(tag in t.tags for tag in filters.tags)]
-        
         if filters.created_after:
             tasks = [t for t in tasks if t.created_at >= filters.created_after]
         
@@ -169,7 +203,7 @@ class TaskService:
                 setattr(task, field, value)
             
             task.updated_at = datetime.utcnow()
-            await self._save_tasks()
+            await self._save_task(task)
             
             logger.info(f"Updated task: {task_id}")
             return task
@@ -185,7 +219,7 @@ class TaskService:
             task.status = status_update.status
             task.updated_at = datetime.utcnow()
             
-            await self._save_tasks()
+            await self._save_task(task)
             
             logger.info(f"Task {task_id} moved from {old_status} to {status_update.status}")
             return task
@@ -195,7 +229,7 @@ class TaskService:
         async with self._lock:
             if task_id in self._tasks:
                 del self._tasks[task_id]
-                await self._save_tasks()
+                await self._delete_tasks([task_id])
                 logger.info(f"Deleted task: {task_id}")
                 return True
             return False
@@ -206,13 +240,7 @@ class TaskService:
     
     async def get_kanban_board(self) -> KanbanBoard:
         """Get complete Kanban board state"""
-        tasks_by_status = {status: [] for status in TaskStatus}
-        
-        # Group tasks by status
-        for task in self._tasks.values():
-            tasks_by_status[task.status].append(task)
-        
-        # Create columns
+        # Create columns from the incrementally maintained column order
         columns = []
         column_configs = [
             (TaskStatus.TODO, "To Do"),
@@ -222,7 +250,7 @@ class TaskService:
         ]
         
         for status, title in column_configs:
-            column_tasks = sorted(tasks_by_status[status], key=lambda t: t.updated_at, reverse=True)
+            column_tasks = self._index.column(status.value)
             columns.append(KanbanColumn(
                 id=status.value,
                 title=title,
@@ -238,7 +266,20 @@ class TaskService:
     
     async def search_tasks(self, search_request: TaskSearchRequest) -> List[Task]:
         """Search tasks with query and filters"""
-        tasks = await self.list_tasks(search_request.filters)
+        filters = search_request.filters
+        task_ids = self._index.select(filters) if filters else None
+        
+        # Narrow with the word index, then confirm substring matches below. Small
+        # filtered selections are cheaper to check directly.
+        if search_request.query and (task_ids is None or len(task_ids) > self.TEXT_INDEX_MIN_TASKS):
+            candidates = self._index.text_candidates(search_request.query)
+            if candidates is not None:
+                if task_ids is None:
+                    task_ids = self._index.ordered(candidates)
+                else:
+                    task_ids = [task_id for task_id in task_ids if task_id in candidates]
+        
+        tasks = self._filter_by_date(self._resolve(task_ids), filters)
         
         # Apply text search if query provided
         if search_request.query:
@@ -257,8 +298,7 @@ class TaskService:
     
     async def get_task_stats(self) -> TaskStats:
         """Get task statistics for dashboard"""
-        tasks = list(self._tasks.values())
-        total_tasks = len(tasks)
+        total_tasks = len(self._tasks)
         
         if total_tasks == 0:
             return TaskStats(
@@ -268,35 +308,18 @@ class TaskService:
                 completion_rate=0.0
             )
         
-        # Count by status - using string values for JSON compatibility
-        by_status = {status.value: 0 for status in TaskStatus}
-        for task in tasks:
-            status_key = task.status.value if hasattr(task.status, 'value') else str(task.status)
-            if status_key in by_status:
-                by_status[status_key] += 1
-        
-        # Count by priority - using string values for JSON compatibility
-        by_priority = {priority.value: 0 for priority in TaskPriority}
-        for task in tasks:
-            priority_key = task.priority.value if hasattr(task.priority, 'value') else str(task.priority)
-            if priority_key in by_priority:
-                by_priority[priority_key] += 1
+        # Counts are maintained by the index - using string values for JSON compatibility
+        by_status = {status.value: self._index.status_counts.get(status.value, 0) for status in TaskStatus}
+        by_priority = {priority.value: self._index.priority_counts.get(priority.value, 0) for priority in TaskPriority}
         
         # Calculate completion rate
         completed_tasks = by_status.get(TaskStatus.DONE.value, 0)
         completion_rate = completed_tasks / total_tasks if total_tasks > 0 else 0.0
         
-        # Calculate average completion time for done tasks
-        done_tasks = [t for t in tasks if t.status == TaskStatus.DONE]
+        # Average completion time (hours) for done tasks
         avg_completion_time = None
-        if done_tasks:
-            completion_times = [
-                (task.updated_at - task.created_at).total_seconds() / 3600  # hours
-                for task in done_tasks
-                if task.updated_at and task.created_at
-            ]
-            if completion_times:
-                avg_completion_time = sum(completion_times) / len(completion_times)
+        if self._index.completion_hours_count:
+            avg_completion_time = self._index.completion_hours_total / self._index.completion_hours_count
         
         return TaskStats(
             total_tasks=total_tasks,
@@ -315,15 +338,15 @@ class TaskService:
         
         async with self._lock:
             tasks_to_remove = [
-                task_id for task_id, task in self._tasks.items()
-                if str(task.status) == TaskStatus.DONE.value and task.updated_at < cutoff_date
+                task_id for task_id in self._index.by_status.get(TaskStatus.DONE.value, ())
+                if self._tasks[task_id].updated_at < cutoff_date
             ]
             
             for task_id in tasks_to_remove:
                 del self._tasks[task_id]
             
             if tasks_to_remove:
-                await self._save_tasks()
+                await self._delete_tasks(tasks_to_remove)
                 logger.info(f"Cleaned up {len(tasks_to_remove)} old completed tasks")
 
 # Global task service instance
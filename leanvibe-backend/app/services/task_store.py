@@ -0,0 +1,332 @@
+"""
+Task storage engine for the Kanban board
+
+Tasks are persisted one row per task in SQLite (WAL mode), so a create,
+update or move writes a single row instead of rewriting the whole task file.
+Reads are served from memory through TaskIndex, which keeps secondary
+indexes, a word index for text search, and counters for stats and Kanban
+columns up to date as tasks change.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from bisect import bisect_left, insort
+from operator import itemgetter
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.task_models import Task, TaskFilters, TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _key(value: Any) -> Any:
+    """Index key for enum-or-string fields"""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _words(task: Task) -> Set[str]:
+    text = " ".join([task.title or "", task.description or "", *(task.tags or [])]).lower()
+    return set(WORD_PATTERN.findall(text))
+
+
+def _completion_hours(task: Task) -> Optional[float]:
+    if _key(task.status) != TaskStatus.DONE.value:
+        return None
+    if not (task.updated_at and task.created_at):
+        return None
+    return (task.updated_at - task.created_at).total_seconds() / 3600
+
+
+@dataclass(frozen=True)
+class _IndexedTask:
+    """The field values a task was indexed under, used to unindex it later"""
+
+    project_id: Optional[str]
+    status: str
+    priority: str
+    assigned_to: Optional[str]
+    tags: Tuple[str, ...]
+    words: frozenset
+    column_key: Tuple[datetime, str]
+    completion_hours: Optional[float]
+
+
+class TaskIndex:
+    """In-memory secondary indexes and counters over a set of tasks"""
+
+    def __init__(self):
+        self._entries: Dict[str, _IndexedTask] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+        self.by_project: Dict[str, Set[str]] = {}
+        self.by_status: Dict[str, Set[str]] = {}
+        self.by_priority: Dict[str, Set[str]] = {}
+        self.by_assignee: Dict[str, Set[str]] = {}
+        self.by_tag: Dict[str, Set[str]] = {}
+        self.by_word: Dict[str, Set[str]] = {}
+        # Newline-delimited copy of the word index keys for fast substring lookup
+        self._vocabulary: Optional[str] = None
+        # Kanban columns of (updated_at, id, task) kept sorted; read newest first
+        self.columns: Dict[str, List[Tuple[datetime, str, Task]]] = {
+            status.value: [] for status in TaskStatus
+        }
+        self.status_counts: Dict[str, int] = {status.value: 0 for status in TaskStatus}
+        self.priority_counts: Dict[str, int] = {
+            priority.value: 0 for priority in TaskPriority
+        }
+        self.completion_hours_total = 0.0
+        self.completion_hours_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, task: Task):
+        """Index a task, replacing any previous entry for the same id"""
+        if task.id in self._entries:
+            self.remove(task.id)
+        else:
+            self._order[task.id] = self._next_order
+            self._next_order += 1
+
+        entry = _IndexedTask(
+            project_id=getattr(task, "project_id", None),
+            status=_key(task.status),
+            priority=_key(task.priority),
+            assigned_to=task.assigned_to,
+            tags=tuple(task.tags or ()),
+            words=frozenset(_words(task)),
+            column_key=(task.updated_at, task.id),
+            completion_hours=_completion_hours(task),
+        )
+        self._entries[task.id] = entry
+
+        self._link(self.by_project, entry.project_id, task.id)
+        self._link(self.by_status, entry.status, task.id)
+        self._link(self.by_priority, entry.priority, task.id)
+        self._link(self.by_assignee, entry.assigned_to, task.id)
+        for tag in entry.tags:
+            self._link(self.by_tag, tag, task.id)
+        by_word = self.by_word
+        for word in entry.words:
+            postings = by_word.get(word)
+            if postings is None:
+                postings = by_word[word] = set()
+                self._vocabulary = None
+            postings.add(task.id)
+
+        if entry.status in self.columns:
+            insort(self.columns[entry.status], (*entry.column_key, task))
+        self.status_counts[entry.status] = self.status_counts.get(entry.status, 0) + 1
+        self.priority_counts[entry.priority] = self.priority_counts.get(entry.priority, 0) + 1
+        if entry.completion_hours is not None:
+            self.completion_hours_total += entry.completion_hours
+            self.completion_hours_count += 1
+
+    def remove(self, task_id: str, forget_order: bool = False):
+        """Drop a task from every index"""
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        if forget_order:
+            self._order.pop(task_id, None)
+
+        self._unlink(self.by_project, entry.project_id, task_id)
+        self._unlink(self.by_status, entry.status, task_id)
+        self._unlink(self.by_priority, entry.priority, task_id)
+        self._unlink(self.by_assignee, entry.assigned_to, task_id)
+        for tag in entry.tags:
+            self._unlink(self.by_tag, tag, task_id)
+        for word in entry.words:
+            self._unlink(self.by_word, word, task_id)
+            if word not in self.by_word:
+                self._vocabulary = None
+
+        column = self.columns.get(entry.status)
+        if column is not None:
+            position = bisect_left(column, entry.column_key)
+            if position < len(column) and column[position][:2] == entry.column_key:
+                del column[position]
+        self.status_counts[entry.status] -= 1
+        self.priority_counts[entry.priority] -= 1
+        if entry.completion_hours is not None:
+            self.completion_hours_total -= entry.completion_hours
+            self.completion_hours_count -= 1
+
+    def select(self, filters: TaskFilters) -> Optional[List[str]]:
+        """Task ids matching the indexed filters, in insertion order.
+
+        Returns None when no indexed filter applies (callers use all tasks).
+        Date filters are not indexed and are applied by the caller.
+        """
+        candidate_sets = []
+        if filters.project_id:
+            candidate_sets.append(self.by_project.get(filters.project_id, set()))
+        if filters.status:
+            candidate_sets.append(self.by_status.get(_key(filters.status), set()))
+        if filters.priority:
+            candidate_sets.append(self.by_priority.get(_key(filters.priority), set()))
+        if filters.assigned_to:
+            candidate_sets.append(self.by_assignee.get(filters.assigned_to, set()))
+        if filters.tags:
+            tagged: Set[str] = set()
+            for tag in filters.tags:
+                tagged |= self.by_tag.get(tag, set())
+            candidate_sets.append(tagged)
+
+        if not candidate_sets:
+            return None
+        return self.ordered(self._intersect(candidate_sets))
+
+    def text_candidates(self, query: str) -> Optional[Set[str]]:
+        """Tasks that may contain ``query`` as a substring of a title, description or tag.
+
+        Every word in the query must occur inside some indexed word, so the
+        candidates are a superset of the true matches. Returns None for queries
+        without word characters, which the index cannot narrow. The result may
+        be an index set itself and must not be modified.
+        """
+        query_words = set(WORD_PATTERN.findall(query.lower()))
+        if not query_words:
+            return None
+
+        candidate_sets = []
+        for query_word in sorted(query_words, key=len, reverse=True):
+            postings = [self.by_word[word] for word in self._words_containing(query_word)]
+            matches = postings[0] if len(postings) == 1 else set().union(*postings)
+            if not matches:
+                return set()
+            candidate_sets.append(matches)
+        return self._intersect(candidate_sets)
+
+    def _words_containing(self, fragment: str) -> Set[str]:
+        """Indexed words that contain ``fragment``"""
+        if self._vocabulary is None:
+            self._vocabulary = "\n" + "\n".join(self.by_word) + "\n"
+        vocabulary = self._vocabulary
+
+        words = set()
+        position = vocabulary.find(fragment)
+        while position != -1:
+            start = vocabulary.rfind("\n", 0, position) + 1
+            end = vocabulary.find("\n", position)
+            words.add(vocabulary[start:end])
+            position = vocabulary.find(fragment, end)
+        return words
+
+    def ordered(self, task_ids: Iterable[str]) -> List[str]:
+        """Sort task ids by insertion order"""
+        return sorted(task_ids, key=self._order.__getitem__)
+
+    def column(self, status: str) -> List[Task]:
+        """Tasks in a Kanban column, most recently updated first"""
+        return list(map(itemgetter(2), reversed(self.columns.get(status, []))))
+
+    @staticmethod
+    def _intersect(candidate_sets: List[Set[str]]) -> Set[str]:
+        """Intersection of the sets; may return one of them, so treat it as read-only"""
+        candidate_sets = sorted(candidate_sets, key=len)
+        result = candidate_sets[0]
+        for candidates in candidate_sets[1:]:
+            result = result & candidates
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _link(index: Dict[str, Set[str]], key: Optional[str], task_id: str):
+        if key is not None:
+            index.setdefault(key, set()).add(task_id)
+
+    @staticmethod
+    def _unlink(index: Dict[str, Set[str]], key: Optional[str], task_id: str):
+        if key is None:
+            return
+        task_ids = index.get(key)
+        if task_ids is not None:
+            task_ids.discard(task_id)
+            if not task_ids:
+                del index[key]
+
+
+class SQLiteTaskStore:
+    """Row-per-task SQLite persistence with write-ahead logging"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection is shared with worker threads; serialize access to it
+        self._conn_lock = threading.Lock()
+
+    def open(self):
+        """Open the database and create the schema if needed"""
+        with self._conn_lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.commit()
+            self._conn = conn
+
+    def close(self):
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def load_all(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Load every stored task in insertion order"""
+        self.open()
+        with self._conn_lock:
+            rows = self._conn.execute("SELECT id, data FROM tasks ORDER BY rowid").fetchall()
+        return [(task_id, json.loads(data)) for task_id, data in rows]
+
+    def upsert(self, tasks: Iterable[Task]):
+        """Write tasks in one transaction, keeping each row's original position"""
+        rows = [(task.id, task.model_dump_json()) for task in tasks]
+        self.open()
+        with self._conn_lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO tasks (id, data) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data",
+                rows,
+            )
+
+    def delete(self, task_ids: Iterable[str]):
+        self.open()
+        with self._conn_lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids]
+            )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        self.open()
+        with self._conn_lock:
+            row = self._conn.execute(
+                "SELECT value FROM store_meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.open()
+        with self._conn_lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
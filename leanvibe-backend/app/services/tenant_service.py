@@ -17,8 +17,9 @@ from ..models.tenant_models import (
     TenantCreate, TenantUpdate, TenantUsage, TenantQuotaExceeded,
     TenantStatus, TenantPlan, TenantType, DEFAULT_QUOTAS, TenantMember
 )
-from ..models.orm_models import TenantORM, TaskORM, ProjectORM, TenantMemberORM, MVPProjectORM
+from ..models.orm_models import TenantORM, MVPProjectORM
 from ..core.database import get_database_session
+from .tenant_usage_service import TenantUsageService, tenant_usage_service
 from ..core.exceptions import (
     TenantNotFoundError, TenantQuotaExceededError, TenantSuspendedError,
     InvalidTenantError
@@ -30,8 +31,9 @@ logger = logging.getLogger(__name__)
 class TenantService:
     """Service for tenant management operations using SQLAlchemy ORM"""
     
-    def __init__(self, db: AsyncSession = None):
+    def __init__(self, db: AsyncSession = None, usage: TenantUsageService = None):
         self.db = db
+        self.usage = usage or tenant_usage_service
     
     async def _get_db(self) -> AsyncSession:
         """Get database session"""
@@ -149,6 +151,7 @@ class TenantService:
                 )
                 
                 await db.commit()
+                self.usage.invalidate(tenant_id)
                 
                 # Return updated tenant
                 return await self.get_by_id(tenant_id)
@@ -231,100 +234,24 @@ class TenantService:
     
     async def get_tenant_usage(self, tenant_id: UUID) -> TenantUsage:
         """Get current resource usage for tenant (Enterprise + MVP Factory)"""
-        async with self._get_db() as db:
-            # Get tenant to check type
-            tenant = await self.get_by_id(tenant_id)
-            
-            # Count actual usage from database
-            
-            # Count projects for this tenant (includes enterprise projects)
-            project_result = await db.execute(
-                select(func.count()).where(ProjectORM.tenant_id == tenant_id)
-            )
-            projects_count = project_result.scalar() or 0
-            
-            # Count MVP projects for this tenant
-            mvp_result = await db.execute(
-                select(func.count()).where(MVPProjectORM.tenant_id == tenant_id)
-            )
-            mvp_count = mvp_result.scalar() or 0
-            
-            # For MVP Factory tenants, MVP projects ARE their projects
-            if tenant.tenant_type == TenantType.MVP_FACTORY:
-                projects_count = mvp_count
-            
-            # Count tasks for this tenant
-            task_result = await db.execute(
-                select(func.count()).where(TaskORM.tenant_id == tenant_id)
-            )
-            tasks_count = task_result.scalar() or 0
-            
-            # Count tenant members
-            member_result = await db.execute(
-                select(func.count()).where(TenantMemberORM.tenant_id == tenant_id)
-            )
-            users_count = member_result.scalar() or 0
-            
-            # Count active MVP generations (concurrent MVPs)
-            active_mvp_result = await db.execute(
-                select(func.count()).where(
-                    and_(
-                        MVPProjectORM.tenant_id == tenant_id,
-                        MVPProjectORM.status.in_(["generating", "testing", "deploying"])
-                    )
-                )
-            )
-            concurrent_mvps = active_mvp_result.scalar() or 0
-            
-            # Sum resource usage for MVP projects
-            resource_result = await db.execute(
-                select(
-                    func.coalesce(func.sum(MVPProjectORM.cpu_hours_used), 0),
-                    func.coalesce(func.sum(MVPProjectORM.memory_gb_hours_used), 0),
-                    func.coalesce(func.sum(MVPProjectORM.storage_mb_used), 0),
-                    func.coalesce(func.sum(MVPProjectORM.ai_tokens_used), 0)
-                ).where(MVPProjectORM.tenant_id == tenant_id)
-            )
-            resource_usage = resource_result.first() or (0, 0, 0, 0)
-            
-            return TenantUsage(
-                tenant_id=tenant_id,
-                users_count=users_count,
-                projects_count=projects_count,
-                api_calls_this_month=0,  # TODO: Count from API logs when implemented
-                storage_used_mb=int(resource_usage[2]),  # From MVP projects
-                ai_requests_today=0,  # TODO: Count from AI request logs when implemented
-                concurrent_sessions=0,  # TODO: Count from active WebSocket connections
-            )
+        counters = await self.usage.get_counters(tenant_id, self.db)
+        return counters.to_usage()
     
     async def check_quota(self, tenant_id: UUID, quota_type: str, increment: int = 1) -> bool:
         """Check if tenant can consume resource within quota"""
-        tenant = await self.get_by_id(tenant_id)
-        usage = await self.get_tenant_usage(tenant_id)
+        # Served from the materialized counters: at most one query, none when cached
+        counters = await self.usage.get_counters(tenant_id, self.db)
         
-        # Convert JSON quotas back to object for easier access
-        from ..models.tenant_models import TenantQuotas
-        quotas = TenantQuotas(**tenant.quotas)
-        
-        quota_checks = {
-            "users": (usage.users_count + increment, quotas.max_users),
-            "projects": (usage.projects_count + increment, quotas.max_projects),
-            "api_calls": (usage.api_calls_this_month + increment, quotas.max_api_calls_per_month),
-            "storage_mb": (usage.storage_used_mb + increment, quotas.max_storage_mb),
-            "ai_requests": (usage.ai_requests_today + increment, quotas.max_ai_requests_per_day),
-            "concurrent_sessions": (usage.concurrent_sessions + increment, quotas.max_concurrent_sessions),
-        }
-        
-        if quota_type not in quota_checks:
+        current_usage = counters.value(quota_type)
+        limit = counters.limit(quota_type)
+        if current_usage is None or limit is None:
             logger.warning(f"Unknown quota type: {quota_type}")
             return True  # Allow unknown quota types
         
-        current_usage, limit = quota_checks[quota_type]
-        
-        if current_usage > limit:
+        if current_usage + increment > limit:
             logger.warning(
-                f"Quota exceeded for tenant {tenant.slug}: {quota_type} "
-                f"({current_usage}/{limit})"
+                f"Quota exceeded for tenant {counters.slug}: {quota_type} "
+                f"({current_usage + increment}/{limit})"
             )
             return False
         
@@ -333,15 +260,15 @@ class TenantService:
     async def enforce_quota(self, tenant_id: UUID, quota_type: str, increment: int = 1):
         """Enforce quota limits, raise exception if exceeded"""
         if not await self.check_quota(tenant_id, quota_type, increment):
-            tenant = await self.get_by_id(tenant_id)
-            usage = await self.get_tenant_usage(tenant_id)
+            counters = await self.usage.get_counters(tenant_id, self.db)
             
             raise TenantQuotaExceededError(
                 f"Quota exceeded for {quota_type}. "
                 f"Consider upgrading to a higher plan.",
                 quota_type=quota_type,
-                current_usage=getattr(usage, f"{quota_type}_count", 0),
-                quota_limit=getattr(tenant.quotas, f"max_{quota_type}", 0)
+                current_usage=counters.value(quota_type),
+                quota_limit=counters.limit(quota_type),
+                tenant_id=str(tenant_id)
             )
     
     async def record_quota_usage(
@@ -352,9 +279,10 @@ class TenantService:
         metadata: Dict = None
     ):
         """Record quota usage (for tracking and billing)"""
-        # This would typically insert into a usage_logs table
-        # For now, just log the usage
-        logger.info(
+        # Metered counters (api_calls, ai_requests, concurrent_sessions) are
+        # flushed to tenants.current_usage by the usage service
+        self.usage.record(tenant_id, quota_type, amount)
+        logger.debug(
             f"Quota usage recorded for tenant {tenant_id}: "
             f"{quota_type}={amount}, metadata={metadata}"
         )
@@ -464,22 +392,20 @@ class TenantService:
     
     async def check_mvp_quota(self, tenant_id: UUID, quota_type: str, increment: int = 1) -> bool:
         """Check MVP-specific quotas"""
-        tenant = await self.get_by_id(tenant_id)
+        counters = await self.usage.get_counters(tenant_id, self.db)
         
         # Only check MVP quotas for MVP Factory tenants
-        if tenant.tenant_type != TenantType.MVP_FACTORY:
+        if counters.tenant_type != TenantType.MVP_FACTORY:
             return True
         
-        usage = await self.get_tenant_usage(tenant_id)
-        from ..models.tenant_models import TenantQuotas
-        quotas = TenantQuotas(**tenant.quotas)
+        quotas = counters.quotas
         
         # MVP-specific quota checks
         mvp_quota_checks = {
-            "concurrent_mvps": (self._get_concurrent_mvps(tenant_id), quotas.max_concurrent_mvps),
-            "mvp_generations": (tenant.mvp_count_used + increment, quotas.max_mvp_generations),
-            "cpu_cores": (self._get_current_cpu_usage(tenant_id) + increment, quotas.max_cpu_cores),
-            "memory_gb": (self._get_current_memory_usage(tenant_id) + increment, quotas.max_memory_gb),
+            "concurrent_mvps": (counters.concurrent_mvps, quotas.max_concurrent_mvps),
+            "mvp_generations": (counters.mvp_count_used + increment, quotas.max_mvp_generations),
+            "cpu_cores": (await self._get_current_cpu_usage(tenant_id) + increment, quotas.max_cpu_cores),
+            "memory_gb": (await self._get_current_memory_usage(tenant_id) + increment, quotas.max_memory_gb),
         }
         
         if quota_type not in mvp_quota_checks:
@@ -490,7 +416,7 @@ class TenantService:
         
         if current_usage > limit:
             logger.warning(
-                f"MVP quota exceeded for tenant {tenant.slug}: {quota_type} "
+                f"MVP quota exceeded for tenant {counters.slug}: {quota_type} "
                 f"({current_usage}/{limit})"
             )
             return False
@@ -511,6 +437,7 @@ class TenantService:
                 )
                 
                 await db.commit()
+                self.usage.invalidate(tenant_id)
                 return await self.get_by_id(tenant_id)
                 
             except Exception as e:
@@ -582,16 +509,8 @@ class TenantService:
     # Helper methods for MVP quota checking
     async def _get_concurrent_mvps(self, tenant_id: UUID) -> int:
         """Get current number of concurrent MVP generations"""
-        async with self._get_db() as db:
-            result = await db.execute(
-                select(func.count()).where(
-                    and_(
-                        MVPProjectORM.tenant_id == tenant_id,
-                        MVPProjectORM.status.in_(["generating", "testing", "deploying"])
-                    )
-                )
-            )
-            return result.scalar() or 0
+        counters = await self.usage.get_counters(tenant_id, self.db)
+        return counters.concurrent_mvps
     
     async def _get_current_cpu_usage(self, tenant_id: UUID) -> int:
         """Get current CPU core usage for active MVP generations"""
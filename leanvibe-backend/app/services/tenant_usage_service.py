@@ -0,0 +1,531 @@
+"""
+Materialized tenant usage counters for quota enforcement
+
+Keeps per-tenant usage counters in memory so quota checks on the create-project
+and create-MVP paths do not recount the source tables. Counters are loaded with
+a single aggregate query, kept current by a transactional outbox on ORM sessions
+(deltas collected at flush time are applied only when the transaction commits),
+and periodically reconciled against the source tables to correct drift from
+bulk statements or other processes.
+
+API calls and AI requests are period counters (calendar month and day). They are
+flushed to ``TenantORM.current_usage`` so they survive restarts and are shared
+between processes; concurrent sessions are live, per-process counts.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.exceptions import TenantNotFoundError
+from ..models.orm_models import (
+    MVPProjectORM,
+    ProjectORM,
+    TaskORM,
+    TenantMemberORM,
+    TenantORM,
+)
+from ..models.tenant_models import TenantQuotas, TenantType, TenantUsage
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_MVP_STATUSES = ("generating", "testing", "deploying")
+
+# Period counters persisted in TenantORM.current_usage: name -> period format
+PERIOD_COUNTERS = {
+    "api_calls": "%Y-%m",
+    "ai_requests": "%Y-%m-%d",
+}
+
+# Source-table counters maintained by the session outbox
+TABLE_COUNTERS = ("users", "projects", "mvp_projects", "tasks", "concurrent_mvps", "storage_mb")
+
+Delta = Tuple[UUID, str, int]
+
+
+@dataclass
+class TenantUsageCounters:
+    """In-memory usage snapshot for one tenant"""
+
+    tenant_id: UUID
+    slug: str
+    tenant_type: TenantType
+    quotas: TenantQuotas
+    mvp_count_used: int = 0
+    users: int = 0
+    projects: int = 0
+    mvp_projects: int = 0
+    tasks: int = 0
+    concurrent_mvps: int = 0
+    storage_mb: int = 0
+    concurrent_sessions: int = 0
+    # Period counters: persisted totals, unflushed local increments, and the period key
+    period_totals: Dict[str, int] = field(default_factory=dict)
+    period_pending: Dict[str, int] = field(default_factory=dict)
+    period_keys: Dict[str, str] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    def roll_periods(self, now: datetime):
+        """Reset period counters whose month or day has ended"""
+        for name, period_format in PERIOD_COUNTERS.items():
+            key = now.strftime(period_format)
+            if self.period_keys.get(name) != key:
+                self.period_keys[name] = key
+                self.period_totals[name] = 0
+                self.period_pending[name] = 0
+
+    def period_count(self, name: str) -> int:
+        return self.period_totals.get(name, 0) + self.period_pending.get(name, 0)
+
+    def value(self, quota_type: str) -> Optional[int]:
+        """Current usage for a quota type, or None if it is not tracked"""
+        if quota_type == "projects" and self.tenant_type == TenantType.MVP_FACTORY:
+            # For MVP Factory tenants, MVP projects ARE their projects
+            return self.mvp_projects
+        if quota_type in PERIOD_COUNTERS:
+            return self.period_count(quota_type)
+        if quota_type in TABLE_COUNTERS or quota_type == "concurrent_sessions":
+            return getattr(self, quota_type)
+        return None
+
+    def limit(self, quota_type: str) -> Optional[int]:
+        """Quota limit for a quota type, or None if it is not tracked"""
+        limits = {
+            "users": self.quotas.max_users,
+            "projects": self.quotas.max_projects,
+            "api_calls": self.quotas.max_api_calls_per_month,
+            "storage_mb": self.quotas.max_storage_mb,
+            "ai_requests": self.quotas.max_ai_requests_per_day,
+            "concurrent_sessions": self.quotas.max_concurrent_sessions,
+            "concurrent_mvps": self.quotas.max_concurrent_mvps,
+        }
+        return limits.get(quota_type)
+
+    def to_usage(self) -> TenantUsage:
+        return TenantUsage(
+            tenant_id=self.tenant_id,
+            users_count=self.users,
+            projects_count=self.value("projects"),
+            api_calls_this_month=self.period_count("api_calls"),
+            storage_used_mb=self.storage_mb,
+            ai_requests_today=self.period_count("ai_requests"),
+            concurrent_sessions=self.concurrent_sessions,
+        )
+
+
+def _table_deltas(obj: Any, sign: int) -> List[Tuple[str, int]]:
+    """Counter changes caused by inserting (+1) or deleting (-1) a row"""
+    if isinstance(obj, ProjectORM):
+        return [("projects", sign)]
+    if isinstance(obj, TaskORM):
+        return [("tasks", sign)]
+    if isinstance(obj, TenantMemberORM):
+        return [("users", sign)]
+    if isinstance(obj, MVPProjectORM):
+        deltas = [("mvp_projects", sign), ("storage_mb", sign * (obj.storage_mb_used or 0))]
+        if obj.status in ACTIVE_MVP_STATUSES:
+            deltas.append(("concurrent_mvps", sign))
+        return deltas
+    return []
+
+
+def _mvp_update_deltas(obj: MVPProjectORM) -> List[Tuple[str, int]]:
+    """Counter changes caused by updating an MVP project's status or storage"""
+    state = inspect(obj)
+    deltas = []
+
+    status = state.attrs.status.history
+    if status.has_changes() and status.deleted:
+        was_active = status.deleted[0] in ACTIVE_MVP_STATUSES
+        is_active = obj.status in ACTIVE_MVP_STATUSES
+        if was_active != is_active:
+            deltas.append(("concurrent_mvps", 1 if is_active else -1))
+
+    storage = state.attrs.storage_mb_used.history
+    if storage.has_changes() and storage.deleted:
+        deltas.append(("storage_mb", (obj.storage_mb_used or 0) - (storage.deleted[0] or 0)))
+    return deltas
+
+
+class TenantUsageService:
+    """Per-tenant usage counters with transactional updates and reconciliation"""
+
+    def __init__(
+        self,
+        session_factory=None,
+        reconcile_interval: float = 300.0,
+        flush_interval: float = 30.0,
+    ):
+        self._session_factory = session_factory
+        self.reconcile_interval = reconcile_interval
+        self.flush_interval = flush_interval
+        self._counters: Dict[UUID, TenantUsageCounters] = {}
+        self._load_locks: Dict[UUID, asyncio.Lock] = {}
+        self._background_task: Optional[asyncio.Task] = None
+        # Session.info key holding deltas collected during the current transaction
+        self._outbox_key = f"tenant_usage_outbox:{id(self)}"
+        self.stats = {"loads": 0, "cache_hits": 0, "flushes": 0, "applied_deltas": 0}
+
+    # ----------------------------
+    # Transactional outbox
+    # ----------------------------
+
+    def install(self, session_class=Session):
+        """Collect usage deltas from ORM sessions of ``session_class``.
+
+        Deltas are gathered at flush time and applied to the cached counters
+        only after the transaction commits; a rollback discards them.
+        """
+        event.listen(session_class, "after_flush", self._collect_deltas)
+        event.listen(session_class, "after_commit", self._apply_outbox)
+        event.listen(session_class, "after_rollback", self._discard_outbox)
+
+    def uninstall(self, session_class=Session):
+        event.remove(session_class, "after_flush", self._collect_deltas)
+        event.remove(session_class, "after_commit", self._apply_outbox)
+        event.remove(session_class, "after_rollback", self._discard_outbox)
+
+    def _collect_deltas(self, session: Session, flush_context):
+        deltas: List[Delta] = []
+        for obj in session.new:
+            tenant_id = getattr(obj, "tenant_id", None)
+            for counter, amount in _table_deltas(obj, 1):
+                deltas.append((tenant_id, counter, amount))
+        for obj in session.deleted:
+            tenant_id = getattr(obj, "tenant_id", None)
+            for counter, amount in _table_deltas(obj, -1):
+                deltas.append((tenant_id, counter, amount))
+        for obj in session.dirty:
+            if isinstance(obj, MVPProjectORM):
+                for counter, amount in _mvp_update_deltas(obj):
+                    deltas.append((obj.tenant_id, counter, amount))
+            elif isinstance(obj, TenantORM):
+                # Plan or quota changes; reload the tenant on next use
+                self.invalidate(obj.id)
+
+        if deltas:
+            session.info.setdefault(self._outbox_key, []).extend(
+                delta for delta in deltas if delta[0] is not None and delta[2]
+            )
+
+    def _apply_outbox(self, session: Session):
+        self.apply(session.info.pop(self._outbox_key, ()))
+
+    def _discard_outbox(self, session: Session):
+        session.info.pop(self._outbox_key, None)
+
+    def apply(self, deltas: Iterable[Delta]):
+        """Apply committed counter deltas to tenants that are cached"""
+        for tenant_id, counter, amount in deltas:
+            counters = self._counters.get(tenant_id)
+            if counters is None:
+                # Not cached; the next load reads the committed row counts
+                continue
+            setattr(counters, counter, max(0, getattr(counters, counter) + amount))
+            self.stats["applied_deltas"] += 1
+
+    # ----------------------------
+    # Loading and reconciliation
+    # ----------------------------
+
+    def _session(self) -> AsyncSession:
+        if self._session_factory is None:
+            from ..core.database import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    @staticmethod
+    def _usage_query(tenant_id: UUID):
+        """Tenant quotas and every source-table counter in one statement"""
+
+        def count(model, *criteria):
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(model.tenant_id == tenant_id, *criteria)
+                .scalar_subquery()
+            )
+
+        storage = (
+            select(func.coalesce(func.sum(MVPProjectORM.storage_mb_used), 0))
+            .where(MVPProjectORM.tenant_id == tenant_id)
+            .scalar_subquery()
+        )
+
+        return select(
+            TenantORM.slug,
+            TenantORM.tenant_type,
+            TenantORM.quotas,
+            TenantORM.current_usage,
+            TenantORM.mvp_count_used,
+            count(TenantMemberORM).label("users"),
+            count(ProjectORM).label("projects"),
+            count(MVPProjectORM).label("mvp_projects"),
+            count(TaskORM).label("tasks"),
+            count(MVPProjectORM, MVPProjectORM.status.in_(ACTIVE_MVP_STATUSES)).label(
+                "concurrent_mvps"
+            ),
+            storage.label("storage_mb"),
+        ).where(TenantORM.id == tenant_id)
+
+    async def _load(self, tenant_id: UUID, db: Optional[AsyncSession]) -> TenantUsageCounters:
+        if db is not None:
+            row = (await db.execute(self._usage_query(tenant_id))).first()
+        else:
+            async with self._session() as session:
+                row = (await session.execute(self._usage_query(tenant_id))).first()
+        self.stats["loads"] += 1
+
+        if row is None:
+            self._counters.pop(tenant_id, None)
+            raise TenantNotFoundError(f"Tenant not found: {tenant_id}", tenant_id=str(tenant_id))
+
+        counters = TenantUsageCounters(
+            tenant_id=tenant_id,
+            slug=row.slug,
+            tenant_type=row.tenant_type,
+            quotas=TenantQuotas(**(row.quotas or {})),
+            mvp_count_used=row.mvp_count_used or 0,
+            users=row.users,
+            projects=row.projects,
+            mvp_projects=row.mvp_projects,
+            tasks=row.tasks,
+            concurrent_mvps=row.concurrent_mvps,
+            storage_mb=int(row.storage_mb or 0),
+        )
+
+        now = datetime.utcnow()
+        counters.roll_periods(now)
+        persisted = row.current_usage or {}
+        previous = self._counters.get(tenant_id)
+        for name in PERIOD_COUNTERS:
+            stored = persisted.get(name) or {}
+            if stored.get("period") == counters.period_keys[name]:
+                counters.period_totals[name] = int(stored.get("count", 0))
+            if previous is not None and previous.period_keys.get(name) == counters.period_keys[name]:
+                counters.period_pending[name] = previous.period_pending.get(name, 0)
+        if previous is not None:
+            counters.concurrent_sessions = previous.concurrent_sessions
+
+        self._counters[tenant_id] = counters
+        return counters
+
+    async def get_counters(
+        self, tenant_id: UUID, db: Optional[AsyncSession] = None
+    ) -> TenantUsageCounters:
+        """Cached counters for a tenant, loading or reconciling them if needed"""
+        counters = self._counters.get(tenant_id)
+        if counters is not None and time.monotonic() - counters.loaded_at < self.reconcile_interval:
+            self.stats["cache_hits"] += 1
+            counters.roll_periods(datetime.utcnow())
+            return counters
+
+        lock = self._load_locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            counters = self._counters.get(tenant_id)
+            if counters is not None and time.monotonic() - counters.loaded_at < self.reconcile_interval:
+                return counters
+            return await self._load(tenant_id, db)
+
+    async def reconcile(self, tenant_id: UUID, db: Optional[AsyncSession] = None) -> TenantUsageCounters:
+        """Recount a tenant's usage from the source tables"""
+        async with self._load_locks.setdefault(tenant_id, asyncio.Lock()):
+            return await self._load(tenant_id, db)
+
+    def invalidate(self, tenant_id: UUID):
+        """Drop cached table counters so the next check reloads them.
+
+        Unflushed period counts and live sessions are carried over on reload.
+        """
+        counters = self._counters.get(tenant_id)
+        if counters is not None:
+            counters.loaded_at = float("-inf")
+
+    # ----------------------------
+    # Metered and live counters
+    # ----------------------------
+
+    def record(self, tenant_id: UUID, quota_type: str, amount: int = 1) -> bool:
+        """Count metered usage (``api_calls``, ``ai_requests``) or session changes.
+
+        Tenants that are not cached yet get a placeholder entry whose period
+        and session counts are merged on the next load. Returns False for
+        unknown quota types.
+        """
+        counters = self._counters.get(tenant_id)
+        if counters is None:
+            counters = self._placeholder(tenant_id)
+        counters.roll_periods(datetime.utcnow())
+
+        if quota_type in PERIOD_COUNTERS:
+            counters.period_pending[quota_type] = counters.period_pending.get(quota_type, 0) + amount
+        elif quota_type == "concurrent_sessions":
+            counters.concurrent_sessions = max(0, counters.concurrent_sessions + amount)
+        elif quota_type in TABLE_COUNTERS:
+            # Table counters follow committed rows; only reconcile them
+            self.invalidate(tenant_id)
+        else:
+            logger.warning(f"Unknown quota type: {quota_type}")
+            return False
+        return True
+
+    def _placeholder(self, tenant_id: UUID) -> TenantUsageCounters:
+        """Uncached entry that only carries period and session counts until loaded"""
+        counters = TenantUsageCounters(
+            tenant_id=tenant_id,
+            slug="",
+            tenant_type=TenantType.ENTERPRISE,
+            quotas=TenantQuotas(
+                max_users=0,
+                max_projects=0,
+                max_api_calls_per_month=0,
+                max_storage_mb=0,
+                max_ai_requests_per_day=0,
+                max_concurrent_sessions=0,
+            ),
+            loaded_at=float("-inf"),
+        )
+        self._counters[tenant_id] = counters
+        return counters
+
+    def record_api_call(self, tenant_id: UUID, count: int = 1):
+        self.record(tenant_id, "api_calls", count)
+
+    def record_ai_request(self, tenant_id: UUID, count: int = 1):
+        self.record(tenant_id, "ai_requests", count)
+
+    def session_opened(self, tenant_id: UUID):
+        self.record(tenant_id, "concurrent_sessions", 1)
+
+    def session_closed(self, tenant_id: UUID):
+        self.record(tenant_id, "concurrent_sessions", -1)
+
+    # ----------------------------
+    # Durable flush
+    # ----------------------------
+
+    async def flush(self, db: Optional[AsyncSession] = None) -> int:
+        """Add unflushed period counts to each tenant's ``current_usage``.
+
+        Counts are merged into the stored totals rather than overwriting them,
+        so several processes can flush for the same tenant.
+        """
+        pending = [
+            counters
+            for counters in self._counters.values()
+            if any(counters.period_pending.values())
+        ]
+        if not pending:
+            return 0
+
+        if db is None:
+            async with self._session() as session:
+                return await self._flush(session, pending)
+        return await self._flush(db, pending)
+
+    @staticmethod
+    def _stored_usage_query(tenant_ids: List[UUID]):
+        """Stored usage of tenants, locked until the flush commits
+
+        Workers flushing the same tenant add their deltas to the stored
+        counts, so the read-modify-write must not interleave. Rows are locked
+        in id order so concurrent flushes cannot deadlock.
+        """
+        return (
+            select(TenantORM.id, TenantORM.current_usage)
+            .where(TenantORM.id.in_(tenant_ids))
+            .order_by(TenantORM.id)
+            .with_for_update()
+        )
+
+    async def _flush(self, db: AsyncSession, pending: List[TenantUsageCounters]) -> int:
+        snapshots = {
+            counters.tenant_id: (dict(counters.period_pending), dict(counters.period_keys))
+            for counters in pending
+        }
+        result = await db.execute(self._stored_usage_query(list(snapshots)))
+        stored_usage = dict(result.all())
+
+        flushed_at = datetime.utcnow().isoformat()
+        for tenant_id, stored in stored_usage.items():
+            amounts, keys = snapshots[tenant_id]
+            usage = dict(stored or {})
+            for name, amount in amounts.items():
+                previous = usage.get(name) or {}
+                base = previous.get("count", 0) if previous.get("period") == keys[name] else 0
+                usage[name] = {"period": keys[name], "count": base + amount}
+            usage["flushed_at"] = flushed_at
+            await db.execute(
+                update(TenantORM).where(TenantORM.id == tenant_id).values(current_usage=usage)
+            )
+        await db.commit()
+
+        for tenant_id in stored_usage:
+            counters = self._counters.get(tenant_id)
+            amounts, keys = snapshots[tenant_id]
+            if counters is None:
+                continue
+            for name, amount in amounts.items():
+                if counters.period_keys.get(name) == keys[name]:
+                    counters.period_pending[name] -= amount
+                    counters.period_totals[name] = counters.period_totals.get(name, 0) + amount
+        # Pending counts for tenants that no longer exist cannot be stored
+        for tenant_id in set(snapshots) - set(stored_usage):
+            self._counters.pop(tenant_id, None)
+
+        self.stats["flushes"] += 1
+        return len(stored_usage)
+
+    async def start(self):
+        """Start periodic flushing and reconciliation"""
+        if self._background_task is None:
+            self._background_task = asyncio.create_task(self._run())
+            logger.info("Tenant usage counters started")
+
+    async def stop(self):
+        """Stop the background task and flush outstanding counts"""
+        if self._background_task:
+            self._background_task.cancel()
+            try:
+                await self._background_task
+            except asyncio.CancelledError:
+                pass
+            self._background_task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                stale = [
+                    tenant_id
+                    for tenant_id, counters in self._counters.items()
+                    if time.monotonic() - counters.loaded_at >= self.reconcile_interval
+                ]
+                for tenant_id in stale:
+                    try:
+                        await self.reconcile(tenant_id)
+                    except TenantNotFoundError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Tenant usage flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_tenants": len(self._counters)}
+
+
+# Global counters shared by every ORM session
+tenant_usage_service = TenantUsageService()
+tenant_usage_service.install()
@@ -5,28 +5,206 @@ Handles initialization and management of tree-sitter parsers for different langu
 """
 
 import asyncio
+import bisect
 import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 import tree_sitter
-from tree_sitter import Language, Node, Parser
+from tree_sitter import Language, Node, Parser, Query, QueryCursor
 
-from ..models.ast_models import ASTNode, LanguageType
+from ..models.ast_models import (
+    NODE_ERROR,
+    NODE_MISSING,
+    NODE_NAMED,
+    ASTNode,
+    CompactAST,
+    LanguageType,
+)
 
 logger = logging.getLogger(__name__)
 
+# Node types that add a path to a function's cyclomatic complexity
+DECISION_NODE_TYPES = [
+    "if_statement",
+    "while_statement",
+    "for_statement",
+    "try_statement",
+    "except_clause",
+    "case_clause",
+    "conditional_expression",
+    "and",
+    "or",
+]
+
+_JS_CAPTURES = {
+    "definition.function": ["function_declaration", "arrow_function", "method_definition"],
+    "definition.class": ["class_declaration"],
+    "definition.variable": ["variable_declarator", "lexical_declaration"],
+    "import": ["import_statement", "call_expression"],
+    "call": ["call_expression"],
+    "parameter": ["formal_parameter", "identifier"],
+    "decision": DECISION_NODE_TYPES,
+    "identifier": [
+        "identifier",
+        "property_identifier",
+        "shorthand_property_identifier",
+        "shorthand_property_identifier_pattern",
+        "type_identifier",
+    ],
+}
+
+# Node types captured, per capture name, by each language's extraction query
+EXTRACTION_CAPTURES: Dict[LanguageType, Dict[str, List[str]]] = {
+    LanguageType.PYTHON: {
+        "definition.function": ["function_definition"],
+        "definition.class": ["class_definition"],
+        "definition.variable": ["assignment"],
+        "import": ["import_statement", "import_from_statement"],
+        "call": ["call"],
+        "parameter": ["parameter"],
+        "decision": DECISION_NODE_TYPES,
+        "identifier": ["identifier"],
+    },
+    LanguageType.JAVASCRIPT: _JS_CAPTURES,
+    LanguageType.TYPESCRIPT: _JS_CAPTURES,
+}
+
+
+def _document_order(node: Node) -> Tuple[int, int]:
+    return (node.start_byte, -node.end_byte)
+
+
+class QueryCaptures:
+    """Extraction query captures by name, in document order, with range lookups"""
+
+    def __init__(self, captures: Dict[str, List[Node]]):
+        self.nodes: Dict[str, List[Node]] = {
+            name: sorted(nodes, key=_document_order) for name, nodes in captures.items()
+        }
+        self._starts = {
+            name: [node.start_byte for node in nodes]
+            for name, nodes in self.nodes.items()
+        }
+
+    def __getitem__(self, name: str) -> List[Node]:
+        return self.nodes.get(name, [])
+
+    def within(self, name: str, node: Node) -> List[Node]:
+        """Captured nodes inside ``node`` (including itself), in document order"""
+        starts = self._starts.get(name)
+        if not starts:
+            return []
+        low = bisect.bisect_left(starts, node.start_byte)
+        high = bisect.bisect_left(starts, node.end_byte, low)
+        return [n for n in self.nodes[name][low:high] if n.end_byte <= node.end_byte]
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    """Length of the shared prefix, compared in C-level slices"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the shared suffix, at most ``limit`` bytes"""
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid : len(a) - low] == b[len(b) - mid : len(b) - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point_at(source: bytes, byte_offset: int) -> Tuple[int, int]:
+    row = source.count(b"\n", 0, byte_offset)
+    return (row, byte_offset - (source.rfind(b"\n", 0, byte_offset) + 1))
+
+
+@dataclass
+class SourceEdit:
+    """Single contiguous edit between two versions of a file, in tree-sitter terms"""
+
+    start_byte: int
+    old_end_byte: int
+    new_end_byte: int
+    start_point: Tuple[int, int]
+    old_end_point: Tuple[int, int]
+    new_end_point: Tuple[int, int]
+    old_source: bytes = b""
+    old_tree: Optional[tree_sitter.Tree] = None
+    changed_rows: List[Tuple[int, int]] = field(default_factory=list)
+
+    @classmethod
+    def between(cls, old_source: bytes, new_source: bytes) -> "SourceEdit":
+        prefix = _common_prefix_length(old_source, new_source)
+        suffix = _common_suffix_length(
+            old_source, new_source, min(len(old_source), len(new_source)) - prefix
+        )
+        old_end = len(old_source) - suffix
+        new_end = len(new_source) - suffix
+        return cls(
+            start_byte=prefix,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_point_at(new_source, prefix),
+            old_end_point=_point_at(old_source, old_end),
+            new_end_point=_point_at(new_source, new_end),
+            old_source=old_source,
+        )
+
+    @property
+    def row_delta(self) -> int:
+        return self.new_end_point[0] - self.old_end_point[0]
+
+    def apply_to(self, tree: tree_sitter.Tree):
+        tree.edit(
+            start_byte=self.start_byte,
+            old_end_byte=self.old_end_byte,
+            new_end_byte=self.new_end_byte,
+            start_point=self.start_point,
+            old_end_point=self.old_end_point,
+            new_end_point=self.new_end_point,
+        )
+
+
+@dataclass
+class CachedTree:
+    """Last parsed tree of a hot file, kept for incremental reparsing"""
+
+    tree: tree_sitter.Tree
+    source: bytes
+    language: LanguageType
+
 
 class TreeSitterManager:
     """Manages tree-sitter parsers for multiple languages"""
 
-    def __init__(self, executor: ThreadPoolExecutor):
+    def __init__(self, executor: ThreadPoolExecutor, max_cached_trees: int = 256):
         self.executor = executor
         self.languages: Dict[LanguageType, Language] = {}
         self.parsers: Dict[LanguageType, Parser] = {}
+        self.queries: Dict[LanguageType, Query] = {}
         self.initialized = False
 
+        # Bounded LRU of recently parsed trees for incremental reparsing
+        self.max_cached_trees = max_cached_trees
+        self.tree_cache: "OrderedDict[str, CachedTree]" = OrderedDict()
+        self._tree_cache_lock = threading.Lock()
+        self.parse_stats = {"full_parses": 0, "incremental_parses": 0}
+
     async def initialize(self):
         """Initialize all supported language parsers"""
         try:
@@ -37,6 +215,8 @@ class TreeSitterManager:
             await self._init_javascript()
             await self._init_typescript()
 
+            self._compile_queries()
+
             self.initialized = True
             logger.info(f"Initialized {len(self.languages)} Tree-sitter parsers")
 
@@ -45,6 +225,39 @@ class TreeSitterManager:
             # Initialize with reduced functionality
             self.initialized = False
 
+    def _compile_queries(self):
+        """Compile one extraction query per language from EXTRACTION_CAPTURES"""
+        for language_type, captures in EXTRACTION_CAPTURES.items():
+            language = self.languages.get(language_type)
+            if language is None or language_type in self.queries:
+                continue
+            try:
+                patterns = []
+                for name, node_types in captures.items():
+                    alternatives = [
+                        pattern
+                        for pattern in (
+                            self._node_pattern(language, node_type)
+                            for node_type in node_types
+                        )
+                        if pattern
+                    ]
+                    if alternatives:
+                        patterns.append(f"[{' '.join(alternatives)}] @{name}")
+                self.queries[language_type] = Query(language, "\n".join(patterns))
+            except Exception as e:
+                logger.error(f"Failed to compile {language_type.value} query: {e}")
+
+    @staticmethod
+    def _node_pattern(language: Language, node_type: str) -> Optional[str]:
+        """Query pattern matching nodes whose type is exactly ``node_type``"""
+        kind_id = language.id_for_node_kind(node_type, True)
+        if kind_id and kind_id not in language.supertypes:
+            return f"({node_type})"
+        if language.id_for_node_kind(node_type, False):
+            return f'"{node_type}"'
+        return None  # not a concrete node type in this grammar
+
     async def _init_python(self):
         """Initialize Python parser"""
         try:
@@ -119,9 +332,16 @@ class TreeSitterManager:
         return language_map.get(extension, LanguageType.UNKNOWN)
 
     def parse_file(
-        self, file_path: str, content: str
+        self,
+        file_path: str,
+        content: str,
+        old_tree: Optional[tree_sitter.Tree] = None,
     ) -> Tuple[Optional[tree_sitter.Tree], List[str]]:
-        """Parse a file and return the syntax tree (synchronous)"""
+        """Parse a file and return the syntax tree (synchronous)
+
+        If ``old_tree`` is given it must already have been edited to match
+        ``content``; unchanged subtrees are then reused by tree-sitter.
+        """
         errors = []
 
         try:
@@ -139,7 +359,10 @@ class TreeSitterManager:
                 return None, errors
 
             parser = self.parsers[language]
-            tree = parser.parse(content.encode("utf-8"))
+            if old_tree is not None:
+                tree = parser.parse(content.encode("utf-8"), old_tree)
+            else:
+                tree = parser.parse(content.encode("utf-8"))
 
             # Check for parsing errors
             if tree.root_node.has_error:
@@ -164,30 +387,102 @@ class TreeSitterManager:
             content,
         )
 
-    def tree_to_ast_node(self, node: Node, source_code: bytes) -> ASTNode:
-        """Convert tree-sitter Node to our ASTNode model"""
-        try:
-            # Extract node text
-            node_text = source_code[node.start_byte : node.end_byte].decode(
-                "utf-8", errors="ignore"
+    def parse_file_incremental(
+        self, file_path: str, content: str
+    ) -> Tuple[Optional[tree_sitter.Tree], List[str], Optional[SourceEdit]]:
+        """Parse a file, reusing its previously cached tree when there is one
+
+        Returns the tree, parsing errors and the edit applied to the cached
+        tree (None when the file was parsed from scratch).
+        """
+        source = content.encode("utf-8")
+        language = self.detect_language(file_path)
+
+        with self._tree_cache_lock:
+            cached = self.tree_cache.pop(file_path, None)
+
+        edit = None
+        if cached is not None and cached.language == language:
+            edit = SourceEdit.between(cached.source, source)
+            edit.apply_to(cached.tree)
+            edit.old_tree = cached.tree
+
+        tree, errors = self.parse_file(
+            file_path, content, old_tree=edit.old_tree if edit else None
+        )
+        if tree is None:
+            return None, errors, None
+
+        if edit is not None:
+            edit.changed_rows = [
+                (changed.start_point[0], changed.end_point[0])
+                for changed in edit.old_tree.changed_ranges(tree)
+            ]
+            self.parse_stats["incremental_parses"] += 1
+        else:
+            self.parse_stats["full_parses"] += 1
+
+        with self._tree_cache_lock:
+            self.tree_cache[file_path] = CachedTree(tree, source, language)
+            while len(self.tree_cache) > self.max_cached_trees:
+                self.tree_cache.popitem(last=False)
+
+        return tree, errors, edit
+
+    async def async_parse_file_incremental(
+        self, file_path: str, content: str
+    ) -> Tuple[Optional[tree_sitter.Tree], List[str], Optional[SourceEdit]]:
+        """Incrementally parse a file asynchronously using the executor"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, self.parse_file_incremental, file_path, content
+        )
+
+    def forget_tree(self, file_path: Optional[str] = None):
+        """Drop a cached tree, or all of them"""
+        with self._tree_cache_lock:
+            if file_path is None:
+                self.tree_cache.clear()
+            else:
+                self.tree_cache.pop(file_path, None)
+
+    def tree_to_compact_ast(self, node: Node, source_code: bytes) -> CompactAST:
+        """Flatten a tree-sitter subtree into a CompactAST over ``source_code``"""
+        ast = CompactAST(source_code)
+        cursor = node.walk()
+        open_nodes: List[int] = []
+
+        while True:
+            current = cursor.node
+            flags = NODE_NAMED if current.is_named else 0
+            if current.has_error:
+                flags |= NODE_ERROR
+            if current.is_missing:
+                flags |= NODE_MISSING
+            index = ast.add_node(
+                current.type,
+                current.start_byte,
+                current.end_byte,
+                open_nodes[-1] if open_nodes else -1,
+                flags,
             )
 
-            # Convert children recursively
-            children = []
-            for child in node.children:
-                children.append(self.tree_to_ast_node(child, source_code))
+            if cursor.goto_first_child():
+                open_nodes.append(index)
+                continue
 
-            return ASTNode(
-                node_type=node.type,
-                start_byte=node.start_byte,
-                end_byte=node.end_byte,
-                start_point=node.start_point,
-                end_point=node.end_point,
-                text=(
-                    node_text[:1000] if len(node_text) > 1000 else node_text
-                ),  # Limit text length
-                children=children,
-            )
+            # Leaf: climb until a sibling is found, closing finished subtrees
+            while not cursor.goto_next_sibling():
+                if not open_nodes or not cursor.goto_parent():
+                    while open_nodes:
+                        ast.close_node(open_nodes.pop())
+                    return ast
+                ast.close_node(open_nodes.pop())
+
+    def tree_to_ast_node(self, node: Node, source_code: bytes) -> ASTNode:
+        """Convert tree-sitter Node to our ASTNode model"""
+        try:
+            return self.tree_to_compact_ast(node, source_code).root.to_ast_node()
 
         except Exception as e:
             logger.error(f"Error converting node to AST: {e}")
@@ -202,19 +497,27 @@ class TreeSitterManager:
                 children=[],
             )
 
+    def capture_nodes(self, root: Node, language: LanguageType) -> QueryCaptures:
+        """Run the language's extraction query once over a subtree"""
+        query = self.queries.get(language)
+        if query is None:
+            return QueryCaptures({})
+        return QueryCaptures(QueryCursor(query).captures(root))
+
     def find_nodes_by_type(self, root: Node, node_types: List[str]) -> List[Node]:
         """Find all nodes of specific types in the tree"""
         found_nodes = []
-
-        def traverse(node: Node):
-            if node.type in node_types:
-                found_nodes.append(node)
-
-            for child in node.children:
-                traverse(child)
-
-        traverse(root)
-        return found_nodes
+        cursor = root.walk()
+
+        while True:
+            if cursor.node.type in node_types:
+                found_nodes.append(cursor.node)
+            if cursor.goto_first_child():
+                continue
+            # The cursor is rooted at ``root`` and never leaves its subtree
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return found_nodes
 
     def get_node_text(self, node: Node, source_code: bytes) -> str:
         """Get the text content of a node"""
@@ -229,15 +532,27 @@ class TreeSitterManager:
         self, tree: tree_sitter.Tree, source_code: bytes, language: LanguageType
     ) -> List[Dict]:
         """Extract import statements from the syntax tree (synchronous)"""
+        return self.extract_node_imports(tree.root_node, source_code, language)
+
+    def extract_node_imports(
+        self,
+        root: Node,
+        source_code: bytes,
+        language: LanguageType,
+        captures: Optional[QueryCaptures] = None,
+    ) -> List[Dict]:
+        """Extract import statements within a subtree (synchronous)"""
         imports = []
 
         try:
+            if captures is None:
+                captures = self.capture_nodes(root, language)
             if language == LanguageType.PYTHON:
                 imports.extend(
-                    self._extract_python_imports(tree.root_node, source_code)
+                    self._extract_python_imports(captures["import"], source_code)
                 )
             elif language in [LanguageType.JAVASCRIPT, LanguageType.TYPESCRIPT]:
-                imports.extend(self._extract_js_imports(tree.root_node, source_code))
+                imports.extend(self._extract_js_imports(captures["import"], source_code))
 
         except Exception as e:
             logger.error(f"Error extracting imports: {e}")
@@ -253,15 +568,12 @@ class TreeSitterManager:
             self.executor, self.extract_imports, tree, source_code, language
         )
 
-    def _extract_python_imports(self, root: Node, source_code: bytes) -> List[Dict]:
-        """Extract Python import statements"""
+    def _extract_python_imports(
+        self, import_nodes: List[Node], source_code: bytes
+    ) -> List[Dict]:
+        """Extract Python import statements from captured import nodes"""
         imports = []
 
-        # Find import and from_import nodes
-        import_nodes = self.find_nodes_by_type(
-            root, ["import_statement", "import_from_statement"]
-        )
-
         for node in import_nodes:
             try:
                 import_text = self.get_node_text(node, source_code)
@@ -292,15 +604,12 @@ class TreeSitterManager:
 
         return imports
 
-    def _extract_js_imports(self, root: Node, source_code: bytes) -> List[Dict]:
-        """Extract JavaScript/TypeScript import statements"""
+    def _extract_js_imports(
+        self, import_nodes: List[Node], source_code: bytes
+    ) -> List[Dict]:
+        """Extract JavaScript/TypeScript imports from captured import and call nodes"""
         imports = []
 
-        # Find import and require nodes
-        import_nodes = self.find_nodes_by_type(
-            root, ["import_statement", "call_expression"]
-        )
-
         for node in import_nodes:
             try:
                 import_text = self.get_node_text(node, source_code)
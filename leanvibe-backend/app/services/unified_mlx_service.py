@@ -9,13 +9,15 @@ Strategy Pattern for improved maintainability and reduced code duplication.
 import logging
 import time
 from abc import ABC, abstractmethod
+from contextlib import aclosing
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from pathlib import Path
 import os
 import asyncio
 
 from ..core.circuit_breaker import ai_circuit_breaker, with_circuit_breaker, FallbackResponses
+from ..core.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +46,24 @@ class MLXServiceInterface(ABC):
         """Generate code completion based on context and intent"""
         pass
     
+    async def generate_code_completion_stream(
+        self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream code completion as ``token`` events followed by one ``complete`` event.
+
+        Default implementation for strategies without incremental generation:
+        the full completion is emitted as a single token.
+        """
+        result = await self.generate_code_completion(context, intent)
+        if result.get("status") != "success":
+            raise RuntimeError(result.get("error", "Completion failed"))
+
+        yield {"type": "token", "text": result.get("response", "")}
+        yield {
+            "type": "complete",
+            **{key: value for key, value in result.items() if key not in ("status", "response")},
+        }
+    
     @abstractmethod
     def get_model_health(self) -> Dict[str, Any]:
         """Get health status of the model service"""
@@ -178,6 +198,42 @@ class ProductionMLXStrategy(MLXServiceInterface):
                 "response_time": response_time
             }
     
+    async def generate_code_completion_stream(
+        self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream tokens straight from the production model as they are generated"""
+        if not self.is_initialized or not self._production_service:
+            raise RuntimeError("Production service not initialized")
+        
+        start_time = time.time()
+        
+        if not self._model_warmed_up:
+            await self._warm_up_model()
+        
+        prompt = self._create_prompt_from_context(context, intent)
+        
+        async for token in self._production_service.generate_text_stream(
+            prompt=prompt,
+            max_tokens=100,
+            temperature=0.7
+        ):
+            yield {"type": "token", "text": token}
+        
+        response_time = time.time() - start_time
+        self._track_response_time(response_time)
+        
+        yield {
+            "type": "complete",
+            "confidence": 0.9,
+            "language": self._detect_language(context),
+            "requires_human_review": False,
+            "suggestions": [f"Generated with {self._production_service.deployment_mode} production model"],
+            "model": self._production_service.config.model_name,
+            "context_used": True,
+            "deployment_mode": self._production_service.deployment_mode,
+            "generation_time": response_time,
+        }
+    
     def get_model_health(self) -> Dict[str, Any]:
         """Get production model health"""
         avg_response_time = sum(self._response_times) / len(self._response_times) if self._response_times else 0
@@ -413,6 +469,25 @@ class MockMLXStrategy(MLXServiceInterface):
                 "confidence": 0.0
             }
     
+    async def generate_code_completion_stream(
+        self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream mock completion chunks for testing"""
+        if not self.is_initialized or not self._mock_service:
+            raise RuntimeError("Mock service not initialized")
+        
+        first_chunk = True
+        async for chunk in self._mock_service.generate_streaming_completion(context, intent):
+            chunk_status = chunk.get("status")
+            if chunk_status == "streaming":
+                text = chunk.get("chunk", "")
+                yield {"type": "token", "text": text if first_chunk else f" {text}"}
+                first_chunk = False
+            elif chunk_status == "complete":
+                yield {"type": "complete", **chunk.get("metadata", {}), "model": "mock"}
+            else:
+                raise RuntimeError(chunk.get("error", "Mock streaming failed"))
+    
     def get_model_health(self) -> Dict[str, Any]:
         """Get mock model health"""
         return {
@@ -527,6 +602,13 @@ class UnifiedMLXService:
         self._target_response_time = 2.0
         self._performance_cache = {}
         
+        # Identical concurrent requests share one model call
+        self._inflight = SingleFlight("unified_mlx")
+        
+        # Streaming metrics
+        self._time_to_first_token = []
+        self._stream_stats = {"started": 0, "completed": 0, "cancelled": 0, "failed": 0}
+        
         # Enhanced AI infrastructure (migrated from enhanced_ai_service)
         self.ast_service = None
         self.vector_service = None
@@ -741,6 +823,18 @@ class UnifiedMLXService:
     @with_circuit_breaker(ai_circuit_breaker)
     async def generate_code_completion(
         self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> Dict[str, Any]:
+        """Generate code completion, sharing one model call between identical concurrent requests"""
+        key = self._inference_key(context, intent)
+        result, coalesced = await self._inflight.do(
+            key, self._generate_code_completion, context, intent
+        )
+        if coalesced:
+            result = {**result, "coalesced": True}
+        return result
+    
+    async def _generate_code_completion(
+        self, context: Dict[str, Any], intent: str = "suggest"
     ) -> Dict[str, Any]:
         """Generate code completion using current strategy with enhanced logging"""
         if not self.is_initialized or not self.current_strategy:
@@ -904,6 +998,161 @@ class UnifiedMLXService:
                 "fallback_attempted": self.current_strategy != self.available_strategies[MLXInferenceStrategy.FALLBACK]
             }
     
+    async def stream_code_completion(
+        self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a code completion, fanning one generation out to identical concurrent requests
+        
+        Subscribers that join an in-flight stream replay the tokens produced so far
+        and then follow the live generation.
+        """
+        key = self._inference_key(context, intent)
+        async with aclosing(
+            self._inflight.stream(key, lambda: self._stream_code_completion(context, intent))
+        ) as events:
+            async for event in events:
+                yield event
+    
+    async def _stream_code_completion(
+        self, context: Dict[str, Any], intent: str = "suggest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a code completion from the current strategy
+        
+        Yields a ``start`` event, one ``token`` event per generated chunk and a final
+        ``complete`` (or ``error``) event carrying the same metadata as
+        ``generate_code_completion``. Generation is pulled by the consumer, so a slow
+        client applies backpressure all the way down to the model, and closing the
+        iterator cancels generation mid-stream.
+        """
+        if not self.is_initialized or not self.current_strategy:
+            error_msg = "Unified MLX service not initialized"
+            logger.error(f"Streaming completion request failed: {error_msg}")
+            yield {"type": "error", "status": "error", "error": error_msg}
+            return
+        
+        request_id = f"mlx_stream_{int(time.time())}_{id(context):x}"
+        start_time = time.time()
+        current_strategy_name = self._get_current_strategy_name()
+        self._stream_stats["started"] += 1
+        
+        yield {
+            "type": "start",
+            "request_id": request_id,
+            "strategy": current_strategy_name,
+            "intent": intent,
+        }
+        
+        # Cached completions are replayed as a single token
+        cache_key = self._generate_cache_key(context, intent)
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result:
+            self._stream_stats["completed"] += 1
+            elapsed = round(time.time() - start_time, 3)
+            yield {"type": "token", "request_id": request_id, "index": 0, "text": cached_result.get("response", "")}
+            yield {
+                **cached_result,
+                "type": "complete",
+                "request_id": request_id,
+                "from_cache": True,
+                "time_to_first_token": elapsed,
+                "total_response_time": elapsed,
+            }
+            return
+        
+        logger.info(
+            f"[{request_id}] Streaming completion request | "
+            f"strategy={current_strategy_name} | "
+            f"intent={intent}"
+        )
+        
+        chunks: List[str] = []
+        metadata: Dict[str, Any] = {}
+        first_token_time = None
+        
+        try:
+            async with aclosing(
+                self.current_strategy.generate_code_completion_stream(context, intent)
+            ) as events:
+                async for event in events:
+                    if event.get("type") == "complete":
+                        metadata = event
+                        continue
+                    
+                    text = event.get("text", "")
+                    if not text:
+                        continue
+                    
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                        self._track_time_to_first_token(first_token_time)
+                    
+                    chunks.append(text)
+                    yield {
+                        "type": "token",
+                        "request_id": request_id,
+                        "index": len(chunks) - 1,
+                        "text": text,
+                    }
+        except (asyncio.CancelledError, GeneratorExit):
+            self._stream_stats["cancelled"] += 1
+            logger.info(
+                f"[{request_id}] Streaming completion cancelled | "
+                f"chunks_sent={len(chunks)} | "
+                f"time={time.time() - start_time:.3f}s"
+            )
+            raise
+        except Exception as e:
+            self._stream_stats["failed"] += 1
+            logger.error(
+                f"[{request_id}] Streaming completion FAILED | "
+                f"strategy={current_strategy_name} | "
+                f"chunks_sent={len(chunks)} | "
+                f"error: {e}"
+            )
+            yield {
+                "type": "error",
+                "status": "error",
+                "request_id": request_id,
+                "error": str(e),
+                "partial_response": "".join(chunks),
+            }
+            return
+        
+        total_response_time = time.time() - start_time
+        self._track_response_time(total_response_time)
+        self._stream_stats["completed"] += 1
+        
+        result = {
+            "status": "success",
+            "response": "".join(chunks),
+            "confidence": metadata.get("confidence", 0.7),
+            "language": metadata.get("language", self._analyze_context(context)["file_type"]),
+            "requires_human_review": metadata.get("requires_human_review", True),
+            "suggestions": metadata.get("suggestions", []),
+            "model": metadata.get("model", current_strategy_name),
+            "context_used": metadata.get("context_used", False),
+            "strategy_used": current_strategy_name,
+            "performance_status": self._get_performance_status(total_response_time),
+        }
+        self._cache_result(cache_key, result)
+        
+        logger.info(
+            f"[{request_id}] Streaming completion SUCCESS | "
+            f"strategy={current_strategy_name} | "
+            f"chunks={len(chunks)} | "
+            f"ttft={first_token_time or 0:.3f}s | "
+            f"time={total_response_time:.3f}s"
+        )
+        
+        yield {
+            **result,
+            "type": "complete",
+            "request_id": request_id,
+            "chunk_count": len(chunks),
+            "time_to_first_token": round(first_token_time or total_response_time, 3),
+            "total_response_time": round(total_response_time, 3),
+        }
+    
     def get_model_health(self) -> Dict[str, Any]:
         """Get comprehensive health status of MLX service with enhanced diagnostics"""
         health_check_time = time.time()
@@ -1166,6 +1415,14 @@ class UnifiedMLXService:
         if response_time > self._target_response_time:
             logger.warning(f"AI response time {response_time:.2f}s exceeds target of {self._target_response_time}s")
     
+    def _track_time_to_first_token(self, ttft: float):
+        """Track time-to-first-token for streaming completions"""
+        self._time_to_first_token.append(ttft)
+        
+        # Keep only last 100 samples for memory efficiency
+        if len(self._time_to_first_token) > 100:
+            self._time_to_first_token = self._time_to_first_token[-100:]
+    
     def _get_performance_status(self, response_time: float) -> str:
         """Get performance status based on response time"""
         if response_time <= 1.0:
@@ -1177,6 +1434,10 @@ class UnifiedMLXService:
         else:
             return "slow"
     
+    def _inference_key(self, context: Dict[str, Any], intent: str) -> str:
+        """Key identifying an inference request by (model, prompt context, params)"""
+        return SingleFlight.make_key(self._get_current_strategy_name(), intent, context)
+    
     def _generate_cache_key(self, context: Dict[str, Any], intent: str) -> str:
         """Generate cache key for performance optimization"""
         import hashlib
@@ -1246,6 +1507,8 @@ class UnifiedMLXService:
             "total_requests": len(self._response_times),
             "cache_entries": len(self._performance_cache),
             "performance_status": self._get_performance_status(avg_response_time),
+            "streaming": self._get_streaming_metrics(),
+            "request_coalescing": self._inflight.get_stats(),
             "enhanced_metrics": {
                 "ast_available": self.enhanced_initialization_status["ast"],
                 "vector_available": self.enhanced_initialization_status["vector"],
@@ -1256,6 +1519,17 @@ class UnifiedMLXService:
             }
         }
     
+    def _get_streaming_metrics(self) -> Dict[str, Any]:
+        """Get streaming completion metrics"""
+        avg_ttft = (
+            sum(self._time_to_first_token) / len(self._time_to_first_token)
+            if self._time_to_first_token else 0
+        )
+        return {
+            **self._stream_stats,
+            "avg_time_to_first_token": round(avg_ttft, 3),
+        }
+    
     # ===== ENHANCED CAPABILITIES (Migrated from enhanced_ai_service) =====
     
     async def _initialize_enhanced_capabilities(self, session_id: str = "enhanced_init"):
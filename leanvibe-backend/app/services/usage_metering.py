@@ -0,0 +1,404 @@
+"""
+Aggregating metered-usage pipeline for billing
+
+Usage increments are summed in memory per (tenant, metric, period bucket) and
+appended to a local segmented journal, so recording usage costs a dictionary
+update and a buffered write instead of a database commit and a Stripe call.
+On an interval the pipeline seals the journal, writes the rolled-up batch to a
+manifest with one idempotency key per rollup, and delivers each rollup to the
+billing backend. Delivered keys are journaled as well, so after a crash the
+undelivered rollups of every manifest are retried with the same keys and the
+unbatched journal segments are replayed into the in-memory totals. A rollup
+that keeps failing (for example, a tenant without an active subscription) is
+moved to a dead-letter file after a bounded number of attempts so it does not
+hold its batch open forever.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, IO, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from ..models.billing_models import UsageMetricType
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment-"
+BATCH_PREFIX = "batch-"
+DEAD_LETTER_FILE = "dead-letter.log"
+
+UsageKey = Tuple[UUID, UsageMetricType, int]
+
+
+@dataclass(frozen=True)
+class UsageRollup:
+    """Summed usage for one tenant, metric and period bucket"""
+
+    tenant_id: UUID
+    metric_type: UsageMetricType
+    period_start: datetime
+    quantity: int
+    idempotency_key: str
+
+    def to_dict(self) -> Dict:
+        return {
+            "tenant_id": str(self.tenant_id),
+            "metric_type": self.metric_type.value,
+            "period_start": int(self.period_start.replace(tzinfo=timezone.utc).timestamp()),
+            "quantity": self.quantity,
+            "idempotency_key": self.idempotency_key,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UsageRollup":
+        return cls(
+            tenant_id=UUID(data["tenant_id"]),
+            metric_type=UsageMetricType(data["metric_type"]),
+            period_start=_bucket_datetime(data["period_start"]),
+            quantity=data["quantity"],
+            idempotency_key=data["idempotency_key"],
+        )
+
+
+def _bucket_datetime(bucket: int) -> datetime:
+    # Naive UTC, matching the datetime.utcnow() timestamps used by billing models
+    return datetime.fromtimestamp(bucket, tz=timezone.utc).replace(tzinfo=None)
+
+
+class UsageJournal:
+    """Segmented append-only journal of usage increments and delivery state"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._segment: Optional[IO[str]] = None
+        self._segment_number = 0
+
+    def open(self):
+        if self._segment is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = self.segments()
+        self._segment_number = self._number(existing[-1]) + 1 if existing else 0
+        self._segment = open(self._segment_path(self._segment_number), "a", encoding="utf-8")
+
+    def close(self):
+        if self._segment is not None:
+            self.sync()
+            self._segment.close()
+            self._segment = None
+
+    def append(self, tenant_id: UUID, metric_type: UsageMetricType, bucket: int, quantity: int):
+        """Append one increment; handed to the OS immediately, fsynced by ``sync``"""
+        self._segment.write(f'["{tenant_id}","{metric_type.value}",{bucket},{quantity}]\n')
+        self._segment.flush()
+
+    def sync(self):
+        if self._segment is not None:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+
+    def seal(self) -> List[Path]:
+        """Close the active segment, start a new one, and return the sealed segments"""
+        self.close()
+        sealed = self.segments()
+        self._segment_number = self._number(sealed[-1]) + 1 if sealed else self._segment_number
+        self._segment = open(self._segment_path(self._segment_number), "a", encoding="utf-8")
+        return sealed
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*.log"))
+
+    @staticmethod
+    def read_segment(path: Path) -> Iterator[Tuple[UUID, UsageMetricType, int, int]]:
+        with open(path, encoding="utf-8") as segment:
+            for line in segment:
+                try:
+                    tenant_id, metric_type, bucket, quantity = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash
+                    logger.warning(f"Skipping unreadable usage journal entry in {path.name}")
+                    continue
+                yield UUID(tenant_id), UsageMetricType(metric_type), bucket, quantity
+
+    def write_batch(self, batch_id: str, segments: List[Path], rollups: List[UsageRollup]):
+        """Durably record a batch, then drop the segments it replaces"""
+        manifest = {
+            "batch_id": batch_id,
+            "segments": [path.name for path in segments],
+            "rollups": [rollup.to_dict() for rollup in rollups],
+        }
+        path = self._batch_path(batch_id)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+
+    def mark_delivered(self, batch_id: str, idempotency_key: str):
+        with open(self._batch_path(batch_id).with_suffix(".done"), "a", encoding="utf-8") as handle:
+            handle.write(idempotency_key + "\n")
+
+    def dead_letter(self, batch_id: str, rollup: UsageRollup, error: str):
+        """Set aside a rollup that cannot be delivered, keeping it for inspection"""
+        entry = {"batch_id": batch_id, "error": error, "rollup": rollup.to_dict()}
+        with open(self.directory / DEAD_LETTER_FILE, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        self.mark_delivered(batch_id, rollup.idempotency_key)
+
+    def complete_batch(self, batch_id: str):
+        path = self._batch_path(batch_id)
+        path.with_suffix(".done").unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+
+    def pending_batches(self) -> List[Tuple[str, List[UsageRollup], Set[str]]]:
+        """Batches left from earlier runs with the keys already delivered.
+
+        Segments listed by a manifest are removed first, in case the process
+        stopped between writing the manifest and deleting them.
+        """
+        batches = []
+        for path in sorted(self.directory.glob(f"{BATCH_PREFIX}*.json")):
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+            for name in manifest["segments"]:
+                (self.directory / name).unlink(missing_ok=True)
+
+            done_path = path.with_suffix(".done")
+            delivered = set()
+            if done_path.exists():
+                delivered = set(done_path.read_text(encoding="utf-8").split())
+            rollups = [UsageRollup.from_dict(data) for data in manifest["rollups"]]
+            batches.append((manifest["batch_id"], rollups, delivered))
+        return batches
+
+    def _segment_path(self, number: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{number:012d}.log"
+
+    def _batch_path(self, batch_id: str) -> Path:
+        return self.directory / f"{BATCH_PREFIX}{batch_id}.json"
+
+    @staticmethod
+    def _number(path: Path) -> int:
+        return int(path.stem[len(SEGMENT_PREFIX):])
+
+
+class UsageAggregator:
+    """In-memory usage totals with a durable journal and interval delivery"""
+
+    def __init__(
+        self,
+        deliver: Callable[[UsageRollup], Awaitable[None]],
+        journal_dir: str = "./.leanvibe_cache/usage_journal",
+        bucket_seconds: int = 3600,
+        flush_interval: float = 60.0,
+        max_delivery_attempts: int = 10,
+    ):
+        self.deliver = deliver
+        self.journal = UsageJournal(Path(journal_dir))
+        self.bucket_seconds = bucket_seconds
+        self.flush_interval = flush_interval
+        self.max_delivery_attempts = max_delivery_attempts
+
+        self._totals: Dict[UsageKey, int] = {}
+        self._pending_batches: List[Tuple[str, List[UsageRollup], Set[str]]] = []
+        self._attempts: Dict[str, int] = {}
+        self._opened = False
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "recorded_events": 0,
+            "delivered_rollups": 0,
+            "failed_deliveries": 0,
+            "recovered_events": 0,
+            "dead_lettered": 0,
+        }
+
+    def open(self):
+        """Open the journal, recovering batches and segments from a previous run"""
+        if self._opened:
+            return
+        self.journal.directory.mkdir(parents=True, exist_ok=True)
+        self._pending_batches = self.journal.pending_batches()
+        for segment in self.journal.segments():
+            for tenant_id, metric_type, bucket, quantity in self.journal.read_segment(segment):
+                key = (tenant_id, metric_type, bucket)
+                self._totals[key] = self._totals.get(key, 0) + quantity
+                self.stats["recovered_events"] += 1
+        self.journal.open()
+        self._opened = True
+
+        if self._pending_batches or self._totals:
+            logger.info(
+                f"Recovered {len(self._pending_batches)} usage batches and "
+                f"{self.stats['recovered_events']} journaled usage events"
+            )
+
+    def record(
+        self,
+        tenant_id: UUID,
+        metric_type: UsageMetricType,
+        quantity: int,
+        usage_date: Optional[datetime] = None,
+    ) -> str:
+        """Add usage to the current totals and journal it; returns the rollup key"""
+        if not self._opened:
+            self.open()
+        if usage_date is None:
+            timestamp = time.time()
+        elif usage_date.tzinfo is None:
+            timestamp = usage_date.replace(tzinfo=timezone.utc).timestamp()
+        else:
+            timestamp = usage_date.timestamp()
+        bucket = int(timestamp) // self.bucket_seconds * self.bucket_seconds
+
+        key = (tenant_id, metric_type, bucket)
+        self._totals[key] = self._totals.get(key, 0) + quantity
+        self.journal.append(tenant_id, metric_type, bucket, quantity)
+        self.stats["recorded_events"] += 1
+        self._ensure_flusher()
+        return f"{tenant_id}:{metric_type.value}:{bucket}"
+
+    def pending_quantity(self, tenant_id: UUID, metric_type: UsageMetricType) -> int:
+        """Usage recorded for a tenant and metric that is not delivered yet"""
+        quantity = sum(
+            total
+            for (tenant, metric, _), total in self._totals.items()
+            if tenant == tenant_id and metric == metric_type
+        )
+        for _, rollups, delivered in self._pending_batches:
+            quantity += sum(
+                rollup.quantity
+                for rollup in rollups
+                if rollup.tenant_id == tenant_id
+                and rollup.metric_type == metric_type
+                and rollup.idempotency_key not in delivered
+            )
+        return quantity
+
+    async def flush(self) -> int:
+        """Roll up the current totals into a batch and deliver outstanding batches"""
+        if not self._opened:
+            self.open()
+        async with self._flush_lock:
+            if self._totals:
+                # Sealing and swapping the totals happen without awaiting, so
+                # no increment can land between them
+                sealed = self.journal.seal()
+                totals, self._totals = self._totals, {}
+
+                batch_id = f"{int(time.time() * 1000):015d}-{secrets.token_hex(4)}"
+                rollups = [
+                    UsageRollup(
+                        tenant_id=tenant_id,
+                        metric_type=metric_type,
+                        period_start=_bucket_datetime(bucket),
+                        quantity=quantity,
+                        idempotency_key=f"{batch_id}:{tenant_id}:{metric_type.value}:{bucket}",
+                    )
+                    for (tenant_id, metric_type, bucket), quantity in totals.items()
+                ]
+                self.journal.write_batch(batch_id, sealed, rollups)
+                self._pending_batches.append((batch_id, rollups, set()))
+
+            delivered = 0
+            remaining = []
+            for batch in self._pending_batches:
+                count, complete = await self._deliver_batch(*batch)
+                delivered += count
+                if not complete:
+                    remaining.append(batch)
+            self._pending_batches = remaining
+            return delivered
+
+    async def _deliver_batch(
+        self, batch_id: str, rollups: List[UsageRollup], delivered: Set[str]
+    ) -> Tuple[int, bool]:
+        count = 0
+        for rollup in rollups:
+            if rollup.idempotency_key in delivered:
+                continue
+            try:
+                await self.deliver(rollup)
+            except Exception as e:
+                self.stats["failed_deliveries"] += 1
+                attempts = self._attempts.get(rollup.idempotency_key, 0) + 1
+                if attempts < self.max_delivery_attempts:
+                    self._attempts[rollup.idempotency_key] = attempts
+                    logger.error(f"Failed to deliver usage rollup {rollup.idempotency_key}: {e}")
+                    continue
+                self._attempts.pop(rollup.idempotency_key, None)
+                self.journal.dead_letter(batch_id, rollup, str(e))
+                delivered.add(rollup.idempotency_key)
+                self.stats["dead_lettered"] += 1
+                logger.error(
+                    f"Dead-lettered usage rollup {rollup.idempotency_key} "
+                    f"after {attempts} failed deliveries: {e}"
+                )
+                continue
+            self._attempts.pop(rollup.idempotency_key, None)
+            self.journal.mark_delivered(batch_id, rollup.idempotency_key)
+            delivered.add(rollup.idempotency_key)
+            count += 1
+
+        self.stats["delivered_rollups"] += count
+        complete = len(delivered) == len(rollups)
+        if complete:
+            self.journal.complete_batch(batch_id)
+        return count, complete
+
+    def _ensure_flusher(self):
+        if self._flush_task is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.journal.sync()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Usage flush failed: {e}")
+
+    async def start(self):
+        """Open the journal and start interval flushing"""
+        self.open()
+        self._ensure_flusher()
+
+    async def stop(self):
+        """Stop interval flushing, deliver what is outstanding and close the journal"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._opened:
+            await self.flush()
+            self.journal.close()
+            self._opened = False
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "open_keys": len(self._totals),
+            "pending_batches": len(self._pending_batches),
+        }
@@ -27,6 +27,8 @@ except ImportError:
     SentenceTransformer = None
     torch = None
 
+from .shared_analysis_store import shared_analysis_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -194,6 +196,13 @@ class VectorStoreService:
     def _create_sentence_transformer_embedding(self, content: str) -> List[float]:
         """Create high-quality embedding using sentence transformers"""
         try:
+            # Identical code in another checkout reuses its embedding
+            embedding = shared_analysis_store.get_embedding(
+                self.embedding_model_name, content
+            )
+            if embedding is not None:
+                return embedding
+
             # Preprocess content for better code understanding
             processed_content = self._preprocess_code_for_embedding(content)
             
@@ -203,7 +212,10 @@ class VectorStoreService:
             # Convert to list and ensure proper format
             if hasattr(embedding, 'tolist'):
                 embedding = embedding.tolist()
-            
+
+            shared_analysis_store.add_embedding(
+                self.embedding_model_name, content, embedding
+            )
             return embedding
             
         except Exception as e:
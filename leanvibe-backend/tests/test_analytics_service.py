@@ -0,0 +1,271 @@
+"""
+Tests for SQL-pushdown analytics backed by rollup tables
+
+Validates that hourly, daily and all-time rollups match a direct computation
+over the underlying projects, that refreshes only recompute buckets touched
+since the watermark, that the daily time series pages with a cursor, and that
+responses are served from cache until the rollups change.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.orm_models import (
+    AnalyticsRollupORM,
+    MVPProjectORM,
+    PipelineExecutionORM,
+    TenantORM,
+)
+from app.models.tenant_models import DEFAULT_QUOTAS, TenantPlan, TenantType
+from app.services.analytics_service import AnalyticsService, truncate
+
+
+@pytest_asyncio.fixture
+async def sessions():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def tenant(sessions):
+    tenant = TenantORM(
+        tenant_type=TenantType.MVP_FACTORY,
+        organization_name="Acme",
+        slug="acme",
+        admin_email="admin@acme.test",
+        plan=TenantPlan.MVP_SINGLE,
+        quotas=DEFAULT_QUOTAS[TenantPlan.MVP_SINGLE].model_dump(),
+        current_usage={},
+    )
+    async with sessions() as db:
+        db.add(tenant)
+        await db.commit()
+    return tenant
+
+
+def make_project(tenant, created_at, status="deployed", hours=None, cost=10.0):
+    return MVPProjectORM(
+        tenant_id=tenant.id,
+        project_name=f"MVP {created_at:%d%H%M}",
+        slug=f"mvp-{created_at:%d%H%M}",
+        description="An idea",
+        status=status,
+        created_at=created_at,
+        updated_at=created_at,
+        completed_at=created_at + timedelta(hours=hours) if hours else None,
+        cpu_hours_used=1.5,
+        ai_tokens_used=100,
+        total_cost=cost,
+    )
+
+
+async def seed(sessions, tenant, count=40):
+    now = datetime.utcnow()
+    projects = []
+    for index in range(count):
+        created_at = now - timedelta(hours=7 * index + 1)
+        status = ["deployed", "failed", "generating", "testing"][index % 4]
+        projects.append(make_project(tenant, created_at, status, hours=index % 3 + 1))
+    async with sessions() as db:
+        db.add_all(projects)
+        await db.commit()
+    return projects
+
+
+def expected_summary(projects, start):
+    selected = [p for p in projects if p.created_at >= truncate(start, "hour")]
+    completed = [p for p in selected if p.completed_at]
+    return {
+        "pipelines_created": len(selected),
+        "pipelines_deployed": sum(p.status == "deployed" for p in selected),
+        "pipelines_failed": sum(p.status == "failed" for p in selected),
+        "completion_hours_sum": sum(
+            (p.completed_at - p.created_at).total_seconds() / 3600 for p in completed
+        ),
+        "total_cost": sum(p.total_cost for p in selected),
+    }
+
+
+class TestRollupMaintenance:
+    """Test rollup correctness and incremental refresh"""
+
+    @pytest.mark.asyncio
+    async def test_rollups_match_direct_aggregation(self, sessions, tenant):
+        projects = await seed(sessions, tenant)
+        service = AnalyticsService(session_factory=sessions)
+
+        for days in (1, 3, 7, 30):
+            start = datetime.utcnow() - timedelta(days=days)
+            summary = (await service.pipeline_summary(tenant.id, start))["project"]
+            expected = expected_summary(projects, start)
+            for metric, value in expected.items():
+                assert summary[metric] == pytest.approx(value), (days, metric)
+
+        totals = await service.tenant_totals(tenant.id)
+        assert totals["pipelines_created"] == len(projects)
+        assert totals["pipelines_active"] == 10
+
+    @pytest.mark.asyncio
+    async def test_refresh_recomputes_only_touched_buckets(self, sessions, tenant):
+        projects = await seed(sessions, tenant)
+        service = AnalyticsService(session_factory=sessions)
+        await service.refresh(tenant.id)
+        initial_buckets = service.stats["buckets_recomputed"]
+
+        changed = projects[5]
+        async with sessions() as db:
+            stored = await db.get(MVPProjectORM, changed.id)
+            stored.status = "deployed"
+            await db.commit()
+        changed.status = "deployed"
+
+        # Hour and day buckets of the changed project, plus those of the
+        # newest project inside the watermark overlap
+        await service.refresh(tenant.id)
+        assert initial_buckets > 40
+        assert service.stats["buckets_recomputed"] - initial_buckets <= 4
+
+        start = datetime.utcnow() - timedelta(days=30)
+        summary = await service.pipeline_summary(tenant.id, start)
+        assert summary["project"]["pipelines_deployed"] == expected_summary(projects, start)["pipelines_deployed"]
+        totals = await service.tenant_totals(tenant.id)
+        assert totals["pipelines_deployed"] == 11
+
+    @pytest.mark.asyncio
+    async def test_stage_rollups_from_executions(self, sessions, tenant):
+        project = make_project(tenant, datetime.utcnow() - timedelta(hours=2))
+        async with sessions() as db:
+            db.add(project)
+            await db.flush()
+            for status, durations in (("completed", {"backend": 3600, "deploy": 1800}),
+                                      ("failed", {"backend": 7200})):
+                db.add(PipelineExecutionORM(
+                    mvp_project_id=project.id,
+                    tenant_id=tenant.id,
+                    current_stage="deploy",
+                    status=status,
+                    started_at=datetime.utcnow() - timedelta(hours=2),
+                    stage_durations=durations,
+                ))
+            await db.commit()
+
+        service = AnalyticsService(session_factory=sessions)
+        summary = await service.pipeline_summary(tenant.id, datetime.utcnow() - timedelta(days=1))
+
+        assert summary["stages"]["backend"]["stage_runs"] == 2
+        assert summary["stages"]["backend"]["stage_hours_sum"] == pytest.approx(3.0)
+        assert summary["stages"]["deploy"]["stage_failures"] == 1
+        assert summary["stages"]["deploy"]["stage_runs"] == 2
+
+    @pytest.mark.asyncio
+    async def test_execution_updates_without_timestamps_are_refreshed(self, sessions, tenant):
+        started_at = datetime.utcnow() - timedelta(hours=2)
+        project = make_project(tenant, started_at)
+        async with sessions() as db:
+            db.add(project)
+            await db.flush()
+            execution = PipelineExecutionORM(
+                mvp_project_id=project.id,
+                tenant_id=tenant.id,
+                current_stage="deploy",
+                status="running",
+                started_at=started_at,
+                current_stage_started_at=started_at,
+                stage_durations={},
+            )
+            # A newer run moves the watermark past the first run's timestamps
+            newer = datetime.utcnow() - timedelta(minutes=1)
+            db.add_all([execution, PipelineExecutionORM(
+                mvp_project_id=project.id,
+                tenant_id=tenant.id,
+                current_stage="backend",
+                status="running",
+                started_at=newer,
+                current_stage_started_at=newer,
+                stage_durations={},
+            )])
+            await db.commit()
+
+        service = AnalyticsService(session_factory=sessions, refresh_interval=0)
+        start = datetime.utcnow() - timedelta(days=1)
+        assert (await service.pipeline_summary(tenant.id, start))["stages"] == {}
+
+        # A stage finishing and the run failing touch no tracked timestamp
+        async with sessions() as db:
+            stored = await db.get(PipelineExecutionORM, execution.id)
+            stored.stage_durations = {"backend": 3600}
+            stored.status = "failed"
+            await db.commit()
+
+        stages = (await service.pipeline_summary(tenant.id, start))["stages"]
+        assert stages["backend"]["stage_runs"] == 1
+        assert stages["deploy"]["stage_failures"] == 1
+        assert service.stats["rebuilds"] == 1
+
+
+class TestAnalyticsQueries:
+    """Test cursor pagination and response caching"""
+
+    @pytest.mark.asyncio
+    async def test_daily_series_pages_with_cursor(self, sessions, tenant):
+        projects = await seed(sessions, tenant)
+        service = AnalyticsService(session_factory=sessions)
+        start = datetime.utcnow() - timedelta(days=9)
+
+        points, cursor = await service.daily_series(tenant.id, start, limit=4)
+        while cursor:
+            page, cursor = await service.daily_series(tenant.id, start, cursor=cursor, limit=4)
+            points.extend(page)
+
+        assert len(points) == 10
+        assert [p["date"] for p in points] == sorted({p["date"] for p in points})
+        first_day = truncate(start, "day")
+        assert sum(p["pipelines_created"] for p in points) == sum(
+            p.created_at >= first_day for p in projects
+        )
+
+    @pytest.mark.asyncio
+    async def test_responses_cached_until_rollups_change(self, sessions, tenant):
+        await seed(sessions, tenant, count=4)
+        service = AnalyticsService(session_factory=sessions, refresh_interval=0)
+        start = datetime.utcnow() - timedelta(days=7)
+
+        first = await service.pipeline_summary(tenant.id, start)
+        assert await service.pipeline_summary(tenant.id, start) == first
+        assert service.stats["cache_hits"] == 1
+
+        async with sessions() as db:
+            db.add(make_project(tenant, datetime.utcnow() - timedelta(minutes=5)))
+            await db.commit()
+
+        updated = await service.pipeline_summary(tenant.id, start)
+        assert updated["project"]["pipelines_created"] == first["project"]["pipelines_created"] + 1
+        assert service.stats["cache_hits"] == 1
+
+        async with sessions() as db:
+            rows = (await db.execute(select(func.count()).select_from(AnalyticsRollupORM))).scalar_one()
+        assert rows > 0
+
+    @pytest.mark.asyncio
+    async def test_cached_responses_are_bounded(self, sessions, tenant):
+        await seed(sessions, tenant, count=4)
+        service = AnalyticsService(session_factory=sessions, max_cached_responses=3)
+        now = datetime.utcnow()
+
+        for hours in range(6):
+            await service.pipeline_summary(tenant.id, now - timedelta(days=7, hours=hours))
+
+        assert service.get_stats()["cached_responses"] == 3
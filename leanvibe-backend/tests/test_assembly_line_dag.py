@@ -0,0 +1,190 @@
+"""
+Tests for dependency-DAG execution in the Assembly Line orchestrator
+
+Validates that independent agents run concurrently within the per-tenant
+bound, declared dependencies are respected, per-node timing is reported,
+and resuming a failed generation reruns only the failed nodes.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from uuid import uuid4
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.mvp_models import MVPStatus, MVPTechStack, TechnicalBlueprint
+from app.services.assembly_line_system import (
+    AgentResult,
+    AgentStatus,
+    AgentType,
+    AssemblyLineOrchestrator,
+    BaseAIAgent,
+)
+
+AGENTS = [AgentType.BACKEND, AgentType.FRONTEND, AgentType.INFRASTRUCTURE, AgentType.OBSERVABILITY]
+
+
+class FakeAgent(BaseAIAgent):
+    """Agent that sleeps, records concurrency and can be told to fail"""
+
+    def __init__(self, agent_type, tracker, delay=0.1, fail=False):
+        super().__init__(agent_type)
+        self.tracker = tracker
+        self.delay = delay
+        self.fail = fail
+        self.runs = 0
+        self.inputs = []
+
+    async def _execute_agent(self, mvp_project_id, input_data, progress_callback=None):
+        self.runs += 1
+        self.inputs.append(dict(input_data))
+        self.tracker["running"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["running"])
+        self.tracker["order"].append(("start", self.agent_type))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.tracker["running"] -= 1
+            self.tracker["order"].append(("end", self.agent_type))
+        if self.fail:
+            raise RuntimeError(f"{self.agent_type.value} failed")
+        return AgentResult(
+            agent_type=self.agent_type,
+            status=AgentStatus.COMPLETED,
+            output={"generated_by": self.agent_type.value},
+            artifacts=[f"{self.agent_type.value}/main.txt"],
+            confidence_score=0.9,
+        )
+
+
+@pytest.fixture
+def blueprint():
+    return TechnicalBlueprint(
+        tech_stack=MVPTechStack.FULL_STACK_REACT,
+        architecture_pattern="monolith",
+        database_schema={},
+        api_endpoints=[],
+        user_flows=[{"name": "Sign up"}],
+        wireframes=[{"name": "Dashboard"}],
+        design_system={},
+        deployment_config={},
+        monitoring_config={},
+        scaling_config={},
+        test_strategy={},
+        performance_targets={},
+        security_requirements=[],
+        confidence_score=0.9,
+        estimated_generation_time=30,
+    )
+
+
+@pytest.fixture
+def tracker():
+    return {"running": 0, "peak": 0, "order": []}
+
+
+def build_orchestrator(tracker, max_concurrent=4, failing=()):
+    orchestrator = AssemblyLineOrchestrator(max_concurrent_agents_per_tenant=max_concurrent)
+    for agent_type in AGENTS:
+        orchestrator.register_agent(FakeAgent(agent_type, tracker, fail=agent_type in failing))
+    return orchestrator
+
+
+class TestParallelExecution:
+    """Test concurrent execution of independent agents"""
+
+    @pytest.mark.asyncio
+    async def test_independent_agents_run_concurrently_with_node_timings(self, blueprint, tracker):
+        orchestrator = build_orchestrator(tracker)
+        project_id = uuid4()
+
+        started = time.perf_counter()
+        assert await orchestrator.start_mvp_generation(project_id, blueprint)
+        elapsed = time.perf_counter() - started
+
+        assert tracker["peak"] == 4
+        assert elapsed < 0.3  # four 0.1s agents, not 0.4s sequentially
+
+        progress = await orchestrator.get_generation_progress(project_id)
+        assert progress.overall_progress == 100.0
+        assert progress.running_stages == []
+        for agent_type in AGENTS:
+            timing = progress.node_timings[agent_type.value]
+            assert timing.status == AgentStatus.COMPLETED
+            assert timing.attempts == 1
+            assert 0.09 <= timing.duration_seconds < 0.3
+
+    @pytest.mark.asyncio
+    async def test_tenant_concurrency_is_bounded_across_generations(self, blueprint, tracker):
+        orchestrator = build_orchestrator(tracker, max_concurrent=2)
+        tenant_id = uuid4()
+
+        results = await asyncio.gather(
+            orchestrator.start_mvp_generation(uuid4(), blueprint, tenant_id=tenant_id),
+            orchestrator.start_mvp_generation(uuid4(), blueprint, tenant_id=tenant_id),
+        )
+
+        assert results == [True, True]
+        assert tracker["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_declared_dependencies_gate_downstream_nodes(self, blueprint, tracker):
+        orchestrator = build_orchestrator(tracker)
+        frontend = FakeAgent(AgentType.FRONTEND, tracker)
+        orchestrator.register_agent(frontend, depends_on=(AgentType.BACKEND,))
+
+        assert await orchestrator.start_mvp_generation(uuid4(), blueprint)
+
+        order = tracker["order"]
+        assert order.index(("end", AgentType.BACKEND)) < order.index(("start", AgentType.FRONTEND))
+        assert frontend.inputs[0]["backend_output"] == {"generated_by": "backend"}
+        assert "infrastructure_output" not in frontend.inputs[0]
+
+
+class TestCheckpointResume:
+    """Test that resume reruns only failed nodes"""
+
+    @pytest.mark.asyncio
+    async def test_resume_reruns_only_failed_nodes(self, blueprint, tracker):
+        orchestrator = build_orchestrator(tracker, failing=(AgentType.INFRASTRUCTURE,))
+        observability = orchestrator.agents[AgentType.OBSERVABILITY]
+        orchestrator.register_agent(observability, depends_on=(AgentType.INFRASTRUCTURE,))
+        project_id = uuid4()
+
+        assert not await orchestrator.start_mvp_generation(project_id, blueprint)
+
+        checkpoint = orchestrator.checkpoints[project_id]
+        assert set(checkpoint.completed) == {AgentType.BACKEND, AgentType.FRONTEND}
+        assert checkpoint.failed == [AgentType.INFRASTRUCTURE]
+        assert observability.runs == 0  # blocked by its failed dependency
+        progress = await orchestrator.get_generation_progress(project_id)
+        assert progress.node_timings["infrastructure"].attempts == 3
+        assert progress.overall_progress == 50.0
+
+        orchestrator.agents[AgentType.INFRASTRUCTURE].fail = False
+        statuses = []
+
+        async def record_status(mvp_project_id, status):
+            statuses.append(status)
+
+        orchestrator._update_mvp_status = record_status
+        assert await orchestrator.resume_generation(project_id)
+        assert await orchestrator._resumed_runs[project_id]
+
+        assert statuses == [MVPStatus.GENERATING, MVPStatus.TESTING]
+        # A finished generation keeps no checkpoint or rerun task
+        assert project_id not in orchestrator.checkpoints
+        assert project_id not in orchestrator._resumed_runs
+
+        assert orchestrator.agents[AgentType.BACKEND].runs == 1
+        assert orchestrator.agents[AgentType.FRONTEND].runs == 1
+        assert orchestrator.agents[AgentType.INFRASTRUCTURE].runs == 4
+        assert observability.runs == 1
+        progress = await orchestrator.get_generation_progress(project_id)
+        assert progress.node_timings["backend"].from_checkpoint
+        assert progress.overall_progress == 100.0
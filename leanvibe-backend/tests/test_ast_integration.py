@@ -486,10 +486,11 @@ def use_target():
 
             assert len(references) > 0
 
-            # Should find definition and usages
+            # Should find the definition, the import and the calls
             ref_types = [ref.reference_type for ref in references]
             assert "definition" in ref_types
-            assert "usage" in ref_types
+            assert "import" in ref_types
+            assert "call" in ref_types
 
     @pytest.mark.asyncio
     async def test_dependency_graph(self):
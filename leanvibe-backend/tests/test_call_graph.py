@@ -0,0 +1,246 @@
+"""
+Tests for call graph extraction and the indexed call graph
+
+Validates that call sites are resolved into edges through the import map,
+that k-hop caller/callee and call-chain queries work on the forward and
+reverse indexes, and that edges are maintained incrementally per file.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ast_models import CallGraphIndex
+
+UTILS = '''def helper():
+    return 1
+
+
+def format_name(name):
+    return helper() and name
+'''
+
+MODELS = '''from utils import format_name
+
+
+class Store:
+    def __init__(self):
+        self.load()
+
+    def load(self):
+        return format_name("store")
+'''
+
+MAIN = '''import utils
+from models import Store
+
+
+def main():
+    store = Store()
+    utils.helper()
+    return Store.load(store)
+
+
+def ping(n):
+    return pong(n - 1)
+
+
+def pong(n):
+    return ping(n) if n else None
+'''
+
+
+def edge_names(project_index):
+    return {
+        (caller.rsplit(":", 2)[1], callee.rsplit(":", 2)[1])
+        for caller, callee in project_index.call_graph.edges()
+    }
+
+
+def symbol_id(project_index, name):
+    return next(s.id for s in project_index.symbols.values() if s.name == name)
+
+
+@pytest_asyncio.fixture
+async def indexed_project():
+    from app.services.ast_service import ast_service
+    from app.services.project_indexer import project_indexer
+
+    await ast_service.initialize()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project_path = Path(temp_dir)
+        (project_path / "utils.py").write_text(UTILS)
+        (project_path / "models.py").write_text(MODELS)
+        (project_path / "main.py").write_text(MAIN)
+        yield project_path, await project_indexer.index_project(temp_dir)
+
+
+class TestCallGraphIndex:
+    """Test the forward and reverse call indexes"""
+
+    def build(self):
+        index = CallGraphIndex()
+        index.set_file("a.py", [("a", "b"), ("a", "c")])
+        index.set_file("b.py", [("b", "d"), ("c", "d"), ("d", "e")], ["a.py"])
+        return index
+
+    def test_k_hop_queries(self):
+        index = self.build()
+
+        assert index.callees_of("a") == {"b": 1, "c": 1}
+        assert index.callees_of("a", depth=3) == {"b": 1, "c": 1, "d": 2, "e": 3}
+        assert index.callers_of("e", depth=2) == {"d": 1, "b": 2, "c": 2}
+        assert index.degree("d") == 3
+
+    def test_call_chains_are_shortest_first_and_bounded(self):
+        index = self.build()
+
+        assert index.find_call_chains("a", "e") == [["a", "b", "d", "e"], ["a", "c", "d", "e"]]
+        assert index.find_call_chains("a", "e", max_depth=2) == []
+        assert index.find_call_chains("e", "a") == []
+
+    def test_replacing_a_file_updates_both_indexes(self):
+        index = self.build()
+
+        index.set_file("b.py", [("b", "e")])
+        assert "d" not in index.callers
+        assert index.callers_of("e") == {"b": 1}
+        assert index.importers == {}
+
+        index.remove_file("a.py")
+        assert index.callees_of("a") == {}
+        assert index.edges() == [("b", "e")]
+
+    def test_cycles(self):
+        index = CallGraphIndex()
+        index.set_file("a.py", [("a", "b"), ("b", "a"), ("b", "c"), ("c", "c")])
+
+        assert sorted(index.cycles()) == [["a", "b"], ["c"]]
+
+
+class TestProjectCallGraph:
+    """Test resolving call sites across an indexed project"""
+
+    @pytest.mark.asyncio
+    async def test_calls_resolve_through_imports(self, indexed_project):
+        from app.services.project_indexer import project_indexer
+
+        _, project_index = indexed_project
+
+        assert edge_names(project_index) == {
+            ("format_name", "helper"),
+            ("__init__", "load"),
+            ("load", "format_name"),
+            ("main", "__init__"),
+            ("main", "helper"),
+            ("main", "load"),
+            ("ping", "pong"),
+            ("pong", "ping"),
+        }
+
+        call_graph = await project_indexer.get_call_graph(project_index)
+        assert len(call_graph.edges) == 8
+        assert symbol_id(project_index, "main") in call_graph.entry_points
+        assert [[i.rsplit(":", 2)[1] for i in cycle] for cycle in call_graph.cycles] == [
+            ["ping", "pong"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_callers_and_call_chains(self, indexed_project):
+        _, project_index = indexed_project
+        index = project_index.call_graph
+        helper = symbol_id(project_index, "helper")
+        main = symbol_id(project_index, "main")
+
+        callers = {i.rsplit(":", 2)[1] for i in index.callers_of(helper, depth=2)}
+        assert callers == {"format_name", "main", "load"}
+        chains = index.find_call_chains(main, helper, max_depth=4)
+        assert [len(chain) for chain in chains] == [2, 4, 5]
+        assert chains[0] == [main, helper]
+
+    @pytest.mark.asyncio
+    async def test_importers_are_re_resolved_when_a_file_changes(self, indexed_project):
+        from app.services.project_indexer import project_indexer
+
+        project_path, project_index = indexed_project
+        utils = next(path for path in project_index.files if path.endswith("utils.py"))
+        old_helper = symbol_id(project_index, "helper")
+
+        Path(utils).write_text("# moved down\n\n" + UTILS)
+        assert await project_indexer.update_file_index(project_index, utils)
+
+        new_helper = symbol_id(project_index, "helper")
+        assert new_helper != old_helper
+        assert old_helper not in project_index.call_graph.callers
+        callers = {i.rsplit(":", 2)[1] for i in project_index.call_graph.callers_of(new_helper)}
+        assert callers == {"format_name", "main"}
+
+    @pytest.mark.asyncio
+    async def test_importers_are_re_resolved_when_an_imported_file_is_added(self):
+        from app.services.ast_service import ast_service
+        from app.services.project_indexer import project_indexer
+
+        await ast_service.initialize()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            (project_path / "a.py").write_text(
+                "from b import helper\n\n\ndef main():\n    return helper()\n"
+            )
+            project_index = await project_indexer.index_project(temp_dir)
+            assert edge_names(project_index) == set()
+
+            added = str((project_path / "b.py").absolute())
+            Path(added).write_text("def helper():\n    return 1\n")
+            assert await project_indexer.update_file_index(project_index, added)
+
+            assert edge_names(project_index) == {("main", "helper")}
+            assert project_index.call_graph.unresolved_importers == {}
+
+    @pytest.mark.asyncio
+    async def test_javascript_relative_imports(self):
+        from app.services.ast_service import ast_service
+        from app.services.project_indexer import project_indexer
+
+        await ast_service.initialize()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            (project_path / "view.js").write_text("export function render() {\n  return 1;\n}\n")
+            (project_path / "app.js").write_text(
+                'import { render as draw } from "./view";\n'
+                'const view = require("./view.js");\n\n'
+                "function main() {\n  draw();\n  return view.render();\n}\n"
+            )
+            project_index = await project_indexer.index_project(temp_dir)
+
+        assert edge_names(project_index) == {("main", "render")}
+
+
+class TestGraphQueryFallback:
+    """Test serving graph queries from the in-memory call graph"""
+
+    @pytest.mark.asyncio
+    async def test_call_chains_and_hotspots_without_graph_database(self):
+        from app.services.graph_query_service import GraphQueryService
+
+        service = GraphQueryService()
+        assert not service.graph_service.initialized
+        index = CallGraphIndex()
+        hub = "/p/hub.py:hub:0"
+        index.set_file("/p/a.py", [(f"/p/a.py:f{i}:{i}", hub) for i in range(5)])
+        index.set_file("/p/hub.py", [(hub, "/p/hub.py:leaf:9")])
+        service.register_call_graph("project_x", index)
+
+        assert await service.find_call_chains("/p/a.py:f1:1", "/p/hub.py:leaf:9") == [
+            ["f1", "hub", "leaf"]
+        ]
+        hotspots = await service.find_hotspots("project_x")
+        assert [(h["symbol_name"], h["connection_count"]) for h in hotspots] == [("hub", 6)]
+        assert hotspots[0]["file_path"] == "/p/hub.py"
+        assert await service.find_hotspots("unknown") == []
@@ -0,0 +1,238 @@
+"""
+Tests for stat-first change detection
+
+Validates that the parallel workspace walk honors exclude patterns and
+.gitignore files, that unchanged files are recognised from their stat
+signature without being read, that the git index is used for tracked files,
+and that the incremental indexer only reanalyzes what actually changed.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.change_detector import (
+    ChangeDetector,
+    FileFingerprint,
+    hash_file,
+    is_ignored,
+    parse_gitignore,
+    read_git_index,
+)
+
+EXTENSIONS = {".py", ".js"}
+EXCLUDES = ["node_modules", "build", "*.min.js"]
+
+
+@pytest.fixture
+def workspace():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for relative_path in (
+            "main.py",
+            "pkg/util.py",
+            "pkg/deep/more.js",
+            "node_modules/lib/index.js",
+            "build/out.py",
+            "static/app.min.js",
+            "logs/debug.py",
+            "pkg/generated/schema.py",
+            "pkg/generated/keep.py",
+            "README.md",
+        ):
+            path = root / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"# {relative_path}\n")
+        (root / ".gitignore").write_text("# comment\n/logs/\n")
+        (root / "pkg" / ".gitignore").write_text("generated/*\n!generated/keep.py\n")
+        yield root
+
+
+def relative(workspace, paths):
+    return sorted(str(Path(p).relative_to(workspace)) for p in paths)
+
+
+def previous_fingerprints(detector, workspace):
+    files = detector.scan(str(workspace), EXTENSIONS, EXCLUDES)
+    return detector.fingerprint_files(str(workspace), files)
+
+
+class TestWorkspaceScan:
+    """Test the parallel scandir walk"""
+
+    def test_honors_excludes_and_gitignore(self, workspace):
+        detector = ChangeDetector(use_git_index=False)
+
+        files = detector.scan(str(workspace), EXTENSIONS, EXCLUDES)
+
+        assert relative(workspace, files) == [
+            "main.py",
+            "pkg/deep/more.js",
+            "pkg/generated/keep.py",
+            "pkg/util.py",
+        ]
+        signature = files[str(workspace / "main.py")]
+        stat = os.stat(workspace / "main.py")
+        assert signature == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def test_gitignore_rules(self):
+        rules = parse_gitignore("*.log\n/dist/\n!keep.log\nsrc/**/gen\n", base="")
+
+        assert is_ignored(rules, "a/b/trace.log", False)
+        assert not is_ignored(rules, "a/keep.log", False)
+        assert is_ignored(rules, "dist", True)
+        assert not is_ignored(rules, "dist", False)
+        assert not is_ignored(rules, "a/dist", True)
+        assert is_ignored(rules, "src/x/gen", True)
+
+    @pytest.mark.asyncio
+    async def test_project_indexer_discovery_prunes_excluded_directories(self, workspace):
+        from app.services.project_indexer import project_indexer
+
+        code_files = await project_indexer._discover_code_files(str(workspace))
+
+        assert relative(workspace, code_files) == [
+            "main.py",
+            "pkg/deep/more.js",
+            "pkg/generated/keep.py",
+            "pkg/util.py",
+        ]
+
+
+class TestChangeDetection:
+    """Test detecting changes against previous fingerprints"""
+
+    def test_unchanged_workspace_reads_no_files(self, workspace):
+        detector = ChangeDetector(use_git_index=False)
+        previous = previous_fingerprints(detector, workspace)
+
+        changes = detector.detect(str(workspace), previous, EXTENSIONS, EXCLUDES)
+
+        assert not changes.has_changes
+        assert changes.unchanged == 4
+        assert changes.files_hashed == 0
+        assert changes.fingerprints == previous
+
+    def test_added_modified_removed_and_touched(self, workspace):
+        detector = ChangeDetector(use_git_index=False)
+        previous = previous_fingerprints(detector, workspace)
+
+        (workspace / "pkg" / "util.py").write_text("def util():\n    pass\n")
+        (workspace / "pkg" / "deep" / "more.js").unlink()
+        (workspace / "new.py").write_text("x = 1\n")
+        main = workspace / "main.py"
+        os.utime(main, ns=(0, main.stat().st_mtime_ns + 5_000_000_000))
+
+        changes = detector.detect(str(workspace), previous, EXTENSIONS, EXCLUDES)
+
+        assert relative(workspace, changes.added) == ["new.py"]
+        assert relative(workspace, changes.modified) == ["pkg/util.py"]
+        assert relative(workspace, changes.removed) == ["pkg/deep/more.js"]
+        # Touched without edits: hashed once, then recorded with its new stat
+        assert changes.unchanged == 2
+        assert changes.files_hashed == 3
+        assert changes.fingerprints[str(main)].signature.mtime_ns == main.stat().st_mtime_ns
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_clean_tracked_files_use_git_blob_ids(self, workspace):
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        subprocess.run(git + ["init", "-q"], cwd=workspace, check=True)
+        subprocess.run(git + ["add", "main.py", "pkg/util.py"], cwd=workspace, check=True)
+
+        entries = read_git_index(str(workspace / ".git" / "index"))
+        assert sorted(entries) == ["main.py", "pkg/util.py"]
+        blob_id = subprocess.run(
+            ["git", "hash-object", "main.py"], cwd=workspace, capture_output=True, text=True
+        ).stdout.strip()
+        assert entries["main.py"].blob_id == blob_id
+
+        detector = ChangeDetector()
+        # Stale previous signatures force a content check on every file
+        previous = {
+            path: FileFingerprint(fingerprint.signature._replace(mtime_ns=0), "stale")
+            for path, fingerprint in previous_fingerprints(detector, workspace).items()
+        }
+        changes = detector.detect(str(workspace), previous, EXTENSIONS, EXCLUDES)
+
+        tracked = detector.git_index(str(workspace))
+        assert relative(workspace, tracked) == ["main.py", "pkg/util.py"]
+        for path, fingerprint in changes.fingerprints.items():
+            if path in tracked:
+                assert fingerprint.content_hash == f"git:{tracked[path].blob_id}"
+            else:
+                # Untracked files are hashed with xxhash, not as git blobs
+                assert fingerprint.content_hash == hash_file(path)
+        # Entries written in the same instant as the index are not trusted
+        trusted = [path for path, entry in tracked.items() if not entry.racy]
+        assert changes.files_hashed == 4 - len(trusted)
+
+    def test_files_outside_a_repository_are_not_hashed_as_blobs(self, workspace):
+        detector = ChangeDetector()
+        assert detector.git_index(str(workspace)) == {}
+
+        fingerprints = previous_fingerprints(detector, workspace)
+        assert fingerprints
+        for path, fingerprint in fingerprints.items():
+            assert fingerprint.content_hash == hash_file(path)
+
+    @pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+    def test_touched_clean_files_match_their_blob_ids(self, workspace):
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        main = workspace / "main.py"
+        # Older than the index, so git's entry is trusted
+        os.utime(main, ns=(0, main.stat().st_mtime_ns - 5_000_000_000))
+        subprocess.run(git + ["init", "-q"], cwd=workspace, check=True)
+        subprocess.run(git + ["add", "main.py"], cwd=workspace, check=True)
+
+        detector = ChangeDetector()
+        previous = previous_fingerprints(detector, workspace)
+        assert previous[str(main)].content_hash.startswith("git:")
+
+        os.utime(main, ns=(0, main.stat().st_mtime_ns + 10_000_000_000))
+        changes = detector.detect(str(workspace), previous, EXTENSIONS, EXCLUDES)
+
+        assert not changes.has_changes
+        assert changes.files_hashed == 1
+        assert changes.fingerprints[str(main)].content_hash == previous[str(main)].content_hash
+
+
+class TestIncrementalIndexerDetection:
+    """Test the incremental indexer's use of stat-first detection"""
+
+    @pytest.mark.asyncio
+    async def test_warm_start_only_reanalyzes_changed_files(self, workspace):
+        from app.services.ast_service import ast_service
+        from app.services.incremental_indexer import IncrementalProjectIndexer
+
+        await ast_service.initialize()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            indexer = IncrementalProjectIndexer(cache_dir=cache_dir)
+            await indexer.get_or_create_project_index(str(workspace))
+            cache = await indexer._load_cache(str(workspace))
+            entry = cache.file_entries[str(workspace / "main.py")]
+            assert entry.mtime_ns == (workspace / "main.py").stat().st_mtime_ns
+            assert entry.inode == (workspace / "main.py").stat().st_ino
+
+            changes = await indexer._detect_changes(str(workspace), cache)
+            assert not changes.has_changes
+            assert changes.files_hashed == 0
+
+            (workspace / "pkg" / "util.py").write_text("def util():\n    return 2\n")
+            changes = await indexer._detect_changes(str(workspace), cache)
+            assert relative(workspace, changes.modified) == ["pkg/util.py"]
+            assert not indexer._needs_full_reindex(cache, changes)
+
+            project_index = await indexer.get_or_create_project_index(str(workspace))
+            assert any(s.name == "util" for s in project_index.symbols.values())
+            cache = await indexer._load_cache(str(workspace))
+            assert cache.file_entries[str(workspace / "pkg" / "util.py")].fingerprint == (
+                changes.fingerprints[str(workspace / "pkg" / "util.py")]
+            )
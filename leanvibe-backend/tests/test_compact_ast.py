@@ -0,0 +1,125 @@
+"""
+Tests for the compact struct-of-arrays AST representation
+
+Validates that CompactAST mirrors the tree-sitter tree, that the lazy
+ASTNode facade matches the eager conversion, and that the compact form is
+what ASTAnalysisService stores and pickles.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ast_models import ASTNodeView, CompactAST
+from app.services.tree_sitter_parsers import tree_sitter_manager
+
+PYTHON_CODE = '''
+import os
+
+
+class Greeter:
+    """Says hello"""
+
+    def greet(self, name: str) -> str:
+        return f"héllo {name}"
+
+
+def main():
+    print(Greeter().greet(os.getcwd()))
+'''
+
+
+def walk(node):
+    yield node
+    for child in node.children:
+        yield from walk(child)
+
+
+@pytest_asyncio.fixture
+async def parsed():
+    await tree_sitter_manager.initialize()
+    tree, errors = tree_sitter_manager.parse_file("sample.py", PYTHON_CODE)
+    assert tree is not None and not errors
+    source = PYTHON_CODE.encode("utf-8")
+    return tree, source, tree_sitter_manager.tree_to_compact_ast(tree.root_node, source)
+
+
+class TestCompactAST:
+    """Test flattening tree-sitter trees into node tables"""
+
+    @pytest.mark.asyncio
+    async def test_node_tables_mirror_tree_sitter(self, parsed):
+        tree, source, ast = parsed
+
+        expected = list(walk(tree.root_node))
+        actual = list(walk(ast.root))
+        assert len(ast) == len(expected) == len(actual)
+        for ts_node, view in zip(expected, actual):
+            assert view.node_type == ts_node.type
+            assert (view.start_byte, view.end_byte) == (ts_node.start_byte, ts_node.end_byte)
+            assert view.start_point == tuple(ts_node.start_point)
+            assert view.end_point == tuple(ts_node.end_point)
+            assert view.is_named == ts_node.is_named
+            assert view.text == ts_node.text.decode("utf-8")
+
+    @pytest.mark.asyncio
+    async def test_navigation_and_type_lookup(self, parsed):
+        _, _, ast = parsed
+
+        functions = ast.find_by_type(["function_definition"])
+        assert [ast.node(i).children[1].text for i in functions] == ["greet", "main"]
+
+        method = ast.node(functions[0])
+        assert method.parent.node_type == "block"
+        assert method.parent.parent.node_type == "class_definition"
+        assert ast.root.parent is None
+        assert ast.node(ast.subtree_ends[functions[0]] - 1).node_type != "function_definition"
+        assert len(ast.type_names) < len(ast)
+
+    @pytest.mark.asyncio
+    async def test_facade_materializes_same_tree_as_eager_conversion(self, parsed):
+        tree, source, ast = parsed
+
+        eager = tree_sitter_manager.tree_to_ast_node(tree.root_node, source)
+        assert ast.root.to_ast_node() == eager
+        assert eager.children[0].node_type == "import_statement"
+
+    @pytest.mark.asyncio
+    async def test_pickle_round_trip_is_smaller_than_pydantic_tree(self, parsed):
+        _, _, ast = parsed
+
+        restored = pickle.loads(pickle.dumps(ast))
+        assert isinstance(restored, CompactAST)
+        assert restored.root.to_ast_node() == ast.root.to_ast_node()
+        assert restored.find_by_type(["class_definition"]) == ast.find_by_type(["class_definition"])
+        assert len(pickle.dumps(ast)) * 3 < len(pickle.dumps(ast.root.to_ast_node()))
+
+
+class TestFileAnalysisStorage:
+    """Test that parsed files keep the compact form"""
+
+    @pytest.mark.asyncio
+    async def test_parse_file_stores_compact_ast(self):
+        from app.services.ast_service import ASTAnalysisService
+
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as handle:
+            handle.write(PYTHON_CODE)
+        try:
+            await tree_sitter_manager.initialize()
+            analysis = await ASTAnalysisService(ThreadPoolExecutor(max_workers=1)).parse_file(handle.name)
+        finally:
+            os.unlink(handle.name)
+
+        assert isinstance(analysis.ast, CompactAST)
+        assert isinstance(analysis.ast_root, ASTNodeView)
+        assert analysis.ast_root.node_type == "module"
+        assert "ast" not in analysis.model_dump()
+        assert pickle.loads(pickle.dumps(analysis)).ast.source == PYTHON_CODE.encode("utf-8")
@@ -5,11 +5,13 @@ Tests for CLI bridge enhancements to the ConnectionManager including
 iOS device detection, broadcasting, and device management.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
-from app.core.connection_manager import ConnectionManager
+from app.core.connection_manager import ConnectionManager, OverflowPolicy
 from app.models.event_models import ClientPreferences
 
 
@@ -88,6 +90,7 @@ class TestConnectionManagerIOSSupport:
         
         # Broadcast to iOS devices
         count = await connection_manager.broadcast_to_ios_devices(message)
+        await connection_manager.drain()
         
         assert count == 1
         # iOS device should receive message
@@ -109,6 +112,7 @@ class TestConnectionManagerIOSSupport:
         
         message = {"type": "test", "content": "iPad message"}
         count = await connection_manager.broadcast_to_ios_devices(message)
+        await connection_manager.drain()
         
         assert count == 1
         ipad_websocket.send_text.assert_called_once()
@@ -119,6 +123,7 @@ class TestConnectionManagerIOSSupport:
         
         message = {"type": "test", "content": "No iOS devices"}
         count = await connection_manager.broadcast_to_ios_devices(message)
+        await connection_manager.drain()
         
         assert count == 0
         mock_cli_websocket.send_text.assert_not_called()
@@ -132,8 +137,10 @@ class TestConnectionManagerIOSSupport:
         
         message = {"type": "test", "content": "Error test"}
         count = await connection_manager.broadcast_to_ios_devices(message)
+        await connection_manager.drain()
         
-        assert count == 0
+        # Broadcasts only queue; the failure surfaces in the device's writer
+        assert count == 1
         # Device should be disconnected due to error
         assert "ios_device" not in connection_manager.active_connections
 
@@ -245,6 +252,7 @@ class TestConnectionManagerIOSSupport:
         
         message = {"type": "test", "content": "Multiple devices"}
         count = await connection_manager.broadcast_to_ios_devices(message)
+        await connection_manager.drain()
         
         assert count == 3
         # All devices should receive message
@@ -255,8 +263,6 @@ class TestConnectionManagerIOSSupport:
         """Test concurrent iOS device operations"""
         await connection_manager.connect(mock_websocket, "ios_device")
         
-        import asyncio
-        
         # Concurrent operations
         message1 = {"type": "test1", "content": "Message 1"}
         message2 = {"type": "test2", "content": "Message 2"}
@@ -272,6 +278,164 @@ class TestConnectionManagerIOSSupport:
         assert mock_websocket.send_text.call_count == 2
 
 
+class TestConnectionManagerOutboundQueues:
+    """Test per-client outbound queues and overflow policies"""
+
+    def _websocket(self, user_agent="LeanVibe/1.0 (iPhone; iOS 17.0)"):
+        websocket = MagicMock()
+        websocket.headers = {"user-agent": user_agent}
+        websocket.accept = AsyncMock()
+        websocket.send_text = AsyncMock()
+        websocket.close = AsyncMock()
+        return websocket
+
+    def _stalled_websocket(self):
+        """A websocket whose sends block until the returned event is set"""
+        websocket = self._websocket()
+        release = asyncio.Event()
+
+        async def stalled_send(text):
+            await release.wait()
+
+        websocket.send_text = AsyncMock(side_effect=stalled_send)
+        return websocket, release
+
+    async def test_stalled_client_does_not_block_broadcast(self):
+        """A client that never finishes a send does not delay anyone else"""
+        manager = ConnectionManager()
+        stalled, release = self._stalled_websocket()
+        healthy = self._websocket()
+        await manager.connect(stalled, "stalled")
+        await manager.connect(healthy, "healthy")
+
+        await asyncio.wait_for(manager.broadcast_json({"type": "update"}), timeout=0.5)
+        await asyncio.sleep(0.01)
+
+        healthy.send_text.assert_called_once_with('{"type": "update"}')
+        assert manager.get_connection_info()["outbound_queues"]["stalled"]["sent"] == 0
+
+        release.set()
+        await manager.drain(timeout=1.0)
+        assert manager.get_connection_info()["outbound_queues"]["stalled"]["sent"] == 1
+
+    async def test_broadcast_serializes_once(self):
+        """Every client receives the same serialized string"""
+        manager = ConnectionManager()
+        websockets = [self._websocket() for _ in range(3)]
+        for i, websocket in enumerate(websockets):
+            await manager.connect(websocket, f"client_{i}")
+
+        await manager.broadcast_json({"type": "update", "value": 1})
+        await manager.drain()
+
+        sent = [websocket.send_text.call_args[0][0] for websocket in websockets]
+        assert all(text is sent[0] for text in sent)
+
+    async def test_drop_oldest_policy(self):
+        """A full queue discards its oldest pending message"""
+        manager = ConnectionManager(max_queue_size=2)
+        websocket, release = self._stalled_websocket()
+        await manager.connect(websocket, "client")
+
+        await manager.broadcast("message_0")
+        await asyncio.sleep(0)
+        for i in range(1, 4):
+            await manager.broadcast(f"message_{i}")
+        release.set()
+        await manager.drain(timeout=1.0)
+
+        sent = [call[0][0] for call in websocket.send_text.call_args_list]
+        # message_0 was already being written when the queue overflowed
+        assert sent == ["message_0", "message_2", "message_3"]
+        assert manager.get_connection_info()["outbound_queues"]["client"]["dropped"] == 1
+
+    async def test_coalesce_policy_replaces_pending_message(self):
+        """A full queue replaces a pending message with the same key in place"""
+        manager = ConnectionManager(max_queue_size=2, overflow_policy=OverflowPolicy.COALESCE)
+        websocket, release = self._stalled_websocket()
+        await manager.connect(websocket, "client")
+
+        await manager.broadcast("in_flight")
+        await asyncio.sleep(0)
+        await manager.broadcast("status_1", coalesce_key="status")
+        await manager.broadcast("log_1", coalesce_key="log")
+        await manager.broadcast("status_2", coalesce_key="status")
+        release.set()
+        await manager.drain(timeout=1.0)
+
+        sent = [call[0][0] for call in websocket.send_text.call_args_list]
+        assert sent == ["in_flight", "status_2", "log_1"]
+        assert manager.get_connection_info()["outbound_queues"]["client"]["coalesced"] == 1
+
+    async def test_disconnect_policy_evicts_slow_consumer(self):
+        """A full queue disconnects the client under the disconnect policy"""
+        manager = ConnectionManager(max_queue_size=1, overflow_policy=OverflowPolicy.DISCONNECT)
+        websocket, _ = self._stalled_websocket()
+        await manager.connect(websocket, "slow")
+
+        await manager.broadcast("in_flight")
+        await asyncio.sleep(0)
+        await manager.broadcast("queued")
+        await manager.broadcast("overflow")
+
+        assert "slow" not in manager.active_connections
+        assert await manager.send_to_client("slow", {"type": "late"}) is False
+        await asyncio.sleep(0)
+        websocket.close.assert_awaited_once_with(code=1013)
+
+    async def test_send_failure_closes_the_socket(self):
+        """A failed send closes the socket with an internal error code"""
+        manager = ConnectionManager()
+        websocket = self._websocket()
+        websocket.send_text.side_effect = Exception("Connection lost")
+        await manager.connect(websocket, "broken")
+
+        assert await manager.send_to_client("broken", {"type": "update"}) is False
+        await asyncio.sleep(0)
+
+        assert "broken" not in manager.active_connections
+        websocket.close.assert_awaited_once_with(code=1011)
+
+    async def test_direct_sends_stay_ordered_behind_broadcasts(self):
+        """send_to_client waits for delivery and keeps per-client ordering"""
+        manager = ConnectionManager()
+        websocket = self._websocket()
+        await manager.connect(websocket, "client")
+
+        await manager.broadcast("first")
+        assert await manager.send_to_client("client", {"type": "second"}) is True
+
+        sent = [call[0][0] for call in websocket.send_text.call_args_list]
+        assert sent == ["first", '{"type": "second"}']
+
+
+    async def test_event_streaming_sends_go_through_outbox(self):
+        """Pushed events queue behind pending messages instead of racing the writer"""
+        from app.services.event_streaming_service import event_streaming_service
+
+        manager = ConnectionManager()
+        websocket, release = self._stalled_websocket()
+        websocket.send_bytes = AsyncMock()
+        await manager.connect(websocket, "client")
+        sender = event_streaming_service.websocket_connections["client"]
+
+        await manager.broadcast("first")
+        await asyncio.sleep(0)
+        await sender.send_bytes(b"compressed")
+        await sender.send_text("event")
+        await asyncio.sleep(0.01)
+        # Nothing else reached the socket while the first send was in progress
+        websocket.send_bytes.assert_not_called()
+        assert websocket.send_text.call_count == 1
+
+        release.set()
+        await manager.drain(timeout=1.0)
+        sent = [call[0][0] for call in websocket.send_text.call_args_list]
+        assert sent == ["first", "event"]
+        websocket.send_bytes.assert_called_once_with(b"compressed")
+        manager.disconnect("client")
+
+
 @pytest.mark.integration
 class TestConnectionManagerIntegration:
     """Integration tests for enhanced connection manager"""
@@ -345,6 +509,7 @@ class TestConnectionManagerIntegration:
         
         # Test broadcast to iOS only
         count = await connection_manager.broadcast_to_ios_devices({"ios_only": True})
+        await connection_manager.drain()
         assert count == 2
         
         # Verify only iOS devices received message
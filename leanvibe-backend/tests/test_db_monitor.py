@@ -0,0 +1,125 @@
+"""
+Tests for database query and connection pool monitoring
+
+Validates statement fingerprinting, latency histograms, slow query sampling,
+pool checkout wait measurement and sizing recommendations on real
+aiosqlite engines.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.db_monitor import (
+    DatabaseMonitor,
+    InstrumentedAsyncQueuePool,
+    LatencyHistogram,
+    fingerprint_statement,
+)
+
+
+class TestFingerprinting:
+    """Test that statements differing only in values share a fingerprint"""
+
+    def test_literals_params_and_in_lists_are_normalised(self):
+        first_id, first = fingerprint_statement(
+            "SELECT * FROM audit_logs WHERE tenant_id = 'abc' AND id IN (1, 2, 3) LIMIT 10"
+        )
+        second_id, _ = fingerprint_statement(
+            "SELECT *  FROM audit_logs\n WHERE tenant_id = 'x''y' AND id IN (7) LIMIT 500"
+        )
+        bound_id, bound = fingerprint_statement(
+            "SELECT * FROM audit_logs WHERE tenant_id = $1 AND id IN ($2, $3) LIMIT $4"
+        )
+
+        assert first == "SELECT * FROM audit_logs WHERE tenant_id = ? AND id IN (?+) LIMIT ?"
+        assert first_id == bound_id
+        assert first_id != second_id  # single-value IN keeps its own shape
+        assert "'" not in bound
+
+    def test_casts_and_identifiers_are_preserved(self):
+        _, normalised = fingerprint_statement("SELECT t1.id::uuid, anon_1 FROM t1 WHERE x = :x_1")
+        assert normalised == "SELECT t1.id::uuid, anon_1 FROM t1 WHERE x = ?"
+
+
+class TestLatencyHistogram:
+    """Test histogram bucketing and percentile estimates"""
+
+    def test_percentiles_use_bucket_upper_bounds(self):
+        histogram = LatencyHistogram()
+        for duration in [0.5] * 90 + [40] * 9 + [20000]:
+            histogram.observe(duration)
+
+        assert histogram.percentile(0.5) == 1
+        assert histogram.percentile(0.95) == 50
+        assert histogram.percentile(1.0) == 20000
+        summary = histogram.to_dict()
+        assert summary["count"] == 100
+        assert summary["buckets"]["le_1"] == 90
+        assert summary["buckets"]["inf"] == 1
+
+
+class TestEngineInstrumentation:
+    """Test event-driven collection from instrumented engines"""
+
+    @pytest.mark.asyncio
+    async def test_queries_errors_and_slow_samples_are_recorded(self):
+        monitor = DatabaseMonitor(slow_query_ms=0)
+        engine = create_async_engine("sqlite+aiosqlite://")
+        monitor.instrument(engine, "api")
+
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER, name TEXT)"))
+            for index in range(3):
+                await conn.execute(text("INSERT INTO items VALUES (:id, :name)"), {"id": index, "name": "secret"})
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM missing_table"))
+        await engine.dispose()
+
+        stats = monitor.get_stats()
+        api = stats["workloads"]["api"]
+        assert api["queries"]["count"] == 4
+        assert api["errors"] == 1
+
+        inserts = [entry for entry in stats["top_statements"] if entry["statement"].startswith("INSERT")]
+        assert inserts[0]["calls"] == 3
+        assert inserts[0]["workloads"] == {"api": 3}
+        assert all("secret" not in sample["statement"] for sample in stats["slow_queries"])
+        assert len(stats["slow_queries"]) == 4
+
+        monitor.reset()
+        assert monitor.get_stats()["workloads"]["api"]["queries"]["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pool_wait_is_measured_and_drives_recommendations(self, tmp_path):
+        monitor = DatabaseMonitor()
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=1,
+            max_overflow=0,
+        )
+        monitor.instrument(engine, "background", pool_size=1, max_overflow=0)
+
+        async def hold_connection():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(0.1)
+
+        await asyncio.gather(hold_connection(), hold_connection())
+        await engine.dispose()
+
+        background = monitor.get_stats()["workloads"]["background"]
+        assert background["pool"]["class"] == "InstrumentedAsyncQueuePool"
+        assert background["pool"]["peak_checked_out"] == 1
+        assert background["pool_wait"]["count"] == 2
+        assert background["pool_wait"]["max_ms"] >= 50
+        assert any(recommendation.startswith("background pool: p95 checkout wait")
+                   for recommendation in monitor.get_recommendations())
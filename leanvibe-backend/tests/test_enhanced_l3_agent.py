@@ -9,6 +9,7 @@ import os
 import sys
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -203,6 +204,63 @@ def another_usage():
             assert "usages" in data
             assert "summary" in data
 
+    @pytest.mark.asyncio
+    async def test_lookups_served_from_index_snapshot(self):
+        """Test that reference and file lookups read the mapped index snapshot"""
+        from app.agent.enhanced_l3_agent import AgentDependencies, EnhancedL3CodingAgent
+        from app.services.incremental_indexer import incremental_indexer
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            (project_path / "target.py").write_text(
+                "def target_function():\n    return 1\n"
+            )
+            (project_path / "usage.py").write_text(
+                "from target import target_function\n\n\n"
+                "def use_target():\n    return target_function()\n"
+            )
+
+            deps = AgentDependencies(
+                workspace_path=str(project_path),
+                client_id="test-snapshot-client",
+                session_data={},
+            )
+            agent = EnhancedL3CodingAgent(deps)
+            await agent.initialize()
+            assert await agent._ensure_project_indexed()
+            await agent._indexing_task
+
+            reader = agent._index_reader()
+            assert reader is not None
+            assert reader.base is incremental_indexer.open_snapshot(str(project_path))
+
+            with patch.object(
+                type(reader),
+                "get_symbol",
+                autospec=True,
+                side_effect=type(reader).get_symbol,
+            ) as get_symbol:
+                answer = await agent._process_user_input(
+                    "where is target_function used?"
+                )
+
+            assert "References for 'target_function'" in answer
+            assert get_symbol.called
+
+            usage = str(project_path.absolute() / "usage.py")
+            with patch.object(
+                type(reader),
+                "symbols_in_file",
+                autospec=True,
+                side_effect=type(reader).symbols_in_file,
+            ) as symbols_in_file:
+                analysis = await agent._analyze_file_with_context(usage)
+
+            assert "Contains: 1" in analysis
+            assert symbols_in_file.call_args.args[1:] == (usage,)
+
+            await incremental_indexer.clear_cache(str(project_path))
+
     @pytest.mark.asyncio
     async def test_complexity_analysis(self):
         """Test complexity analysis functionality"""
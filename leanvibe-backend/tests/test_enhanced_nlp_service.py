@@ -19,7 +19,8 @@ from app.services.enhanced_nlp_service import (
     EnhancedNLPService, 
     CommandIntent, 
     CommandParameter, 
-    NLPCommand
+    NLPCommand,
+    _KeywordAutomaton,
 )
 
 
@@ -708,4 +709,49 @@ class TestEnhancedNLPServicePerformance:
         # Performance metrics should be reasonable
         metrics = nlp_service.get_performance_metrics()
         assert metrics["cache_size"] <= 100
-        assert metrics["history_size"] <= 20
\ No newline at end of file
+        assert metrics["history_size"] <= 20
+
+class TestCompiledIntentMatching:
+    """Test suite for the precompiled intent matcher and caches"""
+
+    @pytest.fixture
+    def nlp_service(self):
+        return EnhancedNLPService()
+
+    def test_keyword_automaton_finds_overlapping_keywords(self):
+        """Every keyword occurrence is reported, including overlapping ones"""
+        automaton = _KeywordAutomaton(["file", "files", "list files", "ile"])
+
+        assert automaton.find("please list files now") == {"file", "files", "list files", "ile"}
+        assert automaton.find("nothing here") == set()
+
+    def test_regex_patterns_gated_by_literal_prefix(self, nlp_service):
+        """Regex patterns still match when only their literal prefix is present"""
+        scores = nlp_service.intent_matcher.score_intents("where exactly am i")
+
+        confidence, matches, specific = scores[CommandIntent.PROJECT_NAVIGATION]
+        assert confidence == 0.8
+        assert specific >= 1
+
+    def test_command_cache_evicts_least_recently_used(self):
+        """The result cache stays bounded and keeps recently used entries"""
+        nlp_service = EnhancedNLPService(cache_size=2)
+        cache = nlp_service.command_cache
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert list(cache) == ["a", "c"]
+        assert isinstance(cache, dict)
+
+    def test_suggestions_are_cached_per_input(self, nlp_service):
+        """Repeated suggestion requests reuse the cached ranking"""
+        first = nlp_service.get_command_suggestions("tas", limit=3)
+        first.append("mutated by caller")
+        second = nlp_service.get_command_suggestions("tas", limit=3)
+
+        assert len(second) <= 3
+        assert all("task" in s for s in second)
+        assert nlp_service.get_performance_metrics()["suggestion_cache_size"] == 1
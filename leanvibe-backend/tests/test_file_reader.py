@@ -0,0 +1,148 @@
+"""
+Tests for the prefetching file reader
+
+Validates that files are read off the event loop and decoded like
+Path.read_text, that the read-ahead byte budget bounds content buffered
+ahead of slow parsers, that read errors reach the handler, and that project
+indexing goes through the pipeline.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.file_reader import PrefetchingFileReader, read_file_content
+
+
+@pytest.fixture
+def files():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        paths = []
+        for i in range(12):
+            path = root / f"file_{i:02d}.py"
+            path.write_bytes(b"x = %d\n" % i + b"#" * 1000 + b"\n")
+            paths.append(str(path))
+        yield root, paths
+
+
+class TestReadFileContent:
+    """Test decoding compatible with Path.read_text"""
+
+    def test_matches_read_text(self, tmp_path):
+        path = tmp_path / "mixed.py"
+        path.write_bytes(b"a = 1\r\nb = '\xff\xc3\xa9'\rc = 3\n")
+
+        content = read_file_content(str(path))
+
+        assert content.text == path.read_text(encoding="utf-8", errors="ignore")
+        assert content.source == content.text.encode("utf-8")
+
+
+class TestPipeline:
+    """Test the read-ahead pipeline feeding parser workers"""
+
+    @pytest.mark.asyncio
+    async def test_results_follow_input_order(self, files):
+        _, paths = files
+        reader = PrefetchingFileReader(max_workers=4)
+
+        async def handler(file_path, content):
+            await asyncio.sleep(0.001 * (len(paths) - paths.index(file_path)))
+            return content.text.splitlines()[0]
+
+        results = await reader.process(paths, handler, concurrency=4)
+
+        assert list(results) == paths
+        assert list(results.values()) == [f"x = {i}" for i in range(len(paths))]
+        metrics = reader.get_metrics()
+        assert metrics["files_read"] == len(paths)
+        assert metrics["pipeline_bytes"] == sum(os.path.getsize(p) for p in paths)
+        assert metrics["throughput_mb_per_s"] > 0
+
+    @pytest.mark.asyncio
+    async def test_budget_bounds_read_ahead(self, files):
+        _, paths = files
+        file_size = os.path.getsize(paths[0])
+        reader = PrefetchingFileReader(max_workers=4, max_inflight_bytes=3 * file_size)
+        release = asyncio.Event()
+
+        async def slow_parser(file_path, content):
+            await release.wait()
+            return len(content.source)
+
+        processing = asyncio.create_task(reader.process(paths, slow_parser, concurrency=1))
+        await asyncio.sleep(0.2)
+
+        # Only the budget's worth of files has been read ahead of the parser
+        assert reader.metrics["files_read"] == 3
+        release.set()
+        results = await asyncio.wait_for(processing, timeout=5)
+
+        assert len(results) == len(paths)
+        assert reader.metrics["peak_inflight_bytes"] == 3 * file_size
+        assert reader.metrics["budget_stall_time"] > 0
+
+    @pytest.mark.asyncio
+    async def test_oversized_file_does_not_deadlock(self, files):
+        _, paths = files
+        reader = PrefetchingFileReader(max_inflight_bytes=10)
+
+        async def handler(file_path, content):
+            return len(content.source)
+
+        results = await asyncio.wait_for(reader.process(paths, handler), timeout=5)
+
+        assert len(results) == len(paths)
+
+    @pytest.mark.asyncio
+    async def test_read_errors_reach_the_handler(self, files):
+        root, paths = files
+        missing = str(root / "missing.py")
+        reader = PrefetchingFileReader()
+
+        async def handler(file_path, content):
+            return type(content).__name__
+
+        results = await reader.process([paths[0], missing], handler)
+
+        assert results == {paths[0]: "FileContent", missing: "FileNotFoundError"}
+        assert reader.metrics["read_errors"] == 1
+
+
+class TestIndexingThroughPipeline:
+    """Test that project indexing reads through the pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_project_indexing_uses_reader(self, files):
+        from app.services.ast_service import ast_service
+        from app.services.file_reader import file_reader
+        from app.services.project_indexer import project_indexer
+
+        root, paths = files
+        await ast_service.initialize()
+        files_read = file_reader.metrics["files_read"]
+
+        project_index = await project_indexer.index_project(str(root))
+
+        assert sorted(project_index.files) == paths
+        assert file_reader.metrics["files_read"] - files_read == len(paths)
+        assert all(not analysis.parsing_errors for analysis in project_index.files.values())
+
+    @pytest.mark.asyncio
+    async def test_parse_file_reports_missing_files(self, files):
+        from app.services.ast_service import ast_service
+
+        root, _ = files
+        missing = str(root / "missing.py")
+
+        analysis = await ast_service.parse_file(missing)
+
+        assert analysis.parsing_errors == [f"Analysis failed: File not found: {missing}"]
@@ -0,0 +1,227 @@
+"""
+Tests for the identifier occurrence index
+
+Validates that identifier occurrences are classified as definitions, calls,
+imports or usages during parsing, that the project-wide index is maintained
+per file and persisted with the incremental cache, and that reference lookups
+are served from it without reading files.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ast_models import IdentifierIndex, IdentifierOccurrence, OccurrenceKind
+from app.services.ast_service import ASTAnalysisService
+from app.services.tree_sitter_parsers import tree_sitter_manager
+
+DEFINITION = OccurrenceKind.DEFINITION
+CALL = OccurrenceKind.CALL
+IMPORT = OccurrenceKind.IMPORT
+USAGE = OccurrenceKind.USAGE
+
+PYTHON_CODE = '''import json
+from os import path as p
+
+
+class Store(Base):
+    def load(self, key, *args, **options):
+        for name, value in self.items():
+            print(name)
+        with open(key) as handle:
+            return json.load(handle)
+
+
+def main(paths):
+    store = Store()
+    return [store.load(item) for item in paths]
+'''
+
+JS_CODE = '''import React, { useState } from "react";
+const fs = require("fs");
+const { width, height } = size;
+
+function render(props, ...rest) {
+  const widget = new Widget(props);
+  return fs.readFileSync(props.path);
+}
+
+class Widget {
+  draw() {
+    return render({ value: width });
+  }
+}
+'''
+
+
+@pytest_asyncio.fixture
+async def service():
+    await tree_sitter_manager.initialize()
+    return ASTAnalysisService(ThreadPoolExecutor(max_workers=1))
+
+
+def extract_identifiers(service, file_path, content):
+    tree, _ = tree_sitter_manager.parse_file(file_path, content)
+    language = tree_sitter_manager.detect_language(file_path)
+    return service._analyze_tree_sync(
+        tree, content.encode("utf-8"), language, file_path
+    ).identifiers
+
+
+def kinds(identifiers, name):
+    return [occurrence.kind for occurrence in identifiers[name]]
+
+
+class TestOccurrenceClassification:
+    """Test telling definitions, calls, imports and usages apart"""
+
+    @pytest.mark.asyncio
+    async def test_python_occurrences(self, service):
+        identifiers = extract_identifiers(service, "store.py", PYTHON_CODE)
+
+        assert identifiers["json"] == [
+            IdentifierOccurrence(1, 7, IMPORT),
+            IdentifierOccurrence(10, 19, USAGE),
+        ]
+        assert kinds(identifiers, "p") == [IMPORT]
+        assert kinds(identifiers, "Store") == [DEFINITION, CALL]
+        assert kinds(identifiers, "Base") == [USAGE]
+        assert kinds(identifiers, "load") == [DEFINITION, CALL, CALL]
+        for parameter in ("self", "key", "args", "options", "name", "value", "handle"):
+            assert kinds(identifiers, parameter)[0] == DEFINITION, parameter
+        assert kinds(identifiers, "print") == [CALL]
+        assert kinds(identifiers, "store") == [DEFINITION, USAGE]
+        assert kinds(identifiers, "item") == [USAGE, DEFINITION]
+
+    @pytest.mark.asyncio
+    async def test_javascript_occurrences(self, service):
+        identifiers = extract_identifiers(service, "widget.js", JS_CODE)
+
+        assert kinds(identifiers, "React") == [IMPORT]
+        assert kinds(identifiers, "useState") == [IMPORT]
+        assert kinds(identifiers, "fs") == [IMPORT, USAGE]
+        assert kinds(identifiers, "require") == [CALL]
+        assert kinds(identifiers, "width") == [DEFINITION, USAGE]
+        assert kinds(identifiers, "rest") == [DEFINITION]
+        assert kinds(identifiers, "Widget") == [CALL, DEFINITION]
+        assert kinds(identifiers, "readFileSync") == [CALL]
+        assert kinds(identifiers, "render") == [DEFINITION, CALL]
+        assert kinds(identifiers, "draw") == [DEFINITION]
+        assert identifiers["path"] == [IdentifierOccurrence(7, 31, USAGE)]
+
+
+class TestIdentifierIndex:
+    """Test per-file maintenance of the project-wide index"""
+
+    def test_set_replace_and_remove_files(self):
+        index = IdentifierIndex()
+        index.set_file("a.py", {"run": [IdentifierOccurrence(1, 4, DEFINITION)]})
+        index.set_file(
+            "b.py",
+            {
+                "run": [IdentifierOccurrence(3, 0, CALL), IdentifierOccurrence(4, 0, CALL)],
+                "other": [IdentifierOccurrence(1, 0, USAGE)],
+            },
+        )
+
+        assert index.count("run") == 3
+        assert index.count("run", CALL) == 2
+        assert index.find("run")[0] == ("a.py", IdentifierOccurrence(1, 4, DEFINITION))
+
+        index.set_file("b.py", {"run": [IdentifierOccurrence(5, 0, CALL)]})
+        assert index.count("run") == 2
+        assert "other" not in index.names
+
+        index.remove_file("a.py")
+        assert index.find("run") == [("b.py", IdentifierOccurrence(5, 0, CALL))]
+        assert index.find("missing") == []
+        assert "a.py" not in index.file_names
+
+    def test_pickle_round_trip(self):
+        index = IdentifierIndex()
+        index.set_file("a.py", {"run": [IdentifierOccurrence(1, 4, DEFINITION)]})
+
+        restored = pickle.loads(pickle.dumps(index))
+
+        assert restored == index
+        assert restored.find("run")[0][1].kind is DEFINITION
+
+
+class TestReferenceLookup:
+    """Test reference lookups served from the identifier index"""
+
+    @pytest.mark.asyncio
+    async def test_find_references_without_reading_files(self, service):
+        from app.services.ast_service import ast_service
+        from app.services.project_indexer import project_indexer
+
+        await ast_service.initialize()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_path = Path(temp_dir)
+            (project_path / "functions.py").write_text(
+                "def target_function():\n    return 42\n\n\n"
+                "def caller():\n    return target_function()\n"
+            )
+            (project_path / "usage.py").write_text(
+                "from functions import target_function\n\n"
+                "callback = target_function\n"
+                "result = target_function()\n"
+            )
+
+            project_index = await project_indexer.index_project(str(project_path))
+
+            # Lookups must not touch the files
+            for file_path in project_index.files:
+                os.unlink(file_path)
+
+            references = await project_indexer.find_references(
+                project_index, "target_function"
+            )
+
+        by_type = {}
+        for reference in references:
+            by_type.setdefault(reference.reference_type, []).append(reference)
+
+        assert len(by_type["definition"]) == 1
+        definition = by_type["definition"][0]
+        assert definition.symbol_id.endswith("functions.py:target_function:0")
+        assert definition.context == "Definition of SymbolType.FUNCTION target_function"
+        assert [r.line_number for r in by_type["import"]] == [1]
+        assert sorted(r.context for r in by_type["call"]) == [
+            "result = target_function()",
+            "return target_function()",
+        ]
+        assert [r.context for r in by_type["usage"]] == ["callback = target_function"]
+        assert project_index.identifiers.count("target_function") == 5
+
+    @pytest.mark.asyncio
+    async def test_update_file_index_replaces_occurrences(self, service):
+        from app.services.ast_service import ast_service
+        from app.services.project_indexer import project_indexer
+
+        await ast_service.initialize()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            module = Path(temp_dir) / "module.py"
+            module.write_text("def old_name():\n    pass\n\nold_name()\n")
+            project_index = await project_indexer.index_project(temp_dir)
+            file_path = next(iter(project_index.files))
+
+            Path(file_path).write_text("def new_name():\n    pass\n")
+            assert await project_indexer.update_file_index(project_index, file_path)
+
+        assert project_index.identifiers.find("old_name") == []
+        assert await project_indexer.find_references(project_index, "old_name") == []
+        assert [r.reference_type for r in await project_indexer.find_references(
+            project_index, "new_name"
+        )] == ["definition"]
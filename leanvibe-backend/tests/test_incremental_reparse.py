@@ -0,0 +1,197 @@
+"""
+Tests for incremental tree-sitter reparsing of edited files
+
+Validates that edits are computed from old and new content, that the cached
+tree is reused for the reparse, and that patching the extraction results
+over the dirty rows gives the same result as a full extraction.
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ast_service import ASTAnalysisService
+from app.services.tree_sitter_parsers import SourceEdit, tree_sitter_manager
+
+BASE_PYTHON = '''import os
+import json
+
+LIMIT = 10
+
+
+class Store:
+    """Key value store"""
+
+    def get(self, key):
+        if key in self.data:
+            return self.data[key]
+        return None
+
+    def put(self, key, value):
+        self.data[key] = value
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save(path, data):
+    return os.path.exists(path) and data
+'''
+
+PYTHON_EDITS = [
+    # Change a method body
+    ("        return None\n", "        for _ in range(3):\n            pass\n        return key or None\n"),
+    # Insert a new top-level function between two others
+    ("\n\ndef save(", "\n\ndef check(value):\n    return value > LIMIT\n\n\ndef save("),
+    # Add an import at the top
+    ("import json\n", "import json\nfrom pathlib import Path\n"),
+    # Rename a class
+    ("class Store:", "class KeyValueStore:"),
+    # Delete a function
+    ("def load(path):\n    with open(path) as handle:\n        return json.load(handle)\n\n\n", ""),
+    # Introduce a syntax error, then fix it
+    ("def check(value):", "def check(value"),
+    ("def check(value", "def check(value):"),
+]
+
+BASE_JS = '''import React from "react";
+const fs = require("fs");
+
+function render(props) {
+  return props.value;
+}
+
+class Widget {
+  draw() {
+    return render({ value: 1 });
+  }
+}
+
+const MAX = 5;
+'''
+
+JS_EDITS = [
+    ("return props.value;", "if (props.value > MAX) {\n    return MAX;\n  }\n  return props.value;"),
+    ("const MAX = 5;\n", "const MAX = 5;\nconst helper = (x) => x * 2;\n"),
+    ('const fs = require("fs");\n', ""),
+]
+
+
+@pytest_asyncio.fixture
+async def service():
+    await tree_sitter_manager.initialize()
+    return ASTAnalysisService(ThreadPoolExecutor(max_workers=1))
+
+
+def full_extraction(service, file_path, content):
+    tree, _ = tree_sitter_manager.parse_file(file_path, content)
+    source = content.encode("utf-8")
+    language = tree_sitter_manager.detect_language(file_path)
+    return service._analyze_tree_sync(tree, source, language, file_path)
+
+
+async def assert_edits_match_full_parse(service, suffix, content, edits):
+    with tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False) as handle:
+        handle.write(content)
+    file_path = handle.name
+    try:
+        await service.parse_file(file_path)
+        for old, new in edits:
+            assert old in content
+            content = content.replace(old, new, 1)
+            with open(file_path, "w") as handle:
+                handle.write(content)
+
+            incremental_before = tree_sitter_manager.parse_stats["incremental_parses"]
+            analysis = await service.parse_file(file_path)
+            assert tree_sitter_manager.parse_stats["incremental_parses"] == incremental_before + 1
+            assert analysis.ast.source == content.encode("utf-8")
+
+            extraction = full_extraction(service, file_path, content)
+            assert analysis.symbols == extraction.symbols, (old, new)
+            assert analysis.dependencies == extraction.dependencies, (old, new)
+            assert analysis.complexity == extraction.complexity, (old, new)
+            assert analysis.identifiers == extraction.identifiers, (old, new)
+            assert analysis.imports == extraction.imports, (old, new)
+            assert analysis.calls == extraction.calls, (old, new)
+    finally:
+        tree_sitter_manager.forget_tree(file_path)
+        os.unlink(file_path)
+
+
+class TestSourceEdit:
+    """Test computing tree-sitter edits from two versions of a file"""
+
+    def test_single_edit_between_versions(self):
+        old = b"a = 1\nb = 2\nc = 3\n"
+        new = b"a = 1\nb = 20\nd = 4\nc = 3\n"
+
+        edit = SourceEdit.between(old, new)
+
+        assert old[: edit.start_byte] == new[: edit.start_byte] == b"a = 1\nb = 2"
+        assert old[edit.old_end_byte :] == new[edit.new_end_byte :]
+        assert edit.start_point == (1, 5)
+        assert edit.old_end_point == (1, 5)
+        assert edit.new_end_point == (2, 5)
+        assert edit.row_delta == 1
+
+    def test_identical_content_is_an_empty_edit(self):
+        edit = SourceEdit.between(b"x = 1\n", b"x = 1\n")
+
+        assert edit.start_byte == edit.old_end_byte == edit.new_end_byte == 6
+
+
+class TestIncrementalParse:
+    """Test reusing cached trees when a file changes"""
+
+    @pytest.mark.asyncio
+    async def test_cached_tree_is_reused_and_matches_fresh_parse(self, service):
+        file_path = "/virtual/incremental_module.py"
+        tree_sitter_manager.forget_tree(file_path)
+        try:
+            _, _, first_edit = tree_sitter_manager.parse_file_incremental(file_path, BASE_PYTHON)
+            edited = BASE_PYTHON.replace("LIMIT = 10", "LIMIT = 100")
+            tree, errors, edit = tree_sitter_manager.parse_file_incremental(file_path, edited)
+        finally:
+            tree_sitter_manager.forget_tree(file_path)
+
+        assert first_edit is None
+        assert not errors
+        assert edit is not None and edit.start_point == (3, 10)
+        fresh, _ = tree_sitter_manager.parse_file(file_path, edited)
+        assert str(tree.root_node) == str(fresh.root_node)
+
+    @pytest.mark.asyncio
+    async def test_tree_cache_is_bounded(self, service):
+        original = tree_sitter_manager.max_cached_trees
+        tree_sitter_manager.max_cached_trees = 2
+        try:
+            for name in ("a", "b", "c"):
+                tree_sitter_manager.parse_file_incremental(f"/virtual/{name}.py", "x = 1\n")
+            assert "/virtual/a.py" not in tree_sitter_manager.tree_cache
+            assert "/virtual/c.py" in tree_sitter_manager.tree_cache
+        finally:
+            tree_sitter_manager.max_cached_trees = original
+            for name in ("a", "b", "c"):
+                tree_sitter_manager.forget_tree(f"/virtual/{name}.py")
+
+
+class TestIncrementalExtraction:
+    """Test that patched extraction results equal a full extraction"""
+
+    @pytest.mark.asyncio
+    async def test_python_edits(self, service):
+        await assert_edits_match_full_parse(service, ".py", BASE_PYTHON, PYTHON_EDITS)
+
+    @pytest.mark.asyncio
+    async def test_javascript_edits(self, service):
+        await assert_edits_match_full_parse(service, ".js", BASE_JS, JS_EDITS)
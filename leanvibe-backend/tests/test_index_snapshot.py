@@ -0,0 +1,237 @@
+"""
+Tests for memory-mapped index snapshots
+
+Validates that a finished project index round-trips through the snapshot
+format, that lookups are served from the mapping without materializing the
+index, that copy-on-write overlays shadow changed and removed files, and
+that the incremental indexer restores cached indexes from snapshots instead
+of reanalyzing every file.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.index_snapshot import IndexSnapshot, SnapshotError, write_snapshot
+
+UTILS = '''"""Utilities"""
+
+
+def helper(value, *args):
+    """Double a value"""
+    return value * 2
+
+
+class Counter:
+    def increment(self):
+        return helper(1)
+'''
+
+MAIN = '''import json
+from utils import helper, Counter
+
+
+async def run(items):
+    counter = Counter()
+    return [helper(item) for item in items] + [counter.increment()]
+'''
+
+
+@pytest_asyncio.fixture
+async def indexed_workspace():
+    from app.services.ast_service import ast_service
+    from app.services.project_indexer import project_indexer
+
+    await ast_service.initialize()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "utils.py").write_text(UTILS)
+        (root / "main.py").write_text(MAIN)
+        (root / "broken.py").write_text("def broken(:\n")
+        project_index = await project_indexer.index_project(str(root))
+        yield root, project_index
+
+
+def file_dump(analysis):
+    return analysis.model_dump(exclude={"ast"})
+
+
+class TestSnapshotFormat:
+    """Test writing and mapping snapshots"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, indexed_workspace, tmp_path):
+        root, project_index = indexed_workspace
+        path = str(tmp_path / "index.snap")
+
+        snapshot_id = write_snapshot(project_index, path)
+
+        with IndexSnapshot(path) as snapshot:
+            assert snapshot.snapshot_id == snapshot_id
+            assert snapshot.workspace_path == project_index.workspace_path
+            restored = snapshot.to_project_index()
+
+        assert sorted(restored.files) == sorted(project_index.files)
+        for file_path, analysis in project_index.files.items():
+            assert file_dump(restored.files[file_path]) == file_dump(analysis)
+        assert restored.symbols == project_index.symbols
+        assert restored.identifiers == project_index.identifiers
+        assert restored.call_graph == project_index.call_graph
+        assert restored.call_graph.unresolved_importers == {"json": {str(root / "main.py")}}
+        assert restored.total_files == project_index.total_files
+        assert restored.last_indexed == project_index.last_indexed
+
+    @pytest.mark.asyncio
+    async def test_lookups_without_materializing(self, indexed_workspace, tmp_path):
+        root, project_index = indexed_workspace
+        path = str(tmp_path / "index.snap")
+        write_snapshot(project_index, path)
+        utils = str(root / "utils.py")
+        main = str(root / "main.py")
+
+        with IndexSnapshot(path) as snapshot:
+            [helper] = snapshot.find_symbols("helper")
+            assert helper.file_path == utils
+            assert helper == project_index.symbols[helper.id]
+            assert snapshot.get_symbol(helper.id) == helper
+            assert snapshot.get_symbol("missing") is None
+            assert snapshot.find_symbols("missing") == []
+
+            assert [s.name for s in snapshot.symbols_in_file(utils)] == [
+                s.name for s in project_index.files[utils].symbols
+            ]
+            assert snapshot.file_metrics(utils) == project_index.files[utils].complexity
+            assert snapshot.dependencies(main) == project_index.files[main].dependencies
+            assert set(snapshot.dependency_edges()) == {
+                (d.source_file, d.target_file)
+                for d in project_index.dependencies
+                if d.target_file
+            }
+            assert set(snapshot.call_edges()) == set(project_index.call_graph.edges())
+            assert not snapshot.has_file(str(root / "missing.py"))
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / "index.snap"
+        path.write_bytes(b"not a snapshot" * 10)
+
+        with pytest.raises(SnapshotError):
+            IndexSnapshot(str(path))
+
+    @pytest.mark.asyncio
+    async def test_replacing_keeps_existing_mappings_valid(
+        self, indexed_workspace, tmp_path
+    ):
+        root, project_index = indexed_workspace
+        path = str(tmp_path / "index.snap")
+        write_snapshot(project_index, path)
+
+        with IndexSnapshot(path) as old:
+            del project_index.files[str(root / "broken.py")]
+            write_snapshot(project_index, path)
+
+            with IndexSnapshot(path) as new:
+                assert old.file_count == 3
+                assert new.file_count == 2
+                assert old.find_symbols("helper") == new.find_symbols("helper")
+
+
+class TestSnapshotOverlay:
+    """Test copy-on-write overlays over a mapped snapshot"""
+
+    @pytest.mark.asyncio
+    async def test_overlay_shadows_changed_and_removed_files(
+        self, indexed_workspace, tmp_path
+    ):
+        from app.services.project_indexer import project_indexer
+
+        root, project_index = indexed_workspace
+        path = str(tmp_path / "index.snap")
+        write_snapshot(project_index, path)
+        utils = root / "utils.py"
+        utils.write_text(UTILS.replace("helper", "assist"))
+        analysis = (await project_indexer._analyze_file_batch([str(utils)]))[str(utils)]
+
+        with IndexSnapshot(path) as snapshot:
+            overlay = snapshot.overlay()
+            overlay.update_file(analysis)
+            overlay.remove_file(str(root / "broken.py"))
+
+            assert overlay.changed_files == {str(utils), str(root / "broken.py")}
+            assert overlay.find_symbols("helper") == []
+            assert [s.name for s in overlay.find_symbols("assist")] == ["assist"]
+            assert not overlay.has_file(str(root / "broken.py"))
+            [assist] = overlay.symbols_in_file(str(utils))[:1]
+            assert overlay.get_symbol(assist.id) == assist
+            old_helper = project_index.files[str(utils)].symbols[0]
+            assert overlay.get_symbol(old_helper.id) is None
+            assert overlay.symbols_in_file(str(root / "broken.py")) == []
+            main = str(root / "main.py")
+            assert overlay.dependencies(main) == project_index.files[main].dependencies
+            assert overlay.file_metrics(str(utils)) == analysis.complexity
+            # The mapping itself is untouched
+            assert [s.file_path for s in snapshot.find_symbols("helper")] == [str(utils)]
+
+            merged = overlay.to_project_index()
+
+        project_indexer.update_call_graph(merged, overlay.changed_files)
+        assert sorted(merged.files) == [str(root / "main.py"), str(utils)]
+        assert merged.identifiers.find("helper")[0][0] == str(root / "main.py")
+        assert merged.total_files == 2
+        assert merged.parsing_errors == 0
+
+
+class TestIncrementalIndexerSnapshots:
+    """Test the incremental indexer's snapshot cache"""
+
+    @pytest.mark.asyncio
+    async def test_warm_start_restores_from_snapshot(self, indexed_workspace):
+        from app.services.incremental_indexer import IncrementalProjectIndexer
+        from app.services.project_indexer import project_indexer
+
+        root, _ = indexed_workspace
+        with tempfile.TemporaryDirectory() as cache_dir:
+            indexer = IncrementalProjectIndexer(cache_dir=cache_dir)
+            first = await indexer.get_or_create_project_index(str(root))
+
+            cache = await indexer._load_cache(str(root))
+            snapshot = indexer.open_snapshot(str(root))
+            assert snapshot.snapshot_id == cache.snapshot_id
+            assert indexer.open_snapshot(str(root)) is snapshot
+
+            # Lookups are served from the mapping
+            reader = indexer.get_index_reader(str(root))
+            assert reader.base is snapshot
+            assert [s.file_path for s in reader.find_symbols("helper")] == [
+                str(root / "utils.py")
+            ]
+
+            (root / "main.py").write_text(MAIN + "\n\ndef extra():\n    pass\n")
+            analyze = project_indexer._analyze_file_batch
+            with patch.object(
+                project_indexer, "_analyze_file_batch", wraps=analyze
+            ) as analyze_batch:
+                second = await indexer.get_or_create_project_index(str(root))
+
+            assert [call.args[0] for call in analyze_batch.call_args_list] == [
+                [str(root / "main.py")]
+            ]
+            assert any(s.name == "extra" for s in second.symbols.values())
+            assert file_dump(second.files[str(root / "utils.py")]) == file_dump(
+                first.files[str(root / "utils.py")]
+            )
+            assert indexer.open_snapshot(str(root)) is not snapshot
+            reader = indexer.get_index_reader(str(root))
+            assert reader.base is indexer.open_snapshot(str(root))
+            assert [s.name for s in reader.find_symbols("extra")] == ["extra"]
+
+            await indexer.clear_cache(str(root))
+            assert indexer.open_snapshot(str(root)) is None
+            assert indexer.get_index_reader(str(root)) is None
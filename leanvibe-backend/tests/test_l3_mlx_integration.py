@@ -365,14 +365,33 @@ async function fetchUserData(userId) {
             {"file_path": "/test/file.py", "cursor_position": 100, "intent": "suggest"}
         )
 
-        response = await agent._mlx_stream_completion_tool(stream_request)
+        async def fake_stream(context, intent):
+            yield {"type": "start", "request_id": "stream-1", "intent": intent}
+            yield {"type": "token", "request_id": "stream-1", "index": 0, "text": "def "}
+            yield {"type": "token", "request_id": "stream-1", "index": 1, "text": "total():"}
+            yield {
+                "type": "complete",
+                "request_id": "stream-1",
+                "response": "def total():",
+                "confidence": 0.8,
+                "chunk_count": 2,
+                "time_to_first_token": 0.01,
+                "total_response_time": 0.05,
+            }
+
+        with patch(
+            "app.agent.enhanced_l3_agent.unified_mlx_service"
+        ) as mock_mlx_service:
+            mock_mlx_service.stream_code_completion = fake_stream
+            response = await agent._mlx_stream_completion_tool(stream_request)
         result = json.loads(response)
 
         assert "status" in result
-        assert result["status"] == "streaming_started"
+        assert result["status"] == "streaming_completed"
         assert result["intent"] == "suggest"
-        assert result["context_ready"] is True
-        assert "WebSocket" in result["message"]
+        assert result["response"] == "def total():"
+        assert result["chunk_count"] == 2
+        assert result["time_to_first_token"] <= result["total_response_time"]
 
     @pytest.mark.asyncio
     async def test_error_handling_in_mlx_tools(self):
@@ -0,0 +1,176 @@
+"""
+Tests for ranged, zero-copy serving of local storage artifacts
+
+Validates conditional and ranged resolution in LocalStorageService.open_range,
+incremental listing manifests, and that ZeroCopyFileResponse streams only the
+requested bytes (via chunked reads or the ASGI zerocopysend extension).
+"""
+
+import os
+import sys
+from uuid import uuid4
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.storage import RangeNotSatisfiable, ZeroCopyFileResponse, parse_range
+from app.services.storage.local_storage_service import LocalStorageService
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorageService(base_dir=str(tmp_path))
+
+
+@pytest.fixture
+def project(storage):
+    project_id = uuid4()
+    with storage.open_write(project_id, "dist/bundle.zip") as writer:
+        writer.write(PAYLOAD)
+    return project_id
+
+
+class TestOpenRange:
+    """Test validator and range resolution without reading file content"""
+
+    def test_full_partial_and_conditional_requests(self, storage, project):
+        full = storage.open_range(project, "dist/bundle.zip")
+        assert (full.status_code, full.length) == (200, len(PAYLOAD))
+        assert full.content_type == "application/zip"
+
+        partial = storage.open_range(project, "dist/bundle.zip", "bytes=100-199")
+        assert partial.status_code == 206
+        assert partial.headers["Content-Range"] == f"bytes 100-199/{len(PAYLOAD)}"
+        assert partial.read() == PAYLOAD[100:200]
+
+        cached = storage.open_range(project, "dist/bundle.zip", if_none_match=f'W/{full.etag}, "x"')
+        assert cached.status_code == 304
+        assert "Content-Length" not in cached.headers
+
+        with pytest.raises(RangeNotSatisfiable):
+            storage.open_range(project, "dist/bundle.zip", f"bytes={len(PAYLOAD)}-")
+        with pytest.raises(FileNotFoundError):
+            storage.open_range(project, "missing.txt")
+
+    def test_parse_range(self):
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("bytes=abc", 100) is None
+
+    def test_range_parity_with_s3_contract(self, storage, project):
+        buffer, content_type, headers, status_code = storage.get_file_with_range(
+            project, "dist/bundle.zip", "bytes=-4"
+        )
+        assert buffer.getvalue() == PAYLOAD[-4:]
+        assert (content_type, status_code) == ("application/zip", 206)
+        assert headers["Accept-Ranges"] == "bytes"
+
+
+class TestListingManifest:
+    """Test that listings are served from an incrementally maintained manifest"""
+
+    def test_writes_and_deletes_update_the_manifest(self, storage, project):
+        assert [f.path for f in storage.list_files(project)] == ["dist/bundle.zip"]
+
+        with storage.open_write(project, "README.md") as writer:
+            writer.write(b"# MVP")
+        files = {f.path: f for f in storage.list_files(project)}
+        assert set(files) == {"README.md", "dist/bundle.zip"}
+        assert files["README.md"].size == 5
+        assert storage.list_files(project, path_filter="dist") == [files["dist/bundle.zip"]]
+
+        storage.delete_project_artifacts(project)
+        assert storage.list_files(project) == []
+
+    def test_refresh_rescans_only_changed_directories(self, storage, project, monkeypatch):
+        storage.list_files(project)
+        root = os.path.join(storage.base_dir, project.hex)
+
+        # Files placed by other writers (e.g. generation agents)
+        os.makedirs(os.path.join(root, "src", "api"))
+        with open(os.path.join(root, "src", "api", "main.py"), "wb") as f:
+            f.write(b"app = None")
+        os.remove(os.path.join(root, "dist", "bundle.zip"))
+
+        scanned = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(os, "scandir", lambda path: scanned.append(path) or real_scandir(path))
+
+        assert [f.path for f in storage.list_files(project)] == ["src/api/main.py"]
+        assert sorted(os.path.relpath(path, root) for path in scanned) == [".", "dist", "src", "src/api"]
+
+        scanned.clear()
+        storage.list_files(project)
+        assert scanned == []
+
+    def test_in_place_writes_refresh_size_and_mtime(self, storage, project):
+        storage.list_files(project)
+        full = os.path.join(storage.base_dir, project.hex, "dist", "bundle.zip")
+
+        # Rewritten in place, so the directory's mtime does not change
+        with open(full, "r+b") as f:
+            f.truncate(10)
+        os.utime(full, (1_000_000_000, 1_000_000_000))
+
+        [stored] = storage.list_files(project)
+        assert stored.size == 10
+        assert stored.modified_at.timestamp() == 1_000_000_000
+
+
+class TestZeroCopyFileResponse:
+    """Test streaming of resolved files over ASGI"""
+
+    def _client(self, storage, project):
+        def download(request):
+            served = storage.open_range(
+                project,
+                "dist/bundle.zip",
+                request.headers.get("range"),
+                request.headers.get("if-none-match"),
+            )
+            return ZeroCopyFileResponse(served, filename="bundle.zip")
+
+        return TestClient(Starlette(routes=[Route("/download", download)]))
+
+    def test_streams_whole_file_and_ranges(self, storage, project):
+        client = self._client(storage, project)
+
+        response = client.get("/download")
+        assert response.status_code == 200
+        assert response.content == PAYLOAD
+        assert response.headers["content-disposition"] == "attachment; filename=bundle.zip"
+
+        resumed = client.get("/download", headers={"Range": "bytes=1000-"})
+        assert resumed.status_code == 206
+        assert resumed.content == PAYLOAD[1000:]
+
+        not_modified = client.get("/download", headers={"If-None-Match": response.headers["etag"]})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+    @pytest.mark.asyncio
+    async def test_uses_zerocopysend_when_server_supports_it(self, storage, project):
+        served = storage.open_range(project, "dist/bundle.zip", "bytes=10-19")
+        messages = []
+
+        async def send(message):
+            if message["type"] == "http.response.zerocopysend":
+                message = {**message, "data": os.pread(message["file"], message["count"], message["offset"])}
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopysend": {}}}
+        await ZeroCopyFileResponse(served)(scope, None, send)
+
+        assert messages[0]["status"] == 206
+        assert messages[1]["type"] == "http.response.zerocopysend"
+        assert messages[1]["data"] == PAYLOAD[10:20]
@@ -0,0 +1,222 @@
+"""
+Tests for the in-memory pipeline status read model
+
+Validates that snapshots are versioned only on real changes, that MVPService
+and orchestration updates publish into the read model, and that the status
+endpoint serves conditional (ETag) and long-poll requests without reloading
+the project.
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import Response
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.mvp_models import MVPProject, MVPStatus
+from app.models.pipeline_models import PipelineStage, PipelineStatus
+from app.services.assembly_line_system import AgentStatus, AgentType
+from app.services.mvp_service import mvp_service
+from app.services.pipeline_read_model import PipelineReadModel, pipeline_read_model
+
+
+def make_project(status=MVPStatus.GENERATING):
+    project_id = uuid4()
+    now = datetime.utcnow()
+    return MVPProject(
+        id=project_id,
+        tenant_id=uuid4(),
+        project_name="Read model",
+        slug=f"mvp-{project_id.hex[:8]}",
+        description="desc",
+        status=status,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def generation_progress():
+    return {
+        "current_stage": "initializing",
+        "overall_progress": 0.0,
+        "stage_progress": 0.0,
+        "estimated_completion": datetime.utcnow() + timedelta(hours=1),
+        "stages_completed": [],
+        "current_stage_details": "Initializing assembly line system...",
+    }
+
+
+@pytest.fixture
+def tracked_project():
+    """Project held in MVPService's in-memory store with live progress tracking"""
+    project = make_project()
+    mvp_service._projects_storage[project.id] = project
+    mvp_service._generation_progress[project.id] = generation_progress()
+    yield project
+    mvp_service._projects_storage.pop(project.id, None)
+    mvp_service._generation_progress.pop(project.id, None)
+    pipeline_read_model.invalidate(project.id)
+
+
+class TestPipelineReadModel:
+    """Test snapshot versioning, freshness and long-polling"""
+
+    def test_version_moves_only_when_responses_change(self):
+        read_model = PipelineReadModel()
+        project = make_project()
+        progress = generation_progress()
+
+        first = read_model.publish(project, progress)
+        assert first.version == 1
+        assert read_model.publish(project, progress) is first
+
+        # In-place mutation of the writer's progress dict must still be detected
+        progress["stages_completed"].append(AgentType.BACKEND)
+        progress["current_stage"] = "frontend"
+        second = read_model.publish(project, progress)
+        assert second.version == 2
+        assert second.status.current_stage == PipelineStage.FRONTEND_DEVELOPMENT
+        assert first.status.stage_details["stages_completed"] == []
+
+        assert second.not_modified(f'W/{second.etag()}')
+        assert not second.not_modified(first.etag())
+        assert second.etag("pipeline") != second.etag("status")
+
+    def test_stale_snapshots_are_reloaded(self):
+        read_model = PipelineReadModel(ttl=0)
+        project = make_project(MVPStatus.DEPLOYED)
+        snapshot = read_model.publish(project, None)
+
+        assert read_model.get(project.id) is None
+        assert read_model.peek(project.id) is snapshot
+        assert snapshot.pipeline.status == PipelineStatus.DEPLOYED
+
+    @pytest.mark.asyncio
+    async def test_wait_for_change_wakes_on_publish_or_times_out(self):
+        read_model = PipelineReadModel()
+        project = make_project()
+        progress = generation_progress()
+        snapshot = read_model.publish(project, progress)
+
+        assert (await read_model.wait_for_change(project.id, snapshot.version, timeout=0.01)) is snapshot
+
+        async def advance():
+            await asyncio.sleep(0.01)
+            read_model.publish(project, {**progress, "overall_progress": 50.0})
+
+        changed, _ = await asyncio.gather(read_model.wait_for_change(project.id, snapshot.version, timeout=5), advance())
+        assert changed.version == 2
+        assert changed.status.progress.overall_progress == 50.0
+
+        execution = read_model.publish_execution(project.id, {"stage": "mvp_generation", "status": "running"})
+        assert execution.version == 3
+        assert execution.status.stage_details["orchestration"]["stage"] == "mvp_generation"
+
+    @pytest.mark.asyncio
+    async def test_timed_out_waiters_are_unregistered(self):
+        read_model = PipelineReadModel()
+        project = make_project()
+        snapshot = read_model.publish(project, generation_progress())
+
+        waiting = asyncio.create_task(read_model.wait_for_change(project.id, snapshot.version, timeout=5))
+        await asyncio.gather(
+            read_model.wait_for_change(project.id, snapshot.version, timeout=0.01),
+            read_model.wait_for_change(project.id, snapshot.version, timeout=0.02),
+        )
+        # The waiter still polling keeps the registration alive
+        assert read_model.get_stats()["waiters"] == 1
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert read_model.get_stats()["waiters"] == 0
+
+
+class TestMVPServicePublishing:
+    """Test that MVPService writes keep the read model current"""
+
+    @pytest.mark.asyncio
+    async def test_progress_and_project_updates_publish_new_versions(self, tracked_project):
+        snapshot = await mvp_service.get_pipeline_snapshot(tracked_project.id)
+        assert snapshot.version == 1
+        assert snapshot.status.progress.current_stage_details.startswith("Initializing")
+
+        await mvp_service._update_generation_progress(
+            tracked_project.id, AgentType.BACKEND, AgentStatus.RUNNING, 50.0
+        )
+        progressed = await mvp_service.get_pipeline_snapshot(tracked_project.id)
+        assert progressed.version == 2
+        assert progressed.pipeline.current_stage == PipelineStage.BACKEND_DEVELOPMENT
+        assert progressed.pipeline.progress.overall_progress == pytest.approx(15.0)
+
+        tracked_project.status = MVPStatus.DEPLOYED
+        tracked_project.completed_at = datetime.utcnow()
+        await mvp_service._update_mvp_project(tracked_project)
+        mvp_service._clear_generation_progress(tracked_project.id)
+
+        deployed = await mvp_service.get_pipeline_snapshot(tracked_project.id)
+        assert deployed.version > progressed.version
+        assert deployed.pipeline.status == PipelineStatus.DEPLOYED
+        assert deployed.status.progress.overall_progress == 100.0
+
+
+class TestPipelineStatusEndpoint:
+    """Test conditional and long-poll status requests"""
+
+    @pytest.fixture
+    def endpoint(self, monkeypatch):
+        import app.api.endpoints.pipelines as pipelines_module
+
+        class DummyAuth:
+            async def verify_token(self, token):
+                return {"user_id": str(uuid4())}
+
+        monkeypatch.setattr(pipelines_module, "auth_service", DummyAuth())
+        return pipelines_module.get_pipeline_status
+
+    @pytest.mark.asyncio
+    async def test_conditional_and_long_poll_requests(self, endpoint, tracked_project, monkeypatch):
+        tenant = SimpleNamespace(id=tracked_project.tenant_id)
+        credentials = SimpleNamespace(credentials="token")
+
+        def request(etag=None):
+            return SimpleNamespace(headers={"if-none-match": etag} if etag else {})
+
+        response = Response()
+        body = await endpoint(tracked_project.id, request(), response, 0, credentials, tenant)
+        etag = response.headers["etag"]
+        assert body.status == PipelineStatus.GENERATING
+        assert response.headers["x-pipeline-version"] == "1"
+
+        # Idle polls must not reload the project
+        async def no_db(*args, **kwargs):
+            raise AssertionError("project reloaded for an idle poll")
+        monkeypatch.setattr(mvp_service, "_get_mvp_project", no_db)
+
+        not_modified = await endpoint(tracked_project.id, request(etag), Response(), 0, credentials, tenant)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+
+        async def advance():
+            await asyncio.sleep(0.01)
+            await mvp_service._update_generation_progress(
+                tracked_project.id, AgentType.FRONTEND, AgentStatus.RUNNING, 10.0
+            )
+
+        response = Response()
+        body, _ = await asyncio.gather(
+            endpoint(tracked_project.id, request(etag), response, 5, credentials, tenant), advance()
+        )
+        assert response.headers["etag"] != etag
+        assert body.current_stage == PipelineStage.FRONTEND_DEVELOPMENT
+
+        with pytest.raises(Exception) as denied:
+            await endpoint(tracked_project.id, request(), Response(), 0, credentials, SimpleNamespace(id=uuid4()))
+        assert denied.value.status_code == 403
@@ -0,0 +1,255 @@
+"""
+Tests for progressive project indexing
+
+Validates that files open in the client and recently modified files are
+indexed first, that partial index snapshots are published as batches
+complete together with progress events, and that the agent answers from the
+partial index with a completeness flag while indexing finishes in the
+background.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ast_models import ProjectIndex
+from app.models.event_models import EventType, create_index_progress_event
+
+FILE_COUNT = 25
+
+
+@pytest_asyncio.fixture
+async def workspace():
+    from app.services.ast_service import ast_service
+
+    await ast_service.initialize()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        for i in range(FILE_COUNT):
+            path = root / f"module_{i:02d}.py"
+            path.write_text(f"def function_{i}():\n    return {i}\n")
+            # Higher numbers were modified more recently
+            os.utime(path, ns=(0, 1_000_000_000 * (i + 1)))
+        yield root
+
+
+class TestProgressiveProjectIndexer:
+    """Test streaming partial snapshots from the project indexer"""
+
+    @pytest.mark.asyncio
+    async def test_open_then_recent_files_are_indexed_first(self, workspace):
+        from app.services.project_indexer import project_indexer
+
+        open_file = str(workspace / "module_03.py")
+        snapshots = []
+        async for project_index in project_indexer.index_project_progressively(
+            str(workspace), priority_files=[open_file]
+        ):
+            snapshots.append(
+                (list(project_index.files), project_index.complete, project_index.progress)
+            )
+
+        first_files, complete, progress = snapshots[0]
+        assert not complete
+        assert progress == pytest.approx(10 / FILE_COUNT)
+        assert first_files[0] == open_file
+        assert [Path(path).name for path in first_files[1:4]] == [
+            "module_24.py",
+            "module_23.py",
+            "module_22.py",
+        ]
+
+        assert [(len(files), complete) for files, complete, _ in snapshots] == [
+            (10, False),
+            (20, False),
+            (25, False),
+            (25, True),
+        ]
+        assert snapshots[-1][2] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_files_are_read_ahead_across_batches(self, workspace):
+        from app.services.file_reader import file_reader
+        from app.services.project_indexer import project_indexer
+
+        with patch.object(file_reader, "process", wraps=file_reader.process) as process:
+            sizes = []
+            async for project_index in project_indexer.index_project_progressively(
+                str(workspace), batch_size=4
+            ):
+                sizes.append(len(project_index.files))
+
+        # One pipeline for the whole project, snapshots published every 4 files
+        assert process.call_count == 1
+        assert len(process.call_args.args[0]) == FILE_COUNT
+        assert sizes == [4, 8, 12, 16, 20, 24, 25, 25]
+
+    @pytest.mark.asyncio
+    async def test_partial_snapshots_are_queryable(self, workspace):
+        from app.services.project_indexer import project_indexer
+
+        async for project_index in project_indexer.index_project_progressively(
+            str(workspace)
+        ):
+            assert len(project_index.symbols) == len(project_index.files)
+            for analysis in project_index.files.values():
+                name = analysis.symbols[0].name
+                assert project_index.identifiers.count(name) == 1
+
+
+class TestIncrementalIndexerProgress:
+    """Test snapshot callbacks and progress events during a full reindex"""
+
+    @pytest.mark.asyncio
+    async def test_snapshots_and_progress_events(self, workspace):
+        from app.services.incremental_indexer import IncrementalProjectIndexer
+
+        with tempfile.TemporaryDirectory() as cache_dir, patch(
+            "app.services.incremental_indexer.emit_index_progress", new=AsyncMock()
+        ) as emit_progress:
+            indexer = IncrementalProjectIndexer(cache_dir=cache_dir)
+            indexer.progress_interval = 0
+            snapshots = []
+
+            project_index = await indexer.get_or_create_project_index(
+                str(workspace),
+                on_snapshot=lambda index: snapshots.append(len(index.files)),
+            )
+
+        assert snapshots == [10, 20, 25]
+        assert project_index.complete
+        progress = [call.args[1:4] for call in emit_progress.await_args_list]
+        assert progress == [
+            (10, FILE_COUNT, False),
+            (20, FILE_COUNT, False),
+            (25, FILE_COUNT, False),
+            (25, FILE_COUNT, True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_progress_only_follows_index_changes(self, workspace):
+        from app.services.incremental_indexer import IncrementalProjectIndexer
+
+        with tempfile.TemporaryDirectory() as cache_dir, patch(
+            "app.services.incremental_indexer.emit_index_progress", new=AsyncMock()
+        ) as emit_progress:
+            indexer = IncrementalProjectIndexer(cache_dir=cache_dir)
+            await indexer.get_or_create_project_index(str(workspace))
+
+            emit_progress.reset_mock()
+            await indexer.get_or_create_project_index(str(workspace))
+            assert not emit_progress.await_count
+
+            (workspace / "module_00.py").write_text("def function_0():\n    return -1\n")
+            await indexer.get_or_create_project_index(str(workspace))
+
+        progress = [call.args[1:4] for call in emit_progress.await_args_list]
+        assert progress == [(FILE_COUNT, FILE_COUNT, True)]
+
+    def test_progress_event_types(self):
+        partial = create_index_progress_event("/p", 10, 25, False)
+        done = create_index_progress_event("/p", 25, 25, True, symbols_count=40)
+
+        assert partial.event_type == EventType.INDEX_PROGRESS
+        assert done.event_type == EventType.INDEX_UPDATED
+        assert partial.data == {"files_indexed": 10, "total_files": 25, "complete": False}
+        assert done.symbols_count == 40
+
+
+class TestAgentPartialIndex:
+    """Test the agent answering from a partial index"""
+
+    @pytest.mark.asyncio
+    async def test_agent_answers_before_indexing_completes(self, workspace):
+        from app.agent.enhanced_l3_agent import AgentDependencies, EnhancedL3CodingAgent
+        from app.services.project_indexer import project_indexer
+
+        partial = await project_indexer.index_project(str(workspace))
+        partial.complete = False
+        partial.total_files = FILE_COUNT * 2
+        finished = ProjectIndex(workspace_path=str(workspace), total_files=FILE_COUNT)
+        release = asyncio.Event()
+
+        async def get_or_create_project_index(workspace_path, **kwargs):
+            assert kwargs["priority_files"] == [str(workspace / "module_01.py")]
+            kwargs["on_snapshot"](partial)
+            await release.wait()
+            return finished
+
+        with patch("app.agent.enhanced_l3_agent.incremental_indexer") as mock_indexer, patch(
+            "app.agent.enhanced_l3_agent.graph_service"
+        ) as mock_graph_service:
+            mock_indexer.get_or_create_project_index = get_or_create_project_index
+            mock_graph_service.initialized = False
+
+            agent = EnhancedL3CodingAgent(
+                AgentDependencies(
+                    workspace_path=str(workspace), client_id="test-progressive", session_data={}
+                )
+            )
+            agent.set_open_files([str(workspace / "module_01.py")])
+
+            assert await asyncio.wait_for(agent._ensure_project_indexed(), timeout=5)
+            assert agent.project_index is partial
+
+            result = await agent._explore_symbols_tool("function_1")
+            assert result["status"] == "success"
+            assert result["index_status"] == {
+                "complete": False,
+                "files_indexed": FILE_COUNT,
+                "total_files": FILE_COUNT * 2,
+            }
+            assert "partial index: 25/50 files indexed" in result["message"]
+
+            release.set()
+            await agent._indexing_task
+
+        assert agent.project_index is finished
+        assert agent.index_status["complete"]
+
+    @pytest.mark.asyncio
+    async def test_completion_request_prioritizes_client_files(self, workspace):
+        from app.api.endpoints import code_completion
+        from app.api.models import CodeCompletionRequest
+
+        current_file = str(workspace / "module_03.py")
+        open_file = str(workspace / "module_01.py")
+        priority_calls = []
+
+        async def get_or_create_project_index(workspace_path, **kwargs):
+            priority_calls.append(kwargs["priority_files"])
+            return ProjectIndex(workspace_path=workspace_path, total_files=FILE_COUNT)
+
+        request = CodeCompletionRequest(file_path=current_file, open_files=[open_file])
+
+        with patch.object(code_completion, "enhanced_agent", None), patch(
+            "app.agent.enhanced_l3_agent.L3CodingAgent.initialize",
+            AsyncMock(return_value=True),
+        ), patch("app.agent.enhanced_l3_agent.ast_service", AsyncMock()), patch(
+            "app.agent.enhanced_l3_agent.graph_service"
+        ) as mock_graph_service, patch(
+            "app.agent.enhanced_l3_agent.incremental_indexer"
+        ) as mock_indexer:
+            mock_graph_service.initialize = AsyncMock()
+            mock_graph_service.initialized = False
+            mock_indexer.get_or_create_project_index = get_or_create_project_index
+
+            agent = await code_completion.get_enhanced_agent(request)
+            await agent._indexing_task
+
+            assert priority_calls == [[current_file, open_file]]
+            assert agent.project_context.current_file == current_file
+
+            # Later requests update the files indexed first on refresh
+            request = CodeCompletionRequest(file_path=open_file, open_files=[current_file])
+            assert await code_completion.get_enhanced_agent(request) is agent
+            assert agent._priority_files() == [open_file, current_file]
@@ -0,0 +1,129 @@
+"""
+Tests for query-based extraction of symbols, dependencies and complexity
+
+Validates the per-language compiled extraction queries, range lookups over
+their captures, and that the single-pass analysis handles deeply nested
+files without Python recursion.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.ast_models import LanguageType
+from app.services.ast_service import ASTAnalysisService
+from app.services.tree_sitter_parsers import tree_sitter_manager
+
+PYTHON_CODE = '''import os
+from typing import List
+
+
+class Parser:
+    def parse(self, items: List[str]):
+        for item in items:
+            if item and not item.startswith("#") or item == "!":
+                yield os.path.basename(item)
+
+
+def run(paths):
+    try:
+        return [p for p in Parser().parse(paths)] if paths else []
+    except ValueError:
+        return []
+'''
+
+
+@pytest_asyncio.fixture
+async def service():
+    await tree_sitter_manager.initialize()
+    return ASTAnalysisService(ThreadPoolExecutor(max_workers=1))
+
+
+def parse(file_path, content):
+    tree, _ = tree_sitter_manager.parse_file(file_path, content)
+    return tree, content.encode("utf-8")
+
+
+class TestExtractionQueries:
+    """Test compiled extraction queries and their captures"""
+
+    @pytest.mark.asyncio
+    async def test_queries_compiled_for_supported_languages(self, service):
+        for language in (LanguageType.PYTHON, LanguageType.JAVASCRIPT, LanguageType.TYPESCRIPT):
+            assert language in tree_sitter_manager.queries
+
+    @pytest.mark.asyncio
+    async def test_captures_are_in_document_order(self, service):
+        tree, _ = parse("sample.py", PYTHON_CODE)
+
+        captures = tree_sitter_manager.capture_nodes(tree.root_node, LanguageType.PYTHON)
+
+        assert [n.type for n in captures["import"]] == ["import_statement", "import_from_statement"]
+        assert [n.start_point[0] for n in captures["definition.function"]] == [5, 11]
+        decisions = captures["decision"]
+        assert decisions == sorted(decisions, key=lambda n: (n.start_byte, -n.end_byte))
+        assert {n.type for n in decisions} >= {"for_statement", "if_statement", "and", "or"}
+        assert "call" in captures.nodes
+
+        run = captures["definition.function"][1]
+        assert {n.type for n in captures.within("decision", run)} == {
+            "try_statement",
+            "except_clause",
+            "conditional_expression",
+        }
+
+    @pytest.mark.asyncio
+    async def test_single_pass_matches_separate_extraction(self, service):
+        tree, source = parse("sample.py", PYTHON_CODE)
+
+        extraction = service._analyze_tree_sync(tree, source, LanguageType.PYTHON, "sample.py")
+        symbols, dependencies, complexity = extraction[:3]
+
+        assert symbols == service._extract_symbols_sync(tree, source, LanguageType.PYTHON, "sample.py")
+        assert dependencies == service._extract_dependencies_sync(
+            tree, source, LanguageType.PYTHON, "sample.py"
+        )
+        assert complexity == service._calculate_complexity_sync(tree, source, LanguageType.PYTHON)
+        by_name = {symbol.name: symbol for symbol in symbols}
+        assert by_name["parse"].complexity == 5  # for, if, and, or
+        assert by_name["run"].complexity == 4  # try, except, conditional
+        assert complexity.number_of_functions == 2
+        assert complexity.cyclomatic_complexity == 9
+
+    @pytest.mark.asyncio
+    async def test_javascript_parameters_and_requires(self, service):
+        code = 'const fs = require("fs");\nfunction load(path, opts) {\n  return fs.readFileSync(path, opts);\n}\n'
+        tree, source = parse("load.js", code)
+
+        extraction = service._analyze_tree_sync(tree, source, LanguageType.JAVASCRIPT, "load.js")
+        symbols, dependencies = extraction.symbols, extraction.dependencies
+
+        load = next(s for s in symbols if s.name == "load")
+        assert load.parameters == ["load", "path", "opts", "fs"]
+        assert [d.dependency_type for d in dependencies] == ["require"]
+
+
+class TestDeepTrees:
+    """Test that deeply nested files no longer hit the recursion limit"""
+
+    @pytest.mark.asyncio
+    async def test_deeply_nested_expression(self, service):
+        depth = sys.getrecursionlimit() + 500
+        code = "def deep():\n    return " + "(" * depth + "1" + ")" * depth + "\n"
+        tree, source = parse("deep.py", code)
+
+        nodes = tree_sitter_manager.find_nodes_by_type(
+            tree.root_node, ["parenthesized_expression"]
+        )
+        extraction = service._analyze_tree_sync(tree, source, LanguageType.PYTHON, "deep.py")
+        symbols, complexity = extraction.symbols, extraction.complexity
+
+        assert len(nodes) == depth
+        assert [s.name for s in symbols] == ["deep"]
+        assert complexity.number_of_functions == 1
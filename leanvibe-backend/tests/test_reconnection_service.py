@@ -0,0 +1,156 @@
+"""
+Tests for reconnection replay from the shared event log
+
+Validates that events are stored once with global sequence numbers, that
+disconnected sessions only keep a cursor, and that reconnection replays the
+filtered range after that cursor.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.event_models import (
+    ClientPreferences,
+    ConnectionState,
+    EventData,
+    EventPriority,
+    EventType,
+    NotificationChannel,
+)
+from app.services.event_streaming_service import EventStreamingService
+from app.services.reconnection_service import (
+    EventLog,
+    ReconnectionConfig,
+    ReconnectionService,
+)
+
+
+def make_event(event_id: str, priority=EventPriority.MEDIUM) -> EventData:
+    return EventData(
+        event_id=event_id,
+        event_type=EventType.FILE_CHANGED,
+        priority=priority,
+        channel=NotificationChannel.FILE_SYSTEM,
+        timestamp=datetime.now(),
+        source="test",
+    )
+
+
+def make_state(client_id: str, **preferences) -> ConnectionState:
+    return ConnectionState(
+        client_id=client_id,
+        connected_at=datetime.now(),
+        last_seen=datetime.now(),
+        preferences=ClientPreferences(client_id=client_id, **preferences),
+    )
+
+
+class TestEventLog:
+    """Test the bounded event ring"""
+
+    def test_sequences_are_global_and_range_scan_from_cursor(self):
+        log = EventLog(max_events=10)
+        sequences = [log.append(make_event(f"e{i}")) for i in range(5)]
+
+        assert sequences == [0, 1, 2, 3, 4]
+        assert [e.event.event_id for e in log.read_from(3)] == ["e3", "e4"]
+        assert list(log.read_from(5)) == []
+
+    def test_ring_overwrites_oldest_events(self):
+        log = EventLog(max_events=3)
+        for i in range(5):
+            log.append(make_event(f"e{i}"))
+
+        assert len(log) == 3
+        assert log.first_sequence == 2
+        assert [e.sequence for e in log.read_from(0)] == [2, 3, 4]
+
+    def test_trim_before_drops_expired_events(self):
+        log = EventLog(max_events=10)
+        for i in range(3):
+            log.append(make_event(f"e{i}"))
+
+        assert log.trim_before(datetime.now() + timedelta(seconds=1)) == 3
+        assert len(log) == 0
+        assert log.append(make_event("e3")) == 3
+
+
+class TestReconnectionReplay:
+    """Test cursor-based missed event replay"""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replays_events_after_cursor(self):
+        service = ReconnectionService()
+        service.record_event(make_event("before"))
+        service.register_client_session("ios", make_state("ios"))
+        service.client_disconnected("ios")
+
+        for i in range(3):
+            service.record_event(make_event(f"missed_{i}"))
+
+        assert service.get_client_session_info("ios")["missed_events_count"] == 3
+
+        result = await service.client_reconnected("ios", make_state("ios"))
+
+        assert result["missed_events_count"] == 3
+        assert [e["event"]["event_id"] for e in result["missed_events"]] == [
+            "missed_0",
+            "missed_1",
+            "missed_2",
+        ]
+        assert [e["sequence_number"] for e in result["missed_events"]] == [1, 2, 3]
+        assert service.client_sessions["ios"].event_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_replay_applies_client_filters(self):
+        service = ReconnectionService()
+        service.register_client_session("cli", make_state("cli"))
+        service.client_disconnected("cli")
+
+        service.record_event(make_event("low", EventPriority.LOW))
+        service.record_event(make_event("critical", EventPriority.CRITICAL))
+
+        state = make_state("cli", min_priority=EventPriority.HIGH, max_events_per_second=1)
+        result = await service.client_reconnected("cli", state)
+
+        assert [e["event"]["event_id"] for e in result["missed_events"]] == ["critical"]
+
+    @pytest.mark.asyncio
+    async def test_many_offline_clients_share_one_log(self):
+        service = ReconnectionService(ReconnectionConfig(max_logged_events=4))
+        for i in range(50):
+            service.register_client_session(f"device_{i}", make_state(f"device_{i}"))
+            service.client_disconnected(f"device_{i}")
+
+        for i in range(6):
+            service.record_event(make_event(f"e{i}"))
+
+        assert len(service.event_log) == 4
+        result = await service.client_reconnected("device_0", make_state("device_0"))
+        assert result["events_truncated"] == 2
+        assert [e["log_sequence"] for e in result["missed_events"]] == [2, 3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_streaming_service_records_each_event_once(self, monkeypatch):
+        from app.services import reconnection_service as module
+
+        service = ReconnectionService()
+        monkeypatch.setattr(module, "reconnection_service", service)
+        streaming = EventStreamingService()
+        for i in range(3):
+            client_id = f"offline_{i}"
+            streaming.register_client(client_id, websocket=None)
+            streaming.clients[client_id].active = False
+            service.register_client_session(client_id, make_state(client_id))
+
+        await streaming._deliver_event(make_event("e0"))
+        await streaming._deliver_event(make_event("e1"))
+
+        assert len(service.event_log) == 2
+        assert all(session.event_cursor == 0 for session in service.client_sessions.values())
@@ -0,0 +1,179 @@
+"""
+Tests for workspace-level analysis sharing
+
+Validates that checkouts of the same code share per-file analyses by content
+hash, that only path-dependent data (symbol ids and resolved imports) is kept
+per workspace, that hot files being edited still parse incrementally, and
+that embeddings of identical code are computed once.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.shared_analysis_store import SharedAnalysisStore, shared_analysis_store
+
+FILES = {
+    "pkg/__init__.py": "",
+    "pkg/shared_model.py": (
+        "class SharedModel:\n"
+        "    def save(self):\n"
+        "        return persist(self)\n\n\n"
+        "def persist(item):\n"
+        "    return item\n"
+    ),
+    "app_main.py": (
+        "from pkg.shared_model import SharedModel\n\n\n"
+        "def shared_entry_point():\n"
+        "    return SharedModel().save()\n"
+    ),
+}
+
+
+@pytest_asyncio.fixture
+async def checkouts():
+    from app.services.ast_service import ast_service
+
+    await ast_service.initialize()
+    shared_analysis_store.clear_analyses()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        roots = []
+        for name in ("main", "worktree"):
+            root = Path(temp_dir) / name
+            for relative_path, content in FILES.items():
+                path = root / relative_path
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content)
+            roots.append(root)
+        yield roots
+
+
+class TestWorkspaceSharing:
+    """Test sharing analyses between checkouts of the same code"""
+
+    @pytest.mark.asyncio
+    async def test_second_checkout_reuses_analyses(self, checkouts):
+        from app.services.project_indexer import project_indexer
+
+        main, worktree = checkouts
+        (worktree / "local_only.py").write_text("def local_only():\n    pass\n")
+        hits = shared_analysis_store.metrics["analysis_hits"]
+
+        first = await project_indexer.index_project(str(main))
+        second = await project_indexer.index_project(str(worktree))
+
+        # Every file of the first checkout was analyzed once; the worktree
+        # only analyzed the file that exists nowhere else
+        assert shared_analysis_store.metrics["analysis_hits"] - hits == len(FILES)
+
+        for relative_path in FILES:
+            original = first.files[str(main / relative_path)]
+            shared = second.files[str(worktree / relative_path)]
+            # Path-independent data is shared, not copied
+            assert shared.ast is original.ast
+            assert shared.identifiers is original.identifiers
+            assert shared.calls is original.calls
+            # Path-dependent data belongs to each workspace
+            assert [s.id.split(":", 1)[1] for s in shared.symbols] == [
+                s.id.split(":", 1)[1] for s in original.symbols
+            ]
+            assert all(s.file_path == str(worktree / relative_path) for s in shared.symbols)
+
+        [main_import] = first.files[str(main / "app_main.py")].dependencies
+        [worktree_import] = second.files[str(worktree / "app_main.py")].dependencies
+        assert main_import.source_file == str(main / "app_main.py")
+        assert worktree_import.source_file == str(worktree / "app_main.py")
+
+        # Imports resolve against each workspace's own files
+        assert second.call_graph.edges() and set(second.call_graph.edges()) == {
+            (caller.replace(str(main), str(worktree)), callee.replace(str(main), str(worktree)))
+            for caller, callee in first.call_graph.edges()
+        }
+        references = await project_indexer.find_references(second, "SharedModel")
+        assert {r.file_path for r in references} == {
+            str(worktree / "pkg" / "shared_model.py"),
+            str(worktree / "app_main.py"),
+        }
+
+    @pytest.mark.asyncio
+    async def test_hot_files_keep_incremental_parsing(self, checkouts):
+        from app.services.project_indexer import ast_service, project_indexer
+        from app.services.tree_sitter_parsers import tree_sitter_manager
+
+        main, worktree = checkouts
+        await project_indexer.index_project(str(main))
+        path = str(worktree / "pkg" / "shared_model.py")
+
+        await ast_service.parse_file(path)
+        Path(path).write_text(FILES["pkg/shared_model.py"] + "\n\nVALUE = 1\n")
+        incremental = tree_sitter_manager.parse_stats["incremental_parses"]
+        analysis = await ast_service.parse_file(path)
+
+        assert tree_sitter_manager.parse_stats["incremental_parses"] == incremental + 1
+        assert "VALUE" in [symbol.name for symbol in analysis.symbols]
+
+    @pytest.mark.asyncio
+    async def test_hot_file_reparses_are_not_shared(self, checkouts):
+        from app.services.project_indexer import ast_service
+
+        main, _ = checkouts
+        path = main / "pkg" / "shared_model.py"
+        for i in range(3):
+            path.write_text(FILES["pkg/shared_model.py"] + f"\n\nVALUE = {i}\n")
+            await ast_service.parse_file(str(path))
+
+        assert shared_analysis_store.get_metrics()["unique_analyses"] == 0
+
+
+class TestSharedEmbeddings:
+    """Test reusing embeddings of identical code"""
+
+    def test_identical_code_is_embedded_once(self):
+        from app.services.vector_store_service import VectorStoreService
+
+        class CountingModel:
+            calls = 0
+
+            def encode(self, content, convert_to_tensor=False):
+                CountingModel.calls += 1
+                return [float(len(content)), 1.0]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            services = [
+                VectorStoreService(db_path=os.path.join(temp_dir, name))
+                for name in ("main", "worktree")
+            ]
+        for service in services:
+            service.embedding_type = "sentence_transformer"
+            service.embedding_model = CountingModel()
+            service.embedding_model_name = "counting-model"
+
+        code = "def shared_helper():\n    return 42\n"
+        first = services[0]._create_embedding(code)
+        second = services[1]._create_embedding(code)
+        services[1]._create_embedding(code + "# changed\n")
+
+        assert first == second
+        assert CountingModel.calls == 2
+
+
+class TestStoreEviction:
+    """Test bounding the store"""
+
+    def test_least_recently_used_entries_are_evicted(self):
+        store = SharedAnalysisStore(max_embeddings=2)
+        store.add_embedding("m", "a", [1.0])
+        store.add_embedding("m", "b", [2.0])
+        assert store.get_embedding("m", "a") == [1.0]
+        store.add_embedding("m", "c", [3.0])
+
+        assert store.get_embedding("m", "b") is None
+        assert store.get_embedding("m", "a") == [1.0]
+        assert store.get_metrics()["unique_embeddings"] == 2
@@ -0,0 +1,221 @@
+"""
+Tests for single-flight request coalescing
+
+Validates that identical concurrent calls and streams share one execution,
+that failures and cancellation propagate correctly, and that the unified
+MLX service coalesces identical completion requests.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.single_flight import SingleFlight
+from app.services.unified_mlx_service import (
+    FallbackMLXStrategy,
+    MLXInferenceStrategy,
+    UnifiedMLXService,
+)
+
+
+class TestSingleFlightCalls:
+    """Test coalescing of awaitable calls"""
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_share_one_execution(self):
+        """Concurrent callers with the same key run the function once"""
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": 42}
+
+        key = SingleFlight.make_key("model", "prompt", {"temperature": 0.1})
+        results = await asyncio.gather(*[flight.do(key, work) for _ in range(5)])
+
+        assert calls == 1
+        assert all(result == {"value": 42} for result, _ in results)
+        assert [coalesced for _, coalesced in results].count(False) == 1
+        assert flight.get_stats()["coalesced"] == 4
+        assert flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_cached(self):
+        """Once a call finishes the next identical request runs again"""
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        first, _ = await flight.do("key", work)
+        second, _ = await flight.do("key", work)
+
+        assert (first, second) == (1, 2)
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """A failing call raises in the leader and in all followers"""
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("model unavailable")
+
+        results = await asyncio.gather(
+            flight.do("key", work), flight.do("key", work), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        """Followers still get the result if the caller that started the work goes away"""
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        result, coalesced = await follower
+        assert result == "done"
+        assert coalesced is True
+
+
+class TestSingleFlightStreams:
+    """Test fan-out of shared streams"""
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_replays_stream(self):
+        """A subscriber joining mid-stream receives every event"""
+        flight = SingleFlight("test")
+        produced = 0
+
+        async def source():
+            nonlocal produced
+            for i in range(5):
+                produced += 1
+                await asyncio.sleep(0.01)
+                yield i
+
+        async def consume(delay):
+            await asyncio.sleep(delay)
+            return [event async for event in flight.stream("key", source)]
+
+        first, second = await asyncio.gather(consume(0), consume(0.025))
+
+        assert first == second == [0, 1, 2, 3, 4]
+        assert produced == 5
+        assert flight.get_stats()["coalesced"] == 1
+
+    @pytest.mark.asyncio
+    async def test_last_subscriber_leaving_cancels_source(self):
+        """The shared source is closed once nobody is listening"""
+        flight = SingleFlight("test")
+        closed = asyncio.Event()
+
+        async def source():
+            try:
+                for i in range(1000):
+                    await asyncio.sleep(0.001)
+                    yield i
+            finally:
+                closed.set()
+
+        stream = flight.stream("key", source)
+        async for event in stream:
+            if event == 2:
+                break
+        await stream.aclose()
+
+        await asyncio.wait_for(closed.wait(), timeout=1.0)
+        assert flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_paces_source(self):
+        """The source is not drained ahead of a subscriber that reads slowly"""
+        flight = SingleFlight("test", max_buffered_events=4)
+        produced = 0
+
+        async def source():
+            nonlocal produced
+            for i in range(100):
+                produced += 1
+                yield i
+
+        stream = flight.stream("key", source)
+        assert await stream.__anext__() == 0
+        await asyncio.sleep(0.05)
+
+        # Only a buffer's worth of events was pulled ahead of the reader
+        assert produced <= 4 + 1
+        assert [event async for event in stream] == list(range(1, 100))
+        assert produced == 100
+
+    @pytest.mark.asyncio
+    async def test_subscriber_after_buffer_trim_starts_new_stream(self):
+        """A stream that dropped events is not replayed to new subscribers"""
+        flight = SingleFlight("test", max_buffered_events=2)
+        runs = 0
+
+        async def source():
+            nonlocal runs
+            runs += 1
+            for i in range(6):
+                yield i
+
+        first = flight.stream("key", source)
+        assert [await first.__anext__() for _ in range(4)] == [0, 1, 2, 3]
+
+        second = [event async for event in flight.stream("key", source)]
+        assert second == list(range(6))
+        assert [event async for event in first] == [4, 5]
+        assert runs == 2
+
+
+class TestUnifiedServiceCoalescing:
+    """Test coalescing in the unified MLX service"""
+
+    @pytest.mark.asyncio
+    async def test_identical_completions_share_model_call(self):
+        """Concurrent identical completion requests hit the strategy once"""
+        service = UnifiedMLXService(preferred_strategy=MLXInferenceStrategy.FALLBACK)
+        strategy = FallbackMLXStrategy()
+        calls = 0
+        original = strategy.generate_code_completion
+
+        async def slow_completion(context, intent="suggest"):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return await original(context, intent)
+
+        strategy.generate_code_completion = slow_completion
+        service.current_strategy = strategy
+        service.is_initialized = True
+
+        context = {"file_path": "a.py", "surrounding_code": "def total(): pass"}
+        results = await asyncio.gather(
+            *[service.generate_code_completion(context, "suggest") for _ in range(3)]
+        )
+
+        assert calls == 1
+        assert all(r["status"] == "success" for r in results)
+        assert sum(1 for r in results if r.get("coalesced")) == 2
+        assert service.get_performance_metrics()["request_coalescing"]["coalesced"] == 2
@@ -0,0 +1,162 @@
+"""
+Tests for the indexed task storage engine
+
+Validates that TaskService answers filters, searches, Kanban loads and
+stats from its incrementally maintained indexes, and that changes are
+persisted row by row to SQLite.
+"""
+
+import json
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.task_models import (
+    Task,
+    TaskFilters,
+    TaskPriority,
+    TaskSearchRequest,
+    TaskStatus,
+    TaskStatusUpdate,
+    TaskUpdate,
+)
+from app.services.task_service import TaskService
+from app.services.task_store import SQLiteTaskStore, TaskIndex
+
+
+def make_task(title: str, **fields) -> Task:
+    fields.setdefault("project_id", "project-1")
+    return Task(title=title, tenant_id="tenant-1", client_id="client-1", **fields)
+
+
+@pytest_asyncio.fixture
+async def task_service(tmp_path):
+    """Task service over a store seeded with a few tasks"""
+    SQLiteTaskStore(tmp_path / "tasks.db").upsert(
+        [
+            make_task("Fix login crash", description="Authentication fails on iOS", tags=["ios", "bug"]),
+            make_task("Write onboarding docs", priority=TaskPriority.LOW, tags=["docs"]),
+            make_task("Refactor auth tokens", assigned_to="agent", project_id="project-2"),
+        ]
+    )
+    service = TaskService(data_dir=str(tmp_path))
+    await service.initialize()
+    yield service
+    service.store.close()
+
+
+class TestTaskIndex:
+    """Test the in-memory secondary indexes"""
+
+    def test_select_intersects_indexed_filters(self):
+        index = TaskIndex()
+        tasks = [
+            make_task("a", priority=TaskPriority.HIGH, tags=["x"]),
+            make_task("b", priority=TaskPriority.HIGH),
+            make_task("c", priority=TaskPriority.LOW, tags=["x"]),
+        ]
+        for task in tasks:
+            index.add(task)
+
+        selected = index.select(TaskFilters(priority=TaskPriority.HIGH, tags=["x"]))
+
+        assert selected == [tasks[0].id]
+        assert index.select(TaskFilters()) is None
+
+    def test_reindexing_moves_task_between_columns(self):
+        index = TaskIndex()
+        task = make_task("a")
+        index.add(task)
+
+        task.status = TaskStatus.DONE
+        task.updated_at = task.created_at + timedelta(hours=2)
+        index.add(task)
+
+        assert index.column(TaskStatus.TODO.value) == []
+        assert index.column(TaskStatus.DONE.value) == [task]
+        assert index.status_counts[TaskStatus.DONE.value] == 1
+        assert index.completion_hours_total == pytest.approx(2.0)
+
+    def test_text_candidates_match_inside_words(self):
+        index = TaskIndex()
+        task = make_task("Authentication bug")
+        index.add(task)
+
+        assert index.text_candidates("thent") == {task.id}
+        assert index.text_candidates("auth bu") == {task.id}
+        assert index.text_candidates("missing") == set()
+        assert index.text_candidates("--") is None
+
+
+class TestIndexedTaskService:
+    """Test TaskService on top of the indexed store"""
+
+    @pytest.mark.asyncio
+    async def test_filters_and_search_use_substring_semantics(self, task_service):
+        ios_tasks = await task_service.list_tasks(TaskFilters(tags=["ios"]))
+        assert [t.title for t in ios_tasks] == ["Fix login crash"]
+
+        results = await task_service.search_tasks(TaskSearchRequest(query="auth"))
+        assert [t.title for t in results] == ["Fix login crash", "Refactor auth tokens"]
+
+        results = await task_service.search_tasks(
+            TaskSearchRequest(query="auth", filters=TaskFilters(project_id="project-2"))
+        )
+        assert [t.title for t in results] == ["Refactor auth tokens"]
+
+    @pytest.mark.asyncio
+    async def test_kanban_and_stats_follow_updates(self, task_service):
+        task = (await task_service.search_tasks(TaskSearchRequest(query="docs")))[0]
+
+        await task_service.update_task_status(task.id, TaskStatusUpdate(status=TaskStatus.DONE))
+        await task_service.update_task(task.id, TaskUpdate(title="Publish onboarding guide"))
+
+        board = await task_service.get_kanban_board()
+        columns = {column.status: column for column in board.columns}
+        assert [t.id for t in columns[TaskStatus.DONE].tasks] == [task.id]
+        assert columns[TaskStatus.TODO].task_count == 2
+
+        stats = await task_service.get_task_stats()
+        assert stats.by_status[TaskStatus.DONE.value] == 1
+        assert stats.completion_rate == pytest.approx(1 / 3)
+
+        assert await task_service.search_tasks(TaskSearchRequest(query="write")) == []
+
+    @pytest.mark.asyncio
+    async def test_changes_persist_row_by_row(self, task_service, tmp_path):
+        task = (await task_service.list_tasks(TaskFilters(assigned_to="agent")))[0]
+        await task_service.update_task(task.id, TaskUpdate(priority=TaskPriority.URGENT))
+        first = (await task_service.list_tasks())[0]
+        await task_service.delete_task(first.id)
+
+        reloaded = TaskService(data_dir=str(tmp_path))
+        await reloaded.initialize()
+
+        assert len(reloaded._tasks) == 2
+        assert reloaded._tasks[task.id].priority == TaskPriority.URGENT
+        assert (await reloaded.get_task_stats()).by_priority[TaskPriority.URGENT.value] == 1
+        reloaded.store.close()
+
+    @pytest.mark.asyncio
+    async def test_legacy_json_is_imported_once(self, tmp_path):
+        legacy = make_task("Legacy task").dict()
+        legacy["status"] = "backlog"
+        (tmp_path / "tasks.json").write_text(json.dumps({legacy["id"]: legacy}, default=str))
+
+        service = TaskService(data_dir=str(tmp_path))
+        await service.initialize()
+        assert [t.title for t in await service.list_tasks()] == ["Legacy task"]
+
+        await service.delete_task(legacy["id"])
+        service.store.close()
+
+        reloaded = TaskService(data_dir=str(tmp_path))
+        await reloaded.initialize()
+        assert await reloaded.list_tasks() == []
+        reloaded.store.close()
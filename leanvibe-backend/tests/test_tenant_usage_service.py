@@ -0,0 +1,267 @@
+"""
+Tests for materialized tenant usage counters
+
+Validates that quota checks are served from cached counters loaded with one
+query, that committed inserts and deletes update the counters while rollbacks
+do not, and that metered API/AI usage is tracked and flushed durably.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.core.exceptions import TenantNotFoundError, TenantQuotaExceededError
+from app.models.orm_models import MVPProjectORM, ProjectORM, TenantORM
+from app.models.tenant_models import DEFAULT_QUOTAS, TenantPlan, TenantType
+from app.services.tenant_service import TenantService
+from app.services.tenant_usage_service import TenantUsageService
+
+
+class UsageTrackedSession(Session):
+    """Session class the test service listens on, isolated from other tests"""
+
+
+@pytest_asyncio.fixture
+async def database():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    sessions = async_sessionmaker(
+        engine, expire_on_commit=False, sync_session_class=UsageTrackedSession
+    )
+    yield sessions, statements
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def usage(database):
+    sessions, _ = database
+    service = TenantUsageService(session_factory=sessions)
+    service.install(UsageTrackedSession)
+    yield service
+    service.uninstall(UsageTrackedSession)
+
+
+async def create_tenant(sessions, plan=TenantPlan.DEVELOPER, tenant_type=TenantType.ENTERPRISE):
+    quotas = DEFAULT_QUOTAS[plan].model_dump()
+    quotas["max_projects"] = 2
+    tenant = TenantORM(
+        tenant_type=tenant_type,
+        organization_name="Acme",
+        slug=f"acme-{plan.value}".replace("_", "-"),
+        admin_email="admin@acme.test",
+        plan=plan,
+        quotas=quotas,
+        current_usage={},
+    )
+    async with sessions() as db:
+        db.add(tenant)
+        await db.commit()
+    return tenant
+
+
+def make_project(tenant, name="project"):
+    return ProjectORM(name=name, tenant_id=tenant.id)
+
+
+class TestUsageCounters:
+    """Test loading and transactional maintenance of the counters"""
+
+    @pytest.mark.asyncio
+    async def test_counters_load_in_one_query_then_serve_from_cache(self, database, usage):
+        sessions, statements = database
+        tenant = await create_tenant(sessions)
+        async with sessions() as db:
+            db.add(make_project(tenant))
+            await db.commit()
+
+        statements.clear()
+        service = TenantService(usage=usage)
+
+        assert await service.check_quota(tenant.id, "projects") is True
+        assert len(statements) == 1
+
+        assert (await service.get_tenant_usage(tenant.id)).projects_count == 1
+        assert await service.check_quota(tenant.id, "projects", increment=2) is False
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_commits_update_counters_and_rollbacks_do_not(self, database, usage):
+        sessions, statements = database
+        tenant = await create_tenant(sessions)
+        await usage.get_counters(tenant.id)
+
+        async with sessions() as db:
+            project = make_project(tenant)
+            db.add(project)
+            await db.commit()
+        async with sessions() as db:
+            db.add(make_project(tenant, "discarded"))
+            await db.flush()
+            await db.rollback()
+
+        counters = await usage.get_counters(tenant.id)
+        assert counters.projects == 1
+
+        async with sessions() as db:
+            await db.delete(await db.get(ProjectORM, project.id))
+            await db.commit()
+        assert counters.projects == 0
+
+    @pytest.mark.asyncio
+    async def test_mvp_status_changes_track_concurrent_generations(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions, TenantPlan.MVP_SINGLE, TenantType.MVP_FACTORY)
+        await usage.get_counters(tenant.id)
+
+        mvp = MVPProjectORM(
+            tenant_id=tenant.id,
+            project_name="Idea",
+            slug="idea",
+            description="An idea",
+            status="generating",
+            storage_mb_used=40,
+        )
+        async with sessions() as db:
+            db.add(mvp)
+            await db.commit()
+
+        counters = await usage.get_counters(tenant.id)
+        assert (counters.mvp_projects, counters.concurrent_mvps, counters.storage_mb) == (1, 1, 40)
+        assert counters.to_usage().projects_count == 1
+
+        async with sessions() as db:
+            stored = await db.get(MVPProjectORM, mvp.id)
+            stored.status = "deployed"
+            stored.storage_mb_used = 100
+            await db.commit()
+
+        assert (counters.concurrent_mvps, counters.storage_mb) == (0, 100)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_corrects_drift_and_unknown_tenant_raises(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+        counters = await usage.get_counters(tenant.id)
+        counters.projects = 7
+
+        assert (await usage.reconcile(tenant.id)).projects == 0
+
+        other = TenantService(usage=usage)
+        with pytest.raises(TenantNotFoundError):
+            await other.check_quota(uuid4(), "projects")
+
+
+class TestMeteredUsage:
+    """Test API call, AI request and session tracking"""
+
+    @pytest.mark.asyncio
+    async def test_metered_usage_is_enforced(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+        service = TenantService(usage=usage)
+        limit = DEFAULT_QUOTAS[TenantPlan.DEVELOPER].max_ai_requests_per_day
+
+        await service.record_quota_usage(tenant.id, "ai_requests", limit)
+        usage.session_opened(tenant.id)
+
+        report = await service.get_tenant_usage(tenant.id)
+        assert report.ai_requests_today == limit
+        assert report.concurrent_sessions == 1
+
+        with pytest.raises(TenantQuotaExceededError) as exc_info:
+            await service.enforce_quota(tenant.id, "ai_requests")
+        assert exc_info.value.details["current_usage"] == limit
+        assert exc_info.value.details["quota_limit"] == limit
+
+    @pytest.mark.asyncio
+    async def test_flush_persists_period_counters_across_restarts(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+        usage.record_api_call(tenant.id, 3)
+        await usage.get_counters(tenant.id)
+        usage.record_api_call(tenant.id, 2)
+
+        assert await usage.flush() == 1
+        assert await usage.flush() == 0
+
+        async with sessions() as db:
+            stored = (
+                await db.execute(select(TenantORM.current_usage).where(TenantORM.id == tenant.id))
+            ).scalar_one()
+        assert stored["api_calls"]["count"] == 5
+
+        restarted = TenantUsageService(session_factory=sessions)
+        restarted.record_api_call(tenant.id)
+        counters = await restarted.get_counters(tenant.id)
+        assert counters.to_usage().api_calls_this_month == 6
+
+    @pytest.mark.asyncio
+    async def test_workers_flushing_the_same_tenant_keep_both_counts(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+        other_worker = TenantUsageService(session_factory=sessions)
+        usage.record_api_call(tenant.id, 3)
+        other_worker.record_api_call(tenant.id, 4)
+
+        assert await usage.flush() == 1
+        assert await other_worker.flush() == 1
+
+        async with sessions() as db:
+            stored = (
+                await db.execute(select(TenantORM.current_usage).where(TenantORM.id == tenant.id))
+            ).scalar_one()
+        assert stored["api_calls"]["count"] == 7
+        # Concurrent flushes are serialized by a row lock (a no-op on SQLite)
+        query = TenantUsageService._stored_usage_query([tenant.id])
+        assert "FOR UPDATE" in str(query.compile(dialect=postgresql.dialect()))
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_usage_counted_since_last_flush(self, database, usage):
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+
+        await usage.start()
+        usage.record_ai_request(tenant.id, 4)
+        await usage.stop()
+
+        async with sessions() as db:
+            stored = (
+                await db.execute(select(TenantORM.current_usage).where(TenantORM.id == tenant.id))
+            ).scalar_one()
+        assert stored["ai_requests"]["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_code_completion_requests_are_metered(self, database, usage):
+        from app.api.endpoints import code_completion
+
+        sessions, _ = database
+        tenant = await create_tenant(sessions)
+
+        with patch.object(code_completion, "tenant_usage_service", usage):
+            code_completion.record_ai_request(SimpleNamespace(state=SimpleNamespace(tenant_id=tenant.id)))
+            # Requests without a resolved tenant are not metered
+            code_completion.record_ai_request(SimpleNamespace(state=SimpleNamespace()))
+
+        report = await TenantService(usage=usage).get_tenant_usage(tenant.id)
+        assert report.ai_requests_today == 1
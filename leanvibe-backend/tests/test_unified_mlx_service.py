@@ -433,6 +433,111 @@ class TestIntegrationScenarios:
             assert f"test{i}.py" in result["response"]
 
 
+class TestStreamingCompletion:
+    """Test incremental token streaming through the unified service"""
+
+    class _TokenStrategy(FallbackMLXStrategy):
+        """Strategy that emits a fixed token sequence"""
+
+        def __init__(self, tokens, fail_after=None):
+            super().__init__()
+            self.tokens = tokens
+            self.fail_after = fail_after
+            self.closed = False
+
+        async def generate_code_completion_stream(self, context, intent="suggest"):
+            try:
+                for index, token in enumerate(self.tokens):
+                    if self.fail_after is not None and index == self.fail_after:
+                        raise RuntimeError("model crashed")
+                    await asyncio.sleep(0)
+                    yield {"type": "token", "text": token}
+                yield {"type": "complete", "confidence": 0.9, "model": "test-model"}
+            finally:
+                self.closed = True
+
+    def _service_with(self, strategy):
+        service = UnifiedMLXService(preferred_strategy=MLXInferenceStrategy.FALLBACK)
+        service.current_strategy = strategy
+        service.is_initialized = True
+        return service
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens_then_complete(self):
+        """Tokens arrive as separate events and the final event carries the full response"""
+        service = self._service_with(self._TokenStrategy(["def ", "total", "():"]))
+
+        events = [
+            event async for event in service.stream_code_completion({"file_path": "a.py"}, "suggest")
+        ]
+
+        assert events[0]["type"] == "start"
+        assert [e["text"] for e in events if e["type"] == "token"] == ["def ", "total", "():"]
+        assert events[-1]["type"] == "complete"
+        assert events[-1]["response"] == "def total():"
+        assert events[-1]["model"] == "test-model"
+        assert events[-1]["chunk_count"] == 3
+        assert events[-1]["time_to_first_token"] <= events[-1]["total_response_time"]
+        assert service.get_performance_metrics()["streaming"]["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_generation(self):
+        """Closing the iterator mid-stream closes the strategy generator"""
+        strategy = self._TokenStrategy([f"tok{i} " for i in range(100)])
+        service = self._service_with(strategy)
+
+        stream = service.stream_code_completion({"file_path": "a.py"}, "suggest")
+        received = []
+        async for event in stream:
+            if event["type"] == "token":
+                received.append(event["text"])
+            if len(received) == 2:
+                break
+        await stream.aclose()
+
+        assert strategy.closed is True
+        assert received == ["tok0 ", "tok1 "]
+        assert service._stream_stats["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_strategy_failure_emits_error_event(self):
+        """A failing strategy ends the stream with an error event and the partial text"""
+        service = self._service_with(self._TokenStrategy(["a", "b", "c"], fail_after=2))
+
+        events = [
+            event async for event in service.stream_code_completion({"file_path": "a.py"}, "suggest")
+        ]
+
+        assert events[-1]["type"] == "error"
+        assert events[-1]["partial_response"] == "ab"
+        assert "model crashed" in events[-1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_default_stream_wraps_full_completion(self):
+        """Strategies without native streaming emit their completion as one token"""
+        service = self._service_with(FallbackMLXStrategy())
+
+        events = [
+            event async for event in service.stream_code_completion({"file_path": "a.py"}, "debug")
+        ]
+
+        tokens = [e for e in events if e["type"] == "token"]
+        assert len(tokens) == 1
+        assert events[-1]["type"] == "complete"
+        assert events[-1]["model"] == "fallback"
+
+    @pytest.mark.asyncio
+    async def test_uninitialized_service_streams_error(self):
+        """Streaming before initialization yields a single error event"""
+        service = UnifiedMLXService()
+
+        events = [event async for event in service.stream_code_completion({}, "suggest")]
+
+        assert events == [
+            {"type": "error", "status": "error", "error": "Unified MLX service not initialized"}
+        ]
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
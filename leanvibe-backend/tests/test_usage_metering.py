@@ -0,0 +1,235 @@
+"""
+Tests for the aggregating metered-usage pipeline
+
+Validates that usage increments are rolled up per tenant, metric and period,
+journaled locally, delivered with idempotency keys, and recovered after a
+crash without losing or double-counting usage.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.billing_models import Subscription, SubscriptionStatus, UsageMetricType
+from app.models.orm_models import UsageRecordORM
+from app.services.billing_service import BillingService, StripeIntegration
+from app.services.usage_metering import UsageAggregator, UsageRollup
+
+
+class RecordingSink:
+    """Delivery target that dedupes by idempotency key, like the billing backends"""
+
+    def __init__(self, fail_keys=()):
+        self.records = {}
+        self.fail_keys = set(fail_keys)
+        self.attempts = 0
+
+    async def __call__(self, rollup):
+        self.attempts += 1
+        if any(fragment in rollup.idempotency_key for fragment in self.fail_keys):
+            raise ConnectionError("billing backend unavailable")
+        self.records.setdefault(rollup.idempotency_key, rollup)
+
+    def totals(self):
+        totals = {}
+        for rollup in self.records.values():
+            key = (rollup.tenant_id, rollup.metric_type)
+            totals[key] = totals.get(key, 0) + rollup.quantity
+        return totals
+
+
+class TestUsageAggregator:
+    """Test in-memory aggregation and interval delivery"""
+
+    @pytest.mark.asyncio
+    async def test_increments_roll_up_per_tenant_metric_and_period(self, tmp_path):
+        sink = RecordingSink()
+        aggregator = UsageAggregator(sink, journal_dir=str(tmp_path))
+        tenant_a, tenant_b = uuid4(), uuid4()
+
+        for _ in range(100):
+            aggregator.record(tenant_a, UsageMetricType.AI_REQUESTS, 1, datetime(2026, 1, 1, 10, 5))
+        aggregator.record(tenant_a, UsageMetricType.AI_REQUESTS, 2, datetime(2026, 1, 1, 11, 0))
+        aggregator.record(tenant_b, UsageMetricType.API_CALLS, 5, datetime(2026, 1, 1, 10, 30))
+
+        assert aggregator.pending_quantity(tenant_a, UsageMetricType.AI_REQUESTS) == 102
+        assert await aggregator.flush() == 3
+        assert sorted(r.quantity for r in sink.records.values()) == [2, 5, 100]
+        assert {r.period_start for r in sink.records.values()} == {
+            datetime(2026, 1, 1, 10, 0),
+            datetime(2026, 1, 1, 11, 0),
+        }
+
+        assert await aggregator.flush() == 0
+        assert sink.attempts == 3
+        await aggregator.stop()
+        assert list(tmp_path.iterdir()) == [tmp_path / "segment-000000000001.log"]
+
+    @pytest.mark.asyncio
+    async def test_failed_rollups_retry_with_the_same_key(self, tmp_path):
+        tenant = uuid4()
+        sink = RecordingSink(fail_keys=[str(tenant)])
+        aggregator = UsageAggregator(sink, journal_dir=str(tmp_path))
+        aggregator.record(tenant, UsageMetricType.API_CALLS, 3)
+
+        assert await aggregator.flush() == 0
+        assert aggregator.pending_quantity(tenant, UsageMetricType.API_CALLS) == 3
+
+        sink.fail_keys.clear()
+        assert await aggregator.flush() == 1
+        assert sink.totals() == {(tenant, UsageMetricType.API_CALLS): 3}
+        assert aggregator.get_stats()["pending_batches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_undeliverable_rollups_are_dead_lettered(self, tmp_path):
+        tenant, other = uuid4(), uuid4()
+        sink = RecordingSink(fail_keys=[str(tenant)])
+        aggregator = UsageAggregator(sink, journal_dir=str(tmp_path), max_delivery_attempts=3)
+        aggregator.record(tenant, UsageMetricType.API_CALLS, 3)
+        aggregator.record(other, UsageMetricType.API_CALLS, 4)
+
+        assert await aggregator.flush() == 1
+        assert await aggregator.flush() == 0
+        assert aggregator.get_stats()["pending_batches"] == 1
+        assert await aggregator.flush() == 0
+
+        stats = aggregator.get_stats()
+        assert (stats["pending_batches"], stats["dead_lettered"]) == (0, 1)
+        assert aggregator.pending_quantity(tenant, UsageMetricType.API_CALLS) == 0
+        [entry] = (tmp_path / "dead-letter.log").read_text().splitlines()
+        assert f'"tenant_id": "{tenant}"' in entry
+
+        # Later flushes no longer retry it
+        attempts = sink.attempts
+        await aggregator.flush()
+        assert sink.attempts == attempts
+        await aggregator.stop()
+
+
+class TestUsageCrashRecovery:
+    """Test recovery of journaled usage after the process stops unexpectedly"""
+
+    @pytest.mark.asyncio
+    async def test_unflushed_increments_are_replayed(self, tmp_path):
+        tenant = uuid4()
+        crashed = UsageAggregator(RecordingSink(), journal_dir=str(tmp_path))
+        for _ in range(4):
+            crashed.record(tenant, UsageMetricType.AI_REQUESTS, 1)
+
+        sink = RecordingSink()
+        recovered = UsageAggregator(sink, journal_dir=str(tmp_path))
+        recovered.record(tenant, UsageMetricType.AI_REQUESTS, 1)
+
+        assert await recovered.flush() == 1
+        assert sink.totals() == {(tenant, UsageMetricType.AI_REQUESTS): 5}
+        assert recovered.get_stats()["recovered_events"] == 4
+
+    @pytest.mark.asyncio
+    async def test_partially_delivered_batch_resumes_without_double_counting(self, tmp_path):
+        delivered, failing = uuid4(), uuid4()
+        first_sink = RecordingSink(fail_keys=[str(failing)])
+        crashed = UsageAggregator(first_sink, journal_dir=str(tmp_path))
+        crashed.record(delivered, UsageMetricType.API_CALLS, 7)
+        crashed.record(failing, UsageMetricType.API_CALLS, 9)
+        await crashed.flush()
+
+        # Restart before the failed rollup was retried; the sink survives
+        first_sink.fail_keys.clear()
+        first_sink.attempts = 0
+        recovered = UsageAggregator(first_sink, journal_dir=str(tmp_path))
+        recovered.open()
+        assert recovered.pending_quantity(failing, UsageMetricType.API_CALLS) == 9
+        assert recovered.get_stats()["open_keys"] == 0
+
+        assert await recovered.flush() == 1
+        assert first_sink.attempts == 1
+        assert first_sink.totals() == {
+            (delivered, UsageMetricType.API_CALLS): 7,
+            (failing, UsageMetricType.API_CALLS): 9,
+        }
+
+
+class TestBillingUsageRecording:
+    """Test BillingService and Stripe integration with the pipeline"""
+
+    @pytest.mark.asyncio
+    async def test_record_usage_only_aggregates(self, tmp_path):
+        service = BillingService(usage_journal_dir=str(tmp_path))
+        tenant = uuid4()
+
+        key = await service.record_usage(tenant, UsageMetricType.AI_REQUESTS, 2)
+        await service.record_usage(tenant, UsageMetricType.AI_REQUESTS, 3)
+
+        assert key.startswith(f"{tenant}:ai_requests:")
+        assert service.usage_aggregator.pending_quantity(tenant, UsageMetricType.AI_REQUESTS) == 5
+        with pytest.raises(ValueError):
+            await service.record_usage(tenant, UsageMetricType.AI_REQUESTS, 0)
+        service.usage_aggregator.journal.close()
+
+    @pytest.mark.asyncio
+    async def test_stripe_usage_records_are_idempotent(self):
+        stripe = StripeIntegration()
+
+        first = await stripe.create_usage_record("si_1", 5, idempotency_key="batch:1")
+        retry = await stripe.create_usage_record("si_1", 5, idempotency_key="batch:1")
+        other = await stripe.create_usage_record("si_1", 5, idempotency_key="batch:2")
+
+        assert retry == first
+        assert other["id"] != first["id"]
+
+    @pytest.mark.asyncio
+    async def test_rollups_are_stored_and_reported_once(self, tmp_path):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        tenant = uuid4()
+        subscription = Subscription(
+            tenant_id=tenant,
+            billing_account_id=uuid4(),
+            plan_id=uuid4(),
+            status=SubscriptionStatus.ACTIVE,
+            current_period_start=datetime(2026, 1, 1),
+            current_period_end=datetime(2026, 2, 1),
+            stripe_subscription_id="sub_mock_1",
+        )
+
+        async with sessions() as db:
+            service = BillingService(db=db, usage_journal_dir=str(tmp_path))
+            service.get_subscription = AsyncMock(return_value=subscription)
+            await service.record_usage(tenant, UsageMetricType.AI_REQUESTS, 2, datetime(2026, 1, 5, 10))
+            await service.record_usage(tenant, UsageMetricType.AI_REQUESTS, 3, datetime(2026, 1, 5, 10))
+
+            assert await service.flush_usage() == 1
+            [record] = (await db.execute(select(UsageRecordORM))).scalars().all()
+
+            # A retried delivery of the same rollup is not stored twice
+            rollup = UsageRollup(
+                tenant_id=tenant,
+                metric_type=UsageMetricType.AI_REQUESTS,
+                period_start=record.usage_date,
+                quantity=record.quantity,
+                idempotency_key=record.aggregation_key,
+            )
+            await service._deliver_usage_rollup(rollup)
+            count = (await db.execute(select(func.count()).select_from(UsageRecordORM))).scalar()
+            service.usage_aggregator.journal.close()
+
+        await engine.dispose()
+        assert count == 1
+        assert (record.tenant_id, record.metric_type, record.quantity) == (tenant, "ai_requests", 5)
+        assert record.subscription_id == subscription.id
+        assert record.aggregation_key.endswith(f"{tenant}:ai_requests:{int(datetime(2026, 1, 5, 10, tzinfo=timezone.utc).timestamp())}")
+        assert record.stripe_usage_record_id in {
+            response["id"] for response in service.stripe._idempotent_responses.values()
+        }
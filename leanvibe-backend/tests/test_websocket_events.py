@@ -267,6 +267,7 @@ class TestBroadcastMessaging:
         
         # Act
         await connection_manager.broadcast(message)
+        await connection_manager.drain()
         
         # Assert
         for client_id, websocket in clients:
@@ -289,6 +290,7 @@ class TestBroadcastMessaging:
         
         # Act
         await connection_manager.broadcast_json(data)
+        await connection_manager.drain()
         
         # Assert
         for client_id, websocket in clients:
@@ -313,6 +315,7 @@ class TestBroadcastMessaging:
         
         # Act
         await connection_manager.broadcast(message)
+        await connection_manager.drain()
         
         # Assert
         # Working client should receive message
@@ -353,6 +356,7 @@ class TestTaskEventBroadcasting:
         
         # Act
         await connection_manager.broadcast_json(event_data)
+        await connection_manager.drain()
         
         # Assert
         assert len(websocket.sent_messages) == 1
@@ -388,6 +392,7 @@ class TestTaskEventBroadcasting:
         
         # Act
         await connection_manager.broadcast_json(event_data)
+        await connection_manager.drain()
         
         # Assert
         assert len(websocket.sent_messages) == 1
@@ -421,6 +426,7 @@ class TestTaskEventBroadcasting:
         
         # Act
         await connection_manager.broadcast_json(event_data)
+        await connection_manager.drain()
         
         # Assert
         assert len(websocket.sent_messages) == 1
@@ -454,6 +460,7 @@ class TestTaskEventBroadcasting:
         
         # Act
         await connection_manager.broadcast_json(event_data)
+        await connection_manager.drain()
         
         # Assert
         assert len(websocket.sent_messages) == 1
@@ -616,6 +623,7 @@ class TestErrorHandling:
         
         # Act - broadcast should handle failures gracefully
         await connection_manager.broadcast("Test message with failures")
+        await connection_manager.drain()
         
         # Assert
         # Working clients should receive message
@@ -648,6 +656,7 @@ class TestErrorHandling:
         
         # Act - should not raise exception due to default=str in json.dumps
         await connection_manager.broadcast_json(problematic_data)
+        await connection_manager.drain()
         
         # Assert - message should be sent successfully
         assert len(websocket.sent_messages) == 1